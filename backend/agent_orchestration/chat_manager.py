@@ -12,6 +12,8 @@ from asgiref.sync import sync_to_async
 
 from .query_analysis_service import get_query_analysis_service
 from .message_protocol import DelegationMessageProtocol, MessageType
+from .dag_scheduler import SubqueryDependencyTracker, get_scheduler_settings
+from .delegate_router import get_delegate_router
 
 logger = logging.getLogger('conversation_orchestrator')
 
@@ -1287,40 +1289,33 @@ class ChatManager:
                 'created_at': ''
             }]
         
-        # Step 2: Match subqueries to delegates (PARALLELIZED)
-        logger.info(f"🎯 GROUP CHAT MANAGER (INTELLIGENT): Matching {len(subqueries)} subqueries to delegates in parallel")
+        # Step 2: Match subqueries to delegates (cache, embedding fast path, then one batched LLM call)
+        logger.info(f"🎯 GROUP CHAT MANAGER (INTELLIGENT): Routing {len(subqueries)} subqueries to delegates")
         subquery_assignments = {}
         
         # Track assignment statistics for debugging
         delegate_assignment_counts = {name: 0 for name in delegate_descriptions.keys()}
         
-        # Create parallel matching tasks for all subqueries
-        matching_tasks = []
-        for subquery in subqueries:
-            sq_id = subquery['subquery_id']
-            sq_text = subquery['query']
-            
-            # Create async task for matching (don't await yet)
-            task = query_analysis_service.match_subquery_to_delegate(
-                subquery=sq_text,
+        matching_start_time = asyncio.get_event_loop().time()
+        try:
+            routing_decisions = await get_delegate_router().route_subqueries(
+                subqueries=subqueries,
                 delegate_descriptions=delegate_descriptions,
                 llm_provider=llm_provider,
-                confidence_threshold=confidence_threshold,
-                project=project
+                query_analysis_service=query_analysis_service,
+                confidence_threshold=confidence_threshold
             )
-            matching_tasks.append((sq_id, subquery, task))
-        
-        # Execute all matching operations in parallel
-        logger.info(f"🚀 GROUP CHAT MANAGER (INTELLIGENT): Executing {len(matching_tasks)} subquery matching operations in parallel")
-        matching_results = await asyncio.gather(
-            *[task for _, _, task in matching_tasks],
-            return_exceptions=True
-        )
+            matching_results = [routing_decisions.get(subquery['subquery_id'], {}) for subquery in subqueries]
+        except Exception as e:
+            logger.error(f"❌ GROUP CHAT MANAGER (INTELLIGENT): Delegate routing failed: {e}")
+            matching_results = [e] * len(subqueries)
+        matching_time = asyncio.get_event_loop().time() - matching_start_time
         
         # Process matching results
-        for (sq_id, subquery, _), match_result in zip(matching_tasks, matching_results):
+        for subquery, match_result in zip(subqueries, matching_results):
+            sq_id = subquery['subquery_id']
             try:
-                # Handle exceptions from parallel execution
+                # Handle routing failure
                 if isinstance(match_result, Exception):
                     logger.error(f"❌ GROUP CHAT MANAGER (INTELLIGENT): Exception matching subquery {sq_id[:8]}: {match_result}")
                     # Fallback: assign to all delegates
@@ -1394,80 +1389,111 @@ class ChatManager:
             'failed_delegations': 0,
             'timeouts': 0,
             'retries': 0,
+            'cancelled_delegations': 0,
             'matching_time': matching_time,
             'delegation_start_time': None,
             'delegation_end_time': None
         }
         
-        # Group subqueries by dependency level for parallel processing
-        dependency_levels = self._group_subqueries_by_dependency_level(subqueries, subquery_assignments)
+        # Each subquery is dispatched as soon as the subqueries it depends on have finished
+        tracker = SubqueryDependencyTracker(subqueries, subquery_assignments)
+        max_concurrent_delegations = max(1, int(
+            manager_data.get('max_concurrent_delegations') or get_scheduler_settings()['MAX_CONCURRENT_DELEGATIONS']
+        ))
+        delegate_semaphore = asyncio.Semaphore(max_concurrent_delegations)
+        # 'first_response': a subquery is answered by its first successful delegate and the
+        # others are cancelled; 'all_delegates' (default) waits for every assigned delegate
+        first_response_wins = manager_data.get('delegation_completion', 'all_delegates') == 'first_response'
         
         delegation_start_time = asyncio.get_event_loop().time()
         delegation_metrics['delegation_start_time'] = delegation_start_time
+        logger.info(f"🔄 GROUP CHAT MANAGER (INTELLIGENT): Dispatching {len(tracker.order)} subqueries by dependency, "
+                   f"up to {max_concurrent_delegations} delegate calls at once")
         
-        # Process each dependency level sequentially, but subqueries within a level in parallel
-        for level_idx, level_subqueries in enumerate(dependency_levels):
-            logger.info(f"🔄 GROUP CHAT MANAGER (INTELLIGENT): Processing dependency level {level_idx + 1}/{len(dependency_levels)} with {len(level_subqueries)} subqueries in parallel")
-            
-            # Create delegation messages for all subqueries in this level
-            level_tasks = []
-            for sq_id, assignment in level_subqueries:
-                subquery = assignment['subquery']
-                sq_text = subquery['query']
-                
-                # Create delegation message
-                delegation_message = DelegationMessageProtocol.create_delegation_message(
-                    subquery=sq_text,
-                    subquery_id=sq_id,
-                    priority=subquery.get('priority', 'medium'),
-                    original_input=input_text,
-                    related_subqueries=[sq['subquery_id'] for sq in subqueries if sq['subquery_id'] != sq_id],
-                    iteration=level_idx + 1,
-                    delegation_confidence=assignment['confidence']
-                )
-                
-                # Format message for delegate
-                formatted_message = DelegationMessageProtocol.format_message_for_delegate(delegation_message)
-                
-                # Create processing task
-                task = self._process_subquery_with_delegates(
-                    sq_id=sq_id,
-                    assignment=assignment,
-                    formatted_message=formatted_message,
-                    delegate_name_to_node=delegate_name_to_node,
-                    llm_provider=llm_provider,
-                    delegation_timeout=delegation_timeout,
-                    max_retries=max_retries,
-                    project_id=project_id,
-                    project=project,
-                    delegation_metrics=delegation_metrics
-                )
-                level_tasks.append((sq_id, task))
+        running_subqueries = {}  # {task: sq_id}
+        
+        def dispatch(sq_id):
+            assignment = subquery_assignments[sq_id]
+            subquery = assignment['subquery']
             
-            # Execute all subqueries in this level in parallel
-            logger.info(f"🚀 GROUP CHAT MANAGER (INTELLIGENT): Executing {len(level_tasks)} subqueries in parallel at level {level_idx + 1}")
-            level_results = await asyncio.gather(
-                *[task for _, task in level_tasks],
-                return_exceptions=True
+            # Create delegation message
+            delegation_message = DelegationMessageProtocol.create_delegation_message(
+                subquery=subquery['query'],
+                subquery_id=sq_id,
+                priority=subquery.get('priority', 'medium'),
+                original_input=input_text,
+                related_subqueries=[sq['subquery_id'] for sq in subqueries if sq['subquery_id'] != sq_id],
+                iteration=tracker.depth(sq_id),
+                delegation_confidence=assignment['confidence']
             )
             
-            # Process results
-            for (sq_id, _), result in zip(level_tasks, level_results):
-                if isinstance(result, Exception):
-                    logger.error(f"❌ GROUP CHAT MANAGER (INTELLIGENT): Exception processing subquery {sq_id[:8]}: {result}")
-                    delegate_responses[sq_id] = {}
-                    assignment = subquery_assignments.get(sq_id, {})
-                    assignment['status'] = 'error'
-                else:
-                    delegate_responses[sq_id] = result['delegate_responses']
+            # Format message for delegate, with the answers of the subqueries it depends on
+            formatted_message = DelegationMessageProtocol.format_message_for_delegate(delegation_message)
+            prerequisite_answers = [
+                f"- {delegate_name} (subquery {dep_id[:8]}): {response_data['response'][:1000]}"
+                for dep_id in tracker.in_order(tracker.dependencies.get(sq_id, ()))
+                for delegate_name, response_data in delegate_responses.get(dep_id, {}).items()
+                if response_data.get('status') == 'completed'
+            ]
+            if prerequisite_answers:
+                formatted_message += "\n\nResults from prerequisite subqueries:\n" + "\n".join(prerequisite_answers)
+            
+            task = asyncio.create_task(self._process_subquery_with_delegates(
+                sq_id=sq_id,
+                assignment=assignment,
+                formatted_message=formatted_message,
+                delegate_name_to_node=delegate_name_to_node,
+                llm_provider=llm_provider,
+                delegation_timeout=delegation_timeout,
+                max_retries=max_retries,
+                project_id=project_id,
+                project=project,
+                delegation_metrics=delegation_metrics,
+                delegate_semaphore=delegate_semaphore,
+                first_response_wins=first_response_wins
+            ))
+            running_subqueries[task] = sq_id
+            tracker.mark_running(sq_id)
+        
+        try:
+            for sq_id in tracker.ready():
+                dispatch(sq_id)
+            
+            while running_subqueries:
+                done, _ = await asyncio.wait(running_subqueries, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    sq_id = running_subqueries.pop(task)
                     assignment = subquery_assignments.get(sq_id, {})
-                    assignment['status'] = 'completed' if result['success'] else 'error'
+                    if task.exception() is not None:
+                        logger.error(f"❌ GROUP CHAT MANAGER (INTELLIGENT): Exception processing subquery {sq_id[:8]}: {task.exception()}")
+                        delegate_responses[sq_id] = {}
+                        assignment['status'] = 'error'
+                    else:
+                        result = task.result()
+                        delegate_responses[sq_id] = result['delegate_responses']
+                        assignment['status'] = 'completed' if result['success'] else 'error'
+                        
+                        # Add to conversation log
+                        for delegate_name, response_data in result['delegate_responses'].items():
+                            conversation_log.append(
+                                f"[Subquery {sq_id[:8]}] {delegate_name}: {response_data['response'][:200]}..."
+                            )
                     
-                    # Add to conversation log
-                    for delegate_name, response_data in result['delegate_responses'].items():
-                        conversation_log.append(
-                            f"[Subquery {sq_id[:8]}] {delegate_name}: {response_data['response'][:200]}..."
-                        )
+                    for next_sq_id in tracker.mark_finished(sq_id):
+                        logger.info(f"🔓 GROUP CHAT MANAGER (INTELLIGENT): Subquery {next_sq_id[:8]} ready after {sq_id[:8]} finished")
+                        dispatch(next_sq_id)
+                
+                if not running_subqueries:
+                    stalled = tracker.release_stalled()
+                    if stalled:
+                        # Circular dependency - process remaining anyway
+                        logger.warning(f"⚠️ GROUP CHAT MANAGER (INTELLIGENT): Circular dependency detected, processing {len(stalled)} remaining subqueries")
+                        for sq_id in stalled:
+                            dispatch(sq_id)
+        finally:
+            # Cancellation of the manager (or an error here) stops every delegate call still in flight
+            for task in running_subqueries:
+                task.cancel()
         
         delegation_end_time = asyncio.get_event_loop().time()
         delegation_metrics['delegation_end_time'] = delegation_end_time
@@ -1753,79 +1779,6 @@ Delegation Metrics:
             'error': str(last_error) if last_error else 'Unknown error'
         }
     
-    def _group_subqueries_by_dependency_level(
-        self,
-        subqueries: List[Dict[str, Any]],
-        subquery_assignments: Dict[str, Any]
-    ) -> List[List[tuple]]:
-        """
-        Group subqueries by dependency level for parallel processing
-        
-        Returns:
-            List of levels, where each level is a list of (sq_id, assignment) tuples
-            that can be processed in parallel
-        """
-        # Build dependency map: sq_id -> set of dependent sq_ids
-        dependency_map = {}
-        sq_id_to_index = {}
-        
-        for sq in subqueries:
-            sq_id = sq['subquery_id']
-            sq_index = sq.get('index', 0)
-            sq_id_to_index[sq_id] = sq_index
-            dependency_map[sq_id] = set()
-        
-        # Build reverse dependency map: which subqueries depend on this one
-        reverse_deps = {sq_id: set() for sq_id in dependency_map.keys()}
-        
-        for sq in subqueries:
-            sq_id = sq['subquery_id']
-            dependencies = sq.get('dependencies', [])
-            for dep_idx in dependencies:
-                # Find the subquery with this index
-                for dep_sq in subqueries:
-                    if dep_sq.get('index') == dep_idx:
-                        dep_sq_id = dep_sq['subquery_id']
-                        dependency_map[sq_id].add(dep_sq_id)
-                        reverse_deps[dep_sq_id].add(sq_id)
-                        break
-        
-        # Topological sort to group by levels
-        levels = []
-        processed = set()
-        remaining = set(dependency_map.keys())
-        
-        while remaining:
-            # Find all subqueries with no unprocessed dependencies
-            current_level = []
-            for sq_id in list(remaining):
-                deps = dependency_map.get(sq_id, set())
-                if deps.issubset(processed):
-                    # All dependencies are processed, can add to current level
-                    if sq_id in subquery_assignments:
-                        current_level.append((sq_id, subquery_assignments[sq_id]))
-            
-            if not current_level:
-                # Circular dependency or error - process remaining anyway
-                logger.warning(f"⚠️ GROUP CHAT MANAGER (INTELLIGENT): Circular dependency detected or missing assignments, processing remaining subqueries")
-                for sq_id in list(remaining):
-                    if sq_id in subquery_assignments:
-                        current_level.append((sq_id, subquery_assignments[sq_id]))
-            
-            if not current_level:
-                break
-            
-            levels.append(current_level)
-            for sq_id, _ in current_level:
-                processed.add(sq_id)
-                remaining.discard(sq_id)
-        
-        logger.info(f"📊 GROUP CHAT MANAGER (INTELLIGENT): Grouped {len(subqueries)} subqueries into {len(levels)} dependency levels")
-        for level_idx, level in enumerate(levels):
-            logger.info(f"  Level {level_idx + 1}: {len(level)} subqueries")
-        
-        return levels
-    
     async def _process_subquery_with_delegates(
         self,
         sq_id: str,
@@ -1837,11 +1790,17 @@ Delegation Metrics:
         max_retries: int,
         project_id: Optional[str],
         project: Optional[Any],
-        delegation_metrics: Dict[str, int]
+        delegation_metrics: Dict[str, int],
+        delegate_semaphore: Optional[asyncio.Semaphore] = None,
+        first_response_wins: bool = False
     ) -> Dict[str, Any]:
         """
         Process a single subquery by delegating to assigned delegates in parallel
         
+        Delegate calls wait on ``delegate_semaphore`` (shared by all subqueries of
+        the manager). With ``first_response_wins`` the first successful response
+        answers the subquery and the remaining calls are cancelled.
+        
         Returns:
             Dict with 'sq_id', 'delegate_responses', 'success'
         """
@@ -1861,7 +1820,7 @@ Delegation Metrics:
             delegation_metrics['total_delegations'] += 1
             
             # Create task for parallel execution
-            task = self._execute_delegate_with_retry(
+            task = self._run_bounded(delegate_semaphore, self._execute_delegate_with_retry(
                 delegate_name=delegate_name,
                 delegate_node=delegate_node,
                 llm_provider=llm_provider,
@@ -1871,7 +1830,7 @@ Delegation Metrics:
                 max_retries=max_retries,
                 project_id=project_id,
                 project=project
-            )
+            ))
             delegate_tasks.append((delegate_name, task))
         
         if not delegate_tasks:
@@ -1884,14 +1843,20 @@ Delegation Metrics:
         
         # Execute all delegates in parallel
         logger.info(f"🚀 GROUP CHAT MANAGER (INTELLIGENT): Executing {len(delegate_tasks)} delegates in parallel for {sq_id[:8]}")
-        delegate_results = await asyncio.gather(
-            *[task for _, task in delegate_tasks],
-            return_exceptions=True
-        )
+        if first_response_wins:
+            delegate_results = await self._gather_until_first_success(delegate_tasks, sq_id, delegation_metrics)
+        else:
+            delegate_results = await asyncio.gather(
+                *[task for _, task in delegate_tasks],
+                return_exceptions=True
+            )
         
         # Process results
         delegate_responses = {}
         for (delegate_name, _), result in zip(delegate_tasks, delegate_results):
+            if result is None:
+                # Cancelled: another delegate already answered this subquery
+                continue
             if isinstance(result, Exception):
                 logger.error(f"❌ GROUP CHAT MANAGER (INTELLIGENT): Exception from {delegate_name}: {result}")
                 delegate_responses[delegate_name] = {
@@ -1932,6 +1897,43 @@ Delegation Metrics:
             'success': any(r.get('status') == 'completed' for r in delegate_responses.values())
         }
     
+    @staticmethod
+    async def _run_bounded(semaphore: Optional[asyncio.Semaphore], coroutine):
+        """Await ``coroutine`` holding a slot of ``semaphore`` (if any)"""
+        if semaphore is None:
+            return await coroutine
+        async with semaphore:
+            return await coroutine
+    
+    async def _gather_until_first_success(
+        self,
+        delegate_tasks: List[tuple],
+        sq_id: str,
+        delegation_metrics: Dict[str, int]
+    ) -> List[Any]:
+        """
+        Run delegate calls until one succeeds, then cancel the rest. Returns
+        results in ``delegate_tasks`` order; cancelled calls are None.
+        """
+        tasks = [asyncio.ensure_future(coroutine) for _, coroutine in delegate_tasks]
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                if any(not task.exception() and task.result().get('success') for task in done):
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+        
+        if pending:
+            delegation_metrics['cancelled_delegations'] += len(pending)
+            logger.info(f"✂️ GROUP CHAT MANAGER (INTELLIGENT): Subquery {sq_id[:8]} answered, cancelled {len(pending)} remaining delegate call(s)")
+        return [
+            None if task in pending else (task.exception() or task.result())
+            for task in tasks
+        ]
+    
     async def _execute_delegate_with_delegation_message(
         self,
         delegate_node: Dict[str, Any],
@@ -62,10 +62,12 @@ class AgentOrchestrationConsumer(AsyncWebsocketConsumer):
             'message': 'Connected to real-time workflow execution',
             'capabilities': {
                 'real_time_messaging': True,
+                'token_streaming': True,
                 'human_input_support': True,
                 'code_execution': True,
                 'multi_provider_llm': True,
                 'execution_status': True,
+                'background_jobs': True,
                 'error_recovery': True
             }
         }))
@@ -123,6 +125,22 @@ class AgentOrchestrationConsumer(AsyncWebsocketConsumer):
             'token_count': event.get('token_count')
         }))
     
+    async def agent_stream(self, event):
+        """Send partial agent output (token deltas) to WebSocket"""
+        await self.send(text_data=json.dumps({
+            'type': 'agent_stream',
+            'event': event['event'],
+            'execution_id': event.get('execution_id'),
+            'node_id': event.get('node_id'),
+            'agent_name': event.get('agent_name'),
+            'agent_type': event.get('agent_type'),
+            'delta': event.get('delta', ''),
+            'error': event.get('error'),
+            'first_token_ms': event.get('first_token_ms'),
+            'response_time_ms': event.get('response_time_ms'),
+            'timestamp': event['timestamp']
+        }))
+    
     async def execution_status(self, event):
         """Send execution status update to WebSocket (Phase 4)"""
         await self.send(text_data=json.dumps({
@@ -133,6 +151,14 @@ class AgentOrchestrationConsumer(AsyncWebsocketConsumer):
             'timestamp': event['timestamp']
         }))
     
+    async def job_update(self, event):
+        """Send background job status/progress to WebSocket"""
+        await self.send(text_data=json.dumps({
+            'type': 'job_update',
+            'job': event['job'],
+            'timestamp': event['timestamp']
+        }))
+    
     async def human_input_request(self, event):
         """Request human input from connected user"""
         await self.send(text_data=json.dumps({
@@ -10,7 +10,7 @@ The heavy lifting is now done by dedicated modules for better maintainability.
 """
 
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Callable, Awaitable
 from asgiref.sync import sync_to_async
 
 # Import specialized modules
@@ -83,7 +83,8 @@ class ConversationOrchestrator:
     # MAIN API METHODS - Primary interfaces used by the application
     # ============================================================================
     
-    async def execute_workflow(self, workflow: AgentWorkflow, executed_by, deployment_context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    async def execute_workflow(self, workflow: AgentWorkflow, executed_by, deployment_context: Optional[Dict[str, Any]] = None,
+                               stream_callback: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None) -> Dict[str, Any]:
         """
         Execute the complete workflow with REAL LLM calls and conversation chaining
         
@@ -91,11 +92,14 @@ class ConversationOrchestrator:
             workflow: The AgentWorkflow instance to execute
             executed_by: User who initiated the execution
             deployment_context: Optional deployment context with user query for UserProxyAgent handling
+            stream_callback: Optional async callback receiving streamed agent token events
             
         Returns:
             Dict containing execution results, conversation history, and metadata
         """
-        return await self.workflow_executor.execute_workflow(workflow, executed_by, deployment_context=deployment_context)
+        return await self.workflow_executor.execute_workflow(
+            workflow, executed_by, deployment_context=deployment_context, stream_callback=stream_callback
+        )
     
     async def resume_workflow_with_human_input(self, execution_id: str, human_input: str, user):
         """
@@ -178,13 +182,13 @@ class ConversationOrchestrator:
             chat_manager_node, llm_provider, conversation_history, execution_sequence, graph_json
         )
     
-    async def handle_reflection_connections(self, agent_node, agent_response, graph_json, llm_provider):
+    async def handle_reflection_connections(self, agent_node, agent_response, graph_json, llm_provider, execution_record=None):
         """
         Handle reflection connections for an agent
         Delegates to ReflectionHandler for actual implementation
         """
         return await self.reflection_handler.handle_reflection_connections(
-            agent_node, agent_response, graph_json, llm_provider
+            agent_node, agent_response, graph_json, llm_provider, execution_record
         )
     
     async def pause_for_human_input(self, workflow, node, executed_nodes, conversation_history, execution_record):
@@ -0,0 +1,270 @@
+"""
+DAG Scheduler for Workflow Execution
+====================================
+
+Completion-driven scheduling for WorkflowExecutor. Dependencies are computed
+once per execution into in-degree counters; finishing a node decrements its
+dependents' counters so each node becomes ready the moment its last upstream
+node finishes, instead of waiting for a whole "wave" to complete.
+
+Also records per-node timing so an execution can report its critical path and
+how long the same run would have taken with wave barriers.
+
+SubqueryDependencyTracker applies the same completion-driven release to the
+subqueries a GroupChatManager delegates.
+"""
+
+import logging
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from django.conf import settings
+
+from .execution_plan import ExecutionPlan, requires_human_input
+
+logger = logging.getLogger('conversation_orchestrator')
+
+DEFAULT_SCHEDULER_SETTINGS = {
+    'MAX_CONCURRENT_NODES': 4,
+    'MAX_CONCURRENT_DELEGATIONS': 6,
+}
+
+# Agent types the concurrent node runner fully handles (one prompt, one LLM call)
+EAGER_NODE_TYPES = {'AssistantAgent', 'DelegateAgent', 'UserProxyAgent'}
+
+
+def get_scheduler_settings() -> Dict[str, Any]:
+    """Merge ``settings.WORKFLOW_SCHEDULER`` over the defaults"""
+    scheduler_settings = dict(DEFAULT_SCHEDULER_SETTINGS)
+    scheduler_settings.update(getattr(settings, 'WORKFLOW_SCHEDULER', {}) or {})
+    return scheduler_settings
+
+
+class DagScheduler:
+    """
+    Ready-set tracking for one workflow execution.
+
+    Dependencies come from the compiled ExecutionPlan: sources of sequential
+    edges, plus sources of reflection edges into human-input UserProxyAgent
+    nodes. StartNode/EndNode are never reported as ready.
+    """
+
+    def __init__(self, execution_sequence: List[Dict[str, Any]], plan: ExecutionPlan,
+                 executed_nodes: Optional[Dict[str, Any]] = None):
+        self.execution_sequence = execution_sequence
+        self.position = {node.get('id'): index for index, node in enumerate(execution_sequence)}
+        self.nodes = {node.get('id'): node for node in execution_sequence}
+        self.reflection_sources = plan.reflection_sources
+
+        self.dependencies: Dict[str, Set[str]] = {
+            node_id: set(plan.dependencies.get(node_id, ())) for node_id in self.nodes
+        }
+        self.dependents: Dict[str, Set[str]] = {node_id: set() for node_id in self.nodes}
+        for node_id, deps in self.dependencies.items():
+            for source_id in deps:
+                if source_id in self.dependents:
+                    self.dependents[source_id].add(node_id)
+
+        executed = set(executed_nodes or {})
+        self.finished: Set[str] = set()
+        self.succeeded: Set[str] = set(executed)
+        # In-degree counters: dependencies still outstanding per node
+        self.remaining: Dict[str, int] = {
+            node_id: len(deps - executed) for node_id, deps in self.dependencies.items()
+        }
+        self.finished.update(node_id for node_id in executed if node_id in self.nodes)
+        self.running: Set[str] = set()
+
+    def ready_nodes(self) -> List[Tuple[int, Dict[str, Any]]]:
+        """Nodes whose dependencies have all succeeded, in execution-sequence order"""
+        ready = []
+        for node_id, count in self.remaining.items():
+            if count or node_id in self.finished or node_id in self.running:
+                continue
+            node = self.nodes[node_id]
+            if node.get('type') in ('StartNode', 'EndNode'):
+                continue
+            ready.append((self.position[node_id], node))
+        ready.sort(key=lambda item: item[0])
+        return ready
+
+    def is_eager(self, node: Dict[str, Any]) -> bool:
+        """
+        Whether the node can run in the concurrent node runner: a plain agent
+        turn with no human input and no outgoing reflection (those pause or
+        need the full sequential handling).
+        """
+        return (node.get('type') in EAGER_NODE_TYPES and
+                not requires_human_input(node) and
+                node.get('id') not in self.reflection_sources)
+
+    def mark_running(self, node_id: str):
+        self.running.add(node_id)
+
+    def mark_finished(self, node_id: str, succeeded: bool = True) -> List[str]:
+        """
+        Record a finished node. On success, decrements dependents' counters and
+        returns the ids that just became ready; failed nodes release nothing.
+        """
+        self.running.discard(node_id)
+        if node_id in self.finished:
+            return []
+        self.finished.add(node_id)
+        if not succeeded:
+            return []
+
+        self.succeeded.add(node_id)
+        newly_ready = []
+        for dependent_id in self.dependents.get(node_id, ()):
+            self.remaining[dependent_id] -= 1
+            if self.remaining[dependent_id] == 0 and dependent_id not in self.finished:
+                newly_ready.append(dependent_id)
+        newly_ready.sort(key=lambda node_id: self.position[node_id])
+        return newly_ready
+
+
+class SubqueryDependencyTracker:
+    """
+    Ready-set tracking for the subqueries of one intelligent delegation.
+
+    ``dependencies`` on a subquery are indexes of other subqueries. A finished
+    subquery (succeeded or not) releases its dependents, matching the level
+    scheduler it replaces; subqueries caught in a cycle are released once
+    nothing else can run.
+    """
+
+    def __init__(self, subqueries: List[Dict[str, Any]], assignments: Dict[str, Any]):
+        self.order = [sq['subquery_id'] for sq in subqueries if sq['subquery_id'] in assignments]
+        self.position = {sq_id: index for index, sq_id in enumerate(self.order)}
+        index_to_id = {}
+        for sq in subqueries:
+            index_to_id.setdefault(sq.get('index'), sq['subquery_id'])
+
+        self.dependencies: Dict[str, Set[str]] = {}
+        for sq in subqueries:
+            sq_id = sq['subquery_id']
+            if sq_id not in self.position:
+                continue
+            self.dependencies[sq_id] = {
+                index_to_id[dep_index] for dep_index in sq.get('dependencies', []) or []
+                if index_to_id.get(dep_index) in self.position and index_to_id[dep_index] != sq_id
+            }
+        self.dependents: Dict[str, Set[str]] = {sq_id: set() for sq_id in self.order}
+        for sq_id, deps in self.dependencies.items():
+            for dep_id in deps:
+                self.dependents[dep_id].add(sq_id)
+
+        self.remaining: Dict[str, int] = {sq_id: len(deps) for sq_id, deps in self.dependencies.items()}
+        self.running: Set[str] = set()
+        self.finished: Set[str] = set()
+
+    def in_order(self, sq_ids) -> List[str]:
+        """``sq_ids`` in the order the subqueries were produced"""
+        return sorted(sq_ids, key=lambda sq_id: self.position[sq_id])
+
+    def ready(self) -> List[str]:
+        """Subqueries whose dependencies have all finished, not yet dispatched"""
+        return self.in_order(
+            sq_id for sq_id, count in self.remaining.items()
+            if not count and sq_id not in self.running and sq_id not in self.finished
+        )
+
+    def depth(self, sq_id: str) -> int:
+        """1 + length of the longest dependency chain below ``sq_id`` (cycles count once)"""
+        depth, frontier, seen = 1, set(self.dependencies.get(sq_id, ())), {sq_id}
+        while frontier - seen:
+            seen |= frontier
+            depth += 1
+            frontier = {dep for node in frontier for dep in self.dependencies.get(node, ())}
+        return depth
+
+    def mark_running(self, sq_id: str):
+        self.running.add(sq_id)
+
+    def mark_finished(self, sq_id: str) -> List[str]:
+        """Record a finished subquery and return the ids that just became ready"""
+        self.running.discard(sq_id)
+        if sq_id in self.finished:
+            return []
+        self.finished.add(sq_id)
+        newly_ready = []
+        for dependent_id in self.dependents.get(sq_id, ()):
+            self.remaining[dependent_id] -= 1
+            if self.remaining[dependent_id] == 0 and dependent_id not in self.finished:
+                newly_ready.append(dependent_id)
+        return self.in_order(newly_ready)
+
+    def release_stalled(self) -> List[str]:
+        """With nothing running, release subqueries still blocked (dependency cycle)"""
+        if self.running:
+            return []
+        stalled = [sq_id for sq_id in self.order if sq_id not in self.finished]
+        for sq_id in stalled:
+            self.remaining[sq_id] = 0
+        return stalled
+
+
+class CriticalPathTracker:
+    """
+    Per-node wall-clock timing for one execution.
+
+    ``summary()`` compares the critical path (longest dependency chain by node
+    duration) with the time a wave scheduler would have needed for the same
+    node durations, where each wave waits for its slowest node.
+    """
+
+    def __init__(self, scheduler: DagScheduler):
+        self.scheduler = scheduler
+        self.started_at = time.monotonic()
+        self.node_started: Dict[str, float] = {}
+        self.node_duration: Dict[str, float] = {}
+
+    def node_start(self, node_id: str):
+        self.node_started.setdefault(node_id, time.monotonic())
+
+    def node_end(self, node_id: str):
+        started = self.node_started.get(node_id)
+        if started is not None and node_id not in self.node_duration:
+            self.node_duration[node_id] = time.monotonic() - started
+
+    def summary(self) -> Dict[str, Any]:
+        dependencies = self.scheduler.dependencies
+        positions = self.scheduler.position
+        timed = sorted(self.node_duration, key=lambda node_id: positions.get(node_id, 0))
+
+        # Earliest finish along dependency chains (nodes are in topological order)
+        earliest_finish: Dict[str, float] = {}
+        predecessor: Dict[str, Optional[str]] = {}
+        # Wave level: 1 + deepest timed dependency
+        level: Dict[str, int] = {}
+        for node_id in timed:
+            timed_deps = [dep for dep in dependencies.get(node_id, ()) if dep in earliest_finish]
+            best = max(timed_deps, key=lambda dep: earliest_finish[dep], default=None)
+            predecessor[node_id] = best
+            earliest_finish[node_id] = (earliest_finish[best] if best else 0.0) + self.node_duration[node_id]
+            level[node_id] = 1 + max((level[dep] for dep in timed_deps), default=0)
+
+        critical_path = []
+        if earliest_finish:
+            node_id = max(earliest_finish, key=earliest_finish.get)
+            while node_id:
+                critical_path.append(node_id)
+                node_id = predecessor[node_id]
+            critical_path.reverse()
+
+        waves: Dict[int, float] = {}
+        for node_id, wave in level.items():
+            waves[wave] = max(waves.get(wave, 0.0), self.node_duration[node_id])
+
+        critical_path_seconds = max(earliest_finish.values(), default=0.0)
+        wave_schedule_seconds = sum(waves.values())
+        return {
+            'wall_clock_seconds': round(time.monotonic() - self.started_at, 3),
+            'critical_path_seconds': round(critical_path_seconds, 3),
+            'wave_schedule_seconds': round(wave_schedule_seconds, 3),
+            'barrier_cost_seconds': round(max(0.0, wave_schedule_seconds - critical_path_seconds), 3),
+            'critical_path': [
+                self.scheduler.nodes[node_id].get('data', {}).get('name', node_id) for node_id in critical_path
+            ],
+            'timed_nodes': len(timed),
+        }
@@ -0,0 +1,333 @@
+"""
+Delegate Router
+===============
+
+Assigns the subqueries of an intelligent delegation to delegate agents in as
+few LLM round trips as possible:
+
+1. Cached decisions, keyed by normalised subquery text and the delegate set
+   (names and descriptions), are reused across executions.
+2. Embedding fast path: a subquery whose embedding is clearly closest to one
+   delegate's description is assigned without an LLM call.
+3. Every remaining subquery is routed in one structured LLM call. Entries the
+   batched reply leaves out fall back to the per-subquery matcher.
+
+Decisions have the same shape as ``QueryAnalysisService.match_subquery_to_delegate``:
+``assigned_delegates``, ``confidence``, ``reasoning`` (plus ``route``: cache,
+embedding, batch_llm, single_llm or fallback).
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from core.ttl_cache import TTLCache
+from vector_search.query_embedding_cache import cached_query_embedding, normalize_query_text
+
+logger = logging.getLogger('agent_orchestration.query_analysis')
+
+DEFAULT_DELEGATE_ROUTING_SETTINGS = {
+    'EMBEDDING_FAST_PATH': True,
+    'EMBEDDING_MODEL': '',  # '' uses VECTOR_EMBEDDING_MODEL
+    'FAST_PATH_MIN_SIMILARITY': 0.5,  # Cosine similarity to the best delegate description
+    'FAST_PATH_MIN_MARGIN': 0.15,  # Lead of the best delegate over the runner-up
+    'CACHE_SIZE': 1024,
+    'CACHE_TTL': 3600,  # seconds
+}
+
+
+def get_delegate_routing_settings() -> Dict[str, Any]:
+    """Merge ``settings.DELEGATE_ROUTING`` over the defaults"""
+    routing_settings = dict(DEFAULT_DELEGATE_ROUTING_SETTINGS)
+    routing_settings.update(getattr(settings, 'DELEGATE_ROUTING', {}) or {})
+    return routing_settings
+
+
+def delegate_set_key(delegate_descriptions: Dict[str, str]) -> str:
+    """Digest of the delegate names and descriptions a decision was made against"""
+    payload = json.dumps(sorted(delegate_descriptions.items()), ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _routing_cache_key(subquery: str, delegates_key: str) -> Tuple[str, str]:
+    return (normalize_query_text(subquery).lower(), delegates_key)
+
+
+def _extract_json(response_text: str) -> Any:
+    """Parse a JSON reply, tolerating markdown fences and surrounding prose"""
+    text = response_text.strip()
+    if text.startswith('```'):
+        text = text.split('\n', 1)[1] if '\n' in text else ''
+        text = text.rsplit('```', 1)[0]
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        start, end = text.find('{'), text.rfind('}')
+        if start == -1 or end <= start:
+            raise
+        return json.loads(text[start:end + 1])
+
+
+class DelegateRouter:
+    """Routes batches of subqueries to delegates; one instance per process"""
+
+    def __init__(self, routing_settings: Optional[Dict[str, Any]] = None):
+        self.settings = routing_settings or get_delegate_routing_settings()
+        self.decisions = TTLCache(
+            'delegate_routing_decisions',
+            maxsize=self.settings['CACHE_SIZE'],
+            ttl=self.settings['CACHE_TTL']
+        )
+        self.model_name = self.settings['EMBEDDING_MODEL'] or getattr(settings, 'VECTOR_EMBEDDING_MODEL', 'all-MiniLM-L6-v2')
+        self._embedding_available = bool(self.settings['EMBEDDING_FAST_PATH'])
+        self.route_counts = {'cache': 0, 'embedding': 0, 'batch_llm': 0, 'single_llm': 0, 'fallback': 0}
+
+    async def route_subqueries(
+        self,
+        subqueries: List[Dict[str, Any]],
+        delegate_descriptions: Dict[str, str],
+        llm_provider,
+        query_analysis_service,
+        confidence_threshold: float = 0.7
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Decide the delegates of every subquery.
+
+        Args:
+            subqueries: Subquery dicts from ``analyze_and_split_query``
+            delegate_descriptions: Dict mapping delegate names to their descriptions
+            llm_provider: LLM provider for the batched routing call
+            query_analysis_service: Service whose per-subquery matcher handles leftovers
+            confidence_threshold: Decisions below this broadcast to all delegates
+
+        Returns:
+            Dict mapping subquery_id to its decision
+        """
+        if not delegate_descriptions:
+            return {
+                sq['subquery_id']: self._broadcast(delegate_descriptions, 0.0, 'No delegates available')
+                for sq in subqueries
+            }
+
+        delegates_key = delegate_set_key(delegate_descriptions)
+        raw_decisions: Dict[str, Dict[str, Any]] = {}
+        unrouted = []
+
+        for sq in subqueries:
+            cached = self.decisions.get(_routing_cache_key(sq['query'], delegates_key))
+            if cached is not None:
+                raw_decisions[sq['subquery_id']] = dict(cached, route='cache')
+            else:
+                unrouted.append(sq)
+
+        if unrouted and self._embedding_available and len(delegate_descriptions) > 1:
+            fast_decisions = await self._embedding_fast_path(unrouted, delegate_descriptions, confidence_threshold)
+            raw_decisions.update(fast_decisions)
+            unrouted = [sq for sq in unrouted if sq['subquery_id'] not in fast_decisions]
+
+        if unrouted:
+            raw_decisions.update(await self._route_with_llm(
+                unrouted, delegate_descriptions, llm_provider, query_analysis_service, confidence_threshold
+            ))
+
+        decisions = {}
+        for sq in subqueries:
+            decision = raw_decisions.get(sq['subquery_id'])
+            if decision is None:
+                decision = self._broadcast(delegate_descriptions, 0.5, 'No routing decision, broadcasting to all delegates')
+            elif decision['route'] in ('embedding', 'batch_llm'):
+                self.decisions.set(_routing_cache_key(sq['query'], delegates_key), {
+                    key: decision[key] for key in ('assigned_delegates', 'confidence', 'reasoning')
+                })
+            self.route_counts[decision['route']] += 1
+            decisions[sq['subquery_id']] = self._apply_threshold(decision, delegate_descriptions, confidence_threshold)
+
+        routes = {}
+        for decision in decisions.values():
+            routes[decision['route']] = routes.get(decision['route'], 0) + 1
+        logger.info(f"🧭 DELEGATE ROUTER: Routed {len(subqueries)} subqueries ({routes})")
+        return decisions
+
+    @staticmethod
+    def _broadcast(delegate_descriptions: Dict[str, str], confidence: float, reasoning: str) -> Dict[str, Any]:
+        return {
+            'assigned_delegates': list(delegate_descriptions.keys()),
+            'confidence': confidence,
+            'reasoning': reasoning,
+            'route': 'fallback'
+        }
+
+    def _apply_threshold(self, decision: Dict[str, Any], delegate_descriptions: Dict[str, str],
+                         confidence_threshold: float) -> Dict[str, Any]:
+        """
+        Same rule as the per-subquery matcher (which already applied it to its own
+        decisions): unknown delegates or low confidence broadcast to all delegates
+        """
+        valid = [name for name in decision['assigned_delegates'] if name in delegate_descriptions]
+        if decision['route'] not in ('fallback', 'single_llm') and (not valid or decision['confidence'] < confidence_threshold):
+            return {
+                'assigned_delegates': list(delegate_descriptions.keys()),
+                'confidence': decision['confidence'],
+                'reasoning': f"Confidence below threshold or no valid matches. Original reasoning: {decision['reasoning']}",
+                'route': decision['route']
+            }
+        return dict(decision, assigned_delegates=valid or list(delegate_descriptions.keys()))
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        from vector_search.model_registry import get_sentence_transformer
+
+        model = get_sentence_transformer(self.model_name)
+        compute = lambda text: model.encode(text, normalize_embeddings=True)
+        return np.vstack([cached_query_embedding(text, self.model_name, compute) for text in texts])
+
+    async def _embedding_fast_path(self, subqueries: List[Dict[str, Any]], delegate_descriptions: Dict[str, str],
+                                   confidence_threshold: float) -> Dict[str, Dict[str, Any]]:
+        """Assign subqueries that are clearly closest to one delegate's description"""
+        names = list(delegate_descriptions.keys())
+        try:
+            embeddings = await sync_to_async(self._embed, thread_sensitive=False)(
+                [f"{name}: {delegate_descriptions[name]}" for name in names] + [sq['query'] for sq in subqueries]
+            )
+        except Exception as e:
+            # Without an embedding model every subquery goes to the LLM
+            logger.warning(f"⚠️ DELEGATE ROUTER: Embedding fast path disabled: {e}")
+            self._embedding_available = False
+            return {}
+
+        delegate_vectors, query_vectors = embeddings[:len(names)], embeddings[len(names):]
+        similarities = query_vectors @ delegate_vectors.T  # normalised embeddings: cosine similarity
+
+        decisions = {}
+        for sq, row in zip(subqueries, similarities):
+            order = np.argsort(row)[::-1]
+            best, runner_up = float(row[order[0]]), float(row[order[1]])
+            margin = best - runner_up
+            confidence = min(1.0, best + margin)
+            if (best >= self.settings['FAST_PATH_MIN_SIMILARITY'] and
+                    margin >= self.settings['FAST_PATH_MIN_MARGIN'] and
+                    confidence >= confidence_threshold):
+                decisions[sq['subquery_id']] = {
+                    'assigned_delegates': [names[order[0]]],
+                    'confidence': round(confidence, 3),
+                    'reasoning': f"Closest delegate description (similarity {best:.2f}, {margin:.2f} ahead of {names[order[1]]})",
+                    'route': 'embedding'
+                }
+        if decisions:
+            logger.info(f"⚡ DELEGATE ROUTER: Embedding fast path routed {len(decisions)}/{len(subqueries)} subqueries")
+        return decisions
+
+    async def _route_with_llm(self, subqueries: List[Dict[str, Any]], delegate_descriptions: Dict[str, str],
+                              llm_provider, query_analysis_service,
+                              confidence_threshold: float) -> Dict[str, Dict[str, Any]]:
+        """One structured call for all subqueries; leftovers use the per-subquery matcher"""
+        delegate_info_str = "\n".join(f"- {name}: {desc}" for name, desc in delegate_descriptions.items())
+        subquery_list = "\n".join(f"{position}. {sq['query']}" for position, sq in enumerate(subqueries))
+
+        routing_prompt = f"""You are a task routing system. Given numbered subqueries and available delegate agents,
+determine which delegate(s) should handle each subquery.
+
+Subqueries:
+{subquery_list}
+
+Available Delegates:
+{delegate_info_str}
+
+Instructions:
+1. Analyze each subquery's requirements and the capabilities needed
+2. Match against delegate capabilities (from their descriptions)
+3. Assign each subquery to the best matching delegate(s) - can assign to multiple if collaboration is beneficial
+4. Provide a confidence score (0.0-1.0) per subquery indicating how well the delegates match
+5. Provide brief reasoning per subquery
+
+Return JSON with one entry per subquery:
+{{
+  "assignments": [
+    {{"subquery": 0, "assigned_delegates": ["Financial Analyst"], "confidence": 0.9, "reasoning": "Requires financial analysis."}}
+  ]
+}}
+
+Return ONLY the JSON object, no additional text or explanation."""
+
+        decisions = {}
+        try:
+            logger.info(f"🤖 DELEGATE ROUTER: Routing {len(subqueries)} subqueries in one LLM call")
+            llm_response = await llm_provider.generate_response(
+                prompt=routing_prompt,
+                max_tokens=min(4000, 200 + 150 * len(subqueries)),
+                temperature=0.2
+            )
+            if llm_response.error:
+                raise ValueError(llm_response.error)
+
+            reply = _extract_json(llm_response.text)
+            assignments = reply.get('assignments', []) if isinstance(reply, dict) else reply
+            for entry in assignments if isinstance(assignments, list) else []:
+                if not isinstance(entry, dict):
+                    continue
+                try:
+                    position = int(entry.get('subquery'))
+                except (TypeError, ValueError):
+                    continue
+                if not 0 <= position < len(subqueries) or subqueries[position]['subquery_id'] in decisions:
+                    continue
+                assigned = entry.get('assigned_delegates', [])
+                try:
+                    confidence = max(0.0, min(1.0, float(entry.get('confidence', 0.5))))
+                except (TypeError, ValueError):
+                    confidence = 0.5
+                decisions[subqueries[position]['subquery_id']] = {
+                    'assigned_delegates': [name for name in assigned if name in delegate_descriptions]
+                    if isinstance(assigned, list) else [],
+                    'confidence': confidence,
+                    'reasoning': entry.get('reasoning', 'No reasoning provided'),
+                    'route': 'batch_llm'
+                }
+        except Exception as e:
+            logger.error(f"❌ DELEGATE ROUTER: Batched routing failed, broadcasting to all delegates: {e}")
+            return {
+                sq['subquery_id']: self._broadcast(
+                    delegate_descriptions, 0.5, 'Batched routing failed, broadcasting to all delegates'
+                )
+                for sq in subqueries
+            }
+
+        leftovers = [sq for sq in subqueries if sq['subquery_id'] not in decisions]
+        if leftovers:
+            logger.warning(f"⚠️ DELEGATE ROUTER: Batched reply missed {len(leftovers)} subqueries, matching them individually")
+            match_results = await asyncio.gather(*[
+                query_analysis_service.match_subquery_to_delegate(
+                    subquery=sq['query'],
+                    delegate_descriptions=delegate_descriptions,
+                    llm_provider=llm_provider,
+                    confidence_threshold=confidence_threshold
+                )
+                for sq in leftovers
+            ])
+            for sq, match_result in zip(leftovers, match_results):
+                decisions[sq['subquery_id']] = dict(match_result, route='single_llm')
+        return decisions
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Routes taken and decision cache counters for monitoring"""
+        return {
+            'routes': dict(self.route_counts),
+            'decision_cache': self.decisions.get_stats(),
+            'embedding_fast_path': self._embedding_available,
+        }
+
+
+_router: Optional[DelegateRouter] = None
+
+
+def get_delegate_router() -> DelegateRouter:
+    """Process-wide delegate router"""
+    global _router
+    if _router is None:
+        _router = DelegateRouter()
+    return _router
@@ -5,7 +5,7 @@ Optimized execution engine for public-facing workflow deployments
 import logging
 import copy
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, Awaitable
 from asgiref.sync import sync_to_async
 
 from .conversation_orchestrator import ConversationOrchestrator
@@ -31,7 +31,8 @@ class WorkflowDeploymentExecutor:
         conversation_history: str,
         session_id: Optional[str] = None,
         execution_id: Optional[str] = None,
-        current_user_query: Optional[str] = None
+        current_user_query: Optional[str] = None,
+        stream_callback: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
     ) -> Dict[str, Any]:
         """
         Execute a deployed workflow with full conversation history
@@ -42,6 +43,8 @@ class WorkflowDeploymentExecutor:
             session_id: Optional session ID for conversation tracking
             execution_id: Optional execution ID for linking to DeploymentExecution
             current_user_query: Current user query for UserProxyAgent nodes in deployment context
+            stream_callback: Optional async callback receiving streamed tokens of the node
+                that produces the deployment response (the End node's predecessor)
             
         Returns:
             Dict containing execution results
@@ -99,7 +102,8 @@ class WorkflowDeploymentExecutor:
                 execution_result = await self.orchestrator.execute_workflow(
                     workflow, 
                     executed_by,
-                    deployment_context=deployment_context
+                    deployment_context=deployment_context,
+                    stream_callback=self._response_node_stream_filter(stream_callback, graph_json)
                 )
                 
                 # Log execution result status for debugging
@@ -153,6 +157,36 @@ class WorkflowDeploymentExecutor:
                 'execution_time_ms': execution_time_ms
             }
     
+    def _response_node_stream_filter(
+        self,
+        stream_callback: Optional[Callable[[Dict[str, Any]], Awaitable[None]]],
+        workflow_graph: Dict[str, Any]
+    ) -> Optional[Callable[[Dict[str, Any]], Awaitable[None]]]:
+        """
+        Restrict streamed events to the node whose output becomes the deployment response.
+        Intermediate agents are not shown to public users; if the response node cannot be
+        determined (no End node / several inputs) every agent's tokens are forwarded.
+        """
+        if stream_callback is None:
+            return None
+        
+        end_node_ids = {node.get('id') for node in workflow_graph.get('nodes', []) if node.get('type') == 'EndNode'}
+        predecessor_ids = {
+            edge.get('source')
+            for edge in workflow_graph.get('edges', [])
+            if edge.get('target') in end_node_ids
+        }
+        if len(predecessor_ids) != 1:
+            return stream_callback
+        
+        response_node_id = next(iter(predecessor_ids))
+        
+        async def filtered_callback(event: Dict[str, Any]):
+            if event.get('node_id') == response_node_id:
+                await stream_callback(event)
+        
+        return filtered_callback
+    
     def _extract_end_node_output(
         self,
         execution_result: Dict[str, Any],
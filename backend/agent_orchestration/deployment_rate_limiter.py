@@ -1,17 +1,65 @@
 """
 Workflow Deployment Rate Limiter
 Per-domain rate limiting for workflow deployments
+
+Limits are token buckets in the shared counter store (core/rate_limit.py), so
+they hold across worker processes. Allowed origins of a deployment are cached
+in the shared Django cache and dropped when an origin or deployment is saved
+or deleted (users/signals.py).
 """
 import logging
-from typing import Optional, Tuple
-from django.core.cache import cache
+from typing import Dict, Optional, Tuple
+from django.conf import settings
+from django.core.cache import caches
 from django.utils import timezone
 from datetime import timedelta
 
+from core.rate_limit import check_rate_limit, peek_rate_limit
 from .models import WorkflowDeployment, WorkflowAllowedOrigin
 
 logger = logging.getLogger('workflow_deployment')
 
+# Upper bound on staleness when an origin changes without a model signal (e.g. queryset.update)
+ALLOWED_ORIGINS_CACHE_TTL = 60
+
+
+def normalize_origin(origin: str) -> str:
+    """Origin as compared against WorkflowAllowedOrigin (no trailing slash, lowercase)"""
+    return (origin or '').strip().rstrip('/').lower()
+
+
+def _origins_cache():
+    return caches['shared'] if 'shared' in getattr(settings, 'CACHES', {}) else caches['default']
+
+
+def _origins_cache_key(deployment_id: int) -> str:
+    return f"deployment_allowed_origins:{deployment_id}"
+
+
+def get_allowed_origins(deployment_id: int) -> Dict[str, int]:
+    """Active allowed origins of a deployment as {normalized origin: rate limit per minute}"""
+    cache = _origins_cache()
+    cache_key = _origins_cache_key(deployment_id)
+    origins = cache.get(cache_key)
+    if origins is None:
+        origins = {
+            normalize_origin(origin): rate_limit
+            for origin, rate_limit in WorkflowAllowedOrigin.objects.filter(
+                deployment_id=deployment_id,
+                is_active=True
+            ).values_list('origin', 'rate_limit_per_minute')
+        }
+        cache.set(cache_key, origins, ALLOWED_ORIGINS_CACHE_TTL)
+    return origins
+
+
+def invalidate_allowed_origins(deployment_id: int):
+    """Drop a deployment's cached allowed origins (all processes share the cache)"""
+    try:
+        _origins_cache().delete(_origins_cache_key(deployment_id))
+    except Exception as e:
+        logger.warning(f"⚠️ RATE LIMITER: Could not invalidate allowed origins of deployment {deployment_id}: {e}")
+
 
 class WorkflowDeploymentRateLimiter:
     """
@@ -50,30 +98,15 @@ class WorkflowDeploymentRateLimiter:
                 logger.debug(f"✅ RATE LIMIT: No limit configured for {origin}, allowing request")
                 return True, None
             
-            # Get cache key for this origin + deployment
+            # One shared token bucket per origin + deployment
             cache_key = self._get_cache_key(deployment.id, origin)
+            result = check_rate_limit(cache_key, rate_limit, period=60)
             
-            # Get current request count for this minute
-            current_minute = timezone.now().replace(second=0, microsecond=0)
-            minute_key = f"{cache_key}:{current_minute.isoformat()}"
-            
-            # Get current count
-            current_count = cache.get(minute_key, 0)
+            if not result.allowed:
+                logger.warning(f"🚫 RATE LIMIT: Exceeded for {origin} (deployment {deployment.id}): limit {rate_limit}/min, retry in {result.retry_after}s")
+                return False, result.retry_after
             
-            if current_count >= rate_limit:
-                # Rate limit exceeded
-                # Calculate retry after (seconds until next minute)
-                next_minute = current_minute + timedelta(minutes=1)
-                retry_after = int((next_minute - timezone.now()).total_seconds())
-                retry_after = max(1, retry_after)  # At least 1 second
-                
-                logger.warning(f"🚫 RATE LIMIT: Exceeded for {origin} (deployment {deployment.id}): {current_count}/{rate_limit}")
-                return False, retry_after
-            
-            # Increment counter
-            cache.set(minute_key, current_count + 1, timeout=120)  # 2 minute timeout (covers current + next minute)
-            
-            logger.debug(f"✅ RATE LIMIT: Allowed for {origin} (deployment {deployment.id}): {current_count + 1}/{rate_limit}")
+            logger.debug(f"✅ RATE LIMIT: Allowed for {origin} (deployment {deployment.id}): {result.remaining}/{rate_limit} remaining")
             return True, None
             
         except Exception as e:
@@ -98,14 +131,9 @@ class WorkflowDeploymentRateLimiter:
         """
         try:
             # Try to find origin-specific rate limit
-            allowed_origin = WorkflowAllowedOrigin.objects.filter(
-                deployment=deployment,
-                origin=origin,
-                is_active=True
-            ).first()
-            
-            if allowed_origin:
-                return allowed_origin.rate_limit_per_minute
+            origin_limit = get_allowed_origins(deployment.id).get(normalize_origin(origin))
+            if origin_limit is not None:
+                return origin_limit
             
             # Fallback to deployment default
             return deployment.rate_limit_per_minute
@@ -152,14 +180,11 @@ class WorkflowDeploymentRateLimiter:
         """
         rate_limit = self._get_rate_limit_for_origin(deployment, origin)
         cache_key = self._get_cache_key(deployment.id, origin)
-        current_minute = timezone.now().replace(second=0, microsecond=0)
-        minute_key = f"{cache_key}:{current_minute.isoformat()}"
-        current_count = cache.get(minute_key, 0)
+        result = peek_rate_limit(cache_key, rate_limit, period=60)
         
         return {
             'rate_limit_per_minute': rate_limit,
-            'current_count': current_count,
-            'remaining': max(0, rate_limit - current_count) if rate_limit else None,
-            'reset_at': (current_minute + timedelta(minutes=1)).isoformat()
+            'current_count': rate_limit - result.remaining if rate_limit else 0,
+            'remaining': result.remaining if rate_limit else None,
+            'reset_at': (timezone.now() + timedelta(seconds=result.reset_after)).isoformat()
         }
-
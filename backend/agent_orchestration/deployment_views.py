@@ -5,12 +5,13 @@ Management endpoints for deployments and public-facing chat endpoint
 import logging
 import json
 import uuid
+import queue
 import hashlib
 import threading
 from datetime import datetime
 from typing import Dict, Any, Optional
 
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.utils import timezone
@@ -22,9 +23,9 @@ from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from asgiref.sync import sync_to_async
-import asyncio
 
 from users.models import IntelliDocProject, AgentWorkflow
+from llm_eval.providers.http_pool import run_with_http_pool
 from .models import (
     WorkflowDeployment,
     WorkflowAllowedOrigin,
@@ -35,6 +36,7 @@ from .models import (
 )
 from .deployment_executor import WorkflowDeploymentExecutor
 from .deployment_rate_limiter import WorkflowDeploymentRateLimiter
+from .streaming import format_sse_event
 
 logger = logging.getLogger('workflow_deployment')
 
@@ -122,6 +124,139 @@ def _save_deployment_data_async(
         close_old_connections()
 
 
+def _build_public_chat_payload(execution_result, request_id, execution_time_ms, session_id):
+    """
+    Build the public chat response body and HTTP status from a deployment execution result.
+    Shared by the JSON and SSE variants of the public chat endpoint.
+    """
+    if execution_result.get('status') == 'success':
+        return {
+            'status': 'success',
+            'response': execution_result.get('response', ''),
+            'metadata': {
+                'request_id': request_id,
+                'execution_time_ms': execution_time_ms,
+                'workflow_name': execution_result.get('workflow_name', ''),
+                'session_id': session_id
+            }
+        }, 200
+    elif execution_result.get('status') == 'awaiting_human_input':
+        # UserProxyAgent requires human input - return special response
+        return {
+            'status': 'awaiting_human_input',
+            'human_input_required': True,
+            'title': execution_result.get('title', 'USER INPUT REQUIRED'),
+            'last_conversation_message': execution_result.get('last_conversation_message', ''),
+            'agent_name': execution_result.get('agent_name', ''),
+            'execution_id': execution_result.get('execution_id', ''),
+            'session_id': session_id,
+            'metadata': {
+                'request_id': request_id,
+                'workflow_name': execution_result.get('workflow_name', '')
+            }
+        }, 200
+    else:
+        return {
+            'status': 'error',
+            'error': execution_result.get('error', 'Workflow execution failed'),
+            'request_id': request_id
+        }, 500
+
+
+def _stream_public_chat_response(
+    executor,
+    deployment,
+    full_conversation,
+    session_id,
+    execution_id,
+    user_query,
+    deployment_session,
+    conversation_history,
+    deployment_request,
+    request_id,
+    start_time
+):
+    """
+    Server-sent events variant of the public chat endpoint.
+    
+    The workflow runs in a worker thread; tokens of the response-producing agent are
+    relayed as `token` events while it generates. The stream ends with a single `done`
+    event (same body as the JSON endpoint, authoritative final text) or an `error` event.
+    Persistence runs in the worker, so it completes even if the client disconnects.
+    """
+    event_queue = queue.Queue()
+    
+    def run_execution():
+        from django.db import close_old_connections
+        
+        async def forward_token(event):
+            if event.get('event') == 'agent_token' and event.get('delta'):
+                event_queue.put(('token', {'delta': event['delta'], 'agent_name': event.get('agent_name')}))
+        
+        try:
+            try:
+                execution_result = run_with_http_pool(
+                    executor.execute_deployment_workflow(
+                        deployment,
+                        full_conversation,
+                        session_id,
+                        execution_id,
+                        current_user_query=user_query,
+                        stream_callback=forward_token
+                    )
+                )
+            except Exception as e:
+                logger.error(f"❌ DEPLOYMENT: Error executing streamed workflow: {e}", exc_info=True)
+                execution_result = {'status': 'error', 'error': 'Workflow execution failed'}
+            
+            execution_time_ms = int((timezone.now() - start_time).total_seconds() * 1000)
+            payload, status_code = _build_public_chat_payload(execution_result, request_id, execution_time_ms, session_id)
+            event_queue.put(('done' if status_code == 200 else 'error', payload))
+            
+            assistant_response = execution_result.get('response', '') if execution_result.get('status') == 'success' else ''
+            if assistant_response:
+                conversation_history.append({
+                    'role': 'assistant',
+                    'content': assistant_response,
+                    'timestamp': timezone.now().isoformat()
+                })
+            _save_deployment_data_async(
+                deployment_session,
+                conversation_history,
+                assistant_response,
+                execution_id,
+                deployment_request,
+                execution_result,
+                execution_time_ms,
+                execution_result.get('execution_id'),
+                user_query
+            )
+        except Exception as e:
+            logger.error(f"❌ DEPLOYMENT: Streamed execution worker failed: {e}", exc_info=True)
+            event_queue.put(('error', {
+                'status': 'error',
+                'error': 'An error occurred while processing your request',
+                'request_id': request_id
+            }))
+        finally:
+            close_old_connections()
+    
+    def event_stream():
+        worker = threading.Thread(target=run_execution, daemon=True, name=f"deploy-stream-{execution_id[:8]}")
+        worker.start()
+        yield format_sse_event('start', {'request_id': request_id, 'session_id': session_id})
+        while True:
+            event_name, payload = event_queue.get()
+            yield format_sse_event(event_name, payload)
+            if event_name in ('done', 'error'):
+                break
+    
+    response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Disable nginx proxy buffering so tokens flush immediately
+    return response
+
+
 class DeploymentViewSet(viewsets.ViewSet):
     """
     ViewSet for managing workflow deployments
@@ -626,6 +761,9 @@ def public_chat_endpoint(request, project_id):
     Public chat endpoint for deployed workflows
     
     POST /api/workflow-deploy/{project_id}/
+    
+    Send `"stream": true` (or `Accept: text/event-stream`) to receive the response
+    as server-sent events while it is generated instead of a single JSON body.
     """
     # Handle CORS preflight (middleware should handle this, but safety check)
     if request.method == 'OPTIONS':
@@ -806,9 +944,25 @@ def public_chat_endpoint(request, project_id):
         # Generate unique execution ID
         execution_id = f"deploy_exec_{timezone.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
         
-        # Run async execution - use asyncio.run() for better efficiency
+        wants_stream = bool(data.get('stream')) or 'text/event-stream' in request.META.get('HTTP_ACCEPT', '')
+        if wants_stream:
+            return _stream_public_chat_response(
+                executor,
+                deployment,
+                full_conversation,
+                session_id,
+                execution_id,
+                user_query,
+                deployment_session,
+                conversation_history,
+                deployment_request,
+                request_id,
+                start_time
+            )
+        
+        # Run async execution (its pooled HTTP session is closed before the loop ends)
         try:
-            execution_result = asyncio.run(
+            execution_result = run_with_http_pool(
                 executor.execute_deployment_workflow(
                     deployment,
                     full_conversation,
@@ -863,38 +1017,8 @@ def public_chat_endpoint(request, project_id):
         logger.debug(f"🚀 DEPLOYMENT: Started background save task for execution {execution_id[:8]}")
         
         # Return response immediately (don't wait for database writes)
-        if execution_result.get('status') == 'success':
-            return JsonResponse({
-                'status': 'success',
-                'response': assistant_response,
-                'metadata': {
-                    'request_id': request_id,
-                    'execution_time_ms': execution_time_ms,
-                    'workflow_name': execution_result.get('workflow_name', ''),
-                    'session_id': session_id
-                }
-            })
-        elif execution_result.get('status') == 'awaiting_human_input':
-            # UserProxyAgent requires human input - return special response
-            return JsonResponse({
-                'status': 'awaiting_human_input',
-                'human_input_required': True,
-                'title': execution_result.get('title', 'USER INPUT REQUIRED'),
-                'last_conversation_message': execution_result.get('last_conversation_message', ''),
-                'agent_name': execution_result.get('agent_name', ''),
-                'execution_id': execution_result.get('execution_id', ''),
-                'session_id': session_id,
-                'metadata': {
-                    'request_id': request_id,
-                    'workflow_name': execution_result.get('workflow_name', '')
-                }
-            })
-        else:
-            return JsonResponse({
-                'status': 'error',
-                'error': execution_result.get('error', 'Workflow execution failed'),
-                'request_id': request_id
-            }, status=500)
+        payload, status_code = _build_public_chat_payload(execution_result, request_id, execution_time_ms, session_id)
+        return JsonResponse(payload, status=status_code)
         
     except Exception as e:
         logger.error(f"❌ DEPLOYMENT: Error in public endpoint: {e}", exc_info=True)
@@ -1094,7 +1218,7 @@ def submit_deployment_human_input(request, project_id):
                 
                 # Resume workflow with user input
                 orchestrator = ConversationOrchestrator()
-                result = asyncio.run(
+                result = run_with_http_pool(
                     orchestrator.resume_workflow_with_human_input(
                         execution_record.execution_id,
                         user_input,
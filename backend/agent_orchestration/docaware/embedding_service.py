@@ -8,10 +8,11 @@ existing embedding infrastructure.
 
 import logging
 from typing import List, Optional, Dict, Any
-from sentence_transformers import SentenceTransformer
 from django.conf import settings
 import numpy as np
 
+from vector_search.query_embedding_cache import cached_query_embedding
+
 logger = logging.getLogger('agent_orchestration')
 
 class DocAwareEmbeddingService:
@@ -29,16 +30,17 @@ class DocAwareEmbeddingService:
         self._load_model()
     
     def _load_model(self):
-        """Load the embedding model"""
+        """Get the embedding model from the process-wide registry (loaded once per process)"""
+        from vector_search.model_registry import get_sentence_transformer
+        
         try:
-            logger.info(f"📊 EMBEDDING: Loading model {self.model_name}")
-            self.model = SentenceTransformer(self.model_name)
-            logger.info(f"✅ EMBEDDING: Model loaded successfully")
+            self.model = get_sentence_transformer(self.model_name)
+            logger.debug(f"✅ EMBEDDING: Using shared model {self.model_name}")
         except Exception as e:
             logger.error(f"❌ EMBEDDING: Failed to load model {self.model_name}: {e}")
             raise
     
-    def encode_query(self, query: str, normalize: bool = True) -> List[float]:
+    def encode_query(self, query: str, normalize: bool = True) -> np.ndarray:
         """
         Convert text query to embedding vector
         
@@ -47,7 +49,7 @@ class DocAwareEmbeddingService:
             normalize: Whether to normalize the vector
             
         Returns:
-            List of float values representing the embedding
+            Read-only float32 embedding, shared through the query embedding cache
         """
         if not self.model:
             raise RuntimeError("Embedding model not initialized")
@@ -55,20 +57,21 @@ class DocAwareEmbeddingService:
         try:
             logger.debug(f"📊 EMBEDDING: Encoding query: {query[:100]}...")
             
-            # Generate embedding
-            embedding = self.model.encode([query], normalize_embeddings=normalize)[0]
-            
-            # Convert to list for JSON serialization
-            embedding_list = embedding.tolist()
+            # Repeated queries (retries, delegates, evaluation prompts) hit the cache
+            embedding = cached_query_embedding(
+                query, self.model_name,
+                lambda text: self.model.encode([text], normalize_embeddings=normalize)[0],
+                normalize=normalize
+            )
             
-            logger.debug(f"✅ EMBEDDING: Generated {len(embedding_list)}-dimensional vector")
-            return embedding_list
+            logger.debug(f"✅ EMBEDDING: Generated {len(embedding)}-dimensional vector")
+            return embedding
             
         except Exception as e:
             logger.error(f"❌ EMBEDDING: Failed to encode query: {e}")
             raise
     
-    def encode_with_context(self, query: str, context: List[str], context_weight: float = 0.3) -> List[float]:
+    def encode_with_context(self, query: str, context: List[str], context_weight: float = 0.3) -> np.ndarray:
         """
         Encode query with conversation context
         
@@ -84,21 +87,21 @@ class DocAwareEmbeddingService:
             return self.encode_query(query)
         
         try:
-            # Encode query and context separately
-            query_embedding = self.model.encode([query], normalize_embeddings=True)[0]
+            # Encode query and context separately (both cached, so only the weighting is recomputed)
+            query_embedding = self.encode_query(query)
             
             # Combine and encode context
             context_text = " ".join(context[-3:])  # Use last 3 context items
-            context_embedding = self.model.encode([context_text], normalize_embeddings=True)[0]
+            context_embedding = self.encode_query(context_text)
             
             # Weighted combination
             combined_embedding = (1 - context_weight) * query_embedding + context_weight * context_embedding
             
             # Normalize the result
-            combined_embedding = combined_embedding / np.linalg.norm(combined_embedding)
+            combined_embedding = (combined_embedding / np.linalg.norm(combined_embedding)).astype(np.float32)
             
             logger.debug(f"📊 EMBEDDING: Generated contextualized embedding (context_weight={context_weight})")
-            return combined_embedding.tolist()
+            return combined_embedding
             
         except Exception as e:
             logger.error(f"❌ EMBEDDING: Failed to encode with context: {e}")
@@ -110,9 +113,7 @@ class DocAwareEmbeddingService:
         if not self.model:
             return getattr(settings, 'VECTOR_DIMENSION', 384)
         
-        # Generate a test embedding to get dimension
-        test_embedding = self.model.encode(["test"], normalize_embeddings=True)[0]
-        return len(test_embedding)
+        return self.model.get_sentence_embedding_dimension()
     
     def batch_encode(self, texts: List[str], normalize: bool = True) -> List[List[float]]:
         """
@@ -71,7 +71,7 @@ class DocAwareSearchMethods:
         
         SearchMethod.HYBRID_SEARCH: SearchMethodConfig(
             name="Hybrid Search",
-            description="Combines semantic search with keyword filtering for precise results",
+            description="Fuses semantic and BM25 keyword rankings (reciprocal-rank fusion) for precise results",
             parameters={
                 "index_type": {
                     "type": "select",
@@ -96,6 +96,12 @@ class DocAwareSearchMethods:
                     "step": 0.1,
                     "description": "Weight for keyword matching (0=semantic only, 1=keyword only)"
                 },
+                "rrf_k": {
+                    "type": "number",
+                    "min": 1,
+                    "max": 200,
+                    "description": "Rank fusion constant (lower favours top-ranked results of each method)"
+                },
                 "filter_expression": {
                     "type": "text",
                     "description": "Milvus filter expression (e.g., 'document_type == \"pdf\"')"
@@ -106,6 +112,7 @@ class DocAwareSearchMethods:
             "metric_type": "IP",  # Changed from COSINE to IP
             "search_limit": 10,
             "keyword_weight": 0.3,
+            "rrf_k": 60,
             "filter_expression": ""
             }
         ),
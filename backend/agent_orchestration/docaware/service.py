@@ -8,17 +8,31 @@ comprehensive RAG capabilities for document-aware agents.
 
 import logging
 import json
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Tuple, Union
 from django.conf import settings
 from users.models import IntelliDocProject
 from django_milvus_search import MilvusSearchService
 from django_milvus_search.models import SearchRequest, IndexType, MetricType, SearchParams
 
+from vector_search.keyword_index import KeywordIndex, get_keyword_index, summarize_paths, tokenize
+
 from .search_methods import DocAwareSearchMethods, SearchMethod, SearchMethodConfig
 from .embedding_service import DocAwareEmbeddingService
 
 logger = logging.getLogger('agent_orchestration')
 
+DEFAULT_HYBRID_SEARCH_SETTINGS = {
+    'CANDIDATE_MULTIPLIER': 3,  # Each ranking contributes search_limit x this candidates to the fusion
+}
+
+
+def get_hybrid_search_settings() -> Dict[str, Any]:
+    """Merge ``settings.DOCAWARE_HYBRID_SEARCH`` over the defaults"""
+    hybrid_settings = dict(DEFAULT_HYBRID_SEARCH_SETTINGS)
+    hybrid_settings.update(getattr(settings, 'DOCAWARE_HYBRID_SEARCH', {}) or {})
+    return hybrid_settings
+
+
 class EnhancedDocAwareAgentService:
     """Enhanced RAG service with multiple search methods using Django Milvus Search"""
     
@@ -102,7 +116,7 @@ class EnhancedDocAwareAgentService:
         if search_method == SearchMethod.SEMANTIC_SEARCH:
             return self._semantic_search(query, validated_params, content_filter_expr)
         elif search_method == SearchMethod.HYBRID_SEARCH:
-            return self._hybrid_search(query, validated_params, content_filter_expr)
+            return self._hybrid_search(query, validated_params, content_filter_expr, content_filters)
         elif search_method == SearchMethod.CONTEXTUAL_SEARCH:
             return self._contextual_search(query, validated_params, content_filter_expr)
         elif search_method == SearchMethod.SIMILARITY_THRESHOLD:
@@ -112,7 +126,7 @@ class EnhancedDocAwareAgentService:
         elif search_method == SearchMethod.HIERARCHICAL_SEARCH:
             return self._hierarchical_search(query, validated_params, content_filter_expr)
         elif search_method == SearchMethod.KEYWORD_SEARCH:
-            return self._keyword_search(query, validated_params, content_filter_expr)
+            return self._keyword_search(query, validated_params, content_filters)
         else:
             raise ValueError(f"Search method {search_method} not implemented")
 
@@ -211,16 +225,12 @@ class EnhancedDocAwareAgentService:
             Metric type string (IP, L2, or COSINE)
         """
         try:
-            collection_info = self.milvus_service.get_collection_info(collection_name)
-            
-            # Look for index information which contains the metric type
-            indexes = collection_info.get('indexes', [])
+            # Served from the search service's collection metadata cache
+            metadata = self.milvus_service.get_collection_metadata(collection_name)
             
-            for index in indexes:
-                if hasattr(index, 'params') and 'metric_type' in index.params:
-                    metric_type = index.params['metric_type']
-                    logger.info(f"🔍 METRIC DETECTION: Collection {collection_name} uses {metric_type} metric")
-                    return metric_type
+            if metadata.metric_type:
+                logger.debug(f"🔍 METRIC DETECTION: Collection {collection_name} uses {metadata.metric_type} metric")
+                return metadata.metric_type
             
             # Fallback: based on error logs, collections use IP
             logger.warning(f"⚠️ METRIC DETECTION: Could not detect metric for {collection_name}, defaulting to IP")
@@ -393,16 +403,24 @@ class EnhancedDocAwareAgentService:
             logger.error(f"❌ SEMANTIC: Collection: {self.collection_name}, Attempted metric: {detected_metric if 'detected_metric' in locals() else 'Unknown'}")
             return []
     
-    def _hybrid_search(self, query: str, params: Dict[str, Any], content_filter_expr: str = None) -> List[Dict[str, Any]]:
-        """Enhanced hybrid search with automatic metric type detection"""
+    def _hybrid_search(self, query: str, params: Dict[str, Any], content_filter_expr: str = None,
+                       content_filters: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Reciprocal-rank fusion of the semantic ranking (Milvus) and the BM25
+        ranking (keyword index): a chunk scores weight / (rrf_k + rank) for each
+        ranking it appears in, with keyword_weight and 1 - keyword_weight as
+        the weights
+        """
         try:
+            keyword_weight = params["keyword_weight"]
+            semantic_weight = 1.0 - keyword_weight
+            rrf_k = params["rrf_k"]
+            candidates = params["search_limit"] * max(1, get_hybrid_search_settings()['CANDIDATE_MULTIPLIER'])
+
             # Auto-detect collection metric type
             detected_metric = self.get_collection_metric_type(self.collection_name)
             
-            logger.info(f"🔍 HYBRID: Starting search with detected metric: {detected_metric}")
-            
-            # Generate query embedding
-            query_vector = self.embedding_service.encode_query(query)
+            logger.info(f"🔍 HYBRID: Starting search with detected metric: {detected_metric}, keyword weight {keyword_weight}, rrf_k {rrf_k}")
             
             # Combine existing filter with content filter
             existing_filter = params.get("filter_expression", "")
@@ -413,89 +431,83 @@ class EnhancedDocAwareAgentService:
             else:
                 combined_filter = existing_filter
             
-            # Create search request with detected metric type and combined filter
-            search_request = SearchRequest(
-                collection_name=self.collection_name,
-                query_vectors=[query_vector],
-                index_type=IndexType(params["index_type"]),
-                metric_type=MetricType(detected_metric),  # Use detected metric
-                limit=params["search_limit"],
-                filter_expression=combined_filter if combined_filter else "",
-                output_fields=["*"]  # Return all fields
-            )
-            
-            # Perform semantic search
-            search_result = self.milvus_service.search(search_request)
-            
-            # Apply keyword weighting
-            keyword_weight = params["keyword_weight"]
-            results = []
-            
-            for hit in search_result.hits:
-                # Extract fields with flexible field name mapping
-                content = (
-                    hit.get("content") or 
-                    hit.get("text") or 
-                    hit.get("document_text") or 
-                    hit.get("body") or 
-                    hit.get("chunk_text") or
-                    ""
-                )
-                
-                source = (
-                    hit.get("source") or
-                    hit.get("filename") or
-                    hit.get("file_name") or
-                    hit.get("document_name") or
-                    hit.get("title") or
-                    "Unknown"
+            semantic_hits = []
+            if semantic_weight > 0:
+                query_vector = self.embedding_service.encode_query(query)
+                search_request = SearchRequest(
+                    collection_name=self.collection_name,
+                    query_vectors=[query_vector],
+                    index_type=IndexType(params["index_type"]),
+                    metric_type=MetricType(detected_metric),  # Use detected metric
+                    limit=candidates,
+                    filter_expression=combined_filter if combined_filter else "",
+                    output_fields=["*"]  # Return all fields
                 )
-                
-                page = (
-                    hit.get("page") or
-                    hit.get("page_number") or
-                    1
-                )
-                
-                # Log for debugging
-                if not content:
-                    logger.warning(f"📚 HYBRID SEARCH: No content found in document. Available fields: {list(hit.keys())}")
-                    # Show sample of each field to help identify the correct one
-                    for key, value in hit.items():
-                        if isinstance(value, str) and len(value) > 20:
-                            logger.info(f"📚 HYBRID SEARCH: Field '{key}' contains: {str(value)[:100]}...")
-                
-                semantic_score = hit.get("score", 0.0)
-                
-                # Simple keyword matching score
-                content_for_keyword = content.lower() if content else ""
-                query_words = query.lower().split()
-                keyword_matches = sum(1 for word in query_words if word in content_for_keyword)
-                keyword_score = keyword_matches / len(query_words) if query_words else 0
-                
-                # Combine scores
-                final_score = (1 - keyword_weight) * semantic_score + keyword_weight * keyword_score
-                
+                semantic_hits = self.milvus_service.search(search_request).hits
+
+            keyword_hits = []
+            if keyword_weight > 0:
+                keyword_index = self._get_keyword_index()
+                if keyword_index is None:
+                    logger.warning("⚠️ HYBRID: Keyword index unavailable, ranking by semantic similarity only")
+                else:
+                    keyword_hits = keyword_index.search(query, limit=candidates, content_filters=content_filters)
+                    if existing_filter and keyword_hits:
+                        keyword_hits = self._filter_keyword_hits(keyword_hits, existing_filter)
+
+            # Fuse by rank; chunk_id identifies the same chunk in both rankings
+            fused: Dict[str, Dict[str, Any]] = {}
+            for rank, hit in enumerate(semantic_hits, 1):
+                fields = self._extract_document_fields(hit)
+                key = str(hit.get("chunk_id") or fields["document_id"])
+                if key in fused:
+                    continue
+                fused[key] = {
+                    "fields": fields,
+                    "score": semantic_weight / (rrf_k + rank),
+                    "semantic_rank": rank,
+                    "semantic_score": hit.get("score", 0.0),
+                    "keyword_rank": None,
+                    "keyword_score": None,
+                }
+            for rank, hit in enumerate(keyword_hits, 1):
+                entry = fused.get(hit["chunk_id"])
+                if entry is None:
+                    entry = fused[hit["chunk_id"]] = {
+                        "fields": self._keyword_hit_fields(hit),
+                        "score": 0.0,
+                        "semantic_rank": None,
+                        "semantic_score": None,
+                    }
+                elif entry.get("keyword_rank") is not None:
+                    continue
+                entry["score"] += keyword_weight / (rrf_k + rank)
+                entry["keyword_rank"] = rank
+                entry["keyword_score"] = round(hit["score"], 4)
+
+            ranked = sorted(fused.values(), key=lambda entry: entry["score"], reverse=True)[:params["search_limit"]]
+            results = []
+            for entry in ranked:
+                fields = entry["fields"]
                 results.append({
-                    "content": content,  # Use extracted content
+                    "content": fields["content"],
                     "metadata": {
-                        "source": source,  # Use extracted source
-                        "page": page,  # Use extracted page
-                        "score": final_score,
-                        "semantic_score": semantic_score,
-                        "keyword_score": keyword_score,
-                        "chunk_type": hit.get("chunk_type", "text"),
-                        "document_id": hit.get("document_id", ""),
+                        "source": fields["source"],
+                        "page": fields["page"],
+                        "score": entry["score"],
+                        "semantic_score": entry["semantic_score"],
+                        "keyword_score": entry["keyword_score"],
+                        "semantic_rank": entry["semantic_rank"],
+                        "keyword_rank": entry["keyword_rank"],
+                        "chunk_type": fields["chunk_type"],
+                        "document_id": fields["document_id"],
                         "collection": self.collection_name,
                         "search_method": "hybrid_search",
                         "metric_used": detected_metric
                     }
                 })
             
-            # Sort by final score
-            results.sort(key=lambda x: x["metadata"]["score"], reverse=True)
-            
-            logger.info(f"✅ HYBRID: Found {len(results)} results with hybrid scoring using {detected_metric} metric")
+            logger.info(f"✅ HYBRID: Fused {len(semantic_hits)} semantic and {len(keyword_hits)} keyword candidates into {len(results)} results")
             return results
             
         except Exception as e:
@@ -503,6 +515,46 @@ class EnhancedDocAwareAgentService:
             logger.error(f"❌ HYBRID: Collection: {self.collection_name}, Attempted metric: {detected_metric if 'detected_metric' in locals() else 'Unknown'}")
             return []
     
+    def _get_keyword_index(self) -> Optional[KeywordIndex]:
+        """BM25 index of the project collection, backfilled from Milvus on first use"""
+        try:
+            keyword_index = get_keyword_index(self.collection_name)
+            if keyword_index is None:
+                logger.warning("⚠️ KEYWORD INDEX: Disabled in settings")
+                return None
+            if keyword_index.ensure_built(lambda: self.milvus_service.get_collection_metadata(self.collection_name).collection):
+                return keyword_index
+            logger.warning(f"⚠️ KEYWORD INDEX: Collection {self.collection_name} not found")
+        except Exception as e:
+            logger.error(f"❌ KEYWORD INDEX: Unavailable for {self.collection_name}: {e}")
+        return None
+
+    def _filter_keyword_hits(self, hits: List[Dict[str, Any]], filter_expression: str) -> List[Dict[str, Any]]:
+        """Keep the keyword hits whose Milvus rows also match a custom filter expression"""
+        try:
+            collection = self.milvus_service.get_collection_metadata(self.collection_name).collection
+            chunk_ids = '", "'.join(hit["chunk_id"].replace('"', '\\"') for hit in hits)
+            rows = collection.query(
+                expr=f'(chunk_id in ["{chunk_ids}"]) && ({filter_expression})',
+                output_fields=["chunk_id"]
+            )
+            allowed = {row["chunk_id"] for row in rows}
+            return [hit for hit in hits if hit["chunk_id"] in allowed]
+        except Exception as e:
+            logger.warning(f"⚠️ HYBRID: Could not apply filter expression to keyword results, dropping them: {e}")
+            return []
+
+    @staticmethod
+    def _keyword_hit_fields(hit: Dict[str, Any]) -> Dict[str, Any]:
+        """Result fields of a keyword index hit, as ``_extract_document_fields`` returns them"""
+        return {
+            "content": hit["content"],
+            "source": hit["file_name"] or "Unknown",
+            "page": 1,
+            "document_id": hit["document_id"],
+            "chunk_type": hit["chunk_type"] or "text"
+        }
+
     def _contextual_search(self, query: str, params: Dict[str, Any], content_filter_expr: str = None) -> List[Dict[str, Any]]:
         """Perform contextual search using conversation history"""
         try:
@@ -761,86 +813,58 @@ class EnhancedDocAwareAgentService:
             logger.error(f"❌ HIERARCHICAL: Collection: {self.collection_name}, Attempted metric: {detected_metric if 'detected_metric' in locals() else 'Unknown'}")
             return []
     
-    def _keyword_search(self, query: str, params: Dict[str, Any], content_filter_expr: str = None) -> List[Dict[str, Any]]:
-        """Perform keyword-based search"""
+    def _keyword_search(self, query: str, params: Dict[str, Any],
+                        content_filters: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """BM25 keyword search on the collection's keyword index"""
         try:
-            # This is a simplified keyword search implementation
-            # In a full implementation, you'd use a text search engine like Elasticsearch
-            
             search_limit = params["search_limit"]
-            boost_exact = params["boost_exact_match"]
             min_length = params["min_keyword_length"]
             
-            # Extract keywords
-            keywords = [word.lower().strip() for word in query.split() 
-                       if len(word.strip()) >= min_length]
+            # Extract keywords (as the index tokenizes them)
+            keywords = [term for term in dict.fromkeys(tokenize(query)) if len(term) >= min_length]
             
             if not keywords:
                 logger.warning("📚 KEYWORD: No valid keywords found")
                 return []
             
-            # Auto-detect collection metric type
-            detected_metric = self.get_collection_metric_type(self.collection_name)
-            logger.info(f"🔍 KEYWORD: Using detected metric: {detected_metric}")
-            
-            # For now, use semantic search as fallback and simulate keyword scoring
-            query_vector = self.embedding_service.encode_query(query)
+            keyword_index = self._get_keyword_index()
+            if keyword_index is None:
+                return []
             
-            search_request = SearchRequest(
-                collection_name=self.collection_name,
-                query_vectors=[query_vector],
-                index_type=IndexType.FLAT,  # Use FLAT for exact matching
-                metric_type=MetricType(detected_metric),  # Use detected metric
-                limit=search_limit * 2,  # Get more to filter
-                filter_expression=content_filter_expr if content_filter_expr else "",
-                output_fields=["*"]  # Return all fields
+            # boost_exact_match adds the whole query as a phrase, so verbatim matches rank first
+            hits = keyword_index.search(
+                query,
+                limit=search_limit,
+                min_term_length=min_length,
+                phrase_boost=params["boost_exact_match"],
+                content_filters=content_filters
             )
             
-            search_result = self.milvus_service.search(search_request)
-            
-            # Score based on keyword matches
             results = []
-            for hit in search_result.hits:
-                content = hit.get("content", "").lower()
-                
-                # Count keyword matches
-                exact_matches = sum(1 for keyword in keywords if keyword in content)
-                partial_matches = sum(1 for keyword in keywords 
-                                    if any(keyword in word for word in content.split()))
-                
-                if exact_matches > 0 or partial_matches > 0:
-                    # Calculate keyword score
-                    keyword_score = (exact_matches * 2 + partial_matches) / len(keywords)
-                    if boost_exact and exact_matches > 0:
-                        keyword_score *= 1.5
-                    
-                    results.append({
-                        "content": hit.get("content", ""),
-                        "metadata": {
-                            "source": hit.get("source", "Unknown"),
-                            "page": hit.get("page", 1),
-                            "score": keyword_score,
-                            "exact_matches": exact_matches,
-                            "partial_matches": partial_matches,
-                            "chunk_type": hit.get("chunk_type", "text"),
-                            "document_id": hit.get("document_id", ""),
-                            "collection": self.collection_name,
-                            "search_method": "keyword_search",
-                            "keywords_used": keywords,
-                            "metric_used": detected_metric
-                        }
-                    })
-            
-            # Sort by keyword score
-            results.sort(key=lambda x: x["metadata"]["score"], reverse=True)
-            results = results[:search_limit]
+            for hit in hits:
+                fields = self._keyword_hit_fields(hit)
+                results.append({
+                    "content": fields["content"],
+                    "metadata": {
+                        "source": fields["source"],
+                        "page": fields["page"],
+                        "score": hit["score"],
+                        "chunk_type": fields["chunk_type"],
+                        "document_id": fields["document_id"],
+                        "section_title": hit["section_title"],
+                        "collection": self.collection_name,
+                        "search_method": "keyword_search",
+                        "keywords_used": keywords,
+                        "scoring": "bm25"
+                    }
+                })
             
-            logger.info(f"✅ KEYWORD: Found {len(results)} results for keywords: {keywords} using {detected_metric} metric")
+            logger.info(f"✅ KEYWORD: Found {len(results)} results for keywords: {keywords}")
             return results
             
         except Exception as e:
             logger.error(f"❌ KEYWORD: Search failed with error: {e}")
-            logger.error(f"❌ KEYWORD: Collection: {self.collection_name}, Attempted metric: {detected_metric if 'detected_metric' in locals() else 'Unknown'}")
+            logger.error(f"❌ KEYWORD: Collection: {self.collection_name}")
             return []
     
     def create_rag_function_for_agent(self, agent_config: Dict[str, Any]):
@@ -917,7 +941,11 @@ class EnhancedDocAwareAgentService:
     
     def get_hierarchical_paths(self, include_files: bool = False) -> List[Dict[str, Any]]:
         """
-        Get unique hierarchical paths for content filtering from Milvus collection
+        Get the folders (and optionally files) of the project collection for content filtering
+
+        Served from the path tables of the collection's keyword index, which
+        ingestion keeps current; without the index the collection's scalar
+        fields are scanned.
 
         Args:
             include_files: If True, include individual file entries alongside folders
@@ -928,88 +956,41 @@ class EnhancedDocAwareAgentService:
         try:
             logger.info(f"📚 HIERARCHICAL PATHS: Getting paths (include_files={include_files}) for {self.collection_name}")
 
-            # Create search request to get all documents
-            dummy_query = [0.0] * 384  # 384-dimensional zero vector for all-MiniLM-L6-v2
-
-            from django_milvus_search.models import SearchRequest, IndexType, MetricType
-
-            # Auto-detect collection metric type
-            detected_metric = self.get_collection_metric_type(self.collection_name)
-
-            search_request = SearchRequest(
-                collection_name=self.collection_name,
-                query_vectors=[dummy_query],
-                index_type=IndexType.AUTOINDEX,
-                metric_type=MetricType(detected_metric),
-                limit=10000,  # High limit to get all documents
-                output_fields=["hierarchical_path", "document_id", "file_name"]  # Get additional fields for files
-            )
-
-            # Perform search
-            search_result = self.milvus_service.search(search_request)
-
-            # Extract unique folder paths and files
-            unique_folder_paths = set()
-            unique_files = {}  # Map: document_id -> file info
-
-            for hit in search_result.hits:
-                hierarchical_path = hit.get("hierarchical_path", "")
-                document_id = hit.get("document_id", "")
-                file_name = hit.get("file_name", "Unknown")
-
-                if hierarchical_path and hierarchical_path.strip():
-                    clean_path = hierarchical_path.strip().strip('/')
-
-                    if clean_path:
-                        # Extract folder path (remove #chunk_XXX suffix)
-                        if '#chunk_' in clean_path:
-                            file_path = clean_path.split('#chunk_')[0]
-                            folder_path = '/'.join(file_path.split('/')[:-1])
-
-                            # Add all parent folder paths
-                            if folder_path:
-                                unique_folder_paths.add(folder_path)
-                                path_parts = folder_path.split('/')
-                                for i in range(1, len(path_parts)):
-                                    parent_path = '/'.join(path_parts[:i])
-                                    if parent_path:
-                                        unique_folder_paths.add(parent_path)
-
-                            # Track file for optional inclusion
-                            if include_files and document_id and document_id not in unique_files:
-                                unique_files[document_id] = {
-                                    'document_id': document_id,
-                                    'file_name': file_name,
-                                    'file_path': file_path,
-                                    'folder_path': folder_path
-                                }
+            keyword_index = self._get_keyword_index()
+            if keyword_index is not None:
+                folders, files = keyword_index.get_path_tree(include_files)
+            else:
+                folders, files = self._scan_hierarchical_paths(include_files)
 
             # Build result list
             result_list = []
 
             # Add folders
-            for folder_path in sorted(unique_folder_paths):
+            for folder in folders:
+                folder_path = folder['path']
                 result_list.append({
                     "id": f"folder_{folder_path}",
                     "name": folder_path.split('/')[-1],
                     "path": folder_path,
                     "type": "folder",
                     "displayName": folder_path,
-                    "isFolder": True
+                    "isFolder": True,
+                    "document_count": folder['document_count']
                 })
 
             # Add files if requested
-            if include_files:
-                for doc_id, file_info in sorted(unique_files.items(), key=lambda x: x[1]['file_name']):
-                    result_list.append({
-                        "id": f"file_{doc_id}",
-                        "name": file_info['file_name'],
-                        "path": file_info['file_path'],
-                        "type": "file",
-                        "displayName": f"{file_info['folder_path']}/{file_info['file_name']}" if file_info['folder_path'] else file_info['file_name'],
-                        "isFolder": False,
-                        "document_id": doc_id
-                    })
+            for file_info in files:
+                doc_id = file_info['document_id']
+                result_list.append({
+                    "id": f"file_{doc_id}",
+                    "name": file_info['file_name'],
+                    "path": file_info['file_path'],
+                    "type": "file",
+                    "displayName": f"{file_info['folder_path']}/{file_info['file_name']}" if file_info['folder_path'] else file_info['file_name'],
+                    "isFolder": False,
+                    "document_id": doc_id,
+                    "chunk_count": file_info['chunk_count']
+                })
 
             logger.info(f"📚 HIERARCHICAL PATHS: Found {len(result_list)} entries (folders: {len([r for r in result_list if r['isFolder']])}, files: {len([r for r in result_list if not r['isFolder']])})")
             if result_list:
@@ -1023,3 +1004,21 @@ class EnhancedDocAwareAgentService:
             logger.error(f"📚 HIERARCHICAL PATHS: Traceback: {traceback.format_exc()}")
             return []
 
+    def _scan_hierarchical_paths(self, include_files: bool) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Folder and file entries from a scalar scan of the whole collection"""
+        collection = self.milvus_service.get_collection_metadata(self.collection_name).collection
+        if collection is None:
+            return [], []
+        output_fields = ["document_id", "file_name", "hierarchical_path"]
+        iterator = collection.query_iterator(batch_size=1000, output_fields=output_fields)
+        rows = []
+        try:
+            while True:
+                batch = iterator.next()
+                if not batch:
+                    break
+                rows.extend(batch)
+        finally:
+            iterator.close()
+        logger.info(f"📚 HIERARCHICAL PATHS: Scanned {len(rows)} chunks of {self.collection_name}")
+        return summarize_paths(rows, include_files)
@@ -0,0 +1,229 @@
+"""
+Execution Control
+=================
+
+Delivers stop, resume and human-input-arrived signals to the coroutine
+running a workflow execution, instead of that coroutine re-reading its
+``WorkflowExecution`` row to notice them.
+
+- In the publishing process, a signal sets an ``asyncio.Event`` on every open
+  channel for the execution straight away.
+- Other processes see it through a per-execution signal counter on the shared
+  counter store (``core/shared_cache.py``). Channels read the counters at most
+  every ``SHARED_POLL_INTERVAL`` seconds, which is a single key lookup rather
+  than a row read.
+- A status-only read of the row every ``FALLBACK_POLL_SECONDS`` remains as a
+  fallback, for stops written to the database without a signal and for a
+  shared store that is down.
+
+Publish with ``publish_signal`` after the database change it announces has
+been written; open a channel with ``open_control_channel`` from the coroutine
+that runs the execution.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from typing import Any, Dict, Iterable, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from core.shared_cache import get_shared_store
+
+logger = logging.getLogger('conversation_orchestrator')
+
+DEFAULT_EXECUTION_CONTROL_SETTINGS = {
+    'SHARED_POLL_INTERVAL': 0.25,  # Min seconds between shared store reads per channel
+    'FALLBACK_POLL_SECONDS': 15,  # Seconds between status reads from the database; 0 disables
+    'SIGNAL_TTL': 86400,  # Seconds a signal counter is kept on the shared store
+    'RESULT_WAIT_SECONDS': 5,  # Max wait for a resumed reflection's result to be signalled
+}
+
+SIGNAL_STOP = 'stop'
+SIGNAL_RESUME = 'resume'
+SIGNAL_HUMAN_INPUT = 'human_input'
+SIGNALS = (SIGNAL_STOP, SIGNAL_RESUME, SIGNAL_HUMAN_INPUT)
+
+
+def get_execution_control_settings() -> Dict[str, Any]:
+    """Merge ``settings.EXECUTION_CONTROL`` over the defaults"""
+    control_settings = dict(DEFAULT_EXECUTION_CONTROL_SETTINGS)
+    control_settings.update(getattr(settings, 'EXECUTION_CONTROL', {}) or {})
+    return control_settings
+
+
+def _signal_key(execution_id: str, signal: str) -> str:
+    return f"exec_ctl:{execution_id}:{signal}"
+
+
+# Open channels of this process by execution id; channels drop out once closed or collected
+_channels: Dict[str, 'weakref.WeakSet[ExecutionControlChannel]'] = {}
+_channels_lock = threading.Lock()
+
+
+def _open_channels(execution_id: str):
+    with _channels_lock:
+        return list(_channels.get(execution_id, ()))
+
+
+class ExecutionControlChannel:
+    """Signals for one execution, as seen by the coroutine running it"""
+
+    def __init__(self, execution_id: str, loop: asyncio.AbstractEventLoop):
+        control_settings = get_execution_control_settings()
+        self.execution_id = execution_id
+        self.loop = loop
+        self.shared_poll_interval = float(control_settings['SHARED_POLL_INTERVAL'])
+        self.fallback_poll_seconds = float(control_settings['FALLBACK_POLL_SECONDS'])
+        self._events = {signal: asyncio.Event() for signal in SIGNALS}
+        # Signal counts already seen; stop is terminal, so a stop sent before the channel opened still counts
+        self._seen_counts = {signal: 0 for signal in SIGNALS}
+        self._last_shared_poll = 0.0
+        self._last_db_poll = time.monotonic()
+        self._shared_store_failed = False
+
+    def _mark(self, signal: str, count: Optional[int]):
+        if count is not None:
+            # Already delivered: the shared store read must not deliver it a second time
+            self._seen_counts[signal] = max(self._seen_counts[signal], count)
+        self._events[signal].set()
+
+    def _deliver(self, signal: str, count: Optional[int] = None):
+        """Deliver ``signal`` (counter value ``count``) on the channel's loop; safe to call from any thread"""
+        try:
+            if self.loop.is_closed():
+                return
+            self.loop.call_soon_threadsafe(self._mark, signal, count)
+        except RuntimeError:
+            # Loop closed between the check and the call
+            pass
+
+    def is_set(self, signal: str) -> bool:
+        return self._events[signal].is_set()
+
+    def clear(self, signal: str):
+        """Consume ``signal`` so the next wait needs a new one"""
+        self._events[signal].clear()
+
+    def _read_counts(self, signals: Iterable[str]) -> Dict[str, int]:
+        store = get_shared_store()
+        return {signal: store.get_count(_signal_key(self.execution_id, signal)) for signal in signals}
+
+    async def _poll_shared(self, signals: Iterable[str], force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._last_shared_poll < self.shared_poll_interval:
+            return
+        self._last_shared_poll = now
+        try:
+            counts = await sync_to_async(self._read_counts, thread_sensitive=False)(tuple(signals))
+            self._shared_store_failed = False
+        except Exception as e:
+            if not self._shared_store_failed:
+                logger.warning(f"⚠️ EXECUTION CONTROL: Shared store unavailable for {self.execution_id}, relying on status polling: {e}")
+            self._shared_store_failed = True
+            return
+        for signal, count in counts.items():
+            if count > self._seen_counts[signal]:
+                self._seen_counts[signal] = count
+                self._events[signal].set()
+
+    async def _poll_database(self):
+        """Fallback: read only the status column and treat STOPPED as a stop signal"""
+        if self.fallback_poll_seconds <= 0 or time.monotonic() - self._last_db_poll < self.fallback_poll_seconds:
+            return
+        self._last_db_poll = time.monotonic()
+        from users.models import WorkflowExecution, WorkflowExecutionStatus
+
+        status = await sync_to_async(
+            WorkflowExecution.objects.filter(execution_id=self.execution_id).values_list('status', flat=True).first
+        )()
+        if status == WorkflowExecutionStatus.STOPPED:
+            self._events[SIGNAL_STOP].set()
+
+    async def is_stopped(self) -> bool:
+        """True once a stop was signalled; a cheap check for every scheduler iteration"""
+        if not self.is_set(SIGNAL_STOP):
+            await self._poll_shared((SIGNAL_STOP,))
+        if not self.is_set(SIGNAL_STOP):
+            await self._poll_database()
+        return self.is_set(SIGNAL_STOP)
+
+    async def wait_for(self, signal: str, timeout: float) -> bool:
+        """
+        Wait up to ``timeout`` seconds for ``signal`` (or a stop). Wakes at once
+        for signals published in this process; other processes are noticed on
+        the next shared store read. Returns True if ``signal`` arrived.
+        """
+        deadline = time.monotonic() + timeout
+        watched = {signal, SIGNAL_STOP}
+        while True:
+            await self._poll_shared(watched, force=True)
+            if any(self.is_set(watched_signal) for watched_signal in watched):
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            waiters = [asyncio.ensure_future(self._events[watched_signal].wait()) for watched_signal in watched]
+            try:
+                await asyncio.wait(waiters, timeout=min(remaining, self.shared_poll_interval),
+                                   return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for waiter in waiters:
+                    waiter.cancel()
+        return self.is_set(signal)
+
+    def close(self):
+        with _channels_lock:
+            channels = _channels.get(self.execution_id)
+            if channels is not None:
+                channels.discard(self)
+                if not channels:
+                    _channels.pop(self.execution_id, None)
+
+
+async def open_control_channel(execution_id: str) -> ExecutionControlChannel:
+    """
+    Open a channel for ``execution_id`` on the running event loop. Signals
+    other than stop are only delivered if published after this call.
+    """
+    channel = ExecutionControlChannel(execution_id, asyncio.get_running_loop())
+    try:
+        channel._seen_counts.update(await sync_to_async(channel._read_counts, thread_sensitive=False)(
+            (SIGNAL_RESUME, SIGNAL_HUMAN_INPUT)
+        ))
+    except Exception as e:
+        logger.warning(f"⚠️ EXECUTION CONTROL: Could not read signal counters for {execution_id}: {e}")
+    with _channels_lock:
+        _channels.setdefault(execution_id, weakref.WeakSet()).add(channel)
+    return channel
+
+
+def publish_signal(execution_id: str, signal: str, store=None):
+    """
+    Send ``signal`` to every coroutine running ``execution_id``: directly to
+    channels open in this process, through the shared store to other
+    processes. Store failures are logged, not raised (receivers still fall
+    back to status polling); raises ValueError for an unknown ``signal``.
+    """
+    if signal not in SIGNALS:
+        raise ValueError(f"Unknown execution control signal: {signal}")
+    if not execution_id:
+        return
+    count = None
+    try:
+        _, count = (store or get_shared_store()).incr_capped(
+            _signal_key(execution_id, signal), 1, None, int(get_execution_control_settings()['SIGNAL_TTL'])
+        )
+    except Exception as e:
+        logger.error(f"❌ EXECUTION CONTROL: Failed to publish {signal} for {execution_id} to other processes: {e}")
+    for channel in _open_channels(execution_id):
+        channel._deliver(signal, count)
+    logger.info(f"📣 EXECUTION CONTROL: Published {signal} for {execution_id}")
+
+
+def publish_stop(execution_ids: Iterable[str]):
+    for execution_id in execution_ids:
+        publish_signal(execution_id, SIGNAL_STOP)
@@ -0,0 +1,241 @@
+"""
+Execution Event Log
+===================
+
+Append-only, batched persistence of workflow execution messages.
+
+Each executed step used to re-save ``executed_nodes``, the growing
+``conversation_history`` text and the ``messages_data`` JSON on the
+WorkflowExecution row, rewriting the whole row every time, and the final
+save inserted WorkflowExecutionMessage rows one by one. The log instead
+appends new messages as WorkflowExecutionMessage rows with ``bulk_create``,
+flushing when ``FLUSH_SIZE`` messages are buffered or ``FLUSH_INTERVAL``
+seconds have passed (on a timer, so a step that blocks for a long time does
+not hold back messages already buffered). The execution row is only written at checkpoints that
+need it (human input pauses, reflection, stop) and once as the final summary.
+
+Log rows are numbered in append order; a message is identified by agent,
+message type and timestamp so re-sequenced or re-loaded copies of the same
+message are not written twice.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger('conversation_orchestrator')
+
+DEFAULT_EVENT_LOG_SETTINGS = {
+    'FLUSH_SIZE': 20,
+    'FLUSH_INTERVAL': 2.0,  # seconds
+}
+
+
+def get_event_log_settings() -> Dict[str, Any]:
+    """Merge ``settings.WORKFLOW_EVENT_LOG`` over the defaults"""
+    log_settings = dict(DEFAULT_EVENT_LOG_SETTINGS)
+    log_settings.update(getattr(settings, 'WORKFLOW_EVENT_LOG', {}) or {})
+    return log_settings
+
+
+def parse_message_timestamp(value) -> datetime:
+    """Timezone-aware timestamp of a message dict (now when missing or invalid)"""
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+        except (TypeError, ValueError):
+            return timezone.now()
+    if parsed.tzinfo is None:
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class ExecutionEventLog:
+    """Buffered, append-only message log for one WorkflowExecution"""
+
+    def __init__(self, execution_record, flush_size: Optional[int] = None, flush_interval: Optional[float] = None):
+        log_settings = get_event_log_settings()
+        self.execution_record = execution_record
+        self.flush_size = flush_size or log_settings['FLUSH_SIZE']
+        self.flush_interval = flush_interval if flush_interval is not None else log_settings['FLUSH_INTERVAL']
+
+        self._buffer: List[Any] = []
+        self._logged_keys = set()
+        self._next_sequence = 0
+        self._loaded = False
+        self._last_flush = time.monotonic()
+        self._flush_lock = asyncio.Lock()
+        self._flush_timer: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks = set()
+        # Position reached in the caller's messages list, so each record() only looks at new entries
+        self._scanned_list_id: Optional[int] = None
+        self._scanned = 0
+
+        self.rows_written = 0
+        self.flushes = 0
+        self.checkpoints = 0
+
+    @staticmethod
+    def _message_key(agent_name: str, message_type: str, timestamp: datetime) -> Tuple[str, str, datetime]:
+        return (agent_name or '', message_type or '', timestamp)
+
+    def _load_existing(self) -> set:
+        """Keys of messages already stored for this execution (resumed runs); sync"""
+        from users.models import WorkflowExecutionMessage
+
+        rows = WorkflowExecutionMessage.objects.filter(
+            execution=self.execution_record
+        ).values_list('sequence', 'agent_name', 'message_type', 'timestamp')
+        stored_keys = set()
+        for sequence, agent_name, message_type, timestamp in rows:
+            stored_keys.add(self._message_key(agent_name, message_type, timestamp))
+            self._next_sequence = max(self._next_sequence, sequence + 1)
+        return stored_keys
+
+    def record(self, messages: List[Dict[str, Any]]) -> int:
+        """
+        Buffer messages from ``messages`` that have not been logged yet; returns
+        how many were added. Passing the same (growing) list again only looks at
+        entries appended since the last call.
+        """
+        from users.models import WorkflowExecutionMessage
+
+        if id(messages) == self._scanned_list_id and self._scanned <= len(messages):
+            new_messages = messages[self._scanned:]
+        else:
+            new_messages = messages
+        self._scanned_list_id = id(messages)
+        self._scanned = len(messages)
+
+        added = 0
+        for message in new_messages:
+            timestamp = parse_message_timestamp(message.get('timestamp'))
+            key = self._message_key(message.get('agent_name'), message.get('message_type'), timestamp)
+            if key in self._logged_keys:
+                continue
+            self._logged_keys.add(key)
+            self._buffer.append(WorkflowExecutionMessage(
+                execution=self.execution_record,
+                agent_name=(message.get('agent_name') or '')[:100],
+                agent_type=(message.get('agent_type') or '')[:50],
+                content=message.get('content') or '',
+                message_type=(message.get('message_type') or 'chat')[:20],
+                timestamp=timestamp,
+                response_time_ms=message.get('response_time_ms') or 0,
+                token_count=message.get('token_count'),
+                metadata=message.get('metadata') or {}
+            ))
+            added += 1
+        return added
+
+    @staticmethod
+    def _write_sync(rows: List[Any]):
+        from users.models import WorkflowExecutionMessage
+
+        try:
+            WorkflowExecutionMessage.objects.bulk_create(rows, ignore_conflicts=True)
+        except Exception as e:
+            # One bad row should not drop the batch
+            logger.error(f"❌ EVENT LOG: Batch insert of {len(rows)} messages failed, inserting individually: {e}")
+            for row in rows:
+                try:
+                    row.save()
+                except Exception as row_error:
+                    logger.error(f"❌ EVENT LOG: Failed to save message {row.sequence} ({row.agent_name}): {row_error}")
+
+    async def flush(self) -> int:
+        """Write all buffered messages in one batch"""
+        self._cancel_timed_flush()
+        self._last_flush = time.monotonic()
+        # The buffer is only swapped on the event loop, so messages recorded
+        # while a batch is being written go into the next one
+        async with self._flush_lock:
+            if not self._loaded:
+                stored_keys = await sync_to_async(self._load_existing)()
+                self._logged_keys |= stored_keys
+                self._buffer = [
+                    row for row in self._buffer
+                    if self._message_key(row.agent_name, row.message_type, row.timestamp) not in stored_keys
+                ]
+                self._loaded = True
+            if not self._buffer:
+                return 0
+
+            rows, self._buffer = self._buffer, []
+            for row in rows:
+                row.sequence = self._next_sequence
+                self._next_sequence += 1
+            await sync_to_async(self._write_sync)(rows)
+            self.rows_written += len(rows)
+            self.flushes += 1
+            return len(rows)
+
+    def _arm_timed_flush(self):
+        """
+        Flush ``flush_interval`` after the last flush even if nothing else is
+        appended, so messages do not sit in the buffer through a long LLM call
+        or a human input wait
+        """
+        if self._flush_timer is not None or not self._buffer:
+            return
+        delay = max(0.0, self.flush_interval - (time.monotonic() - self._last_flush))
+        self._flush_timer = asyncio.get_running_loop().call_later(delay, self._start_timed_flush)
+
+    def _cancel_timed_flush(self):
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+    def _start_timed_flush(self):
+        self._flush_timer = None
+        # Held until done: the loop only keeps a weak reference to tasks
+        task = asyncio.get_running_loop().create_task(self._timed_flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _timed_flush(self):
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"❌ EVENT LOG: Timed flush failed: {e}")
+
+    async def append(self, messages: List[Dict[str, Any]]) -> int:
+        """Buffer new messages and flush when the size or time threshold is reached"""
+        self.record(messages)
+        if len(self._buffer) >= self.flush_size or \
+                (self._buffer and time.monotonic() - self._last_flush >= self.flush_interval):
+            return await self.flush()
+        self._arm_timed_flush()
+        return 0
+
+    async def checkpoint(self, executed_nodes: Dict[str, Any], conversation_history: str,
+                         messages: List[Dict[str, Any]]):
+        """
+        Flush the log and write the execution state to the row. Used before code
+        that reloads the row (human input pause, reflection) and on stop.
+        """
+        self.record(messages)
+        await self.flush()
+        self.execution_record.executed_nodes = executed_nodes
+        self.execution_record.conversation_history = conversation_history
+        self.execution_record.messages_data = messages
+        await sync_to_async(self.execution_record.save)(
+            update_fields=['executed_nodes', 'conversation_history', 'messages_data']
+        )
+        self.checkpoints += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'rows_written': self.rows_written,
+            'flushes': self.flushes,
+            'checkpoints': self.checkpoints,
+            'buffered': len(self._buffer),
+        }
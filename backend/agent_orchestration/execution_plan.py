@@ -0,0 +1,212 @@
+"""
+Compiled Workflow Execution Plans
+=================================
+
+Everything the executor derives from a workflow graph's structure - the
+topological execution sequence, per-node inputs and outputs, dependencies,
+multi-input aggregation points, parallel groups and reflection edges - is
+compiled once into an ``ExecutionPlan`` and cached across executions and
+deployed-endpoint requests.
+
+Plans are keyed by a hash of the graph's *structure* (node ids, types, human
+input flags and edges), not of the whole graph JSON: deployments and the
+evaluator rewrite the StartNode prompt on every request, which must not force
+a recompile. A plan stores ids and edge positions only and is bound to the
+caller's own graph_json on use, so prompts and other node data always come
+from the graph being executed.
+
+Saving a workflow compiles its new plan (see users/signals.py); a graph that
+reaches the executor without a cached plan is compiled on first use.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from django.conf import settings
+
+logger = logging.getLogger('conversation_orchestrator')
+
+DEFAULT_PLAN_CACHE_SETTINGS = {
+    'MAX_ENTRIES': 256,
+}
+
+
+def get_plan_cache_settings() -> Dict[str, Any]:
+    """Merge ``settings.WORKFLOW_PLAN_CACHE`` over the defaults"""
+    cache_settings = dict(DEFAULT_PLAN_CACHE_SETTINGS)
+    cache_settings.update(getattr(settings, 'WORKFLOW_PLAN_CACHE', {}) or {})
+    return cache_settings
+
+
+def requires_human_input(node: Dict[str, Any]) -> bool:
+    return node.get('type') == 'UserProxyAgent' and node.get('data', {}).get('require_human_input', True)
+
+
+def compute_structure_key(graph_json: Dict[str, Any]) -> str:
+    """Hash of the parts of a graph that determine its execution plan"""
+    structure = {
+        'nodes': [
+            [node.get('id'), node.get('type'), requires_human_input(node)]
+            for node in graph_json.get('nodes', [])
+        ],
+        'edges': [
+            [edge.get('source'), edge.get('target'), edge.get('type', 'sequential')]
+            for edge in graph_json.get('edges', [])
+        ],
+    }
+    return hashlib.sha256(json.dumps(structure, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+@dataclass(frozen=True)
+class ExecutionPlan:
+    """
+    Structure-only view of a workflow graph. Node and edge references are ids
+    and positions into ``graph_json['nodes']`` / ``graph_json['edges']``.
+    """
+    key: str
+    node_index: Dict[str, int]
+    sequence_ids: Tuple[str, ...]
+    excluded_ids: FrozenSet[str]
+    incoming: Dict[str, Tuple[int, ...]]
+    outgoing: Dict[str, Tuple[int, ...]]
+    # Scheduler dependencies: sequential edges, plus reflection edges into human-input UserProxy nodes
+    dependencies: Dict[str, FrozenSet[str]]
+    reflection_edges: Tuple[int, ...]
+    reflection_sources: FrozenSet[str]
+    aggregation_points: FrozenSet[str]
+    parallel_groups: Tuple[Tuple[str, ...], ...]
+    order_violations: Tuple[str, ...] = field(default_factory=tuple)
+
+    def execution_sequence(self, graph_json: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Node dicts of ``graph_json`` in execution order"""
+        nodes = graph_json.get('nodes', [])
+        return [nodes[self.node_index[node_id]] for node_id in self.sequence_ids]
+
+    def input_sources(self, node_id: str, graph_json: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Same entries as WorkflowParser.find_multiple_inputs_to_node, without scanning the graph"""
+        nodes = graph_json.get('nodes', [])
+        edges = graph_json.get('edges', [])
+        input_nodes = []
+        for edge_position in self.incoming.get(node_id, ()):
+            edge = edges[edge_position]
+            source_id = edge.get('source')
+            source_node = nodes[self.node_index[source_id]]
+            input_nodes.append({
+                'node': source_node,
+                'edge': edge,
+                'source_id': source_id,
+                'name': source_node.get('data', {}).get('name', source_id),
+                'type': source_node.get('type', 'Unknown')
+            })
+        return input_nodes
+
+    def outgoing_targets(self, node_id: str, graph_json: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Same entries as WorkflowParser.find_outgoing_edges_from_node, without scanning the graph"""
+        nodes = graph_json.get('nodes', [])
+        edges = graph_json.get('edges', [])
+        target_nodes = []
+        for edge_position in self.outgoing.get(node_id, ()):
+            edge = edges[edge_position]
+            target_id = edge.get('target')
+            target_node = nodes[self.node_index[target_id]]
+            target_nodes.append({
+                'node': target_node,
+                'edge': edge,
+                'target_id': target_id,
+                'name': target_node.get('data', {}).get('name', target_id),
+                'type': target_node.get('type', 'Unknown'),
+                'edge_type': edge.get('type', 'sequential')
+            })
+        return target_nodes
+
+
+class ExecutionPlanCache:
+    """Thread-safe LRU of compiled plans keyed by graph structure"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._plans: "OrderedDict[str, ExecutionPlan]" = OrderedDict()
+        self._workflow_keys: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.compiles = 0
+
+    def get_or_compile(self, graph_json: Dict[str, Any],
+                       compile_plan: Callable[[Dict[str, Any], str], ExecutionPlan]) -> ExecutionPlan:
+        # Hashed on every lookup: callers may edit a graph dict in place, so its identity says nothing
+        key = compute_structure_key(graph_json)
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+                self.hits += 1
+                return plan
+            self.misses += 1
+
+        # Compiling twice on a concurrent miss is harmless; both plans are identical
+        plan = compile_plan(graph_json, key)
+        self._store(plan)
+        return plan
+
+    def _store(self, plan: ExecutionPlan):
+        with self._lock:
+            self.compiles += 1
+            self._plans[plan.key] = plan
+            self._plans.move_to_end(plan.key)
+            while len(self._plans) > self.max_entries:
+                self._plans.popitem(last=False)
+
+    def recompile_for_workflow(self, workflow_id: str, graph_json: Dict[str, Any],
+                               compile_plan: Callable[[Dict[str, Any], str], ExecutionPlan]) -> ExecutionPlan:
+        """Compile a saved workflow's plan and drop the one its previous graph used"""
+        key = compute_structure_key(graph_json)
+        with self._lock:
+            previous_key = self._workflow_keys.get(workflow_id)
+            if previous_key and previous_key != key:
+                self._plans.pop(previous_key, None)
+            self._workflow_keys[workflow_id] = key
+            plan = self._plans.get(key)
+        if plan is None:
+            plan = compile_plan(graph_json, key)
+            self._store(plan)
+        return plan
+
+    def forget_workflow(self, workflow_id: str):
+        with self._lock:
+            key = self._workflow_keys.pop(workflow_id, None)
+            if key:
+                self._plans.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._plans),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'compiles': self.compiles,
+            }
+
+
+_plan_cache: Optional[ExecutionPlanCache] = None
+_plan_cache_lock = threading.Lock()
+
+
+def get_execution_plan_cache() -> ExecutionPlanCache:
+    """Process-wide execution plan cache"""
+    global _plan_cache
+
+    if _plan_cache is None:
+        with _plan_cache_lock:
+            if _plan_cache is None:
+                _plan_cache = ExecutionPlanCache(max_entries=get_plan_cache_settings()['MAX_ENTRIES'])
+    return _plan_cache
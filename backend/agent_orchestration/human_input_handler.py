@@ -6,12 +6,14 @@ Handles human input pause/resume functionality for conversation orchestration.
 """
 
 import logging
-import asyncio
 from typing import Dict, List, Any, Optional
 from django.utils import timezone
 from asgiref.sync import sync_to_async
 
 from users.models import WorkflowExecution, WorkflowExecutionMessage, WorkflowExecutionStatus, HumanInputInteraction
+from .execution_control import (
+    SIGNAL_HUMAN_INPUT, SIGNAL_RESUME, get_execution_control_settings, open_control_channel, publish_signal
+)
 
 logger = logging.getLogger('conversation_orchestrator')
 
@@ -146,6 +148,7 @@ class HumanInputHandler:
         await sync_to_async(execution_record.save)()
         
         logger.info(f"✅ HUMAN INPUT: Recorded interaction and updated execution state")
+        publish_signal(execution_record.execution_id, SIGNAL_HUMAN_INPUT)
         
         # Resume workflow execution from where we left off
         return await self.continue_workflow_from_resumed_state(execution_record, human_input)
@@ -210,6 +213,9 @@ class HumanInputHandler:
             if reflection_source:
                 logger.info(f"🔄 WORKFLOW RESUME: This is a reflection workflow, calling reflection handler")
                 
+                # Opened first so the reflection handler's resume signal is not missed
+                control = await open_control_channel(execution_record.execution_id)
+                
                 # This is a reflection workflow - call the reflection handler to complete the reflection
                 final_response, updated_conversation = await self.reflection_handler.resume_reflection_workflow_execution(
                     execution_record, human_input
@@ -283,18 +289,22 @@ class HumanInputHandler:
                 logger.info(f"📊 REFLECTION RESUME: Loaded executed_nodes with {len(executed_nodes)} entries after reflection")
                 
                 # CRITICAL FIX: Verify reflection response is in executed_nodes before continuing
-                if reflection_source_id:
-                    if reflection_source_id not in executed_nodes:
-                        logger.error(f"❌ REFLECTION RESUME: Reflection source {reflection_source_id} not in executed_nodes after reflection!")
-                        logger.error(f"❌ REFLECTION RESUME: Available nodes: {list(executed_nodes.keys())}")
-                        # Wait a bit and refresh
-                        await asyncio.sleep(0.5)
-                        await sync_to_async(execution_record.refresh_from_db)()
-                        executed_nodes = execution_record.executed_nodes or {}
+                try:
+                    if reflection_source_id:
                         if reflection_source_id not in executed_nodes:
-                            raise Exception(f"Reflection response for {reflection_source_id} not saved properly")
-                    else:
-                        logger.info(f"✅ REFLECTION RESUME: Verified reflection source {reflection_source_id} in executed_nodes")
+                            logger.error(f"❌ REFLECTION RESUME: Reflection source {reflection_source_id} not in executed_nodes after reflection!")
+                            logger.error(f"❌ REFLECTION RESUME: Available nodes: {list(executed_nodes.keys())}")
+                            # Wait for the reflection result to be signalled, then read it once
+                            result_wait = float(get_execution_control_settings()['RESULT_WAIT_SECONDS'])
+                            if await control.wait_for(SIGNAL_RESUME, result_wait):
+                                await sync_to_async(execution_record.refresh_from_db)(fields=['executed_nodes'])
+                                executed_nodes = execution_record.executed_nodes or {}
+                            if reflection_source_id not in executed_nodes:
+                                raise Exception(f"Reflection response for {reflection_source_id} not saved properly")
+                        else:
+                            logger.info(f"✅ REFLECTION RESUME: Verified reflection source {reflection_source_id} in executed_nodes")
+                finally:
+                    control.close()
                 
                 # CRITICAL FIX: Use node_id instead of node_name for accurate position calculation
                 # This prevents matching the wrong node when multiple nodes have the same name
@@ -7,11 +7,14 @@ from rest_framework.response import Response
 from rest_framework import status
 from django.utils import timezone
 from asgiref.sync import sync_to_async
-import asyncio
 import logging
 
 from users.models import WorkflowExecution, WorkflowExecutionStatus, HumanInputInteraction
+from llm_eval.providers.http_pool import run_with_http_pool
 from .conversation_orchestrator import ConversationOrchestrator
+from .execution_control import SIGNAL_STOP, publish_signal
+from .jobs import background_requested, serialize_job, submit_job
+from .models import BackgroundJob, BackgroundJobStatus, BackgroundJobType
 
 # Enhanced logging setup for human input API operations
 logger = logging.getLogger('human_input_views')
@@ -189,6 +192,30 @@ def submit_human_input(request):
             f"workflow={execution.workflow.name}, agent={execution.awaiting_human_input_agent}"
         )
         
+        if background_requested(request):
+            if BackgroundJob.objects.filter(
+                job_type=BackgroundJobType.HUMAN_INPUT_RESUME,
+                payload__execution_id=execution_id,
+                status__in=[BackgroundJobStatus.QUEUED, BackgroundJobStatus.RUNNING]
+            ).exists():
+                return Response({
+                    'status': 'error',
+                    'error': 'A resume for this execution is already queued'
+                }, status=status.HTTP_409_CONFLICT)
+            job = submit_job(
+                BackgroundJobType.HUMAN_INPUT_RESUME, execution.workflow.project, request.user,
+                {'execution_id': execution_id, 'human_input': human_input, 'action': action}
+            )
+            logger.info(f"📥 SUBMIT_INPUT: Resume of {execution_id[:8]} queued as job {job.job_id}")
+            return Response({
+                'status': 'queued',
+                'message': 'Workflow resume queued',
+                'execution_id': execution_id,
+                'action': action,
+                'job_id': str(job.job_id),
+                'job': serialize_job(job)
+            }, status=status.HTTP_202_ACCEPTED)
+        
         logger.info(
             f"🔄 SUBMIT_INPUT: Resuming workflow for execution {execution_id[:8]}"
         )
@@ -225,7 +252,7 @@ def submit_human_input(request):
                 )
         
         logger.debug(f"🔄 SUBMIT_INPUT: Running async resume_workflow for {execution_id[:8]} with action: {action}")
-        result = asyncio.run(resume_workflow())
+        result = run_with_http_pool(resume_workflow())
         logger.debug(f"✅ SUBMIT_INPUT: Async operation completed for {execution_id[:8]}")
         
         # Handle special iteration response
@@ -361,6 +388,8 @@ def clear_pending_inputs_for_execution(execution_id: str):
             human_input_context={},
             end_time=timezone.now()
         )
+        # Running coroutines learn of the stop from the signal rather than by re-reading the row
+        publish_signal(execution_id, SIGNAL_STOP)
         
         # Clear from HumanInputInteraction model  
         HumanInputInteraction.objects.filter(
@@ -0,0 +1,199 @@
+"""
+Background Job Handlers
+=======================
+
+Built-in handlers for the job runner in jobs.py. Each handler re-loads its
+records from the ids in the job payload, runs the same orchestrator call the
+HTTP views used to run inline, and returns a JSON-serialisable result.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict
+
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+from django.utils import timezone
+
+from users.models import (
+    AgentWorkflow, EvaluationStatus, WorkflowEvaluation, WorkflowExecution, WorkflowExecutionStatus
+)
+from .execution_control import publish_stop
+from .jobs import JobContext, PermanentJobError, register_job_handler
+from .models import BackgroundJobType
+
+logger = logging.getLogger('agent_orchestration')
+
+
+def _stop_executions_started_by(job, earlier_attempts: bool = False):
+    """
+    Mark executions the job's current attempt left RUNNING (it was cancelled)
+    as stopped and signal them. With ``earlier_attempts``, those left by the
+    attempts before this one instead (their worker stopped heartbeating and
+    the job was requeued).
+    """
+    if earlier_attempts:
+        started = Q(start_time__gte=job.created_at, start_time__lt=job.started_at)
+    else:
+        started = Q(start_time__gte=job.started_at)
+    running = WorkflowExecution.objects.filter(
+        started,
+        workflow__workflow_id=job.payload.get('workflow_id'),
+        executed_by_id=job.submitted_by_id,
+        status=WorkflowExecutionStatus.RUNNING
+    )
+    execution_ids = list(running.values_list('execution_id', flat=True))
+    stopped = running.filter(execution_id__in=execution_ids).update(
+        status=WorkflowExecutionStatus.STOPPED, end_time=timezone.now()
+    )
+    publish_stop(execution_ids)
+    return stopped
+
+
+async def _stop_earlier_attempts(job):
+    """A retry re-runs the work from scratch: retire what a lost attempt left running"""
+    if job.attempts <= 1:
+        return
+    stopped = await sync_to_async(_stop_executions_started_by)(job, earlier_attempts=True)
+    if stopped:
+        logger.warning(f"⚠️ JOBS: Job {job.job_id} attempt {job.attempts} stopped {stopped} execution(s) left running by earlier attempts")
+
+
+async def _load_workflow(job) -> AgentWorkflow:
+    try:
+        return await sync_to_async(
+            AgentWorkflow.objects.select_related('project').get
+        )(workflow_id=job.payload['workflow_id'], project_id=job.project_id)
+    except AgentWorkflow.DoesNotExist:
+        raise PermanentJobError(f"Workflow {job.payload.get('workflow_id')} no longer exists")
+
+
+async def _load_submitter(job):
+    user = await sync_to_async(lambda: job.submitted_by)()
+    if user is None:
+        raise PermanentJobError('The user who submitted this job no longer exists')
+    return user
+
+
+@register_job_handler(BackgroundJobType.WORKFLOW_EXECUTION)
+async def run_workflow_execution(job, context: JobContext) -> Dict[str, Any]:
+    """Payload: ``workflow_id``"""
+    from .conversation_orchestrator import ConversationOrchestrator
+    from .streaming import WebSocketTokenStreamer
+
+    workflow = await _load_workflow(job)
+    user = await _load_submitter(job)
+    await _stop_earlier_attempts(job)
+    orchestrator = ConversationOrchestrator()
+    token_streamer = WebSocketTokenStreamer(str(workflow.project.project_id))
+
+    await context.report_progress(0, f"Executing workflow {workflow.name}")
+    try:
+        result = await orchestrator.execute_workflow(
+            workflow, user,
+            stream_callback=token_streamer if token_streamer.enabled else None
+        )
+    except asyncio.CancelledError:
+        stopped = await sync_to_async(_stop_executions_started_by)(job)
+        logger.info(f"🛑 JOBS: Workflow job {job.job_id} cancelled, {stopped} execution(s) stopped")
+        raise
+    return result
+
+
+@register_job_handler(BackgroundJobType.WORKFLOW_EVALUATION)
+async def run_workflow_evaluation(job, context: JobContext) -> Dict[str, Any]:
+    """
+    Payload: ``workflow_id``, ``evaluation_id`` (a WorkflowEvaluation created by
+    the view) and ``csv_content``. Retries resume after the rows already done.
+    """
+    from .conversation_orchestrator import ConversationOrchestrator
+    from .workflow_evaluator import WorkflowEvaluator
+
+    workflow = await _load_workflow(job)
+    user = await _load_submitter(job)
+    evaluation_id = job.payload['evaluation_id']
+    await _stop_earlier_attempts(job)
+
+    orchestrator = ConversationOrchestrator()
+    evaluator = WorkflowEvaluator(
+        workflow_executor=orchestrator.workflow_executor,
+        llm_provider_manager=orchestrator.llm_provider_manager,
+        workflow_parser=orchestrator.workflow_parser
+    )
+
+    async def on_row_done(processed_rows: int, total_rows: int):
+        await context.report_progress(
+            processed_rows * 100 // max(total_rows, 1),
+            f"Evaluated row {processed_rows} of {total_rows}"
+        )
+
+    def mark_evaluation(status: str):
+        WorkflowEvaluation.objects.filter(evaluation_id=evaluation_id).update(status=status)
+
+    try:
+        evaluation = await evaluator.evaluate_workflow(
+            workflow=workflow,
+            csv_file=job.payload['csv_content'],
+            executed_by=user,
+            evaluation_id=evaluation_id,
+            progress_callback=on_row_done
+        )
+    except asyncio.CancelledError:
+        await sync_to_async(mark_evaluation)(EvaluationStatus.CANCELLED)
+        await sync_to_async(_stop_executions_started_by)(job)
+        raise
+    except ValueError as e:
+        await sync_to_async(mark_evaluation)(EvaluationStatus.FAILED)
+        raise PermanentJobError(str(e))
+    except WorkflowEvaluation.DoesNotExist:
+        raise PermanentJobError(f"Evaluation {evaluation_id} no longer exists")
+    except Exception:
+        if job.attempts >= job.max_attempts:
+            await sync_to_async(mark_evaluation)(EvaluationStatus.FAILED)
+        raise
+
+    return {
+        'evaluation_id': str(evaluation.evaluation_id),
+        'status': evaluation.status,
+        'total_rows': evaluation.total_rows,
+        'completed_rows': evaluation.completed_rows,
+        'failed_rows': evaluation.failed_rows,
+    }
+
+
+@register_job_handler(BackgroundJobType.HUMAN_INPUT_RESUME, max_attempts=1)
+async def run_human_input_resume(job, context: JobContext) -> Dict[str, Any]:
+    """
+    Payload: ``execution_id``, ``human_input`` and ``action`` ('submit' or
+    'iterate'). Never retried: the input is consumed by the first attempt.
+    """
+    from .conversation_orchestrator import ConversationOrchestrator
+
+    user = await _load_submitter(job)
+    execution_id = job.payload['execution_id']
+    human_input = job.payload['human_input']
+    orchestrator = ConversationOrchestrator()
+
+    await context.report_progress(0, f"Resuming execution {execution_id}")
+    if job.payload.get('action') == 'iterate':
+        try:
+            execution = await sync_to_async(WorkflowExecution.objects.get)(execution_id=execution_id)
+        except WorkflowExecution.DoesNotExist:
+            raise PermanentJobError(f"Execution {execution_id} no longer exists")
+        reflection_context = execution.human_input_context
+        if reflection_context and reflection_context.get('reflection_source'):
+            result = await orchestrator.human_input_handler.reflection_handler.iterate_reflection_workflow(
+                execution, human_input
+            )
+            if not (isinstance(result, tuple) and len(result) == 2):
+                return {'execution_id': execution_id, 'action': 'iterate', 'result': result}
+            iteration_response, _ = result
+            return {
+                'execution_id': execution_id,
+                'action': 'iterate',
+                'awaiting_input': iteration_response == 'AWAITING_REFLECTION_INPUT',
+                'result': None if iteration_response == 'AWAITING_REFLECTION_INPUT' else iteration_response
+            }
+
+    result = await orchestrator.resume_workflow_with_human_input(execution_id, human_input, user)
+    return {'execution_id': execution_id, 'result': result}
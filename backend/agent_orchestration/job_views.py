@@ -0,0 +1,95 @@
+# backend/agent_orchestration/job_views.py
+"""
+Background Job API: poll and cancel jobs queued by the workflow execute,
+evaluate and human-input endpoints.
+"""
+
+import logging
+
+from django.shortcuts import get_object_or_404
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from users.models import IntelliDocProject
+from .jobs import ensure_job_worker, get_queue_stats, list_jobs, request_cancel, serialize_job
+from .models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+
+def _get_accessible_project(request, project_id):
+    project = get_object_or_404(IntelliDocProject, project_id=project_id)
+    if not project.has_user_access(request.user):
+        logger.warning(f"🚫 JOBS: User {request.user.email} denied access to project {project.name}")
+        return None
+    return project
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def project_jobs(request, project_id):
+    """
+    GET /api/projects/{project_id}/jobs/?status=&job_type=&limit=
+    Recent background jobs of a project with queue counts
+    """
+    project = _get_accessible_project(request, project_id)
+    if project is None:
+        return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+
+    ensure_job_worker()
+    try:
+        limit = min(int(request.query_params.get('limit', 50)), 200)
+    except ValueError:
+        limit = 50
+    jobs = list_jobs(
+        project,
+        limit=limit,
+        status=request.query_params.get('status'),
+        job_type=request.query_params.get('job_type')
+    )
+    return Response({
+        'project_id': str(project.project_id),
+        'jobs': [serialize_job(job) for job in jobs],
+        'queue': get_queue_stats(project)
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def job_detail(request, project_id, job_id):
+    """
+    GET /api/projects/{project_id}/jobs/{job_id}/
+    Poll a job's status, progress and (once finished) result
+    """
+    project = _get_accessible_project(request, project_id)
+    if project is None:
+        return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+
+    ensure_job_worker()
+    job = get_object_or_404(BackgroundJob.objects.select_related('project'), job_id=job_id, project=project)
+    return Response(serialize_job(job))
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def cancel_job(request, project_id, job_id):
+    """
+    POST /api/projects/{project_id}/jobs/{job_id}/cancel/
+    Cancel a queued job, or ask the worker to stop a running one
+    """
+    project = _get_accessible_project(request, project_id)
+    if project is None:
+        return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+
+    job = get_object_or_404(BackgroundJob.objects.select_related('project'), job_id=job_id, project=project)
+    if job.is_finished:
+        return Response({
+            'error': f'Job already {job.status}',
+            'job': serialize_job(job)
+        }, status=status.HTTP_409_CONFLICT)
+
+    logger.info(f"🛑 JOBS: Cancel of job {job.job_id} requested by {request.user.email}")
+    job = request_cancel(job)
+    return Response(serialize_job(job), status=status.HTTP_202_ACCEPTED)
@@ -0,0 +1,532 @@
+"""
+Background Job Runner
+=====================
+
+Durable queue for long-running work that used to run inline in HTTP requests
+(whole workflow executions, CSV evaluations, human-input resumes).
+
+- ``submit_job`` stores a ``BackgroundJob`` row; the request returns at once
+  with the job id and clients poll it (or listen for ``job_update`` events on
+  the project's websocket group).
+- A ``JobWorker`` claims queued jobs with ``SELECT ... FOR UPDATE SKIP LOCKED``,
+  so any number of worker processes can share the queue. At most
+  ``MAX_CONCURRENT_PER_PROJECT`` jobs of one project run at once.
+- Running jobs heartbeat; a job whose worker stopped heartbeating is requeued
+  (or failed once it has used all attempts). Failed attempts are retried with
+  exponential backoff unless the handler raised ``PermanentJobError``.
+- Cancelling a queued job removes it from the queue; cancelling a running job
+  sets ``cancel_requested``, which the worker picks up on its next heartbeat.
+
+Workers run via ``python manage.py run_job_worker``. With ``EMBEDDED_WORKER``
+enabled, a web process also starts one worker thread the first time it
+submits or polls a job, so a single-container setup needs no extra process.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from llm_eval.providers.http_pool import run_with_http_pool
+
+logger = logging.getLogger('agent_orchestration')
+
+DEFAULT_JOB_SETTINGS = {
+    'WORKER_CONCURRENCY': 4,
+    'MAX_CONCURRENT_PER_PROJECT': 2,
+    'POLL_INTERVAL': 1.0,
+    'HEARTBEAT_INTERVAL': 10,
+    'STALE_JOB_TIMEOUT': 120,
+    'MAX_ATTEMPTS': 3,
+    'RETRY_BACKOFF': 10,
+    'EMBEDDED_WORKER': True,
+}
+
+# Queued candidates examined per claim (skipped when their project is at its limit)
+CLAIM_BATCH_SIZE = 20
+
+
+def get_job_settings() -> Dict[str, Any]:
+    """Merge ``settings.BACKGROUND_JOBS`` over the defaults"""
+    job_settings = dict(DEFAULT_JOB_SETTINGS)
+    job_settings.update(getattr(settings, 'BACKGROUND_JOBS', {}) or {})
+    return job_settings
+
+
+def _host_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler for failures that a retry cannot fix (bad input, missing records)"""
+
+
+# ============================================================================
+# HANDLER REGISTRY
+# ============================================================================
+
+JobHandler = Callable[[Any, 'JobContext'], Awaitable[Dict[str, Any]]]
+
+_handlers: Dict[str, JobHandler] = {}
+_handler_attempts: Dict[str, int] = {}
+
+
+def register_job_handler(job_type: str, max_attempts: Optional[int] = None):
+    """
+    Decorator registering ``async def handler(job, context) -> dict`` for a job
+    type. ``max_attempts`` overrides the MAX_ATTEMPTS setting for jobs that must
+    not run twice.
+    """
+    def decorator(handler: JobHandler) -> JobHandler:
+        _handlers[job_type] = handler
+        if max_attempts is not None:
+            _handler_attempts[job_type] = max_attempts
+        return handler
+    return decorator
+
+
+def get_job_handler(job_type: str) -> Optional[JobHandler]:
+    if not _handlers:
+        from . import job_handlers  # noqa: F401  (registers the built-in handlers)
+    return _handlers.get(job_type)
+
+
+class JobContext:
+    """Handed to a running handler for progress reporting"""
+
+    def __init__(self, job):
+        self.job = job
+
+    async def report_progress(self, progress: int, message: str = ''):
+        """Store percent complete (0-100) and push it to the project's websocket group"""
+        progress = max(0, min(100, int(progress)))
+        message = (message or '')[:255]
+        self.job.progress = progress
+        self.job.progress_message = message
+        await sync_to_async(update_job)(
+            self.job.job_id, progress=progress, progress_message=message, heartbeat_at=timezone.now()
+        )
+        await push_job_update(self.job)
+
+
+# ============================================================================
+# QUEUE OPERATIONS
+# ============================================================================
+
+def serialize_job(job) -> Dict[str, Any]:
+    """API / websocket representation of a job"""
+    return {
+        'job_id': str(job.job_id),
+        'job_type': job.job_type,
+        'project_id': str(job.project.project_id),
+        'status': job.status,
+        'progress': job.progress,
+        'progress_message': job.progress_message,
+        'attempts': job.attempts,
+        'max_attempts': job.max_attempts,
+        'cancel_requested': job.cancel_requested,
+        'error_message': job.error_message,
+        'result': job.result if job.is_finished else None,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+def _get_channel_layer():
+    try:
+        from channels.layers import get_channel_layer
+        return get_channel_layer()
+    except Exception:
+        return None
+
+
+async def push_job_update(job):
+    """Send a ``job_update`` event to the AgentOrchestrationConsumer group of the job's project"""
+    channel_layer = _get_channel_layer()
+    if channel_layer is None:
+        return
+    try:
+        job_data = await sync_to_async(serialize_job)(job)
+        await channel_layer.group_send(f"agent_orchestration_{job_data['project_id']}", {
+            'type': 'job_update',
+            'job': job_data,
+            'timestamp': timezone.now().isoformat()
+        })
+    except Exception as e:
+        logger.debug(f"JOBS: Could not push update for job {job.job_id}: {e}")
+
+
+def send_job_update(job):
+    """Synchronous ``push_job_update`` for views and the worker's bookkeeping code"""
+    if _get_channel_layer() is not None:
+        async_to_sync(push_job_update)(job)
+
+
+def background_requested(request) -> bool:
+    """Whether a view request asked to run as a background job (``background`` in body or query)"""
+    value = request.data.get('background', request.query_params.get('background', False))
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes')
+    return bool(value)
+
+
+def update_job(job_id, **fields):
+    from .models import BackgroundJob
+    return BackgroundJob.objects.filter(job_id=job_id).update(**fields)
+
+
+def submit_job(job_type: str, project, submitted_by, payload: Dict[str, Any],
+               max_attempts: Optional[int] = None):
+    """Queue a job and return the BackgroundJob row"""
+    from .models import BackgroundJob
+
+    if get_job_handler(job_type) is None:
+        raise ValueError(f"No handler registered for job type '{job_type}'")
+
+    if max_attempts is None:
+        max_attempts = _handler_attempts.get(job_type, get_job_settings()['MAX_ATTEMPTS'])
+    job = BackgroundJob.objects.create(
+        job_type=job_type,
+        project=project,
+        submitted_by=submitted_by,
+        payload=payload,
+        max_attempts=max(1, max_attempts)
+    )
+    logger.info(f"📥 JOBS: Queued {job_type} job {job.job_id} for project {project.project_id}")
+    send_job_update(job)
+    ensure_job_worker()
+    return job
+
+
+def claim_next_job(worker_id: str):
+    """
+    Move the oldest runnable queued job to RUNNING for ``worker_id``.
+
+    Jobs of projects already running MAX_CONCURRENT_PER_PROJECT jobs are
+    skipped. The project row is locked while its running jobs are counted, so
+    concurrent workers cannot both start a project's last free slot.
+    """
+    from users.models import IntelliDocProject
+    from .models import BackgroundJob, BackgroundJobStatus
+
+    per_project_limit = get_job_settings()['MAX_CONCURRENT_PER_PROJECT']
+    now = timezone.now()
+
+    with transaction.atomic():
+        candidates = list(
+            BackgroundJob.objects.select_for_update(skip_locked=True)
+            .filter(status=BackgroundJobStatus.QUEUED, run_after__lte=now)
+            .order_by('run_after', 'created_at')[:CLAIM_BATCH_SIZE]
+        )
+        full_projects = set()
+        for job in candidates:
+            if job.project_id in full_projects:
+                continue
+            if per_project_limit:
+                IntelliDocProject.objects.select_for_update().filter(pk=job.project_id).first()
+                running = BackgroundJob.objects.filter(
+                    project_id=job.project_id, status=BackgroundJobStatus.RUNNING
+                ).count()
+                if running >= per_project_limit:
+                    full_projects.add(job.project_id)
+                    continue
+
+            job.status = BackgroundJobStatus.RUNNING
+            job.attempts += 1
+            job.worker = worker_id
+            job.started_at = now
+            job.heartbeat_at = now
+            job.progress = 0
+            job.progress_message = ''
+            job.save(update_fields=['status', 'attempts', 'worker', 'started_at', 'heartbeat_at',
+                                    'progress', 'progress_message'])
+            return job
+    return None
+
+
+def heartbeat(job_id, worker_id: str) -> bool:
+    """
+    Refresh a running job's heartbeat. Returns False when the job should stop:
+    cancellation was requested, or the job no longer belongs to this worker
+    (it was requeued as stale).
+    """
+    from .models import BackgroundJob, BackgroundJobStatus
+
+    updated = BackgroundJob.objects.filter(
+        job_id=job_id, worker=worker_id, status=BackgroundJobStatus.RUNNING, cancel_requested=False
+    ).update(heartbeat_at=timezone.now())
+    return updated == 1
+
+
+def finish_job(job, status: str, result: Optional[Dict[str, Any]] = None, error_message: str = ''):
+    """Record a terminal status (only if the job is still owned by its worker)"""
+    from .models import BackgroundJob, BackgroundJobStatus
+
+    now = timezone.now()
+    fields = {
+        'status': status,
+        'finished_at': now,
+        'heartbeat_at': now,
+        'error_message': error_message[:10000],
+    }
+    if result is not None:
+        fields['result'] = result
+    if status == BackgroundJobStatus.SUCCEEDED:
+        fields['progress'] = 100
+    BackgroundJob.objects.filter(job_id=job.job_id, worker=job.worker,
+                                 status=BackgroundJobStatus.RUNNING).update(**fields)
+    job.refresh_from_db()
+    send_job_update(job)
+
+
+def retry_or_fail_job(job, error_message: str, retryable: bool = True):
+    """Requeue a failed attempt with exponential backoff, or fail the job for good"""
+    from .models import BackgroundJob, BackgroundJobStatus
+
+    if not retryable or job.attempts >= job.max_attempts:
+        finish_job(job, BackgroundJobStatus.FAILED, error_message=error_message)
+        logger.error(f"❌ JOBS: Job {job.job_id} failed after {job.attempts} attempt(s): {error_message}")
+        return
+
+    delay = get_job_settings()['RETRY_BACKOFF'] * (2 ** (job.attempts - 1))
+    BackgroundJob.objects.filter(job_id=job.job_id, worker=job.worker,
+                                 status=BackgroundJobStatus.RUNNING).update(
+        status=BackgroundJobStatus.QUEUED,
+        run_after=timezone.now() + timedelta(seconds=delay),
+        worker='',
+        error_message=error_message[:10000]
+    )
+    job.refresh_from_db()
+    send_job_update(job)
+    logger.warning(f"🔁 JOBS: Job {job.job_id} attempt {job.attempts}/{job.max_attempts} failed, "
+                   f"retrying in {delay}s: {error_message}")
+
+
+def request_cancel(job):
+    """
+    Cancel a job: queued jobs are cancelled immediately, running jobs are
+    flagged and stopped by their worker on its next heartbeat.
+    """
+    from .models import BackgroundJob, BackgroundJobStatus
+
+    now = timezone.now()
+    cancelled = BackgroundJob.objects.filter(job_id=job.job_id, status=BackgroundJobStatus.QUEUED).update(
+        status=BackgroundJobStatus.CANCELLED, cancel_requested=True, finished_at=now
+    )
+    if not cancelled:
+        BackgroundJob.objects.filter(job_id=job.job_id, status=BackgroundJobStatus.RUNNING).update(
+            cancel_requested=True
+        )
+    job.refresh_from_db()
+    send_job_update(job)
+    logger.info(f"🛑 JOBS: Cancel requested for job {job.job_id} (now {job.status})")
+    return job
+
+
+def requeue_stale_jobs() -> int:
+    """Requeue RUNNING jobs whose worker stopped heartbeating (fail those out of attempts)"""
+    from django.db.models import F
+    from .models import BackgroundJob, BackgroundJobStatus
+
+    stale_before = timezone.now() - timedelta(seconds=get_job_settings()['STALE_JOB_TIMEOUT'])
+    stale = BackgroundJob.objects.filter(status=BackgroundJobStatus.RUNNING).filter(
+        Q(heartbeat_at__lt=stale_before) | Q(heartbeat_at__isnull=True, started_at__lt=stale_before)
+    )
+    now = timezone.now()
+    cancelled = stale.filter(cancel_requested=True).update(
+        status=BackgroundJobStatus.CANCELLED, finished_at=now, worker=''
+    )
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=BackgroundJobStatus.FAILED, finished_at=now, worker='',
+        error_message='Worker stopped heartbeating'
+    )
+    requeued = stale.update(
+        status=BackgroundJobStatus.QUEUED, run_after=now, worker='',
+        error_message='Worker stopped heartbeating; requeued'
+    )
+    if cancelled or failed or requeued:
+        logger.warning(f"⚠️ JOBS: Stale jobs - {requeued} requeued, {failed} failed, {cancelled} cancelled")
+    return cancelled + failed + requeued
+
+
+def get_queue_stats(project=None) -> Dict[str, int]:
+    """Job counts by status (optionally for one project)"""
+    from .models import BackgroundJob
+
+    jobs = BackgroundJob.objects.all()
+    if project is not None:
+        jobs = jobs.filter(project=project)
+    return {row['status']: row['count'] for row in jobs.values('status').annotate(count=Count('id'))}
+
+
+def list_jobs(project, limit: int = 50, status: Optional[str] = None,
+              job_type: Optional[str] = None) -> List[Any]:
+    from .models import BackgroundJob
+
+    jobs = BackgroundJob.objects.filter(project=project).select_related('project')
+    if status:
+        jobs = jobs.filter(status=status)
+    if job_type:
+        jobs = jobs.filter(job_type=job_type)
+    return list(jobs.order_by('-created_at')[:limit])
+
+
+# ============================================================================
+# WORKER
+# ============================================================================
+
+class JobWorker:
+    """
+    Claims and runs jobs on a thread pool; each job runs its async handler in
+    its own event loop. ``run`` blocks until ``stop`` is called and then waits
+    for the jobs in flight.
+    """
+
+    def __init__(self, concurrency: Optional[int] = None, poll_interval: Optional[float] = None):
+        job_settings = get_job_settings()
+        self.concurrency = max(1, concurrency or job_settings['WORKER_CONCURRENCY'])
+        self.poll_interval = poll_interval or job_settings['POLL_INTERVAL']
+        self.heartbeat_interval = job_settings['HEARTBEAT_INTERVAL']
+        self.worker_id = _host_id()
+        self._stop = threading.Event()
+        self.jobs_run = 0
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def stopping(self) -> bool:
+        return self._stop.is_set()
+
+    def run(self):
+        logger.info(f"🚀 JOBS: Worker {self.worker_id} started (concurrency {self.concurrency})")
+        in_flight = set()
+        last_stale_check = 0.0
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='background-job') as pool:
+            while not self._stop.is_set():
+                try:
+                    if time.monotonic() - last_stale_check >= self.heartbeat_interval:
+                        requeue_stale_jobs()
+                        last_stale_check = time.monotonic()
+
+                    claimed = False
+                    while len(in_flight) < self.concurrency and not self._stop.is_set():
+                        job = claim_next_job(self.worker_id)
+                        if job is None:
+                            break
+                        claimed = True
+                        in_flight.add(pool.submit(self._run_job, job))
+                except Exception as e:
+                    logger.error(f"❌ JOBS: Worker loop error: {e}")
+                    claimed = False
+                finally:
+                    close_old_connections()
+
+                if in_flight:
+                    done, in_flight = wait(in_flight, timeout=0 if claimed else self.poll_interval,
+                                           return_when=FIRST_COMPLETED)
+                    in_flight = set(in_flight)
+                else:
+                    self._stop.wait(self.poll_interval)
+
+            if in_flight:
+                logger.info(f"⏳ JOBS: Worker {self.worker_id} waiting for {len(in_flight)} running jobs")
+                wait(in_flight)
+        logger.info(f"🛑 JOBS: Worker {self.worker_id} stopped after {self.jobs_run} jobs")
+
+    def _run_job(self, job):
+        from .models import BackgroundJobStatus
+
+        close_old_connections()
+        logger.info(f"▶️ JOBS: Running {job.job_type} job {job.job_id} (attempt {job.attempts}/{job.max_attempts})")
+        send_job_update(job)
+        try:
+            outcome, value = run_with_http_pool(self._execute(job))
+            if outcome == 'succeeded':
+                finish_job(job, BackgroundJobStatus.SUCCEEDED, result=value or {})
+                logger.info(f"✅ JOBS: Job {job.job_id} succeeded")
+            elif outcome == 'cancelled':
+                finish_job(job, BackgroundJobStatus.CANCELLED, error_message='Cancelled on request')
+                logger.info(f"🛑 JOBS: Job {job.job_id} cancelled")
+            elif outcome == 'lost':
+                logger.warning(f"⚠️ JOBS: Job {job.job_id} was requeued by another worker, dropped here")
+            else:
+                retry_or_fail_job(job, str(value), retryable=not isinstance(value, PermanentJobError))
+        except Exception as e:
+            logger.error(f"❌ JOBS: Bookkeeping for job {job.job_id} failed: {e}")
+        finally:
+            self.jobs_run += 1
+            close_old_connections()
+
+    async def _execute(self, job):
+        """Run the handler, heartbeating and watching for cancellation; returns (outcome, value)"""
+        from .models import BackgroundJob
+
+        handler = get_job_handler(job.job_type)
+        if handler is None:
+            return 'failed', PermanentJobError(f"No handler registered for job type '{job.job_type}'")
+
+        task = asyncio.ensure_future(handler(job, JobContext(job)))
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=self.heartbeat_interval)
+            if done:
+                break
+            if await sync_to_async(heartbeat)(job.job_id, self.worker_id):
+                continue
+
+            task.cancel()
+            try:
+                await task
+            except BaseException:
+                pass
+            cancel_requested = await sync_to_async(
+                BackgroundJob.objects.filter(job_id=job.job_id, cancel_requested=True).exists
+            )()
+            return ('cancelled' if cancel_requested else 'lost'), None
+
+        try:
+            return 'succeeded', task.result()
+        except asyncio.CancelledError:
+            return 'cancelled', None
+        except Exception as e:
+            logger.error(f"❌ JOBS: Job {job.job_id} raised {type(e).__name__}: {e}")
+            return 'failed', e
+
+
+_embedded_worker: Optional[JobWorker] = None
+_embedded_worker_lock = threading.Lock()
+
+
+def set_process_worker(worker: JobWorker):
+    """Mark ``worker`` as this process's worker so no embedded one is started"""
+    global _embedded_worker
+    with _embedded_worker_lock:
+        _embedded_worker = worker
+
+
+def ensure_job_worker() -> Optional[JobWorker]:
+    """Start the embedded worker thread once per process when EMBEDDED_WORKER is enabled"""
+    global _embedded_worker
+
+    if _embedded_worker is not None or not get_job_settings()['EMBEDDED_WORKER']:
+        return _embedded_worker
+    with _embedded_worker_lock:
+        if _embedded_worker is None:
+            worker = JobWorker()
+            thread = threading.Thread(target=worker.run, name='background-job-worker', daemon=True)
+            thread.start()
+            _embedded_worker = worker
+    return _embedded_worker
+
@@ -10,19 +10,56 @@ import os
 import logging
 from typing import Dict, List, Any, Optional, Tuple
 from asgiref.sync import sync_to_async
+from django.conf import settings
 
 # Import existing LLM infrastructure
 from llm_eval.providers.openai_provider import OpenAIProvider
 from llm_eval.providers.claude_provider import ClaudeProvider  
 from llm_eval.providers.gemini_provider import GeminiProvider
 from llm_eval.providers.base import LLMResponse
+from core.ttl_cache import TTLCache
 
 # Import project API key integration
+from project_api_keys.cache import get_key_generation
+from project_api_keys.encryption import encryption_service
 from project_api_keys.services import get_project_api_key_service
+from project_api_keys.signals import project_api_key_changed
 from users.models import IntelliDocProject
 
 logger = logging.getLogger('conversation_orchestrator')
 
+_key_settings = getattr(settings, 'PROJECT_API_KEY_SETTINGS', {})
+
+# Ready provider instances keyed by (project_id, provider_type, model, key generation).
+# Providers hold no per-call state, so one instance can serve concurrent nodes.
+# A key change in any process bumps the project's shared key generation, so
+# entries made with the old key are no longer looked up.
+_provider_cache = TTLCache(
+    'llm_provider_instances',
+    maxsize=_key_settings.get('PROVIDER_CACHE_SIZE', 128),
+    ttl=_key_settings.get('PROVIDER_CACHE_TTL', 300)
+)
+
+
+def _invalidate_cached_providers(sender, project_id=None, provider_type=None, **kwargs):
+    """Drop cached providers when a project's API key changes"""
+    if project_id:
+        _provider_cache.invalidate_where(lambda key: key[0] == project_id)
+    else:
+        _provider_cache.clear()
+    logger.info(f"🧹 LLM PROVIDER CACHE: Invalidated cached providers for project {project_id or 'ALL'} ({provider_type} key changed)")
+
+
+project_api_key_changed.connect(_invalidate_cached_providers, dispatch_uid='llm_provider_manager_cache')
+
+
+def get_provider_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters for provider instances and derived encryption keys"""
+    return {
+        'providers': _provider_cache.get_stats(),
+        'derived_keys': encryption_service.get_cache_stats(),
+    }
+
 
 class LLMProviderManager:
     """
@@ -58,6 +95,14 @@ class LLMProviderManager:
             logger.error(f"❌ LLM PROVIDER: {error_msg}")
             return None
         
+        generation = await sync_to_async(get_key_generation, thread_sensitive=False)(str(project.project_id))
+        cache_key = (str(project.project_id), provider_type, model, generation)
+        cached_provider = _provider_cache.get(cache_key) if generation is not None else None
+        if cached_provider is not None:
+            logger.info(f"⚡ LLM PROVIDER: Reusing cached {provider_type} provider for model {model}")
+            await sync_to_async(self.project_api_service.record_api_key_usage)(project, provider_type)
+            return cached_provider
+        
         # Get API key from project-specific configuration only
         api_key = await self._get_api_key_for_provider(provider_type, project)
         
@@ -80,6 +125,13 @@ class LLMProviderManager:
             logger.error(f"❌ LLM PROVIDER: {error_msg}")
             return None
         
+        provider = self._create_provider(provider_type, api_key, model)
+        if provider is not None and generation is not None:
+            _provider_cache.set(cache_key, provider)
+        return provider
+    
+    def _create_provider(self, provider_type: str, api_key: str, model: str) -> Optional[object]:
+        """Instantiate the provider class for a provider type"""
         try:
             if provider_type == 'openai':
                 logger.info(f"✅ LLM PROVIDER: Creating OpenAI provider with project key, model {model}")
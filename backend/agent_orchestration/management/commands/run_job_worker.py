@@ -0,0 +1,47 @@
+# agent_orchestration/management/commands/run_job_worker.py
+import signal
+
+from django.core.management.base import BaseCommand
+
+from agent_orchestration.jobs import JobWorker, get_job_settings, requeue_stale_jobs, set_process_worker
+
+
+class Command(BaseCommand):
+    help = 'Run the background job worker (workflow executions, evaluations, human input resumes)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=None,
+            help='Jobs run at once by this worker (default: BACKGROUND_JOBS WORKER_CONCURRENCY)'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=None,
+            help='Seconds between queue polls when idle (default: BACKGROUND_JOBS POLL_INTERVAL)'
+        )
+
+    def handle(self, *args, **options):
+        job_settings = get_job_settings()
+        worker = JobWorker(concurrency=options['concurrency'], poll_interval=options['poll_interval'])
+        set_process_worker(worker)
+
+        def _shutdown(signum, frame):
+            self.stdout.write(self.style.WARNING('Stopping: finishing jobs in flight...'))
+            worker.stop()
+
+        signal.signal(signal.SIGTERM, _shutdown)
+        signal.signal(signal.SIGINT, _shutdown)
+
+        requeued = requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(f'Recovered {requeued} jobs left by stopped workers')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Job worker {worker.worker_id} running with concurrency {worker.concurrency} '
+            f'(max {job_settings["MAX_CONCURRENT_PER_PROJECT"]} per project)'
+        ))
+        worker.run()
+        self.stdout.write(self.style.SUCCESS(f'Job worker stopped after {worker.jobs_run} jobs'))
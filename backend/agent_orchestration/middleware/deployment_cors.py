@@ -9,7 +9,8 @@ from django.http import JsonResponse
 from django.utils.deprecation import MiddlewareMixin
 from django.shortcuts import get_object_or_404
 
-from agent_orchestration.models import WorkflowDeployment, WorkflowAllowedOrigin
+from agent_orchestration.models import WorkflowDeployment
+from agent_orchestration.deployment_rate_limiter import get_allowed_origins, normalize_origin
 
 logger = logging.getLogger('workflow_deployment')
 
@@ -130,17 +131,8 @@ class WorkflowDeploymentCORSMiddleware(MiddlewareMixin):
                 logger.warning(f"🚫 CORS: No origin header provided")
                 return False, deployment
             
-            # Normalize origin (remove trailing slash, lowercase)
-            normalized_origin = origin.rstrip('/').lower()
-            
-            # Check against allowed origins
-            allowed_origin = WorkflowAllowedOrigin.objects.filter(
-                deployment=deployment,
-                origin__iexact=normalized_origin,
-                is_active=True
-            ).first()
-            
-            if allowed_origin:
+            # Check against allowed origins (cached per deployment, normalized: no trailing slash, lowercase)
+            if normalize_origin(origin) in get_allowed_origins(deployment.id):
                 logger.debug(f"✅ CORS: Origin {origin} is allowed for deployment {deployment.id}")
                 return True, deployment
             else:
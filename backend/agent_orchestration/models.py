@@ -3,6 +3,7 @@ Workflow Deployment Models
 Models for deploying agent workflows as public-facing chatbots
 """
 import uuid
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.utils import timezone
 from users.models import IntelliDocProject, AgentWorkflow, User
@@ -321,3 +322,95 @@ class DeploymentExecution(models.Model):
     def __str__(self):
         return f"Execution {self.execution_id[:8]} for session {self.deployment_session.session_id[:8]}"
 
+
+
+class BackgroundJobType(models.TextChoices):
+    """Kinds of work run by the background job worker"""
+    WORKFLOW_EXECUTION = 'workflow_execution', 'Workflow Execution'
+    WORKFLOW_EVALUATION = 'workflow_evaluation', 'Workflow Evaluation'
+    HUMAN_INPUT_RESUME = 'human_input_resume', 'Human Input Resume'
+
+
+class BackgroundJobStatus(models.TextChoices):
+    """Status choices for background jobs"""
+    QUEUED = 'queued', 'Queued'
+    RUNNING = 'running', 'Running'
+    SUCCEEDED = 'succeeded', 'Succeeded'
+    FAILED = 'failed', 'Failed'
+    CANCELLED = 'cancelled', 'Cancelled'
+
+
+class BackgroundJob(models.Model):
+    """Durable queue entry for a long-running workflow, evaluation or resume run"""
+    job_id = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    job_type = models.CharField(max_length=40, choices=BackgroundJobType.choices)
+    project = models.ForeignKey(
+        IntelliDocProject,
+        on_delete=models.CASCADE,
+        related_name='background_jobs'
+    )
+    submitted_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='background_jobs'
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=BackgroundJobStatus.choices,
+        default=BackgroundJobStatus.QUEUED
+    )
+    payload = models.JSONField(
+        default=dict,
+        encoder=DjangoJSONEncoder,
+        help_text='Handler arguments (workflow id, CSV text, human input, ...)'
+    )
+    result = models.JSONField(
+        default=dict,
+        blank=True,
+        encoder=DjangoJSONEncoder,
+        help_text='Handler return value once the job succeeded'
+    )
+    error_message = models.TextField(blank=True)
+    
+    # Progress reported by the handler
+    progress = models.PositiveSmallIntegerField(default=0, help_text='Percent complete (0-100)')
+    progress_message = models.CharField(max_length=255, blank=True)
+    
+    # Retries and control
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=3)
+    run_after = models.DateTimeField(
+        default=timezone.now,
+        help_text='Job is not claimed before this time (retry backoff)'
+    )
+    cancel_requested = models.BooleanField(
+        default=False,
+        help_text='Checked by the worker on every heartbeat'
+    )
+    
+    # Liveness
+    worker = models.CharField(max_length=255, blank=True, help_text='host:pid of the worker running the job')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='bg_job_status_run_after_idx'),
+            models.Index(fields=['project', 'status'], name='bg_job_project_status_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.project.name} - {self.job_type} {self.job_id.hex[:8]} ({self.status})"
+    
+    @property
+    def is_finished(self):
+        return self.status in (
+            BackgroundJobStatus.SUCCEEDED,
+            BackgroundJobStatus.FAILED,
+            BackgroundJobStatus.CANCELLED,
+        )
@@ -0,0 +1,157 @@
+"""
+Reflection Convergence
+======================
+
+Decides when a reflection loop has stopped changing its answer. Every round
+is compared with the answer it revised; once the change falls under the
+connection's threshold the remaining rounds would mostly repeat the answer,
+so the loop stops early.
+
+Change measures (``convergence_method`` on the reflection connection):
+
+- ``edit_distance``: normalised edit distance over word tokens
+  (1 - difflib similarity ratio). Cheap and needs no model.
+- ``embedding``: cosine distance of sentence embeddings from the shared model
+  registry. Falls back to ``edit_distance`` when no model can be loaded.
+
+``convergence_threshold`` on the connection overrides
+``REFLECTION_CONVERGENCE['THRESHOLD']``; 0 disables early termination.
+Per-loop summaries (iterations run and saved, estimated tokens avoided) are
+added to ``WorkflowExecution.reflection_stats``.
+"""
+
+import difflib
+import logging
+from typing import Any, Dict, List, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger('conversation_orchestrator')
+
+DEFAULT_REFLECTION_CONVERGENCE_SETTINGS = {
+    'METHOD': 'edit_distance',  # edit_distance or embedding
+    'THRESHOLD': 0.05,  # Stop once a round changes less than this (0-1)
+    'EMBEDDING_MODEL': '',  # '' uses VECTOR_EMBEDDING_MODEL
+    'MAX_RECORDED_LOOPS': 100,  # Loop summaries kept per execution
+}
+
+CONVERGENCE_METHODS = ('edit_distance', 'embedding')
+
+# Rough token estimate when a provider does not report usage
+CHARS_PER_TOKEN = 4
+
+
+def get_reflection_convergence_settings() -> Dict[str, Any]:
+    """Merge ``settings.REFLECTION_CONVERGENCE`` over the defaults"""
+    convergence_settings = dict(DEFAULT_REFLECTION_CONVERGENCE_SETTINGS)
+    convergence_settings.update(getattr(settings, 'REFLECTION_CONVERGENCE', {}) or {})
+    return convergence_settings
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    return len(text) // CHARS_PER_TOKEN if text else 0
+
+
+def call_tokens(prompt: str, llm_response) -> int:
+    """Tokens of one LLM call: reported usage, or an estimate from prompt and reply length"""
+    token_count = getattr(llm_response, 'token_count', None)
+    if token_count:
+        return int(token_count)
+    return estimate_tokens(prompt) + estimate_tokens(getattr(llm_response, 'text', None))
+
+
+def normalized_edit_distance(previous: str, current: str) -> float:
+    """Word-level edit distance scaled to 0 (identical) .. 1 (nothing in common)"""
+    previous_words, current_words = previous.split(), current.split()
+    if not previous_words and not current_words:
+        return 0.0
+    return 1.0 - difflib.SequenceMatcher(None, previous_words, current_words, autojunk=False).ratio()
+
+
+def _embedding_distance(previous: str, current: str, model_name: str) -> float:
+    from vector_search.model_registry import get_sentence_transformer
+
+    model = get_sentence_transformer(model_name)
+    vectors = model.encode([previous, current], normalize_embeddings=True)
+    return max(0.0, 1.0 - float(vectors[0] @ vectors[1]))
+
+
+class ConvergenceTracker:
+    """Change between successive answers of one reflection loop"""
+
+    def __init__(self, connection_data: Dict[str, Any]):
+        convergence_settings = get_reflection_convergence_settings()
+        method = connection_data.get('convergence_method') or convergence_settings['METHOD']
+        self.method = method if method in CONVERGENCE_METHODS else 'edit_distance'
+        try:
+            self.threshold = float(connection_data.get('convergence_threshold', convergence_settings['THRESHOLD']))
+        except (TypeError, ValueError):
+            self.threshold = float(convergence_settings['THRESHOLD'])
+        self.model_name = convergence_settings['EMBEDDING_MODEL'] or getattr(settings, 'VECTOR_EMBEDDING_MODEL', 'all-MiniLM-L6-v2')
+        self.changes: List[float] = []
+        self.round_tokens: List[int] = []
+        self.converged = False
+
+    async def measure_change(self, previous: str, current: str) -> float:
+        if self.method == 'embedding':
+            try:
+                return await sync_to_async(_embedding_distance, thread_sensitive=False)(previous, current, self.model_name)
+            except Exception as e:
+                logger.warning(f"⚠️ REFLECTION CONVERGENCE: Embedding model unavailable, using edit distance: {e}")
+                self.method = 'edit_distance'
+        return normalized_edit_distance(previous, current)
+
+    async def record_round(self, previous: str, current: str, tokens: int) -> bool:
+        """Record a round that revised ``previous`` into ``current``; True once the loop has converged"""
+        change = await self.measure_change(previous, current)
+        self.changes.append(round(change, 4))
+        self.round_tokens.append(tokens)
+        self.converged = self.threshold > 0 and change < self.threshold
+        return self.converged
+
+    def summary(self, iterations_planned: int, **details) -> Dict[str, Any]:
+        """Loop summary; rounds are only counted as saved when the loop stopped on convergence"""
+        iterations_run = len(self.changes)
+        iterations_saved = max(0, iterations_planned - iterations_run) if self.converged else 0
+        tokens_per_round = sum(self.round_tokens) // len(self.round_tokens) if self.round_tokens else 0
+        return dict(
+            details,
+            method=self.method,
+            threshold=self.threshold,
+            changes=self.changes,
+            converged=self.converged,
+            iterations_planned=iterations_planned,
+            iterations_run=iterations_run,
+            iterations_saved=iterations_saved,
+            tokens_avoided=iterations_saved * tokens_per_round,
+        )
+
+
+async def record_reflection_summary(execution_record, loop_summary: Dict[str, Any]):
+    """
+    Add a loop summary to ``execution_record.reflection_stats`` (running
+    totals plus the recent loops). Nodes reflecting in parallel share the row,
+    so the update runs under a row lock.
+    """
+    if execution_record is None or not getattr(execution_record, 'pk', None):
+        return
+    max_loops = get_reflection_convergence_settings()['MAX_RECORDED_LOOPS']
+    model = type(execution_record)
+
+    def update() -> Dict[str, Any]:
+        with transaction.atomic():
+            stats = model.objects.select_for_update().values_list('reflection_stats', flat=True).get(pk=execution_record.pk) or {}
+            for key in ('iterations_run', 'iterations_saved', 'tokens_avoided'):
+                stats[key] = stats.get(key, 0) + loop_summary[key]
+            loops = (stats.get('loops') or []) + [loop_summary]
+            stats['loops'] = loops[-max_loops:] if max_loops > 0 else []
+            model.objects.filter(pk=execution_record.pk).update(reflection_stats=stats)
+            return stats
+
+    try:
+        # Later full saves of the in-memory record must not write back stale totals
+        execution_record.reflection_stats = await sync_to_async(update)()
+    except Exception as e:
+        logger.error(f"❌ REFLECTION CONVERGENCE: Failed to record reflection stats on {getattr(execution_record, 'execution_id', execution_record.pk)}: {e}")
@@ -15,6 +15,9 @@ from django.utils import timezone
 
 from users.models import WorkflowExecutionMessage
 
+from .execution_control import SIGNAL_RESUME, publish_signal
+from .reflection_convergence import ConvergenceTracker, call_tokens, record_reflection_summary
+
 logger = logging.getLogger(__name__)
 
 class ReflectionHandler:
@@ -30,10 +33,11 @@ class ReflectionHandler:
         """Set the human input handler reference"""
         self.human_input_handler = human_input_handler
 
-    async def handle_reflection_connections(self, agent_node, agent_response, graph_json, llm_provider):
+    async def handle_reflection_connections(self, agent_node, agent_response, graph_json, llm_provider, execution_record=None):
         """
         Handle reflection connections for an agent
-        Implements self-review and iteration cycles
+        Implements self-review and iteration cycles, stopping early once a
+        round no longer changes the response (see reflection_convergence)
         """
         agent_id = agent_node.get('id')
         agent_name = agent_node.get('data', {}).get('name', 'Agent')
@@ -71,7 +75,9 @@ class ReflectionHandler:
             reflection_prompt = connection_data.get('reflection_prompt',
                 'Please review and improve your previous response. Consider if there are any ways to make it better, more accurate, or more helpful.')
 
-            logger.info(f"🔄 REFLECTION: Starting reflection iteration for {agent_name} (max: {max_iterations})")
+            convergence = ConvergenceTracker(connection_data)
+
+            logger.info(f"🔄 REFLECTION: Starting reflection iteration for {agent_name} (max: {max_iterations}, convergence threshold: {convergence.threshold})")
 
             # Perform reflection iterations
             for iteration in range(max_iterations - 1):  # -1 because we already have the initial response
@@ -96,9 +102,20 @@ Please provide your improved response:
                     logger.error(f"❌ REFLECTION: Error in iteration {iteration + 2}: {reflected_response.error}")
                     break
 
+                previous_response = current_response
                 current_response = reflected_response.text.strip()
                 logger.info(f"✅ REFLECTION: Completed iteration {iteration + 2}/{max_iterations} - response length: {len(current_response)} chars")
 
+                if await convergence.record_round(previous_response, current_response,
+                                                  call_tokens(reflection_full_prompt, reflected_response)):
+                    logger.info(f"🎯 REFLECTION: {agent_name} converged at iteration {iteration + 2}/{max_iterations} (change {convergence.changes[-1]} < {convergence.threshold})")
+                    break
+
+            if convergence.changes:
+                await record_reflection_summary(execution_record, convergence.summary(
+                    max_iterations - 1, kind='self', agent=agent_name, connection_id=connection.get('id')
+                ))
+
         logger.info(f"🎯 SELF-REFLECTION: Completed {len(self_reflection_connections)} self-reflection iterations for {agent_name}")
         return current_response
 
@@ -140,9 +157,12 @@ Please provide your improved response:
         current_conversation = conversation_history
         final_response = source_response
         original_source_response = source_response  # Preserve original for context
+        convergence = ConvergenceTracker(connection_data)
 
         for iteration in range(max_iterations):
             logger.info(f"🔄 CROSS-AGENT-REFLECTION: Iteration {iteration + 1}/{max_iterations}")
+            iteration_tokens = 0
+            revised_this_iteration = False
 
             # Step 1: Send message to target agent
             # CRITICAL FIX: Use chat manager to craft proper prompt with agent's system message
@@ -291,6 +311,7 @@ Please provide your feedback, suggestions, or response:
                         target_response = f"Error processing reflection from {target_name}"
                     else:
                         target_response = target_llm_response.text.strip()
+                        iteration_tokens += call_tokens(full_target_prompt, target_llm_response)
                         logger.info(f"✅ CROSS-AGENT-REFLECTION: {target_name} generated reflection ({len(target_response)} chars)")
 
             # Update conversation history
@@ -416,7 +437,10 @@ Please revise your response based on this feedback:
                         )
 
                         if not revised_response.error:
+                            previous_response = final_response
                             final_response = revised_response.text.strip()
+                            iteration_tokens += call_tokens(source_reflection_prompt, revised_response)
+                            revised_this_iteration = True
                             current_conversation += f"\n{source_name} (Revised): {final_response}"
                             logger.info(f"✅ CROSS-AGENT-REFLECTION: {source_name} revised response based on {target_name} feedback")
                             
@@ -470,7 +494,18 @@ Please revise your response based on this feedback:
                     # Continue with original response since we can't process the reflection
                     logger.warning(f"⚠️ CROSS-AGENT-REFLECTION: Continuing with original response from {source_name} due to provider failure")
 
-        logger.info(f"🎯 CROSS-AGENT-REFLECTION: Completed {max_iterations} iterations between {source_name} and {target_name}")
+            # Stop once a revision barely changes the response; further rounds would repeat it
+            if revised_this_iteration and await convergence.record_round(previous_response, final_response, iteration_tokens):
+                logger.info(f"🎯 CROSS-AGENT-REFLECTION: Converged at iteration {iteration + 1}/{max_iterations} (change {convergence.changes[-1]} < {convergence.threshold})")
+                break
+
+        if convergence.changes:
+            await record_reflection_summary(execution_record, convergence.summary(
+                max_iterations, kind='cross_agent', agent=source_name, reviewer=target_name,
+                connection_id=reflection_edge.get('id')
+            ))
+
+        logger.info(f"🎯 CROSS-AGENT-REFLECTION: Completed {len(convergence.changes) or max_iterations} iterations between {source_name} and {target_name}")
         logger.info(f"🎯 CROSS-AGENT-REFLECTION: Final response length: {len(final_response)} chars")
         logger.info(f"🎯 CROSS-AGENT-REFLECTION: Target type was: {target_type}")
         
@@ -620,6 +655,7 @@ Please provide your final response, taking this feedback into account:
         # CRITICAL FIX: Save executed_nodes and conversation_history BEFORE adding message
         await sync_to_async(execution_record.save)(update_fields=['executed_nodes', 'conversation_history'])
         logger.info(f"💾 REFLECTION RESUME: Saved executed_nodes and conversation_history for {source_name}")
+        publish_signal(execution_record.execution_id, SIGNAL_RESUME)
 
         # CRITICAL FIX: Add the final reflection response to messages array
         # Refresh from database to get latest messages and avoid sequence conflicts
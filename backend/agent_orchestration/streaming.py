@@ -0,0 +1,101 @@
+"""
+Agent Token Streaming
+=====================
+
+Delivery of partial agent output produced by WorkflowExecutor stream callbacks:
+
+- WebSocketTokenStreamer forwards events to the AgentOrchestrationConsumer
+  group of a project, coalescing tokens so the channel layer is not hit once
+  per token.
+- format_sse_event renders events for text/event-stream responses (used by the
+  public deployment endpoint).
+"""
+
+import json
+import logging
+import time
+from typing import Dict, Any, Optional
+
+from django.utils import timezone
+
+logger = logging.getLogger('agent_orchestration.websocket')
+
+
+def format_sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Render one server-sent event frame"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class WebSocketTokenStreamer:
+    """
+    Async stream callback that pushes agent tokens to the project's websocket group.
+
+    Tokens for a node are buffered and flushed every ``flush_interval`` seconds or
+    once ``max_buffer_chars`` accumulate; start/end events flush immediately.
+    """
+
+    def __init__(self, project_id: str, flush_interval: float = 0.05, max_buffer_chars: int = 256):
+        self.group_name = f'agent_orchestration_{project_id}'
+        self.flush_interval = flush_interval
+        self.max_buffer_chars = max_buffer_chars
+        self._buffers: Dict[str, Dict[str, Any]] = {}
+        self._channel_layer = self._get_channel_layer()
+
+    @staticmethod
+    def _get_channel_layer():
+        try:
+            from channels.layers import get_channel_layer
+            channel_layer = get_channel_layer()
+            if channel_layer is None:
+                logger.warning("⚠️ STREAM: No channel layer configured, websocket token streaming disabled")
+            return channel_layer
+        except Exception as e:
+            logger.warning(f"⚠️ STREAM: Channel layer unavailable, websocket token streaming disabled: {e}")
+            return None
+
+    @property
+    def enabled(self) -> bool:
+        return self._channel_layer is not None
+
+    async def __call__(self, event: Dict[str, Any]):
+        if not self.enabled:
+            return
+
+        node_id = event.get('node_id')
+        event_type = event.get('event')
+
+        if event_type == 'agent_token':
+            buffer = self._buffers.setdefault(node_id, {'context': event, 'text': '', 'flushed_at': time.monotonic()})
+            buffer['text'] += event.get('delta', '')
+            if (len(buffer['text']) >= self.max_buffer_chars or
+                    time.monotonic() - buffer['flushed_at'] >= self.flush_interval):
+                await self._flush(node_id)
+            return
+
+        if event_type == 'agent_stream_end':
+            await self._flush(node_id)
+        await self._send(event)
+
+    async def _flush(self, node_id: Optional[str]):
+        buffer = self._buffers.get(node_id)
+        if not buffer or not buffer['text']:
+            return
+        text = buffer['text']
+        buffer['text'] = ''
+        buffer['flushed_at'] = time.monotonic()
+        await self._send({**buffer['context'], 'delta': text})
+
+    async def _send(self, event: Dict[str, Any]):
+        await self._channel_layer.group_send(self.group_name, {
+            'type': 'agent_stream',
+            'event': event.get('event'),
+            'execution_id': event.get('execution_id'),
+            'node_id': event.get('node_id'),
+            'agent_name': event.get('agent_name'),
+            'agent_type': event.get('agent_type'),
+            'delta': event.get('delta', ''),
+            'error': event.get('error'),
+            'first_token_ms': event.get('first_token_ms'),
+            'response_time_ms': event.get('response_time_ms'),
+            'timestamp': timezone.now().isoformat()
+        })
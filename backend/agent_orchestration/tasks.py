@@ -7,7 +7,7 @@ Implements Celery tasks for executing workflows with real-time streaming.
 from celery import shared_task
 from django.utils import timezone
 from users.models import SimulationRun, AgentMessage, IntelliDocProject
-import asyncio
+from llm_eval.providers.http_pool import run_with_http_pool
 import logging
 import json
 import uuid
@@ -42,7 +42,7 @@ def execute_agent_workflow(self, run_id: str):
         )
         
         # Use workflow executor for execution
-        result = asyncio.run(execute_workflow(run))
+        result = run_with_http_pool(execute_workflow(run))
         
         # Mark as completed
         run.status = 'completed' if result['success'] else 'failed'
@@ -0,0 +1,64 @@
+"""
+Tests for the batched execution event log
+"""
+import asyncio
+
+from asgiref.sync import async_to_sync
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+from users.models import (
+    AgentWorkflow, IntelliDocProject, User, WorkflowExecution, WorkflowExecutionMessage
+)
+from agent_orchestration.execution_log import ExecutionEventLog
+
+
+def _message(index):
+    return {
+        'agent_name': f'Agent {index}',
+        'agent_type': 'AssistantAgent',
+        'content': f'message {index}',
+        'message_type': 'chat',
+        'timestamp': timezone.now().isoformat(),
+    }
+
+
+class ExecutionEventLogTests(TransactionTestCase):
+    """Flushes run through sync_to_async, so the rows must be visible to other connections"""
+
+    def setUp(self):
+        user = User.objects.create_user(email='log@example.com', password='x')
+        project = IntelliDocProject.objects.create(name='Log', created_by=user)
+        workflow = AgentWorkflow.objects.create(project=project, name='Log', graph_json={}, created_by=user)
+        self.execution = WorkflowExecution.objects.create(
+            workflow=workflow, execution_id='exec-log', start_time=timezone.now(), executed_by=user
+        )
+
+    def _stored(self):
+        return WorkflowExecutionMessage.objects.filter(execution=self.execution).count()
+
+    def test_buffered_messages_are_flushed_without_another_append(self):
+        event_log = ExecutionEventLog(self.execution, flush_size=100, flush_interval=0.1)
+
+        async def append_then_block():
+            await event_log.append([_message(1)])
+            stored_before = await asyncio.to_thread(self._stored)
+            # Stands in for a long LLM call: nothing else is appended
+            await asyncio.sleep(0.5)
+            return stored_before
+
+        stored_before = async_to_sync(append_then_block)()
+
+        self.assertEqual(stored_before, 0)
+        self.assertEqual(self._stored(), 1)
+        self.assertEqual(event_log.get_stats()['buffered'], 0)
+
+    def test_size_threshold_flushes_at_once(self):
+        event_log = ExecutionEventLog(self.execution, flush_size=2, flush_interval=60)
+        messages = [_message(1), _message(2)]
+
+        async_to_sync(event_log.append)(messages)
+
+        self.assertEqual(self._stored(), 2)
+        self.assertEqual(list(WorkflowExecutionMessage.objects.filter(
+            execution=self.execution).order_by('sequence').values_list('sequence', flat=True)), [0, 1])
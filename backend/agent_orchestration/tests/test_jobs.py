@@ -0,0 +1,310 @@
+"""
+Tests for the background job queue: claiming, retries, stale requeue and cancellation
+"""
+import asyncio
+import threading
+from datetime import timedelta
+from unittest import mock, skipUnless
+
+from django.db import close_old_connections, connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from users.models import AgentWorkflow, IntelliDocProject, User, WorkflowExecution, WorkflowExecutionStatus
+from agent_orchestration import job_handlers, jobs
+from agent_orchestration.models import BackgroundJob, BackgroundJobStatus
+
+JOB_SETTINGS = {
+    'MAX_CONCURRENT_PER_PROJECT': 0,
+    'HEARTBEAT_INTERVAL': 0.05,
+    'STALE_JOB_TIMEOUT': 120,
+    'MAX_ATTEMPTS': 3,
+    'RETRY_BACKOFF': 10,
+    'EMBEDDED_WORKER': False,
+}
+
+
+async def _succeed(job, context):
+    return {'ok': True}
+
+
+async def _fail(job, context):
+    raise RuntimeError('flaky')
+
+
+async def _fail_permanently(job, context):
+    raise jobs.PermanentJobError('bad payload')
+
+
+async def _wait_forever(job, context):
+    await asyncio.sleep(60)
+
+
+TEST_HANDLERS = {
+    'test_succeed': _succeed,
+    'test_fail': _fail,
+    'test_fail_permanently': _fail_permanently,
+    'test_wait_forever': _wait_forever,
+}
+
+
+class JobTestMixin:
+    """Shared fixtures: test handlers, no websocket pushes and no embedded worker"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(email='jobs@example.com', password='x')
+        self.project = IntelliDocProject.objects.create(name='Jobs', created_by=self.user)
+        self.other_project = IntelliDocProject.objects.create(name='Other jobs', created_by=self.user)
+
+        for patch in (mock.patch.dict(jobs._handlers, TEST_HANDLERS),
+                      mock.patch.object(jobs, '_get_channel_layer', return_value=None)):
+            patch.start()
+            self.addCleanup(patch.stop)
+        job_settings = override_settings(BACKGROUND_JOBS=JOB_SETTINGS)
+        job_settings.enable()
+        self.addCleanup(job_settings.disable)
+
+    def _submit(self, job_type='test_succeed', project=None, **kwargs):
+        return jobs.submit_job(job_type, project or self.project, self.user, {}, **kwargs)
+
+
+class ClaimTests(JobTestMixin, TestCase):
+
+    def test_claimed_job_is_not_claimed_again(self):
+        first = self._submit()
+        second = self._submit(project=self.other_project)
+
+        claimed_a = jobs.claim_next_job('worker-a')
+        claimed_b = jobs.claim_next_job('worker-b')
+
+        self.assertEqual({claimed_a.job_id, claimed_b.job_id}, {first.job_id, second.job_id})
+        self.assertIsNone(jobs.claim_next_job('worker-c'))
+        claimed_a.refresh_from_db()
+        self.assertEqual(claimed_a.status, BackgroundJobStatus.RUNNING)
+        self.assertEqual(claimed_a.worker, 'worker-a')
+        self.assertEqual(claimed_a.attempts, 1)
+
+    def test_claims_oldest_job_first(self):
+        older = self._submit()
+        self._submit()
+
+        self.assertEqual(jobs.claim_next_job('worker-a').job_id, older.job_id)
+
+    @override_settings(BACKGROUND_JOBS={**JOB_SETTINGS, 'MAX_CONCURRENT_PER_PROJECT': 1})
+    def test_project_at_its_limit_is_skipped(self):
+        self._submit()
+        self._submit()
+        other = self._submit(project=self.other_project)
+
+        jobs.claim_next_job('worker-a')
+
+        self.assertEqual(jobs.claim_next_job('worker-b').job_id, other.job_id)
+        self.assertIsNone(jobs.claim_next_job('worker-c'))
+
+
+@skipUnless(connection.features.has_select_for_update_skip_locked, 'needs SELECT ... FOR UPDATE SKIP LOCKED')
+class ConcurrentClaimTests(JobTestMixin, TransactionTestCase):
+
+    def test_concurrent_workers_claim_each_job_once(self):
+        submitted = {self._submit(project=self.project if i % 2 else self.other_project).job_id
+                     for i in range(12)}
+        claimed = []
+        claimed_lock = threading.Lock()
+
+        def claim_all(worker_id):
+            try:
+                while True:
+                    job = jobs.claim_next_job(worker_id)
+                    if job is None:
+                        return
+                    with claimed_lock:
+                        claimed.append(job.job_id)
+            finally:
+                close_old_connections()
+
+        threads = [threading.Thread(target=claim_all, args=(f'worker-{i}',)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(claimed), len(submitted))
+        self.assertEqual(set(claimed), submitted)
+
+
+class RetryTests(JobTestMixin, TestCase):
+
+    def test_failed_attempt_is_requeued_with_exponential_backoff(self):
+        job = self._submit()
+
+        for attempt, delay in ((1, 10), (2, 20)):
+            claimed = jobs.claim_next_job('worker-a')
+            self.assertEqual(claimed.attempts, attempt)
+            before = timezone.now()
+            jobs.retry_or_fail_job(claimed, 'flaky')
+
+            job.refresh_from_db()
+            self.assertEqual(job.status, BackgroundJobStatus.QUEUED)
+            self.assertEqual(job.worker, '')
+            self.assertGreaterEqual(job.run_after, before + timedelta(seconds=delay))
+            self.assertLess(job.run_after, before + timedelta(seconds=delay + 5))
+            # Not claimable until the backoff has passed
+            self.assertIsNone(jobs.claim_next_job('worker-a'))
+            BackgroundJob.objects.filter(pk=job.pk).update(run_after=timezone.now())
+
+        claimed = jobs.claim_next_job('worker-a')
+        jobs.retry_or_fail_job(claimed, 'flaky')
+        job.refresh_from_db()
+        self.assertEqual(job.status, BackgroundJobStatus.FAILED)
+        self.assertEqual(job.attempts, 3)
+
+    def test_permanent_failure_is_not_retried(self):
+        job = self._submit()
+
+        jobs.retry_or_fail_job(jobs.claim_next_job('worker-a'), 'bad payload', retryable=False)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, BackgroundJobStatus.FAILED)
+        self.assertIsNone(jobs.claim_next_job('worker-a'))
+
+
+class StaleRequeueTests(JobTestMixin, TestCase):
+
+    def _claim_and_go_silent(self, **fields):
+        job = jobs.claim_next_job('worker-a')
+        BackgroundJob.objects.filter(pk=job.pk).update(
+            heartbeat_at=timezone.now() - timedelta(seconds=JOB_SETTINGS['STALE_JOB_TIMEOUT'] + 1), **fields
+        )
+        return job
+
+    def test_silent_job_is_requeued_and_its_worker_loses_it(self):
+        self._submit()
+        job = self._claim_and_go_silent()
+
+        self.assertEqual(jobs.requeue_stale_jobs(), 1)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, BackgroundJobStatus.QUEUED)
+        self.assertEqual(job.worker, '')
+        self.assertFalse(jobs.heartbeat(job.job_id, 'worker-a'))
+        self.assertEqual(jobs.claim_next_job('worker-b').job_id, job.job_id)
+
+    def test_heartbeating_job_is_left_running(self):
+        self._submit()
+        job = jobs.claim_next_job('worker-a')
+
+        self.assertEqual(jobs.requeue_stale_jobs(), 0)
+        self.assertTrue(jobs.heartbeat(job.job_id, 'worker-a'))
+
+    def test_silent_job_out_of_attempts_fails(self):
+        self._submit(max_attempts=1)
+        job = self._claim_and_go_silent()
+
+        jobs.requeue_stale_jobs()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, BackgroundJobStatus.FAILED)
+
+    def test_silent_job_with_cancel_requested_is_cancelled(self):
+        self._submit()
+        job = self._claim_and_go_silent(cancel_requested=True)
+
+        jobs.requeue_stale_jobs()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, BackgroundJobStatus.CANCELLED)
+
+
+class RetryCleanupTests(JobTestMixin, TestCase):
+
+    def test_retry_stops_executions_left_running_by_lost_attempt(self):
+        workflow = AgentWorkflow.objects.create(project=self.project, name='Retried', graph_json={}, created_by=self.user)
+        jobs.submit_job('test_succeed', self.project, self.user, {'workflow_id': str(workflow.workflow_id)})
+        lost_attempt = jobs.claim_next_job('worker-a')
+        lost = WorkflowExecution.objects.create(
+            workflow=workflow, execution_id='lost', start_time=lost_attempt.started_at,
+            executed_by=self.user, status=WorkflowExecutionStatus.RUNNING
+        )
+        BackgroundJob.objects.filter(pk=lost_attempt.pk).update(
+            heartbeat_at=timezone.now() - timedelta(seconds=JOB_SETTINGS['STALE_JOB_TIMEOUT'] + 1)
+        )
+        jobs.requeue_stale_jobs()
+
+        retry = jobs.claim_next_job('worker-b')
+        current = WorkflowExecution.objects.create(
+            workflow=workflow, execution_id='current', start_time=retry.started_at,
+            executed_by=self.user, status=WorkflowExecutionStatus.RUNNING
+        )
+
+        self.assertEqual(job_handlers._stop_executions_started_by(retry, earlier_attempts=True), 1)
+        lost.refresh_from_db()
+        current.refresh_from_db()
+        self.assertEqual(lost.status, WorkflowExecutionStatus.STOPPED)
+        self.assertEqual(current.status, WorkflowExecutionStatus.RUNNING)
+
+
+class CancelTests(JobTestMixin, TestCase):
+
+    def test_queued_job_is_cancelled_at_once(self):
+        job = self._submit()
+
+        jobs.request_cancel(job)
+
+        self.assertEqual(job.status, BackgroundJobStatus.CANCELLED)
+        self.assertIsNone(jobs.claim_next_job('worker-a'))
+
+    def test_running_job_is_flagged_and_stops_heartbeating(self):
+        self._submit()
+        job = jobs.claim_next_job('worker-a')
+
+        jobs.request_cancel(job)
+
+        self.assertEqual(job.status, BackgroundJobStatus.RUNNING)
+        self.assertTrue(job.cancel_requested)
+        self.assertFalse(jobs.heartbeat(job.job_id, 'worker-a'))
+
+
+class WorkerTests(JobTestMixin, TransactionTestCase):
+    """JobWorker._run_job end to end (handlers run in their own event loop and DB connection)"""
+
+    def _run(self, job_type, **kwargs):
+        job = self._submit(job_type, **kwargs)
+        worker = jobs.JobWorker(concurrency=1)
+        worker._run_job(jobs.claim_next_job(worker.worker_id))
+        job.refresh_from_db()
+        return job
+
+    def test_successful_job_stores_result(self):
+        job = self._run('test_succeed')
+
+        self.assertEqual(job.status, BackgroundJobStatus.SUCCEEDED)
+        self.assertEqual(job.result, {'ok': True})
+        self.assertEqual(job.progress, 100)
+
+    def test_failing_job_is_requeued_for_retry(self):
+        job = self._run('test_fail')
+
+        self.assertEqual(job.status, BackgroundJobStatus.QUEUED)
+        self.assertIn('flaky', job.error_message)
+        self.assertGreater(job.run_after, timezone.now())
+
+    def test_permanent_error_fails_job(self):
+        job = self._run('test_fail_permanently')
+
+        self.assertEqual(job.status, BackgroundJobStatus.FAILED)
+        self.assertIn('bad payload', job.error_message)
+
+    def test_cancel_stops_running_handler_on_next_heartbeat(self):
+        job = self._submit('test_wait_forever')
+        worker = jobs.JobWorker(concurrency=1)
+        claimed = jobs.claim_next_job(worker.worker_id)
+        runner = threading.Thread(target=worker._run_job, args=(claimed,))
+        runner.start()
+
+        jobs.request_cancel(job)
+        runner.join(timeout=10)
+
+        self.assertFalse(runner.is_alive())
+        job.refresh_from_db()
+        self.assertEqual(job.status, BackgroundJobStatus.CANCELLED)
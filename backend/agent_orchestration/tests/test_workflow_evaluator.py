@@ -0,0 +1,53 @@
+"""
+Tests for concurrent evaluation rows
+"""
+from unittest import mock
+
+from django.test import TransactionTestCase
+
+from users.models import (
+    AgentWorkflow, EvaluationResultStatus, IntelliDocProject, User, WorkflowEvaluation, WorkflowExecution
+)
+from agent_orchestration.conversation_orchestrator import ConversationOrchestrator
+from agent_orchestration.workflow_evaluator import WorkflowEvaluator, ZERO_METRICS
+
+GRAPH = {
+    'nodes': [
+        {'id': 'start', 'type': 'StartNode', 'data': {'name': 'Start', 'prompt': 'hello'}},
+        {'id': 'end', 'type': 'EndNode', 'data': {'name': 'End'}},
+    ],
+    'edges': [{'id': 'e1', 'source': 'start', 'target': 'end'}],
+}
+
+
+class ConcurrentEvaluationRowsTests(TransactionTestCase):
+    """Rows started in the same millisecond must each get their own execution"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='evaluator@example.com', password='x')
+        project = IntelliDocProject.objects.create(name='Evaluation', created_by=self.user)
+        self.workflow = AgentWorkflow.objects.create(
+            project=project, name='Echo', graph_json=GRAPH, created_by=self.user
+        )
+        orchestrator = ConversationOrchestrator()
+        self.evaluator = WorkflowEvaluator(
+            orchestrator.workflow_executor, orchestrator.llm_provider_manager, orchestrator.workflow_parser
+        )
+
+    async def test_rows_started_in_same_millisecond_get_distinct_executions(self):
+        rows = [(row_number, {'input': f'row {row_number}', 'expected_output': ''}) for row_number in range(1, 9)]
+        evaluation = await WorkflowEvaluation.objects.acreate(
+            workflow=self.workflow, csv_filename='rows.csv', total_rows=len(rows), executed_by=self.user
+        )
+
+        with mock.patch('agent_orchestration.workflow_executor.time.time', return_value=1_700_000_000.0), \
+                mock.patch.object(WorkflowEvaluator, 'calculate_metrics_batch',
+                                  side_effect=lambda outputs, expected: [dict(ZERO_METRICS) for _ in outputs]):
+            await self.evaluator._run_rows(evaluation, self.workflow, rows, self.user, 0, len(rows), None)
+
+        execution_ids = [execution_id async for execution_id in
+                         WorkflowExecution.objects.values_list('execution_id', flat=True)]
+        self.assertEqual(len(execution_ids), len(rows))
+        self.assertEqual(len(set(execution_ids)), len(rows))
+        failed = [result async for result in evaluation.results.filter(status=EvaluationResultStatus.FAILED)]
+        self.assertEqual(failed, [])
@@ -3,13 +3,22 @@ Workflow Evaluator Service
 ==========================
 
 Service for evaluating workflows using CSV input/output pairs and various metrics.
+
+Evaluation runs in two overlapping phases: row workflows execute concurrently
+(bounded by WORKFLOW_EVALUATION['ROW_CONCURRENCY']), and finished rows are
+scored in batches with resident BERTScore / sentence-transformer models and
+saved with one bulk insert per batch.
 """
 
+import asyncio
+import copy
 import logging
 import csv
 import io
+import threading
 import time
-from typing import Dict, List, Any, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from django.conf import settings
 from django.utils import timezone
 from asgiref.sync import sync_to_async
 
@@ -20,6 +29,48 @@ from users.models import (
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_EVALUATION_SETTINGS = {
+    'ROW_CONCURRENCY': 8,
+    'SCORING_BATCH_SIZE': 32,
+    'FLUSH_INTERVAL': 5.0,
+    'BERT_SCORE_LANG': 'en',
+}
+
+ZERO_METRICS = {
+    'rouge_1': 0.0,
+    'rouge_2': 0.0,
+    'rouge_l': 0.0,
+    'bleu': 0.0,
+    'bert_score': 0.0,
+    'semantic_similarity': 0.0,
+    'average_score': 0.0
+}
+
+_bert_scorers: Dict[str, Any] = {}
+_bert_scorer_lock = threading.Lock()
+
+
+def get_evaluation_settings() -> Dict[str, Any]:
+    """Merge ``settings.WORKFLOW_EVALUATION`` over the defaults"""
+    evaluation_settings = dict(DEFAULT_EVALUATION_SETTINGS)
+    evaluation_settings.update(getattr(settings, 'WORKFLOW_EVALUATION', {}) or {})
+    return evaluation_settings
+
+
+def get_bert_scorer(lang: str):
+    """Process-wide BERTScorer for ``lang``; the model loads once and stays resident"""
+    scorer = _bert_scorers.get(lang)
+    if scorer is not None:
+        return scorer
+    with _bert_scorer_lock:
+        scorer = _bert_scorers.get(lang)
+        if scorer is None:
+            from bert_score import BERTScorer
+            logger.info(f"📦 EVALUATOR: Loading BERTScore model for '{lang}'")
+            scorer = BERTScorer(lang=lang)
+            _bert_scorers[lang] = scorer
+        return scorer
+
 
 class WorkflowEvaluator:
     """Service for evaluating workflows with CSV data"""
@@ -42,7 +93,8 @@ class WorkflowEvaluator:
         workflow: AgentWorkflow,
         csv_file: Any,
         executed_by,
-        evaluation_id: str = None
+        evaluation_id: str = None,
+        progress_callback: Optional[Callable[[int, int], Awaitable[None]]] = None
     ) -> WorkflowEvaluation:
         """
         Main evaluation orchestration method
@@ -51,7 +103,9 @@ class WorkflowEvaluator:
             workflow: AgentWorkflow instance to evaluate
             csv_file: Uploaded CSV file
             executed_by: User who initiated the evaluation
-            evaluation_id: Optional evaluation ID (for resuming)
+            evaluation_id: Optional evaluation ID (for resuming); rows that already
+                have a result are skipped
+            progress_callback: Optional async callback receiving (processed_rows, total_rows)
             
         Returns:
             WorkflowEvaluation instance
@@ -63,10 +117,19 @@ class WorkflowEvaluator:
         total_rows = len(csv_data)
         
         # Create or get evaluation record
+        finished_rows = set()
         if evaluation_id:
             evaluation = await sync_to_async(WorkflowEvaluation.objects.get)(
                 evaluation_id=evaluation_id
             )
+            finished_rows = await sync_to_async(
+                lambda: set(evaluation.results.values_list('row_number', flat=True))
+            )()
+            evaluation.total_rows = total_rows
+            evaluation.status = EvaluationStatus.RUNNING
+            await sync_to_async(evaluation.save)(update_fields=['total_rows', 'status'])
+            if finished_rows:
+                logger.info(f"🔁 EVALUATOR: Resuming evaluation {evaluation.evaluation_id}, {len(finished_rows)} rows already done")
         else:
             evaluation = await sync_to_async(WorkflowEvaluation.objects.create)(
                 workflow=workflow,
@@ -76,36 +139,11 @@ class WorkflowEvaluator:
                 executed_by=executed_by
             )
         
-        # Process each row sequentially
-        for row_index, row_data in enumerate(csv_data, start=1):
-            try:
-                await self._process_evaluation_row(
-                    evaluation,
-                    workflow,
-                    row_index,
-                    row_data,
-                    executed_by
-                )
-                
-                # Update evaluation progress
-                evaluation.completed_rows += 1
-                await sync_to_async(evaluation.save)(update_fields=['completed_rows'])
-                
-            except Exception as e:
-                logger.error(f"❌ EVALUATOR: Failed to process row {row_index}: {e}")
-                evaluation.failed_rows += 1
-                
-                # Create failed result record
-                await sync_to_async(WorkflowEvaluationResult.objects.create)(
-                    evaluation=evaluation,
-                    row_number=row_index,
-                    input_text=row_data.get('input', ''),
-                    expected_output=row_data.get('expected_output', ''),
-                    status=EvaluationResultStatus.FAILED,
-                    error_message=str(e)
-                )
-                
-                await sync_to_async(evaluation.save)(update_fields=['failed_rows'])
+        pending_rows = [
+            (row_number, row_data) for row_number, row_data in enumerate(csv_data, start=1)
+            if row_number not in finished_rows
+        ]
+        await self._run_rows(evaluation, workflow, pending_rows, executed_by, len(finished_rows), total_rows, progress_callback)
         
         # Mark evaluation as completed
         evaluation.status = EvaluationStatus.COMPLETED
@@ -115,7 +153,140 @@ class WorkflowEvaluator:
         
         return evaluation
     
-    def parse_csv_file(self, csv_file: Any) -> List[Dict[str, str]]:
+    async def _run_rows(
+        self,
+        evaluation: WorkflowEvaluation,
+        workflow: AgentWorkflow,
+        rows: List[tuple],
+        executed_by,
+        processed_rows: int,
+        total_rows: int,
+        progress_callback: Optional[Callable[[int, int], Awaitable[None]]]
+    ):
+        """
+        Execute ``rows`` concurrently and score/save them in batches as they finish.
+        Rows are saved progressively, so a resumed evaluation only re-runs rows
+        that were still in flight.
+        """
+        evaluation_settings = get_evaluation_settings()
+        batch_size = max(1, evaluation_settings['SCORING_BATCH_SIZE'])
+        flush_interval = evaluation_settings['FLUSH_INTERVAL']
+        semaphore = asyncio.Semaphore(max(1, evaluation_settings['ROW_CONCURRENCY']))
+        
+        async def run_row(row_number, row_data):
+            async with semaphore:
+                return await self._execute_evaluation_row(workflow, row_number, row_data, executed_by)
+        
+        logger.info(f"🔍 EVALUATOR: Running {len(rows)} rows, {evaluation_settings['ROW_CONCURRENCY']} at a time")
+        pending = {asyncio.create_task(run_row(row_number, row_data)) for row_number, row_data in rows}
+        batch = []
+        last_flush = time.monotonic()
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, timeout=flush_interval, return_when=asyncio.FIRST_COMPLETED)
+                batch.extend(task.result() for task in done)
+                if batch and (len(batch) >= batch_size or not pending
+                              or time.monotonic() - last_flush >= flush_interval):
+                    processed_rows += await self._score_and_save_batch(evaluation, batch)
+                    batch = []
+                    last_flush = time.monotonic()
+                    if progress_callback:
+                        await progress_callback(processed_rows, total_rows)
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def _execute_evaluation_row(
+        self,
+        workflow: AgentWorkflow,
+        row_number: int,
+        row_data: Dict[str, str],
+        executed_by
+    ) -> Dict[str, Any]:
+        """
+        Phase one for a single row: run the workflow and extract its output.
+        Failures are returned in ``error`` so they are saved with the batch.
+        """
+        input_text = row_data.get('input', '')
+        outcome = {
+            'row_number': row_number,
+            'input_text': input_text,
+            'expected_output': row_data.get('expected_output', ''),
+            'workflow_output': '',
+            'execution_id': '',
+            'execution_time': None,
+            'error': None
+        }
+        
+        logger.info(f"🔍 EVALUATOR: Processing row {row_number} - input: {input_text[:50]}...")
+        start_time = time.time()
+        try:
+            execution_result = await self.execute_workflow_with_input(workflow, input_text, executed_by)
+            outcome['execution_time'] = time.time() - start_time
+            outcome['execution_id'] = execution_result.get('execution_id', '')
+            outcome['workflow_output'] = self.extract_end_node_inputs(execution_result, workflow.graph_json)
+        except Exception as e:
+            logger.error(f"❌ EVALUATOR: Failed to process row {row_number}: {e}")
+            outcome['error'] = str(e) or e.__class__.__name__
+        return outcome
+    
+    async def _score_and_save_batch(self, evaluation: WorkflowEvaluation, batch: List[Dict[str, Any]]) -> int:
+        """Phase two: score a batch of finished rows together and bulk insert their results"""
+        succeeded = [outcome for outcome in batch if not outcome['error']]
+        metrics_list = []
+        if succeeded:
+            # Model inference off the event loop and off the thread that serves the ORM
+            metrics_list = await sync_to_async(self.calculate_metrics_batch, thread_sensitive=False)(
+                [outcome['workflow_output'] for outcome in succeeded],
+                [outcome['expected_output'] for outcome in succeeded]
+            )
+        metrics_by_row = {outcome['row_number']: metrics for outcome, metrics in zip(succeeded, metrics_list)}
+        
+        results = []
+        for outcome in sorted(batch, key=lambda item: item['row_number']):
+            metrics = metrics_by_row.get(outcome['row_number'])
+            if metrics is None:
+                results.append(WorkflowEvaluationResult(
+                    evaluation=evaluation,
+                    row_number=outcome['row_number'],
+                    input_text=outcome['input_text'],
+                    expected_output=outcome['expected_output'],
+                    status=EvaluationResultStatus.FAILED,
+                    error_message=outcome['error']
+                ))
+                continue
+            results.append(WorkflowEvaluationResult(
+                evaluation=evaluation,
+                row_number=outcome['row_number'],
+                input_text=outcome['input_text'],
+                expected_output=outcome['expected_output'],
+                workflow_output=outcome['workflow_output'],
+                execution_id=outcome['execution_id'],
+                rouge_1_score=metrics['rouge_1'],
+                rouge_2_score=metrics['rouge_2'],
+                rouge_l_score=metrics['rouge_l'],
+                bleu_score=metrics['bleu'],
+                bert_score=metrics['bert_score'],
+                semantic_similarity=metrics['semantic_similarity'],
+                average_score=metrics['average_score'],
+                status=EvaluationResultStatus.SUCCESS,
+                execution_time_seconds=outcome['execution_time']
+            ))
+        
+        evaluation.completed_rows += len(succeeded)
+        evaluation.failed_rows += len(batch) - len(succeeded)
+        
+        def save_batch():
+            WorkflowEvaluationResult.objects.bulk_create(results)
+            evaluation.save(update_fields=['completed_rows', 'failed_rows'])
+        
+        await sync_to_async(save_batch)()
+        logger.info(f"💾 EVALUATOR: Saved {len(batch)} rows ({len(succeeded)} scored); "
+                   f"{evaluation.completed_rows} successful, {evaluation.failed_rows} failed so far")
+        return len(batch)
+    
+    @staticmethod
+    def parse_csv_file(csv_file: Any) -> List[Dict[str, str]]:
         """
         Parse CSV file and validate format
         
@@ -171,75 +342,6 @@ class WorkflowEvaluator:
             logger.error(f"❌ EVALUATOR: CSV parsing failed: {e}")
             raise ValueError(f"Failed to parse CSV file: {str(e)}")
     
-    async def _process_evaluation_row(
-        self,
-        evaluation: WorkflowEvaluation,
-        workflow: AgentWorkflow,
-        row_number: int,
-        row_data: Dict[str, str],
-        executed_by
-    ):
-        """
-        Process a single evaluation row
-        
-        Args:
-            evaluation: WorkflowEvaluation instance
-            workflow: AgentWorkflow instance
-            row_number: Row number in CSV
-            row_data: Dictionary with 'input' and 'expected_output'
-            executed_by: User who initiated evaluation
-        """
-        input_text = row_data.get('input', '')
-        expected_output = row_data.get('expected_output', '')
-        
-        logger.info(f"🔍 EVALUATOR: Processing row {row_number} - input: {input_text[:50]}...")
-        
-        start_time = time.time()
-        
-        try:
-            # Execute workflow with input substitution
-            execution_result = await self.execute_workflow_with_input(
-                workflow,
-                input_text,
-                executed_by
-            )
-            
-            execution_time = time.time() - start_time
-            
-            # Extract End node input messages
-            workflow_output = self.extract_end_node_inputs(
-                execution_result,
-                workflow.graph_json
-            )
-            
-            # Calculate metrics
-            metrics = self.calculate_metrics(workflow_output, expected_output)
-            
-            # Create evaluation result
-            await sync_to_async(WorkflowEvaluationResult.objects.create)(
-                evaluation=evaluation,
-                row_number=row_number,
-                input_text=input_text,
-                expected_output=expected_output,
-                workflow_output=workflow_output,
-                execution_id=execution_result.get('execution_id', ''),
-                rouge_1_score=metrics['rouge_1'],
-                rouge_2_score=metrics['rouge_2'],
-                rouge_l_score=metrics['rouge_l'],
-                bleu_score=metrics['bleu'],
-                bert_score=metrics['bert_score'],
-                semantic_similarity=metrics['semantic_similarity'],
-                average_score=metrics['average_score'],
-                status=EvaluationResultStatus.SUCCESS,
-                execution_time_seconds=execution_time
-            )
-            
-            logger.info(f"✅ EVALUATOR: Row {row_number} processed successfully - avg score: {metrics['average_score']:.3f}")
-            
-        except Exception as e:
-            logger.error(f"❌ EVALUATOR: Row {row_number} processing failed: {e}")
-            raise
-    
     async def execute_workflow_with_input(
         self,
         workflow: AgentWorkflow,
@@ -260,7 +362,6 @@ class WorkflowEvaluator:
         logger.info(f"🚀 EVALUATOR: Executing workflow with input: {input_text[:50]}...")
         
         # Get workflow graph and make a deep copy to avoid modifying original
-        import copy
         graph_json = copy.deepcopy(workflow.graph_json)
         
         # Find Start node and replace prompt with input_text
@@ -273,24 +374,13 @@ class WorkflowEvaluator:
                     logger.info(f"🔄 EVALUATOR: Replaced Start node prompt with input text")
                 break
         
-        # Create a temporary workflow-like object with modified graph
-        # We'll need to patch the workflow's graph_json property temporarily
-        # Since graph_json is likely a JSONField, we can temporarily modify it
-        original_graph = workflow.graph_json
-        
-        # Temporarily set the modified graph
-        # Note: This modifies the workflow object in memory, but we'll restore it
-        workflow.graph_json = graph_json
+        # Each row runs on its own copy of the workflow object, so concurrent rows
+        # never see each other's substituted graph (the executor only writes stats
+        # columns back, never graph_json)
+        row_workflow = copy.copy(workflow)
+        row_workflow.graph_json = graph_json
         
-        try:
-            # Execute workflow with modified graph
-            execution_result = await self.workflow_executor.execute_workflow(workflow, executed_by)
-            
-            return execution_result
-            
-        finally:
-            # Always restore original graph, even if execution fails
-            workflow.graph_json = original_graph
+        return await self.workflow_executor.execute_workflow(row_workflow, executed_by)
     
     def extract_end_node_inputs(
         self,
@@ -370,7 +460,7 @@ class WorkflowEvaluator:
     
     def calculate_metrics(self, workflow_output: str, expected_output: str) -> Dict[str, float]:
         """
-        Calculate comprehensive evaluation metrics
+        Calculate comprehensive evaluation metrics for one output
         
         Args:
             workflow_output: Output from workflow execution
@@ -379,93 +469,104 @@ class WorkflowEvaluator:
         Returns:
             Dictionary with metric scores
         """
-        if not workflow_output or not expected_output:
-            logger.warning("⚠️ EVALUATOR: Empty output or expected output, returning zero scores")
-            return {
-                'rouge_1': 0.0,
-                'rouge_2': 0.0,
-                'rouge_l': 0.0,
-                'bleu': 0.0,
-                'bert_score': 0.0,
-                'semantic_similarity': 0.0,
-                'average_score': 0.0
-            }
-        
-        metrics = {}
+        return self.calculate_metrics_batch([workflow_output], [expected_output])[0]
+    
+    def calculate_metrics_batch(self, workflow_outputs: List[str], expected_outputs: List[str]) -> List[Dict[str, float]]:
+        """
+        Calculate evaluation metrics for many output pairs at once. BERTScore and
+        semantic similarity run as single batched forward passes on resident models.
+        
+        Args:
+            workflow_outputs: Outputs from workflow executions
+            expected_outputs: Expected outputs from CSV, in the same order
+            
+        Returns:
+            One dictionary of metric scores per pair
+        """
+        results = [dict(ZERO_METRICS) for _ in workflow_outputs]
+        scored = [
+            index for index, (output, expected) in enumerate(zip(workflow_outputs, expected_outputs))
+            if output and expected
+        ]
+        if len(scored) < len(results):
+            logger.warning(f"⚠️ EVALUATOR: {len(results) - len(scored)} rows with empty output or expected output, returning zero scores")
+        if not scored:
+            return results
+        
+        candidates = [workflow_outputs[index] for index in scored]
+        references = [expected_outputs[index] for index in scored]
+        
+        def assign(metric: str, values):
+            for index, value in zip(scored, values):
+                results[index][metric] = float(value)
         
         try:
             # ROUGE scores
             from rouge_score import rouge_scorer
             scorer = rouge_scorer.RougeScorer(['rouge1', 'rouge2', 'rougeL'], use_stemmer=True)
-            rouge_scores = scorer.score(expected_output, workflow_output)
-            metrics['rouge_1'] = rouge_scores['rouge1'].fmeasure
-            metrics['rouge_2'] = rouge_scores['rouge2'].fmeasure
-            metrics['rouge_l'] = rouge_scores['rougeL'].fmeasure
+            rouge_scores = [scorer.score(reference, candidate) for candidate, reference in zip(candidates, references)]
+            assign('rouge_1', [score['rouge1'].fmeasure for score in rouge_scores])
+            assign('rouge_2', [score['rouge2'].fmeasure for score in rouge_scores])
+            assign('rouge_l', [score['rougeL'].fmeasure for score in rouge_scores])
             
         except Exception as e:
             logger.error(f"❌ EVALUATOR: ROUGE calculation failed: {e}")
-            metrics['rouge_1'] = 0.0
-            metrics['rouge_2'] = 0.0
-            metrics['rouge_l'] = 0.0
         
         try:
             # BLEU score
             from sacrebleu import BLEU
             bleu = BLEU()
-            bleu_result = bleu.sentence_score(workflow_output, [expected_output])
-            metrics['bleu'] = bleu_result.score / 100.0
+            assign('bleu', [
+                bleu.sentence_score(candidate, [reference]).score / 100.0
+                for candidate, reference in zip(candidates, references)
+            ])
             
         except Exception as e:
             logger.error(f"❌ EVALUATOR: BLEU calculation failed: {e}")
-            metrics['bleu'] = 0.0
         
         try:
-            # BERTScore
-            from bert_score import score
-            P, R, F1 = score([workflow_output], [expected_output], lang='en', verbose=False)
-            metrics['bert_score'] = float(F1.item())
+            # BERTScore (resident model, one batched pass)
+            bert_scorer = get_bert_scorer(get_evaluation_settings()['BERT_SCORE_LANG'])
+            P, R, F1 = bert_scorer.score(candidates, references, batch_size=64)
+            assign('bert_score', F1.tolist())
             
         except Exception as e:
             logger.error(f"❌ EVALUATOR: BERTScore calculation failed: {e}")
-            metrics['bert_score'] = 0.0
         
         try:
             # Semantic Similarity (using sentence transformers)
-            from sentence_transformers import SentenceTransformer
+            from vector_search.model_registry import get_sentence_transformer
             import numpy as np
-            from numpy.linalg import norm
-            
-            # Lazy load model (cache it if needed)
-            if not hasattr(self, '_semantic_model'):
-                self._semantic_model = SentenceTransformer('all-MiniLM-L6-v2')
             
-            embeddings = self._semantic_model.encode([workflow_output, expected_output])
+            # Shared process-wide model (loaded once, reused across evaluations)
+            semantic_model = get_sentence_transformer('all-MiniLM-L6-v2')
             
-            # Calculate cosine similarity
-            dot_product = np.dot(embeddings[0], embeddings[1])
-            norm_a = norm(embeddings[0])
-            norm_b = norm(embeddings[1])
-            similarity = dot_product / (norm_a * norm_b)
+            embeddings = np.asarray(semantic_model.encode(candidates + references, batch_size=64))
+            candidate_embeddings = embeddings[:len(candidates)]
+            reference_embeddings = embeddings[len(candidates):]
             
-            metrics['semantic_similarity'] = float(similarity)
+            # Row-wise cosine similarity
+            norms = np.linalg.norm(candidate_embeddings, axis=1) * np.linalg.norm(reference_embeddings, axis=1)
+            similarities = np.einsum('ij,ij->i', candidate_embeddings, reference_embeddings) / np.maximum(norms, 1e-12)
+            assign('semantic_similarity', similarities)
             
         except Exception as e:
             logger.error(f"❌ EVALUATOR: Semantic similarity calculation failed: {e}")
-            metrics['semantic_similarity'] = 0.0
         
         # Calculate average score
-        metric_values = [
-            metrics['rouge_1'],
-            metrics['rouge_2'],
-            metrics['rouge_l'],
-            metrics['bleu'],
-            metrics['bert_score'],
-            metrics['semantic_similarity']
-        ]
-        metrics['average_score'] = sum(metric_values) / len(metric_values)
+        for index in scored:
+            metrics = results[index]
+            metric_values = [
+                metrics['rouge_1'],
+                metrics['rouge_2'],
+                metrics['rouge_l'],
+                metrics['bleu'],
+                metrics['bert_score'],
+                metrics['semantic_similarity']
+            ]
+            metrics['average_score'] = sum(metric_values) / len(metric_values)
         
-        logger.info(f"📊 EVALUATOR: Metrics calculated - Avg: {metrics['average_score']:.3f}, "
-                   f"ROUGE-1: {metrics['rouge_1']:.3f}, BLEU: {metrics['bleu']:.3f}")
+        average = sum(results[index]['average_score'] for index in scored) / len(scored)
+        logger.info(f"📊 EVALUATOR: Metrics calculated for {len(scored)} rows - Avg: {average:.3f}")
         
-        return metrics
-
+        return results
@@ -7,15 +7,22 @@ Main workflow execution engine for conversation orchestration.
 
 import logging
 import time
+import uuid
 import asyncio
-from typing import Dict, List, Any, Optional, Tuple
-from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple, Callable, Awaitable
+from django.db.models import ExpressionWrapper, F, FloatField, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from asgiref.sync import sync_to_async
 
 from users.models import WorkflowExecution, WorkflowExecutionMessage, WorkflowExecutionStatus, AgentWorkflow
 from llm_eval.providers.base import LLMResponse
+from llm_eval.providers.http_pool import get_http_pool_stats
 from mcp_servers.manager import get_mcp_server_manager
+from .llm_provider_manager import get_provider_cache_stats
+from .dag_scheduler import DagScheduler, CriticalPathTracker, get_scheduler_settings
+from .execution_log import ExecutionEventLog
+from .execution_control import open_control_channel
 
 logger = logging.getLogger('conversation_orchestrator')
 
@@ -68,7 +75,8 @@ class WorkflowExecutor:
         self.human_input_handler = human_input_handler
         self.reflection_handler = reflection_handler
     
-    async def execute_workflow(self, workflow: AgentWorkflow, executed_by, deployment_context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    async def execute_workflow(self, workflow: AgentWorkflow, executed_by, deployment_context: Optional[Dict[str, Any]] = None,
+                               stream_callback: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None) -> Dict[str, Any]:
         """
         Execute the complete workflow with REAL LLM calls and conversation chaining
         Returns execution results as dictionary instead of database records
@@ -77,6 +85,8 @@ class WorkflowExecutor:
             workflow: The AgentWorkflow instance to execute
             executed_by: User who initiated the execution
             deployment_context: Optional deployment context with user query for UserProxyAgent handling
+            stream_callback: Optional async callback receiving agent_stream_start / agent_token /
+                agent_stream_end events while agent LLM calls are generating
         """
         # Get workflow data using sync_to_async to avoid async context issues
         workflow_id = await sync_to_async(lambda: workflow.workflow_id)()
@@ -91,7 +101,8 @@ class WorkflowExecutor:
             logger.info(f"🚀 ORCHESTRATOR: Starting REAL workflow execution for {workflow_id}")
         
         start_time = timezone.now()
-        execution_id = f"exec_{int(time.time() * 1000)}" # Added milliseconds for uniqueness
+        # Evaluation rows start concurrently, so the millisecond alone is not unique
+        execution_id = f"exec_{int(time.time() * 1000)}_{uuid.uuid4().hex[:8]}"
         
         # CRITICAL FIX: Create execution record IMMEDIATELY so it's available for human input pausing
         execution_record = await sync_to_async(WorkflowExecution.objects.create)(
@@ -107,43 +118,28 @@ class WorkflowExecutor:
             result_summary=""
         )
         logger.info(f"💾 ORCHESTRATOR: Created execution record {execution_id}")
+        # Messages are appended to the log in batches; the row is written at checkpoints and at the end
+        event_log = ExecutionEventLog(execution_record)
+        # Stop requests arrive as signals instead of a row read per scheduler iteration
+        control = await open_control_channel(execution_id)
         
         try:
-            # Parse workflow into execution sequence
-            execution_sequence = self.workflow_parser.parse_workflow_graph(graph_json)
+            # Compiled plan for this graph structure (cached across executions)
+            plan = self.workflow_parser.get_execution_plan(graph_json)
+            execution_sequence = plan.execution_sequence(graph_json)
             
             if not execution_sequence:
                 raise Exception("No execution sequence could be built from workflow graph")
             
-            # CRITICAL FIX: Validate execution sequence before starting
-            # Check that all nodes from graph are in sequence (except reflection-only targets)
-            graph_node_ids = {node['id'] for node in graph_json.get('nodes', [])}
-            sequence_node_ids = {node['id'] for node in execution_sequence}
-            
-            # Find nodes missing from sequence (excluding reflection-only targets which are intentionally excluded)
-            missing_nodes = graph_node_ids - sequence_node_ids
-            if missing_nodes:
-                missing_node_names = [next((n.get('data', {}).get('name', nid) for n in graph_json.get('nodes', []) if n['id'] == nid), nid) for nid in missing_nodes]
-                logger.warning(f"⚠️ ORCHESTRATOR: {len(missing_nodes)} nodes not in execution sequence: {missing_node_names}")
-                # Don't fail here - reflection-only targets are intentionally excluded
-                # But log for debugging
-            
-            # Validate sequence order: check that dependencies are satisfied
-            sequence_node_map = {node['id']: node for node in execution_sequence}
-            for i, node in enumerate(execution_sequence):
-                node_id = node['id']
-                # Check all incoming sequential edges
-                for edge in graph_json.get('edges', []):
-                    if edge.get('target') == node_id and edge.get('type') == 'sequential':
-                        source_id = edge.get('source')
-                        if source_id in sequence_node_map:
-                            # Source should appear before target in sequence
-                            source_index = next((idx for idx, n in enumerate(execution_sequence) if n['id'] == source_id), -1)
-                            if source_index >= i:
-                                source_name = sequence_node_map[source_id].get('data', {}).get('name', source_id)
-                                target_name = node.get('data', {}).get('name', node_id)
-                                logger.error(f"❌ ORCHESTRATOR: Dependency violation: {target_name} (position {i}) depends on {source_name} (position {source_index})")
-                                raise Exception(f"Execution sequence violation: {target_name} appears before dependency {source_name}")
+            # Nodes missing from the sequence are delegate/reflection-only targets, excluded on purpose
+            if plan.excluded_ids:
+                missing_node_names = [graph_json['nodes'][plan.node_index[nid]].get('data', {}).get('name', nid) for nid in plan.excluded_ids]
+                logger.warning(f"⚠️ ORCHESTRATOR: {len(plan.excluded_ids)} nodes not in execution sequence: {missing_node_names}")
+            
+            # Dependency order was checked when the plan was compiled
+            if plan.order_violations:
+                logger.error(f"❌ ORCHESTRATOR: Dependency violation: {plan.order_violations[0]}")
+                raise Exception(f"Execution sequence violation: {plan.order_violations[0]}")
             
             logger.info(f"✅ ORCHESTRATOR: Execution sequence validated - {len(execution_sequence)} nodes in correct dependency order")
             
@@ -162,7 +158,7 @@ class WorkflowExecutor:
             # Execute nodes with parallel execution support
             node_index = 0
             
-            # CRITICAL FIX: Handle StartNode first (it's skipped by _find_ready_nodes)
+            # CRITICAL FIX: Handle StartNode first (the scheduler never reports it as ready)
             if node_index < len(execution_sequence):
                 start_node = execution_sequence[node_index]
                 if start_node.get('type') == 'StartNode':
@@ -186,127 +182,64 @@ class WorkflowExecutor:
                     })
                     message_sequence += 1
                     
-                    # Save conversation history to execution record
                     execution_record.conversation_history = conversation_history
                     execution_record.executed_nodes = executed_nodes
-                    await sync_to_async(execution_record.save)(update_fields=['conversation_history', 'executed_nodes'])
+                    await event_log.append(messages)
                     
                     logger.info(f"✅ ORCHESTRATOR: StartNode executed - prompt: '{start_prompt[:100]}...'")
                     node_index += 1  # Move past StartNode
             
-            while node_index < len(execution_sequence):
-                # Check if execution has been stopped
-                await sync_to_async(execution_record.refresh_from_db)()
-                if execution_record.status == WorkflowExecutionStatus.STOPPED:
+            # Completion-driven scheduling: in-degree counters are computed once and
+            # each node becomes ready as soon as its last dependency finishes
+            scheduler = DagScheduler(execution_sequence, plan, executed_nodes)
+            timing = CriticalPathTracker(scheduler)
+            max_concurrent_nodes = get_scheduler_settings()['MAX_CONCURRENT_NODES']
+            
+            while True:
+                # Check if execution has been stopped (signalled; the row is only read as a periodic fallback)
+                if await control.is_stopped():
+                    execution_record.status = WorkflowExecutionStatus.STOPPED
                     logger.info(f"🛑 ORCHESTRATOR: Execution {execution_id} has been stopped, terminating workflow")
+                    await event_log.checkpoint(executed_nodes, conversation_history, messages)
                     return {
                         'status': 'stopped',
                         'message': 'Workflow execution was stopped by user',
                         'execution_id': execution_id
                     }
                 
-                # PARALLEL EXECUTION: Find all nodes ready to execute in parallel
-                ready_nodes = self._find_ready_nodes(execution_sequence, executed_nodes, graph_json, node_index)
-                
+                ready_nodes = scheduler.ready_nodes()
                 if not ready_nodes:
-                    # No ready nodes, move to next
-                    node_index += 1
+                    break
+                
+                eager_nodes = [(idx, ready_node) for idx, ready_node in ready_nodes if scheduler.is_eager(ready_node)]
+                if len(ready_nodes) > 1 and eager_nodes:
+                    # Several branches ready: run plain agent turns concurrently, starting each
+                    # dependent the moment its inputs are in. Nodes needing the full sequential
+                    # handling (human input, group chat, reflection, MCP) run once these drain.
+                    logger.info(f"🔀 PARALLEL: {len(ready_nodes)} nodes ready, running {len(eager_nodes)} concurrently "
+                               f"(cap {max_concurrent_nodes})")
+                    state = await self._run_ready_nodes_concurrently(
+                        eager_nodes, scheduler, timing, max_concurrent_nodes, workflow, graph_json,
+                        executed_nodes, conversation_history, execution_record, messages, message_sequence,
+                        agents_involved, total_response_time, providers_used, project_id, event_log,
+                        stream_callback=stream_callback
+                    )
+                    conversation_history = state['conversation_history']
+                    message_sequence = state['message_sequence']
+                    total_response_time = state['total_response_time']
                     continue
                 
-                # If only one node is ready, execute it sequentially
-                if len(ready_nodes) == 1:
-                    node_index, node = ready_nodes[0]
-                    node_index += 1  # Move to next after execution
-                else:
-                    # Multiple nodes ready - execute in parallel
-                    logger.info(f"🔀 PARALLEL: Executing {len(ready_nodes)} nodes in parallel")
-                    node_names = [n[1].get('data', {}).get('name', n[1].get('id')) for n in ready_nodes]
-                    logger.info(f"🔀 PARALLEL: Nodes: {', '.join(node_names)}")
-                    
-                    # CRITICAL FIX: Check if UserProxyAgent's dependencies are actually satisfied
-                    # Build dependency map to check UserProxyAgent dependencies
-                    edges = graph_json.get('edges', [])
-                    nodes = graph_json.get('nodes', [])
-                    node_map = {node.get('id'): node for node in nodes}
-                    dependency_map = {}
-                    for edge in edges:
-                        edge_type = edge.get('type', 'sequential')
-                        source_id = edge.get('source')
-                        target_id = edge.get('target')
-                        target_node = node_map.get(target_id)
-                        is_user_proxy = (target_node and 
-                                        target_node.get('type') == 'UserProxyAgent' and
-                                        target_node.get('data', {}).get('require_human_input', True))
-                        if edge_type == 'sequential' or (edge_type == 'reflection' and is_user_proxy):
-                            if target_id not in dependency_map:
-                                dependency_map[target_id] = set()
-                            dependency_map[target_id].add(source_id)
-                    
-                    # Separate UserProxyAgent nodes from other nodes
-                    ready_user_proxy_nodes = []
-                    other_ready_nodes = []
-                    
-                    for idx, node in ready_nodes:
-                        if node.get('type') == 'UserProxyAgent' and node.get('data', {}).get('require_human_input', True):
-                            node_id = node.get('id')
-                            dependencies = dependency_map.get(node_id, set())
-                            # Check if all dependencies (including reflection edges) are satisfied
-                            if all(dep_id in executed_nodes for dep_id in dependencies):
-                                ready_user_proxy_nodes.append((idx, node))
-                                logger.info(f"✅ PARALLEL: UserProxyAgent {node.get('data', {}).get('name')} dependencies satisfied")
-                            else:
-                                # Dependencies not satisfied - don't execute yet
-                                missing_deps = [dep_id for dep_id in dependencies if dep_id not in executed_nodes]
-                                logger.info(f"⏳ PARALLEL: UserProxyAgent {node.get('data', {}).get('name')} waiting for dependencies: {missing_deps}")
-                        else:
-                            other_ready_nodes.append((idx, node))
-                    
-                    # CRITICAL FIX: Always execute other nodes first if available
-                    # This ensures parallel execution happens before UserProxyAgent pauses
-                    if other_ready_nodes:
-                        # Execute other nodes in parallel first, UserProxyAgent will wait
-                        parallel_results = await self._execute_nodes_in_parallel(
-                            other_ready_nodes, workflow, graph_json, executed_nodes, conversation_history,
-                            execution_record, messages, message_sequence, agents_involved,
-                            total_response_time, providers_used, project_id
-                        )
-                        
-                        # Update state from parallel execution results
-                        for result in parallel_results:
-                            if result.get('executed'):
-                                executed_nodes[result['node_id']] = result['output']
-                                conversation_history += f"\n{result['node_name']}: {result['output']}"
-                                agents_involved.update(result.get('agents_involved', []))
-                                total_response_time += result.get('response_time_ms', 0)
-                                for provider in result.get('providers_used', []):
-                                    if provider not in providers_used:
-                                        providers_used.append(provider)
-                        
-                        # Update message sequence
-                        executed_count = sum(1 for r in parallel_results if r.get('executed'))
-                        message_sequence += executed_count
-                        
-                        # Save updated state
-                        execution_record.executed_nodes = executed_nodes
-                        execution_record.conversation_history = conversation_history
-                        execution_record.messages_data = messages
-                        await sync_to_async(execution_record.save)(update_fields=['executed_nodes', 'conversation_history', 'messages_data'])
-                        
-                        # Move past all executed nodes
-                        max_index = max(idx for idx, _ in other_ready_nodes)
-                        node_index = max_index + 1
-                        # Continue loop to check UserProxyAgent again after parallel execution
-                        continue
-                    elif ready_user_proxy_nodes:
-                        # Only UserProxyAgent nodes ready (dependencies satisfied) - execute sequentially to pause
-                        node_index, node = ready_user_proxy_nodes[0]
-                        # Will be handled in single node execution below
-                    else:
-                        # No ready nodes (shouldn't happen)
-                        node_index += 1
-                        continue
+                # One node at a time through the full handling below; human-input nodes
+                # go last so other ready branches finish before the workflow pauses
+                node_index, node = next(
+                    ((idx, ready_node) for idx, ready_node in ready_nodes
+                     if not (ready_node.get('type') == 'UserProxyAgent' and
+                             ready_node.get('data', {}).get('require_human_input', True))),
+                    ready_nodes[0]
+                )
+                scheduler.mark_running(node.get('id'))
+                timing.node_start(node.get('id'))
                 
-                # Single node execution - node is already set from ready_nodes[0] or ready_user_proxy_nodes[0]
                 node_type = node.get('type')
                 node_data = node.get('data', {})
                 node_name = node_data.get('name', f'Node_{node.get("id", "unknown")}')
@@ -356,15 +289,17 @@ class WorkflowExecutor:
                     })
                     message_sequence += 1  # Increment for chronological ordering
                     
-                    # CRITICAL FIX: Save conversation history to execution record after each node
                     execution_record.conversation_history = conversation_history
-                    await sync_to_async(execution_record.save)()
+                    await event_log.append(messages)
                     
                 elif node_type in ['AssistantAgent', 'UserProxyAgent', 'GroupChatManager', 'DelegateAgent']:
                     # ============================================================================
                     # PHASE 2: USERPROXYAGENT HUMAN INPUT DETECTION AND DOCAWARE PROCESSING
                     # ============================================================================
                     if node_type == 'UserProxyAgent' and node_data.get('require_human_input', True):
+                        # Pausing reloads and re-saves the row, so it must hold the current state
+                        await event_log.checkpoint(executed_nodes, conversation_history, messages)
+                        
                         # Get input mode (default to 'user' for backward compatibility)
                         input_mode = node_data.get('input_mode', 'user')
                         
@@ -691,10 +626,9 @@ class WorkflowExecutor:
                                     logger.warning(f"⚠️ ORCHESTRATOR: GroupChatManager node_name was '{node_name}', correcting to '{validated_name}'")
                                     node_name = validated_name
                             
-                            # Save messages to execution record
                             execution_record.messages_data = messages
-                            await sync_to_async(execution_record.save)()
-                            logger.info(f"💾 ORCHESTRATOR: Saved GroupChatManager {node_name} message with {len(delegate_conversations)} delegate conversations and {len([m for m in messages if m.get('agent_type') == 'DelegateAgent'])} individual delegate messages")
+                            await event_log.append(messages)
+                            logger.info(f"💾 ORCHESTRATOR: Logged GroupChatManager {node_name} message with {len(delegate_conversations)} delegate conversations and {len([m for m in messages if m.get('agent_type') == 'DelegateAgent'])} individual delegate messages")
                             
                             # CRITICAL FIX: Update conversation history with agent response
                             conversation_history += f"\n{node_name}: {agent_response_text}"
@@ -707,9 +641,8 @@ class WorkflowExecutor:
                             if agent_config['llm_provider'] not in providers_used:
                                 providers_used.append(agent_config['llm_provider'])
                             
-                            # CRITICAL FIX: Save updated conversation history to database
                             execution_record.conversation_history = conversation_history
-                            await sync_to_async(execution_record.save)()
+                            execution_record.executed_nodes = executed_nodes
                         except Exception as gcm_error:
                             logger.error(f"❌ ORCHESTRATOR: GroupChatManager {node_name} failed: {gcm_error}")
                             raise gcm_error
@@ -753,8 +686,8 @@ class WorkflowExecutor:
                                 )
                             
                             # Execute the agent
-                            agent_response = await llm_provider.generate_response(
-                                prompt=prompt
+                            agent_response = await self._generate_agent_response(
+                                llm_provider, prompt, node, execution_id, stream_callback
                             )
                             
                             if agent_response.error:
@@ -786,15 +719,20 @@ class WorkflowExecutor:
                                 'metadata': {
                                     'llm_provider': agent_config['llm_provider'],
                                     'llm_model': agent_config['llm_model'],
-                                    'cost_estimate': getattr(agent_response, 'cost_estimate', None) if hasattr(agent_response, 'cost_estimate') else None
+                                    'cost_estimate': getattr(agent_response, 'cost_estimate', None) if hasattr(agent_response, 'cost_estimate') else None,
+                                    'http_connection': getattr(agent_response, 'connection_stats', None),
+                                    'first_token_ms': getattr(agent_response, 'first_token_ms', None)
                                 }
                             })
                             message_sequence += 1  # Increment for chronological ordering
                             
-                            # Save messages to execution record
                             execution_record.messages_data = messages
-                            await sync_to_async(execution_record.save)()
-                            logger.info(f"💾 ORCHESTRATOR: Saved {node_name} message before reflection processing")
+                            if node_id in plan.reflection_sources:
+                                # The reflection handler reloads messages_data from the row
+                                await event_log.checkpoint(executed_nodes, conversation_history, messages)
+                                logger.info(f"💾 ORCHESTRATOR: Saved {node_name} message before reflection processing")
+                            else:
+                                await event_log.append(messages)
                             
                             # Track agent involvement and provider usage
                             agents_involved.add(node_name)
@@ -812,7 +750,7 @@ class WorkflowExecutor:
                                 
                                 # First handle self-reflection
                                 self_reflected_response = await self.reflection_handler.handle_reflection_connections(
-                                    node, agent_response_text, graph_json, llm_provider
+                                    node, agent_response_text, graph_json, llm_provider, execution_record
                                 )
                                 if self_reflected_response != agent_response_text:
                                     logger.info(f"🔄 SELF-REFLECTION: {node_name} response updated through self-reflection - new length: {len(self_reflected_response)} chars")
@@ -899,6 +837,10 @@ class WorkflowExecutor:
                                         conversation_history = updated_conversation
                                         logger.info(f"✅ CROSS-AGENT-REFLECTION: Completed cross-agent reflection - final response length: {len(agent_response_text)} chars")
                                 
+                                if cross_agent_reflection_edges:
+                                    # The reflection handler adds its messages to the row's messages_data
+                                    await event_log.append(execution_record.messages_data or [])
+                                
                             except Exception as reflection_error:
                                 logger.error(f"❌ REFLECTION: Error processing reflection for {node_name}: {reflection_error}")
                                 import traceback
@@ -911,13 +853,9 @@ class WorkflowExecutor:
                             # Store node output for multi-input support
                             executed_nodes[node_id] = agent_response_text
                             
-                            # CRITICAL FIX: Save executed_nodes immediately to prevent duplicate execution
                             execution_record.executed_nodes = executed_nodes
-                            
-                            # CRITICAL FIX: Save updated conversation history to database
                             execution_record.conversation_history = conversation_history
-                            await sync_to_async(execution_record.save)(update_fields=['executed_nodes', 'conversation_history'])
-                            logger.info(f"💾 ORCHESTRATOR: Saved executed_nodes and conversation_history for {node_name} (node_id: {node_id})")
+                            await event_log.append(messages)
                             
                         except Exception as agent_error:
                             logger.error(f"❌ ORCHESTRATOR: Agent {node_name} failed: {agent_error}")
@@ -1041,10 +979,9 @@ class WorkflowExecutor:
                         })
                         message_sequence += 1
                         
-                        # Save execution state
                         execution_record.executed_nodes = executed_nodes
                         execution_record.conversation_history = conversation_history
-                        await sync_to_async(execution_record.save)(update_fields=['executed_nodes', 'conversation_history'])
+                        await event_log.append(messages)
                         
                     except Exception as mcp_error:
                         logger.error(f"❌ MCP SERVER: Node {node_name} failed: {mcp_error}")
@@ -1073,6 +1010,14 @@ class WorkflowExecutor:
                     
                 else:
                     logger.warning(f"⚠️ ORCHESTRATOR: Unknown node type {node_type}, skipping")
+                
+                timing.node_end(node_id)
+                scheduler.mark_finished(node_id, succeeded=node_id in executed_nodes)
+            
+            schedule_timing = timing.summary()
+            logger.info(f"⏱️ SCHEDULER: wall {schedule_timing['wall_clock_seconds']}s, critical path "
+                       f"{schedule_timing['critical_path_seconds']}s, wave barriers would have cost "
+                       f"{schedule_timing['barrier_cost_seconds']}s ({' -> '.join(schedule_timing['critical_path'])})")
             
             # Calculate execution metrics
             end_time = timezone.now()
@@ -1080,25 +1025,28 @@ class WorkflowExecutor:
             
             # Update workflow execution stats using sync_to_async
             def update_workflow_stats():
-                workflow.total_executions += 1
-                workflow.successful_executions += 1
-                workflow.last_executed_at = timezone.now()
-                
-                # Update average execution time
-                if workflow.average_execution_time:
-                    workflow.average_execution_time = (
-                        (workflow.average_execution_time * (workflow.total_executions - 1) + duration) 
-                        / workflow.total_executions
+                # One UPDATE with F() so concurrent executions of this workflow (evaluation
+                # rows) don't lose counts or write back each other's in-memory graph_json
+                AgentWorkflow.objects.filter(pk=workflow.pk).update(
+                    total_executions=F('total_executions') + 1,
+                    successful_executions=F('successful_executions') + 1,
+                    last_executed_at=timezone.now(),
+                    average_execution_time=Coalesce(
+                        ExpressionWrapper(
+                            (F('average_execution_time') * F('total_executions') + duration) / (F('total_executions') + 1),
+                            output_field=FloatField()
+                        ),
+                        Value(duration, output_field=FloatField())
                     )
-                else:
-                    workflow.average_execution_time = duration
-                
-                workflow.save()
+                )
+                workflow.refresh_from_db(fields=[
+                    'total_executions', 'successful_executions', 'last_executed_at', 'average_execution_time'
+                ])
             
             await sync_to_async(update_workflow_stats)()
             
-            # CRITICAL FIX: Get the latest messages_data from database first
-            await sync_to_async(execution_record.refresh_from_db)()
+            # CRITICAL FIX: Get the latest messages_data from database first (reflection saves its messages there)
+            await sync_to_async(execution_record.refresh_from_db)(fields=['messages_data'])
             stored_messages = execution_record.messages_data or []
             logger.info(f"🔍 ORCHESTRATOR: Retrieved {len(stored_messages)} stored messages from database")
             
@@ -1108,18 +1056,16 @@ class WorkflowExecutor:
             
             # Merge messages: Start with stored messages, then add any new messages with updated sequences
             final_messages = stored_messages.copy()
+            stored_keys = {
+                (msg.get('sequence'), msg.get('agent_name'), msg.get('message_type')) for msg in stored_messages
+            }
             
             # Add workflow messages that aren't already stored, updating their sequences if needed
             for message in messages:
                 message_sequence = message.get('sequence', -1)
                 
                 # Check if this message already exists in stored messages
-                already_stored = any(
-                    stored_msg.get('sequence') == message_sequence and 
-                    stored_msg.get('agent_name') == message.get('agent_name') and
-                    stored_msg.get('message_type') == message.get('message_type')
-                    for stored_msg in stored_messages
-                )
+                already_stored = (message_sequence, message.get('agent_name'), message.get('message_type')) in stored_keys
                 
                 if not already_stored:
                     # If this is a workflow message (like EndNode) that needs to be added after reflection
@@ -1157,8 +1103,8 @@ class WorkflowExecutor:
             logger.info(f"✅ ORCHESTRATOR: Execution record saved with status: {execution_record.status}")
             logger.info(f"💾 ORCHESTRATOR: Saved final {len(final_messages)} messages to execution record")
             
-            # ✅ SAVE MESSAGES TO DATABASE
-            await self._save_messages_to_database(final_messages, execution_record)
+            # ✅ SAVE MESSAGES TO DATABASE - whatever the log has not written yet
+            await self._save_messages_to_database(final_messages, execution_record, event_log)
             
             # Return execution results
             execution_result = {
@@ -1175,6 +1121,7 @@ class WorkflowExecutor:
                 'providers_used': providers_used,
                 'conversation_history': conversation_history,
                 'messages': final_messages,
+                'schedule_timing': schedule_timing,
                 'result_summary': f"Successfully executed {len(execution_sequence)} nodes with {len(agents_involved)} agents"
             }
             
@@ -1186,6 +1133,8 @@ class WorkflowExecutor:
             agent_names = [msg['agent_name'] for msg in final_messages]
             logger.info(f"📋 MESSAGE TYPES: {message_types}")
             logger.info(f"👥 AGENT NAMES: {agent_names}")
+            logger.info(f"🔌 HTTP POOL: {get_http_pool_stats()}")
+            logger.info(f"🔑 PROVIDER CACHE: {get_provider_cache_stats()}")
             
             return execution_result
             
@@ -1194,9 +1143,11 @@ class WorkflowExecutor:
             
             # Update workflow stats for failed execution using sync_to_async
             def update_failed_stats():
-                workflow.total_executions += 1
-                workflow.last_executed_at = timezone.now()
-                workflow.save()
+                AgentWorkflow.objects.filter(pk=workflow.pk).update(
+                    total_executions=F('total_executions') + 1,
+                    last_executed_at=timezone.now()
+                )
+                workflow.refresh_from_db(fields=['total_executions', 'last_executed_at'])
             
             await sync_to_async(update_failed_stats)()
             
@@ -1209,6 +1160,10 @@ class WorkflowExecutor:
             execution_record.duration_seconds = duration
             execution_record.error_message = str(e)
             await sync_to_async(execution_record.save)()
+            try:
+                await event_log.flush()
+            except Exception as log_error:
+                logger.error(f"❌ ORCHESTRATOR: Failed to flush execution log: {log_error}")
             
             return {
                 'execution_id': execution_id,
@@ -1227,8 +1182,11 @@ class WorkflowExecutor:
                 'error_message': str(e),
                 'result_summary': f"Execution failed: {str(e)}"
             }
+        finally:
+            control.close()
     
-    async def continue_workflow_execution(self, workflow, execution_record, execution_sequence, start_position, executed_nodes, deployment_context: Optional[Dict[str, Any]] = None):
+    async def continue_workflow_execution(self, workflow, execution_record, execution_sequence, start_position, executed_nodes, deployment_context: Optional[Dict[str, Any]] = None,
+                                          stream_callback: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None):
         """
         Continue workflow execution from a specific position (used after reflection completion)
         
@@ -1239,6 +1197,7 @@ class WorkflowExecutor:
             start_position: Position to start from
             executed_nodes: Dictionary of executed nodes
             deployment_context: Optional deployment context for UserProxyAgent handling
+            stream_callback: Optional async callback for streamed agent tokens
         """
         logger.info(f"▶️ CONTINUE WORKFLOW: Resuming from position {start_position} with {len(execution_sequence) - start_position} remaining nodes")
         
@@ -1262,13 +1221,14 @@ class WorkflowExecutor:
         
         # Initialize message sequence manager
         message_manager = MessageSequenceManager(messages)
+        control = await open_control_channel(execution_record.execution_id)
         
         try:
             # Execute remaining nodes in sequence
             for node_index in range(start_position, len(execution_sequence)):
-                # Check if execution has been stopped
-                await sync_to_async(execution_record.refresh_from_db)()
-                if execution_record.status == WorkflowExecutionStatus.STOPPED:
+                # Check if execution has been stopped (nodes here are saved as they finish, so the in-memory record is current)
+                if await control.is_stopped():
+                    execution_record.status = WorkflowExecutionStatus.STOPPED
                     logger.info(f"🛑 CONTINUE WORKFLOW: Execution {execution_record.execution_id} has been stopped, terminating")
                     return {
                         'status': 'stopped',
@@ -1493,7 +1453,9 @@ class WorkflowExecutor:
                     
                     # Make LLM call
                     start_time = timezone.now()
-                    llm_response = await llm_provider.generate_response(prompt=combined_prompt)
+                    llm_response = await self._generate_agent_response(
+                        llm_provider, combined_prompt, node, execution_record.execution_id, stream_callback
+                    )
                     end_time = timezone.now()
                     
                     if llm_response.error:
@@ -1521,7 +1483,8 @@ class WorkflowExecutor:
                         metadata={
                             'llm_provider': agent_config['llm_provider'],
                             'llm_model': agent_config['llm_model'],
-                            'temperature': agent_config.get('temperature', 0.7)  # CRITICAL FIX: Use .get() with default for safety
+                            'temperature': agent_config.get('temperature', 0.7),  # CRITICAL FIX: Use .get() with default for safety
+                            'http_connection': llm_response.connection_stats
                         }
                     )
                     
@@ -1695,309 +1658,259 @@ class WorkflowExecutor:
                 'execution_id': execution_record.execution_id,
                 'error': str(e)
             }
+        finally:
+            control.close()
     
-    async def _save_messages_to_database(self, messages, execution_record):
+    async def _generate_agent_response(self, llm_provider, prompt: str, node: Dict[str, Any], execution_id: str,
+                                       stream_callback: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None) -> LLMResponse:
         """
-        Save messages to database with proper error handling and duplicate prevention
+        Run an agent's LLM call, streaming tokens to stream_callback when one is attached.
+        Without a callback this is a plain generate_response call.
         """
-        # Get existing message sequences to prevent duplicates
-        from users.models import WorkflowExecutionMessage
+        if stream_callback is None:
+            return await llm_provider.generate_response(prompt=prompt)
         
-        try:
-            existing_sequences = await sync_to_async(set)(
-                WorkflowExecutionMessage.objects.filter(
-                    execution=execution_record
-                ).values_list('sequence', flat=True)
-            )
-        except Exception as e:
-            logger.error(f"❌ SAVE MESSAGE: Error getting existing sequences: {e}")
-            existing_sequences = set()
+        node_data = node.get('data', {})
+        stream_context = {
+            'execution_id': execution_id,
+            'node_id': node.get('id'),
+            'agent_name': node_data.get('name', f"Node_{node.get('id')}"),
+            'agent_type': node.get('type'),
+        }
         
-        logger.info(f"💾 SAVE MESSAGE: Found {len(existing_sequences)} existing message sequences in database")
+        await self._emit_stream_event(stream_callback, {'event': 'agent_stream_start', **stream_context})
         
-        saved_count = 0
-        skipped_count = 0
+        async def on_token(delta: str):
+            await stream_callback({'event': 'agent_token', **stream_context, 'delta': delta})
         
-        for message in messages:
-            # Skip messages that already exist in database
-            if message['sequence'] in existing_sequences:
-                skipped_count += 1
-                logger.debug(f"⏭️ SAVE MESSAGE: Skipping duplicate sequence {message['sequence']} ({message['agent_name']})")
-                continue
-                
-            # Parse timestamp from message
-            try:
-                message_timestamp = datetime.fromisoformat(message['timestamp'].replace('Z', '+00:00'))
-                if message_timestamp.tzinfo is None:
-                    message_timestamp = timezone.make_aware(message_timestamp)
-            except (KeyError, ValueError):
-                message_timestamp = timezone.now()
-            
-            try:
-                await sync_to_async(WorkflowExecutionMessage.objects.create)(
-                    execution=execution_record,
-                    sequence=message['sequence'],
-                    agent_name=message['agent_name'],
-                    agent_type=message['agent_type'],
-                    content=message['content'],
-                    message_type=message['message_type'],
-                    timestamp=message_timestamp,
-                    response_time_ms=message['response_time_ms'],
-                    token_count=message.get('token_count'),
-                    metadata=message.get('metadata', {})
-                )
-                saved_count += 1
-                logger.debug(f"💾 SAVE MESSAGE: Saved sequence {message['sequence']} ({message['agent_name']})")
-            except Exception as save_error:
-                logger.error(f"❌ SAVE MESSAGE: Failed to save message {message['sequence']}: {save_error}")
+        response = await llm_provider.generate_response_streaming(prompt=prompt, on_token=on_token)
         
-        logger.info(f"💾 SAVE MESSAGE: Saved {saved_count} new messages, skipped {skipped_count} duplicates")
+        await self._emit_stream_event(stream_callback, {
+            'event': 'agent_stream_end',
+            **stream_context,
+            'error': response.error,
+            'response_time_ms': response.response_time_ms,
+            'first_token_ms': response.first_token_ms,
+            'token_count': response.token_count
+        })
+        if response.first_token_ms is not None:
+            logger.info(f"⚡ STREAM: {stream_context['agent_name']} first token after {response.first_token_ms}ms (total {response.response_time_ms}ms)")
+        return response
     
-    def _find_ready_nodes(self, execution_sequence: List[Dict[str, Any]], executed_nodes: Dict[str, str],
-                         graph_json: Dict[str, Any], current_index: int) -> List[Tuple[int, Dict[str, Any]]]:
+    async def _emit_stream_event(self, stream_callback, event: Dict[str, Any]):
+        """Deliver a stream event; a broken listener must never fail the workflow"""
+        try:
+            await stream_callback(event)
+        except Exception as e:
+            logger.warning(f"⚠️ STREAM: Failed to deliver {event.get('event')} event: {e}")
+    
+    async def _save_messages_to_database(self, messages, execution_record, event_log: Optional[ExecutionEventLog] = None):
         """
-        Find all nodes that are ready to execute in parallel (all dependencies satisfied)
+        Save messages to database with proper error handling and duplicate prevention
         
-        Args:
-            execution_sequence: Full execution sequence
-            executed_nodes: Dictionary of executed node outputs
-            graph_json: Full workflow graph
-            current_index: Current position in execution sequence
-            
-        Returns:
-            List of (index, node) tuples for nodes ready to execute in parallel
+        Messages already written (by the execution's event log or an earlier save)
+        are skipped; the rest go out in one batch insert.
         """
-        ready_nodes = []
-        edges = graph_json.get('edges', [])
-        
-        # Build dependency map: node_id -> set of source node_ids it depends on
-        dependency_map = {}
-        nodes = graph_json.get('nodes', [])
-        node_map = {node.get('id'): node for node in nodes}  # Create lookup for fast access
-        
-        for edge in edges:
-            edge_type = edge.get('type', 'sequential')
-            source_id = edge.get('source')
-            target_id = edge.get('target')
-            
-            # Get target node to check if it's a UserProxyAgent
-            target_node = node_map.get(target_id)
-            is_user_proxy = (target_node and 
-                            target_node.get('type') == 'UserProxyAgent' and
-                            target_node.get('data', {}).get('require_human_input', True))
-            
-            # Include sequential edges for all nodes
-            # Include reflection edges ONLY for UserProxyAgent nodes (they depend on reflection sources)
-            if edge_type == 'sequential' or (edge_type == 'reflection' and is_user_proxy):
-                if target_id not in dependency_map:
-                    dependency_map[target_id] = set()
-                dependency_map[target_id].add(source_id)
-        
-        # Check nodes from current_index onwards
-        for i in range(current_index, len(execution_sequence)):
-            node = execution_sequence[i]
-            node_id = node.get('id')
-            node_type = node.get('type')
-            
-            # Skip if already executed
-            if node_id in executed_nodes:
-                continue
-            
-            # Skip StartNode and EndNode (handled separately)
-            if node_type in ['StartNode', 'EndNode']:
-                continue
-            
-            # Check if all dependencies are satisfied
-            dependencies = dependency_map.get(node_id, set())
-            all_dependencies_satisfied = all(dep_id in executed_nodes for dep_id in dependencies)
-            
-            if all_dependencies_satisfied:
-                # CRITICAL FIX: Check if this node depends on any node that's currently executing in parallel
-                # If a dependency is in the current ready_nodes batch, this node should wait
-                depends_on_parallel_node = False
-                node_name = node.get('data', {}).get('name', node_id)
-                for dep_id in dependencies:
-                    # Check if this dependency is in the ready_nodes we're about to execute
-                    # (This prevents nodes from being ready if their dependency is executing in parallel)
-                    for ready_idx, ready_node in ready_nodes:
-                        if ready_node.get('id') == dep_id:
-                            depends_on_parallel_node = True
-                            dep_name = ready_node.get('data', {}).get('name', dep_id)
-                            logger.info(f"⏳ PARALLEL: Node {node_name} depends on {dep_name} which is executing in parallel - will wait")
-                            break
-                    if depends_on_parallel_node:
-                        break
-                
-                if not depends_on_parallel_node:
-                    ready_nodes.append((i, node))
-                else:
-                    # This node depends on a node that's executing in parallel, so it must wait
-                    break
-            else:
-                # If this node's dependencies aren't satisfied, no nodes after it can be ready either
-                # (due to topological sort ordering)
-                break
-        
-        return ready_nodes
+        event_log = event_log or ExecutionEventLog(execution_record)
+        try:
+            added = event_log.record(messages)
+            saved_count = await event_log.flush()
+            logger.info(f"💾 SAVE MESSAGE: Saved {saved_count} new messages, skipped {len(messages) - added} duplicates "
+                       f"(event log: {event_log.get_stats()})")
+        except Exception as e:
+            logger.error(f"❌ SAVE MESSAGE: Error saving messages: {e}")
     
-    async def _execute_nodes_in_parallel(self, ready_nodes: List[Tuple[int, Dict[str, Any]]],
-                                        workflow, graph_json, executed_nodes, conversation_history,
-                                        execution_record, messages, message_sequence, agents_involved,
-                                        total_response_time, providers_used, project_id) -> List[Dict[str, Any]]:
+    async def _execute_agent_node(self, node_tuple: Tuple[int, Dict[str, Any]], workflow, graph_json,
+                                  executed_nodes, conversation_history, execution_record, project_id,
+                                  stream_callback: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None) -> Dict[str, Any]:
         """
-        Execute multiple nodes in parallel using asyncio.gather
-        
-        Args:
-            ready_nodes: List of (index, node) tuples to execute
-            workflow: Workflow instance
-            graph_json: Full workflow graph
-            executed_nodes: Current executed nodes state
-            conversation_history: Current conversation history
-            execution_record: Execution record
-            messages: Current messages list
-            message_sequence: Current message sequence number
-            agents_involved: Set of agents involved
-            total_response_time: Total response time so far
-            providers_used: List of providers used
-            project_id: Project ID
-            
-        Returns:
-            List of execution results for each node
+        Run one plain agent turn (prompt + LLM call) for concurrent execution.
+        Never raises; failures are returned as a result with an 'error'.
         """
-        async def execute_single_node(node_tuple):
-            """Execute a single node and return result"""
-            idx, node = node_tuple
-            node_id = node.get('id')
-            node_type = node.get('type')
-            node_data = node.get('data', {})
-            node_name = node_data.get('name', f'Node_{node_id}')
+        idx, node = node_tuple
+        node_id = node.get('id')
+        node_type = node.get('type')
+        node_data = node.get('data', {})
+        node_name = node_data.get('name', f'Node_{node_id}')
+        
+        try:
+            logger.info(f"🔀 PARALLEL: Executing {node_name} (type: {node_type})")
             
-            try:
-                logger.info(f"🔀 PARALLEL: Executing {node_name} (type: {node_type})")
-                
-                # Handle UserProxyAgent separately (can't parallelize if requires human input)
-                if node_type == 'UserProxyAgent' and node_data.get('require_human_input', True):
-                    return {
-                        'node_id': node_id,
-                        'node_name': node_name,
-                        'executed': False,
-                        'paused': True,
-                        'index': idx
-                    }
-                
-                # Get LLM provider
-                agent_config = {
-                    'llm_provider': node_data.get('llm_provider', 'openai'),
-                    'llm_model': node_data.get('llm_model', 'gpt-3.5-turbo')
-                }
-                
-                project = await sync_to_async(lambda: workflow.project)()
-                llm_provider = await self.llm_provider_manager.get_llm_provider(agent_config, project)
-                if not llm_provider:
-                    raise Exception(f"Failed to create LLM provider for agent {node_name}")
-                
-                # Get input sources - use a snapshot of executed_nodes to avoid race conditions
-                # Each parallel execution gets its own snapshot
-                input_sources = self.workflow_parser.find_multiple_inputs_to_node(node_id, graph_json)
-                
-                # Validate inputs
-                if len(input_sources) > 0:
-                    missing_inputs = []
-                    for input_source in input_sources:
-                        source_id = input_source.get('source_id')
-                        if source_id not in executed_nodes:
-                            missing_inputs.append(source_id)
-                    if missing_inputs:
-                        raise Exception(f"Missing required inputs: {missing_inputs}")
-                
-                # Craft prompt - use conversation_history snapshot
-                # Note: In parallel execution, conversation_history may not include other parallel nodes yet
-                # This is correct - each node sees the state before parallel execution started
-                if len(input_sources) > 1:
-                    aggregated_context = self.workflow_parser.aggregate_multiple_inputs(input_sources, executed_nodes)
-                    prompt = await self.chat_manager.craft_conversation_prompt_with_docaware(
-                        aggregated_context, node, str(project_id), conversation_history
-                    )
-                else:
-                    prompt = await self.chat_manager.craft_conversation_prompt(
-                        conversation_history, node, str(project_id)
-                    )
-                
-                # Execute LLM call
-                agent_response = await llm_provider.generate_response(prompt=prompt)
-                
-                if agent_response.error:
-                    raise Exception(f"Agent {node_name} error: {agent_response.error}")
-                
-                agent_response_text = agent_response.text.strip()
-                response_time_ms = getattr(agent_response, 'response_time_ms', 0) if hasattr(agent_response, 'response_time_ms') else 0
-                
-                logger.info(f"✅ PARALLEL: {node_name} completed - {len(agent_response_text)} chars, {response_time_ms}ms")
-                
-                return {
-                    'node_id': node_id,
-                    'node_name': node_name,
-                    'executed': True,
-                    'output': agent_response_text,
-                    'response_time_ms': response_time_ms,
-                    'token_count': getattr(agent_response, 'token_count', None),
-                    'agents_involved': {node_name},
-                    'providers_used': [agent_config['llm_provider']],
-                    'metadata': {
-                        'llm_provider': agent_config['llm_provider'],
-                        'llm_model': agent_config['llm_model'],
-                        'cost_estimate': getattr(agent_response, 'cost_estimate', None)
-                    },
-                    'index': idx
-                }
-            except Exception as e:
-                logger.error(f"❌ PARALLEL: {node_name} failed: {e}")
+            # Handle UserProxyAgent separately (can't parallelize if requires human input)
+            if node_type == 'UserProxyAgent' and node_data.get('require_human_input', True):
                 return {
                     'node_id': node_id,
                     'node_name': node_name,
                     'executed': False,
-                    'error': str(e),
+                    'paused': True,
                     'index': idx
                 }
+            
+            # Get LLM provider
+            agent_config = {
+                'llm_provider': node_data.get('llm_provider', 'openai'),
+                'llm_model': node_data.get('llm_model', 'gpt-3.5-turbo')
+            }
+            
+            project = await sync_to_async(lambda: workflow.project)()
+            llm_provider = await self.llm_provider_manager.get_llm_provider(agent_config, project)
+            if not llm_provider:
+                raise Exception(f"Failed to create LLM provider for agent {node_name}")
+            
+            # Get input sources - use a snapshot of executed_nodes to avoid race conditions
+            # Each parallel execution gets its own snapshot
+            input_sources = self.workflow_parser.find_multiple_inputs_to_node(node_id, graph_json)
+            
+            # Validate inputs
+            if len(input_sources) > 0:
+                missing_inputs = []
+                for input_source in input_sources:
+                    source_id = input_source.get('source_id')
+                    if source_id not in executed_nodes:
+                        missing_inputs.append(source_id)
+                if missing_inputs:
+                    raise Exception(f"Missing required inputs: {missing_inputs}")
+            
+            # Craft prompt - use conversation_history snapshot
+            # Note: In parallel execution, conversation_history may not include other parallel nodes yet
+            # This is correct - each node sees the state before parallel execution started
+            if len(input_sources) > 1:
+                aggregated_context = self.workflow_parser.aggregate_multiple_inputs(input_sources, executed_nodes)
+                prompt = await self.chat_manager.craft_conversation_prompt_with_docaware(
+                    aggregated_context, node, str(project_id), conversation_history
+                )
+            else:
+                prompt = await self.chat_manager.craft_conversation_prompt(
+                    conversation_history, node, str(project_id)
+                )
+            
+            # Execute LLM call
+            agent_response = await self._generate_agent_response(
+                llm_provider, prompt, node, execution_record.execution_id, stream_callback
+            )
+            
+            if agent_response.error:
+                raise Exception(f"Agent {node_name} error: {agent_response.error}")
+            
+            agent_response_text = agent_response.text.strip()
+            if not agent_response_text:
+                raise Exception(f"Agent {node_name} returned an empty response. This indicates an LLM error or configuration issue.")
+            response_time_ms = getattr(agent_response, 'response_time_ms', 0) if hasattr(agent_response, 'response_time_ms') else 0
+            
+            logger.info(f"✅ PARALLEL: {node_name} completed - {len(agent_response_text)} chars, {response_time_ms}ms")
+            
+            return {
+                'node_id': node_id,
+                'node_name': node_name,
+                'executed': True,
+                'output': agent_response_text,
+                'response_time_ms': response_time_ms,
+                'token_count': getattr(agent_response, 'token_count', None),
+                'agents_involved': {node_name},
+                'providers_used': [agent_config['llm_provider']],
+                'metadata': {
+                    'llm_provider': agent_config['llm_provider'],
+                    'llm_model': agent_config['llm_model'],
+                    'cost_estimate': getattr(agent_response, 'cost_estimate', None),
+                    'http_connection': getattr(agent_response, 'connection_stats', None)
+                },
+                'index': idx
+            }
+        except Exception as e:
+            logger.error(f"❌ PARALLEL: {node_name} failed: {e}")
+            return {
+                'node_id': node_id,
+                'node_name': node_name,
+                'executed': False,
+                'error': str(e),
+                'index': idx
+            }
+    
+    async def _run_ready_nodes_concurrently(self, ready_nodes: List[Tuple[int, Dict[str, Any]]], scheduler,
+                                            timing, max_concurrent_nodes: int, workflow, graph_json,
+                                            executed_nodes, conversation_history, execution_record, messages,
+                                            message_sequence, agents_involved, total_response_time,
+                                            providers_used, project_id, event_log: ExecutionEventLog,
+                                            stream_callback: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None) -> Dict[str, Any]:
+        """
+        Run agent nodes concurrently, completion-driven.
         
-        # Execute all nodes in parallel
-        results = await asyncio.gather(*[execute_single_node(node_tuple) for node_tuple in ready_nodes])
-        
-        # Process results and create messages (in order of execution sequence)
-        results.sort(key=lambda r: r['index'])
-        next_sequence = message_sequence
-        new_messages = []
-        
-        for result in results:
-            if result.get('executed'):
-                # Get node type from original node
-                node_idx = result['index']
-                node_type = next((n[1].get('type', 'AssistantAgent') for n in ready_nodes if n[0] == node_idx), 'AssistantAgent')
-                
-                # Create message for this node
-                new_messages.append({
-                    'sequence': next_sequence,
-                    'agent_name': result['node_name'],
-                    'agent_type': node_type,
-                    'content': result['output'],
-                    'message_type': 'chat',
-                    'timestamp': timezone.now().isoformat(),
-                    'response_time_ms': result.get('response_time_ms', 0),
-                    'token_count': result.get('token_count'),
-                    'metadata': result.get('metadata', {})
-                })
-                next_sequence += 1
+        Each finished node releases its dependents through the scheduler's in-degree
+        counters; dependents the concurrent runner can handle start immediately, up
+        to ``max_concurrent_nodes`` at a time, without waiting for unrelated branches.
+        Returns once nothing is left in flight.
         
-        # Append new messages to existing messages list
-        messages.extend(new_messages)
+        executed_nodes, messages, agents_involved and providers_used are updated in
+        place; returns the new conversation_history, message_sequence and
+        total_response_time.
+        """
+        queue = list(ready_nodes)
+        in_flight: Dict[asyncio.Task, Tuple[int, Dict[str, Any]]] = {}
         
-        # Update execution record with all messages
-        execution_record.messages_data = messages
-        await sync_to_async(execution_record.save)(update_fields=['messages_data'])
+        def launch_queued():
+            while queue and len(in_flight) < max(1, max_concurrent_nodes):
+                idx, node = queue.pop(0)
+                scheduler.mark_running(node.get('id'))
+                timing.node_start(node.get('id'))
+                # Each node sees the conversation as of its own start
+                task = asyncio.create_task(self._execute_agent_node(
+                    (idx, node), workflow, graph_json, executed_nodes, conversation_history,
+                    execution_record, project_id, stream_callback
+                ))
+                in_flight[task] = (idx, node)
         
-        logger.info(f"💾 PARALLEL: Saved {len(new_messages)} messages from parallel execution")
+        launch_queued()
+        while in_flight:
+            done, _ = await asyncio.wait(in_flight.keys(), return_when=asyncio.FIRST_COMPLETED)
+            
+            for task in sorted(done, key=lambda t: in_flight[t][0]):
+                idx, node = in_flight.pop(task)
+                result = task.result()
+                node_id = result['node_id']
+                timing.node_end(node_id)
+                
+                if result.get('executed'):
+                    executed_nodes[node_id] = result['output']
+                    conversation_history += f"\n{result['node_name']}: {result['output']}"
+                    agents_involved.update(result.get('agents_involved', []))
+                    total_response_time += result.get('response_time_ms', 0)
+                    for provider in result.get('providers_used', []):
+                        if provider not in providers_used:
+                            providers_used.append(provider)
+                    
+                    # Messages are logged in completion order
+                    messages.append({
+                        'sequence': message_sequence,
+                        'agent_name': result['node_name'],
+                        'agent_type': node.get('type', 'AssistantAgent'),
+                        'content': result['output'],
+                        'message_type': 'chat',
+                        'timestamp': timezone.now().isoformat(),
+                        'response_time_ms': result.get('response_time_ms', 0),
+                        'token_count': result.get('token_count'),
+                        'metadata': result.get('metadata', {})
+                    })
+                    message_sequence += 1
+                
+                for dependent_id in scheduler.mark_finished(node_id, succeeded=bool(result.get('executed'))):
+                    dependent = scheduler.nodes[dependent_id]
+                    if scheduler.is_eager(dependent):
+                        logger.info(f"🔀 PARALLEL: {dependent.get('data', {}).get('name', dependent_id)} ready after "
+                                   f"{result['node_name']} - starting without waiting for other branches")
+                        queue.append((scheduler.position[dependent_id], dependent))
+            
+            execution_record.executed_nodes = executed_nodes
+            execution_record.conversation_history = conversation_history
+            execution_record.messages_data = messages
+            await event_log.append(messages)
+            
+            launch_queued()
         
-        return results
+        return {
+            'conversation_history': conversation_history,
+            'message_sequence': message_sequence,
+            'total_response_time': total_response_time
+        }
     
     def get_workflow_execution_summary(self, workflow: AgentWorkflow) -> Dict[str, Any]:
         """
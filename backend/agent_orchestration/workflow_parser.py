@@ -5,8 +5,11 @@ Workflow Parser
 Handles workflow graph parsing and multiple input processing for conversation orchestration.
 """
 
+import heapq
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+
+from .execution_plan import ExecutionPlan, compute_structure_key, get_execution_plan_cache, requires_human_input
 
 logger = logging.getLogger('conversation_orchestrator')
 
@@ -16,55 +19,135 @@ class WorkflowParser:
     Parses workflow graphs and handles multiple input aggregation
     """
     
+    def get_execution_plan(self, graph_json: Dict[str, Any]) -> ExecutionPlan:
+        """Compiled plan for the graph's structure, from the process-wide plan cache"""
+        return get_execution_plan_cache().get_or_compile(graph_json, self.compile_execution_plan)
+    
     def parse_workflow_graph(self, graph_json: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         Parse workflow graph into linear execution sequence using TOPOLOGICAL SORT
         This respects the visual flow by processing nodes in dependency order.
         It excludes nodes that are only targets of reflection edges from the main sequence.
+        
+        The sort runs once per graph structure; later calls reuse the cached plan.
         """
-        nodes = graph_json.get('nodes', [])
-        edges = graph_json.get('edges', [])
-
-        if not nodes:
+        if not graph_json.get('nodes', []):
             logger.warning("⚠️ ORCHESTRATOR: No nodes found in workflow graph")
             return []
-
+        return self.get_execution_plan(graph_json).execution_sequence(graph_json)
+    
+    def compile_execution_plan(self, graph_json: Dict[str, Any], key: Optional[str] = None) -> ExecutionPlan:
+        """
+        Build the ExecutionPlan for a graph: adjacency lists, execution sequence,
+        dependencies, aggregation points, parallel groups and reflection edges.
+        """
+        nodes = graph_json.get('nodes', [])
+        edges = graph_json.get('edges', [])
+        node_index = {node['id']: index for index, node in enumerate(nodes)}
+        
+        # Adjacency lists by edge position, built in one pass over the edges
+        incoming: Dict[str, List[int]] = {}
+        outgoing: Dict[str, List[int]] = {}
+        incoming_edges: Dict[str, List[Dict[str, Any]]] = {}
+        for position, edge in enumerate(edges):
+            incoming_edges.setdefault(edge['target'], []).append(edge)
+            if edge.get('source') in node_index:
+                incoming.setdefault(edge.get('target'), []).append(position)
+            if edge.get('target') in node_index:
+                outgoing.setdefault(edge.get('source'), []).append(position)
+        
+        sequence_ids, excluded_ids = self._build_execution_sequence(nodes, edges, node_index, incoming_edges) if nodes else ([], set())
+        sequence_set = set(sequence_ids)
+        
+        reflection_edges = tuple(position for position, edge in enumerate(edges) if edge.get('type', 'sequential') == 'reflection')
+        reflection_sources = frozenset(edges[position].get('source') for position in reflection_edges)
+        
+        dependencies: Dict[str, set] = {node_id: set() for node_id in sequence_ids}
+        for edge in edges:
+            edge_type = edge.get('type', 'sequential')
+            target_id = edge.get('target')
+            if target_id not in dependencies:
+                continue
+            if edge_type == 'sequential' or (edge_type == 'reflection' and requires_human_input(nodes[node_index[target_id]])):
+                dependencies[target_id].add(edge.get('source'))
+        
+        # Parallel groups: dependency depth within the sequence
+        level: Dict[str, int] = {}
+        for node_id in sequence_ids:
+            level[node_id] = 1 + max((level[dep] for dep in dependencies[node_id] if dep in level), default=-1)
+        groups: Dict[int, List[str]] = {}
+        for node_id in sequence_ids:
+            groups.setdefault(level[node_id], []).append(node_id)
+        
+        # Sequential edges whose source is ordered after its target
+        position_in_sequence = {node_id: position for position, node_id in enumerate(sequence_ids)}
+        order_violations = []
+        for edge in edges:
+            if edge.get('type') != 'sequential':
+                continue
+            source_id, target_id = edge.get('source'), edge.get('target')
+            if source_id in position_in_sequence and target_id in position_in_sequence and \
+                    position_in_sequence[source_id] >= position_in_sequence[target_id]:
+                source_name = nodes[node_index[source_id]].get('data', {}).get('name', source_id)
+                target_name = nodes[node_index[target_id]].get('data', {}).get('name', target_id)
+                order_violations.append(f"{target_name} appears before dependency {source_name}")
+        
+        plan = ExecutionPlan(
+            key=key or compute_structure_key(graph_json),
+            node_index=node_index,
+            sequence_ids=tuple(sequence_ids),
+            excluded_ids=frozenset(excluded_ids),
+            incoming={node_id: tuple(positions) for node_id, positions in incoming.items()},
+            outgoing={node_id: tuple(positions) for node_id, positions in outgoing.items()},
+            dependencies={node_id: frozenset(deps) for node_id, deps in dependencies.items()},
+            reflection_edges=reflection_edges,
+            reflection_sources=reflection_sources,
+            aggregation_points=frozenset(node_id for node_id in sequence_set if len(incoming.get(node_id, ())) > 1),
+            parallel_groups=tuple(tuple(groups[depth]) for depth in sorted(groups)),
+            order_violations=tuple(order_violations),
+        )
+        logger.info(f"🧩 ORCHESTRATOR: Compiled execution plan {plan.key[:12]} - {len(plan.sequence_ids)} nodes, "
+                   f"{len(plan.parallel_groups)} parallel groups, {len(plan.aggregation_points)} aggregation points")
+        return plan
+    
+    def _build_execution_sequence(self, nodes: List[Dict[str, Any]], edges: List[Dict[str, Any]],
+                                  node_index: Dict[str, int],
+                                  incoming_edges: Dict[str, List[Dict[str, Any]]]) -> Tuple[List[str], set]:
+        """Topological sort (Kahn) of the main sequence; returns (node ids in order, excluded ids)"""
         logger.info(f"🔗 ORCHESTRATOR: Parsing workflow with {len(nodes)} nodes and {len(edges)} edges")
 
         # Identify nodes that should be excluded from main execution sequence:
         # 1. Nodes that are exclusively targets of reflection edges (except UserProxyAgent with human input)
         # 2. Nodes that are exclusively targets of delegate edges (DelegateAgent nodes)
         excluded_targets = set()
-        all_targets = {edge['target'] for edge in edges}
-        for target_id in all_targets:
-            incoming_edges = [edge for edge in edges if edge['target'] == target_id]
-            if incoming_edges:
+        for target_id, target_incoming in incoming_edges.items():
+            if target_incoming:
                 # Get target node to check its type
-                target_node = next((n for n in nodes if n['id'] == target_id), None)
-                if not target_node:
+                if target_id not in node_index:
                     continue
+                target_node = nodes[node_index[target_id]]
                     
                 target_name = target_node.get('data', {}).get('name', target_id)
                 target_type = target_node.get('type', 'Unknown')
                 target_data = target_node.get('data', {})
-                edge_types = [edge.get('type', 'sequential') for edge in incoming_edges]
+                edge_types = [edge.get('type', 'sequential') for edge in target_incoming]
                 
                 # Check if ALL incoming edges are delegate type
-                all_delegate = all(edge.get('type') == 'delegate' for edge in incoming_edges)
+                all_delegate = all(edge.get('type') == 'delegate' for edge in target_incoming)
                 
                 # Check if ALL incoming edges are reflection type
-                all_reflection = all(edge.get('type') == 'reflection' for edge in incoming_edges)
+                all_reflection = all(edge.get('type') == 'reflection' for edge in target_incoming)
                 
                 # CRITICAL: DelegateAgent nodes connected via delegate edges should be excluded
                 # They are discovered and executed internally by GroupChatManager
                 if all_delegate and target_type == 'DelegateAgent':
-                    logger.info(f"🔍 DELEGATE CHECK: Node {target_name} ({target_type}) has {len(incoming_edges)} delegate-only edges: {edge_types} - EXCLUDING from main sequence (will be handled by GroupChatManager)")
+                    logger.info(f"🔍 DELEGATE CHECK: Node {target_name} ({target_type}) has {len(target_incoming)} delegate-only edges: {edge_types} - EXCLUDING from main sequence (will be handled by GroupChatManager)")
                     excluded_targets.add(target_id)
                 # CRITICAL FIX: UserProxyAgent nodes that require human input should be included
                 # even if they only have reflection edges, because they pause the workflow
                 elif all_reflection and not (target_type == 'UserProxyAgent' and target_data.get('require_human_input', True)):
                     # This is a reflection-only target that doesn't require human input - exclude it
-                    logger.info(f"🔍 REFLECTION CHECK: Node {target_name} ({target_type}) has {len(incoming_edges)} reflection-only edges: {edge_types} - EXCLUDING from main sequence")
+                    logger.info(f"🔍 REFLECTION CHECK: Node {target_name} ({target_type}) has {len(target_incoming)} reflection-only edges: {edge_types} - EXCLUDING from main sequence")
                     excluded_targets.add(target_id)
                 elif all_reflection and target_type == 'UserProxyAgent' and target_data.get('require_human_input', True):
                     # This is a UserProxyAgent with reflection edges that requires human input - INCLUDE it
@@ -86,10 +169,6 @@ class WorkflowParser:
         adjacency = {node['id']: [] for node in nodes_for_sorting}
         in_degree = {node['id']: 0 for node in nodes_for_sorting}
         
-        # CRITICAL FIX: Track reflection dependencies for UserProxyAgent nodes
-        # This ensures they execute AFTER their dependencies, even if they only have reflection edges
-        reflection_dependencies = {}  # Maps node_id to list of source node_ids that have reflection edges to it
-        
         # Process edges to build graph structure
         for edge in edges:
             source = edge['source']
@@ -105,66 +184,48 @@ class WorkflowParser:
             if source not in node_map or target not in node_map:
                 continue
             
-            # CRITICAL FIX: For UserProxyAgent nodes, include reflection edges in adjacency
-            # This ensures they're queued when their dependencies are processed
-            target_node = node_map.get(target)
-            is_user_proxy_target = (target_node and 
-                                   target_node.get('type') == 'UserProxyAgent' and
-                                   target_node.get('data', {}).get('require_human_input', True))
-            
             if edge_type == 'reflection':
-                if is_user_proxy_target:
-                    # For UserProxyAgent nodes, add reflection edges to adjacency
-                    # This ensures they execute after their reflection source
+                # CRITICAL FIX: For human-input UserProxyAgent nodes, reflection edges order them
+                # after their reflection source; other reflection targets get no dependency
+                if requires_human_input(node_map[target]):
                     adjacency[source].append(target)
                     in_degree[target] += 1
                     logger.info(f"🔗 REFLECTION EDGE: Added reflection edge from {node_map[source].get('data', {}).get('name', source)} to {node_map[target].get('data', {}).get('name', target)} (UserProxyAgent)")
-                else:
-                    # Track reflection dependencies for non-UserProxyAgent nodes (if any)
-                    if target not in reflection_dependencies:
-                        reflection_dependencies[target] = []
-                    reflection_dependencies[target].append(source)
-                continue  # Don't add reflection edges to adjacency for non-UserProxyAgent targets
+                continue
             
             # Add sequential edges to adjacency and in-degree
             adjacency[source].append(target)
             in_degree[target] += 1
         
+        # CRITICAL FIX: Create node order map for deterministic sorting
+        # This ensures nodes execute in consistent order when multiple are ready
+        node_order_map = {node['id']: idx for idx, node in enumerate(nodes_for_sorting)}
+        
         # KAHN'S ALGORITHM for Topological Sort
+        # Min-heap on original node order (not alphabetical) for deterministic order
         execution_sequence = []
         queue = []
         
         # Find all nodes with in-degree 0 (start nodes)
         for node_id, degree in in_degree.items():
             if degree == 0:
-                queue.append(node_id)
+                heapq.heappush(queue, (node_order_map[node_id], node_id))
                 logger.info(f"🚀 ORCHESTRATOR: Found start node: {node_map[node_id].get('data', {}).get('name', node_id)}")
         
         # If no start nodes found, look specifically for StartNode type
         if not queue:
             start_nodes = [n for n in nodes_for_sorting if n.get('type') == 'StartNode']
             if start_nodes:
-                queue = [start_nodes[0]['id']]
+                queue = [(node_order_map[start_nodes[0]['id']], start_nodes[0]['id'])]
                 logger.warning("⚠️ ORCHESTRATOR: No zero in-degree nodes, using StartNode")
             elif nodes_for_sorting:
-                queue = [nodes_for_sorting[0]['id']]
+                queue = [(0, nodes_for_sorting[0]['id'])]
                 logger.warning("⚠️ ORCHESTRATOR: No StartNode found, using first node")
         
         # Process nodes in topological order
         processed_count = 0
-        # CRITICAL FIX: Create node order map for deterministic sorting
-        # This ensures nodes execute in consistent order when multiple are ready
-        node_order_map = {node['id']: idx for idx, node in enumerate(nodes_for_sorting)}
-        
         while queue:
-            # CRITICAL FIX: Sort by original node order, not alphabetically
-            # This ensures deterministic execution order when multiple nodes have in-degree 0
-            queue.sort(key=lambda node_id: node_order_map.get(node_id, 999999))
-            current_node_id = queue.pop(0)
-            
-            if current_node_id not in node_map:
-                logger.error(f"❌ ORCHESTRATOR: Node {current_node_id} not found in node_map")
-                continue
+            _, current_node_id = heapq.heappop(queue)
             
             current_node = node_map[current_node_id]
             execution_sequence.append(current_node)
@@ -175,14 +236,12 @@ class WorkflowParser:
             logger.info(f"🎯 ORCHESTRATOR: [{processed_count}] Added to sequence: {node_name} (type: {node_type})")
             
             # Process all neighbors of the current node
-            if current_node_id in adjacency:
-                for neighbor_id in adjacency[current_node_id]:
-                    if neighbor_id in in_degree:
-                        in_degree[neighbor_id] -= 1
-                        if in_degree[neighbor_id] == 0:
-                            queue.append(neighbor_id)
-                            neighbor_name = node_map[neighbor_id].get('data', {}).get('name', neighbor_id)
-                            logger.info(f"🔗 ORCHESTRATOR: Queued next node: {neighbor_name}")
+            for neighbor_id in adjacency[current_node_id]:
+                in_degree[neighbor_id] -= 1
+                if in_degree[neighbor_id] == 0:
+                    heapq.heappush(queue, (node_order_map[neighbor_id], neighbor_id))
+                    neighbor_name = node_map[neighbor_id].get('data', {}).get('name', neighbor_id)
+                    logger.info(f"🔗 ORCHESTRATOR: Queued next node: {neighbor_name}")
         
         # ROBUST FIX: Ensure ALL nodes are processed (handle any remaining unprocessed nodes)
         # This catches terminal nodes, isolated nodes, or any edge cases
@@ -195,24 +254,16 @@ class WorkflowParser:
             for node_id in unprocessed_ids:
                 node = node_map[node_id]
                 node_name = node.get('data', {}).get('name', node_id)
-                node_type = node.get('type', 'Unknown')
-                node_data = node.get('data', {})
-                is_user_proxy_with_input = (node_type == 'UserProxyAgent' and 
-                                          node_data.get('require_human_input', True))
+                is_user_proxy_with_input = requires_human_input(node)
                 
                 # CRITICAL FIX: Find ALL dependencies (both in execution_sequence and not yet processed)
                 # This ensures UserProxyAgent nodes are placed correctly even if their dependencies haven't been processed yet
-                dependency_node_ids = set()
-                for edge in edges:
-                    if edge['target'] == node_id:
-                        edge_type = edge.get('type', 'sequential')
-                        source_id = edge['source']
-                        
-                        # For UserProxyAgent with human input, include reflection edges
-                        # For other nodes, only check non-reflection edges
-                        if edge_type != 'reflection' or is_user_proxy_with_input:
-                            if source_id in node_map:  # Only consider sources that are in the execution sequence
-                                dependency_node_ids.add(source_id)
+                # For UserProxyAgent with human input, include reflection edges
+                # For other nodes, only check non-reflection edges
+                dependency_node_ids = {
+                    edge['source'] for edge in incoming_edges.get(node_id, [])
+                    if (edge.get('type', 'sequential') != 'reflection' or is_user_proxy_with_input) and edge['source'] in node_map
+                }
                 
                 # Find positions of dependency nodes that are already in execution_sequence
                 dependency_positions = []
@@ -232,21 +283,14 @@ class WorkflowParser:
                 if dependency_positions:
                     insert_position = max(dependency_positions) + 1
                     logger.info(f"✅ ORCHESTRATOR: Adding unprocessed node {node_name} after dependency at position {insert_position + 1}")
-                elif unprocessed_dependencies:
-                    # Dependencies exist but haven't been processed yet - insert at end for now
-                    # They will be reordered when dependencies are processed
-                    insert_position = len(execution_sequence)
-                    logger.info(f"⏳ ORCHESTRATOR: Adding unprocessed node {node_name} at end (dependencies not yet processed)")
                 else:
-                    # No dependencies found - this might be an isolated node
-                    # Check if it has any incoming edges (including reflection)
-                    has_incoming = any(edge['target'] == node_id for edge in edges)
-                    if not has_incoming:
-                        # Truly isolated - but UserProxyAgent nodes should not be here if they have reflection dependencies
-                        insert_position = len(execution_sequence)
+                    # Dependencies not processed yet, or an isolated node - add at the end
+                    insert_position = len(execution_sequence)
+                    if unprocessed_dependencies:
+                        logger.info(f"⏳ ORCHESTRATOR: Adding unprocessed node {node_name} at end (dependencies not yet processed)")
+                    elif node_id not in incoming_edges:
                         logger.warning(f"⚠️ ORCHESTRATOR: Node {node_name} has no dependencies - adding at end (position {insert_position + 1})")
                     else:
-                        insert_position = len(execution_sequence)
                         logger.info(f"✅ ORCHESTRATOR: Adding unprocessed node {node_name} at end (position {insert_position + 1})")
                 
                 execution_sequence.insert(insert_position, node)
@@ -254,17 +298,8 @@ class WorkflowParser:
         
         # CRITICAL FIX: Move End nodes to the end of execution sequence
         # This ensures End nodes execute after all other nodes, including UserProxy inputs
-        end_nodes = []
-        non_end_nodes = []
-        
-        for node in execution_sequence:
-            if node.get('type') == 'EndNode':
-                end_nodes.append(node)
-            else:
-                non_end_nodes.append(node)
-        
-        # Reconstruct sequence with End nodes at the end
-        execution_sequence = non_end_nodes + end_nodes
+        end_nodes = [node for node in execution_sequence if node.get('type') == 'EndNode']
+        execution_sequence = [node for node in execution_sequence if node.get('type') != 'EndNode'] + end_nodes
         
         if end_nodes:
             end_node_names = [node.get('data', {}).get('name', 'Unknown') for node in end_nodes]
@@ -274,34 +309,16 @@ class WorkflowParser:
         logger.info(f"🔗 ORCHESTRATOR: FINAL execution sequence: {' → '.join(sequence_names)}")
         
         logger.info(f"✅ ORCHESTRATOR: Parsed {len(execution_sequence)} nodes using topological sort with End nodes last")
-        return execution_sequence
+        return [node['id'] for node in execution_sequence], excluded_targets
     
     def find_multiple_inputs_to_node(self, target_node_id: str, graph_json: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         Find all nodes that feed into the target node (multiple inputs support)
         Returns list of input node data with metadata
         """
-        input_nodes = []
-        edges = graph_json.get('edges', [])
-        node_map = {node['id']: node for node in graph_json.get('nodes', [])}
-        
-        logger.info(f"🔍 MULTI-INPUT: Finding input sources for node {target_node_id}")
-        
-        for edge in edges:
-            if edge.get('target') == target_node_id:
-                source_id = edge.get('source')
-                if source_id in node_map:
-                    source_node = node_map[source_id]
-                    input_nodes.append({
-                        'node': source_node,
-                        'edge': edge,
-                        'source_id': source_id,
-                        'name': source_node.get('data', {}).get('name', source_id),
-                        'type': source_node.get('type', 'Unknown')
-                    })
-                    logger.info(f"🔗 MULTI-INPUT: Found input source: {source_node.get('data', {}).get('name', source_id)} (type: {source_node.get('type')})")
-        
-        logger.info(f"✅ MULTI-INPUT: Found {len(input_nodes)} input sources for {target_node_id}")
+        input_nodes = self.get_execution_plan(graph_json).input_sources(target_node_id, graph_json)
+        logger.info(f"✅ MULTI-INPUT: Found {len(input_nodes)} input sources for {target_node_id}: "
+                   f"{[source['name'] for source in input_nodes]}")
         return input_nodes
     
     def find_outgoing_edges_from_node(self, source_node_id: str, graph_json: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -312,29 +329,9 @@ class WorkflowParser:
         CRITICAL: This is used to determine which agents should receive input from a UserProxyAgent
         If a UserProxyAgent has no outgoing edges, its input should NOT be routed to any agent
         """
-        target_nodes = []
-        edges = graph_json.get('edges', [])
-        node_map = {node['id']: node for node in graph_json.get('nodes', [])}
-        
-        logger.info(f"🔍 OUTGOING: Finding target nodes for source node {source_node_id}")
-        
-        for edge in edges:
-            if edge.get('source') == source_node_id:
-                target_id = edge.get('target')
-                edge_type = edge.get('type', 'sequential')
-                if target_id in node_map:
-                    target_node = node_map[target_id]
-                    target_nodes.append({
-                        'node': target_node,
-                        'edge': edge,
-                        'target_id': target_id,
-                        'name': target_node.get('data', {}).get('name', target_id),
-                        'type': target_node.get('type', 'Unknown'),
-                        'edge_type': edge_type
-                    })
-                    logger.info(f"🔗 OUTGOING: Found target: {target_node.get('data', {}).get('name', target_id)} (type: {target_node.get('type')}, edge_type: {edge_type})")
-        
-        logger.info(f"✅ OUTGOING: Found {len(target_nodes)} target nodes for source node {source_node_id}")
+        target_nodes = self.get_execution_plan(graph_json).outgoing_targets(source_node_id, graph_json)
+        logger.info(f"✅ OUTGOING: Found {len(target_nodes)} target nodes for source node {source_node_id}: "
+                   f"{[(target['name'], target['edge_type']) for target in target_nodes]}")
         return target_nodes
     
     def aggregate_multiple_inputs(self, input_sources: List[Dict[str, Any]], executed_nodes: Dict[str, str]) -> Dict[str, Any]:
@@ -15,9 +15,11 @@ from users.models import (
     IntelliDocProject, AgentWorkflow, AgentWorkflowStatus,
     WorkflowEvaluation, WorkflowEvaluationResult, EvaluationStatus
 )
+from llm_eval.providers.http_pool import run_with_http_pool
 from .serializers import AgentWorkflowSerializer, AgentWorkflowCreateSerializer
 from .workflow_evaluator import WorkflowEvaluator
-from .conversation_orchestrator import ConversationOrchestrator
+from .jobs import background_requested, serialize_job, submit_job
+from .models import BackgroundJobType
 
 logger = logging.getLogger(__name__)
 
@@ -135,18 +137,38 @@ class AgentWorkflowViewSet(viewsets.ModelViewSet):
         
         logger.info(f"🚀 WORKFLOW EXECUTE: {workflow.workflow_id} by {request.user.email}")
         
+        if background_requested(request):
+            # Long runs go to the job queue; progress arrives over the project websocket
+            job = submit_job(
+                BackgroundJobType.WORKFLOW_EXECUTION, workflow.project, request.user,
+                {'workflow_id': str(workflow.workflow_id)}
+            )
+            return Response({
+                'status': 'queued',
+                'message': 'Workflow execution queued',
+                'workflow_id': str(workflow.workflow_id),
+                'job_id': str(job.job_id),
+                'job': serialize_job(job)
+            }, status=status.HTTP_202_ACCEPTED)
+        
         try:
             # Import here to avoid circular imports
             from .conversation_orchestrator import ConversationOrchestrator
-            import asyncio
+            from .streaming import WebSocketTokenStreamer
             
             # Create orchestrator and execute workflow
             orchestrator = ConversationOrchestrator()
             
+            # Partial agent output goes to the project's websocket group as it is generated
+            token_streamer = WebSocketTokenStreamer(str(project_id))
+            
             async def run_workflow():
-                return await orchestrator.execute_workflow(workflow, request.user)
+                return await orchestrator.execute_workflow(
+                    workflow, request.user,
+                    stream_callback=token_streamer if token_streamer.enabled else None
+                )
             
-            result = asyncio.run(run_workflow())
+            result = run_with_http_pool(run_workflow())
             
             # Check if workflow is paused for human input
             if result.get('status') == 'awaiting_human_input':
@@ -336,6 +358,16 @@ class AgentWorkflowViewSet(viewsets.ModelViewSet):
             messages_from_data = execution.messages_data or []
             logger.info(f"💬 ENHANCED PARSER: Found {len(messages_from_data)} messages in messages_data JSON field")
             
+            if execution.status == 'running':
+                # A running execution appends messages to the event log; messages_data is written at checkpoints
+                logged_messages = list(WorkflowExecutionMessage.objects.filter(execution=execution).order_by('sequence').values(
+                    'sequence', 'agent_name', 'agent_type', 'content', 'message_type',
+                    'timestamp', 'response_time_ms', 'token_count', 'metadata'
+                ))
+                if len(logged_messages) > len(messages_from_data):
+                    logger.info(f"💬 CONVERSATION: Using {len(logged_messages)} messages from the execution log (running)")
+                    messages_from_data = logged_messages
+            
             # ROOT CAUSE FIX: Directly use messages_data without complex duplicate detection
             # Since we're using single source, duplicates shouldn't exist
             for message_data in messages_from_data:
@@ -733,33 +765,35 @@ class AgentWorkflowViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            # Import here to avoid circular imports
-            import asyncio
-            
-            # Create orchestrator to get dependencies
-            orchestrator = ConversationOrchestrator()
-            
-            # Create evaluator
-            evaluator = WorkflowEvaluator(
-                workflow_executor=orchestrator.workflow_executor,
-                llm_provider_manager=orchestrator.llm_provider_manager,
-                workflow_parser=orchestrator.workflow_parser
+            # Parse up front so a malformed file is rejected here rather than in the worker
+            csv_content = csv_file.read()
+            if isinstance(csv_content, bytes):
+                csv_content = csv_content.decode('utf-8')
+            total_rows = len(WorkflowEvaluator.parse_csv_file(csv_content))
+            
+            evaluation = WorkflowEvaluation.objects.create(
+                workflow=workflow,
+                csv_filename=csv_file.name,
+                total_rows=total_rows,
+                status=EvaluationStatus.PENDING,
+                executed_by=request.user
             )
             
-            # Run evaluation asynchronously
-            async def run_evaluation():
-                return await evaluator.evaluate_workflow(
-                    workflow=workflow,
-                    csv_file=csv_file,
-                    executed_by=request.user
-                )
-            
-            evaluation = asyncio.run(run_evaluation())
+            # Rows are run by the background worker; the client polls evaluation_results
+            job = submit_job(
+                BackgroundJobType.WORKFLOW_EVALUATION, workflow.project, request.user,
+                {
+                    'workflow_id': str(workflow.workflow_id),
+                    'evaluation_id': str(evaluation.evaluation_id),
+                    'csv_content': csv_content
+                }
+            )
             
-            logger.info(f"✅ WORKFLOW EVALUATE: Evaluation {evaluation.evaluation_id} completed")
+            logger.info(f"✅ WORKFLOW EVALUATE: Evaluation {evaluation.evaluation_id} queued as job {job.job_id}")
             
             return Response({
                 'evaluation_id': str(evaluation.evaluation_id),
+                'job_id': str(job.job_id),
                 'status': evaluation.status,
                 'total_rows': evaluation.total_rows,
                 'completed_rows': evaluation.completed_rows,
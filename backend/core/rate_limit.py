@@ -0,0 +1,93 @@
+"""
+Rate limits and usage quotas on the shared counter store
+========================================================
+
+- ``check_rate_limit`` is a token bucket (GCRA): ``limit`` requests per
+  ``period`` seconds, refilled continuously, so there is no burst of
+  2 x limit around a fixed window's edge and every process sees the same
+  bucket.
+- ``consume_daily_quota`` is a per-day counter that refuses once the limit is
+  reached, for quotas that reset at midnight.
+
+Both fail open (allow the request) when the store errors, matching how the
+existing limiters behaved.
+"""
+
+import logging
+import math
+from dataclasses import dataclass
+from datetime import datetime, time as datetime_time, timedelta
+from typing import Optional, Tuple
+
+from django.utils import timezone
+
+from .shared_cache import SharedCounterStore, get_shared_store
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: Optional[int]  # seconds until the next request is allowed (None when allowed)
+    reset_after: float  # seconds until the bucket is full again
+
+
+def _result(allowed: bool, used: float, limit: int, period: float) -> RateLimitResult:
+    emission_interval = period / limit
+    remaining = max(0, int((period - used) // emission_interval))
+    retry_after = None
+    if not allowed:
+        # The next token frees up once the oldest use has drained
+        retry_after = max(1, math.ceil(used + emission_interval - period))
+    return RateLimitResult(allowed, limit, remaining, retry_after, round(used, 3))
+
+
+def check_rate_limit(key: str, limit: Optional[int], period: float = 60,
+                     store: Optional[SharedCounterStore] = None) -> RateLimitResult:
+    """Consume one request from ``key``'s bucket of ``limit`` per ``period`` seconds"""
+    if not limit or limit <= 0:
+        return RateLimitResult(True, 0, 0, None, 0.0)
+    try:
+        allowed, used = (store or get_shared_store()).gcra(f"rl:{key}", period / limit, period, cost=1)
+    except Exception as e:
+        logger.error(f"❌ RATE LIMIT: Store error for {key}, allowing request: {e}")
+        return RateLimitResult(True, limit, limit, None, 0.0)
+    return _result(allowed, used, limit, period)
+
+
+def peek_rate_limit(key: str, limit: Optional[int], period: float = 60,
+                    store: Optional[SharedCounterStore] = None) -> RateLimitResult:
+    """Current state of a bucket without consuming from it"""
+    if not limit or limit <= 0:
+        return RateLimitResult(True, 0, 0, None, 0.0)
+    try:
+        _, used = (store or get_shared_store()).gcra(f"rl:{key}", period / limit, period, cost=0)
+    except Exception as e:
+        logger.error(f"❌ RATE LIMIT: Store error for {key}: {e}")
+        used = 0.0
+    return _result(True, used, limit, period)
+
+
+def _seconds_until_midnight() -> int:
+    now = timezone.localtime()
+    midnight = timezone.make_aware(datetime.combine(now.date() + timedelta(days=1), datetime_time.min))
+    return max(1, int((midnight - now).total_seconds()))
+
+
+def consume_daily_quota(key: str, limit: Optional[int], amount: int = 1,
+                        store: Optional[SharedCounterStore] = None) -> Tuple[bool, int]:
+    """
+    Count ``amount`` against today's quota for ``key`` (local date). Returns
+    (allowed, count today); with no limit the use is only counted.
+    """
+    day_key = f"quota:{key}:{timezone.localdate().isoformat()}"
+    try:
+        return (store or get_shared_store()).incr_capped(
+            day_key, amount, limit if limit and limit > 0 else None, _seconds_until_midnight() + 3600
+        )
+    except Exception as e:
+        logger.error(f"❌ QUOTA: Store error for {key}, allowing use: {e}")
+        return True, 0
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -187,6 +188,47 @@ DATABASES = {
 }
 
 
+# Caches
+# https://docs.djangoproject.com/en/5.2/ref/settings/#caches
+# 'default' stays per process unless Redis is configured; 'shared' is seen by
+# every worker process (cached deployment origins; set QUERY_EMBEDDING_SHARED_CACHE=shared
+# to share query embeddings too).
+
+REDIS_URL = os.getenv('REDIS_URL', '')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'default',
+        },
+        'shared': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'shared',
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'shared': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('SHARED_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'aicc_shared_cache')),
+        },
+    }
+
+# Atomic counters for rate limits and daily quotas (core/shared_cache.py, core/rate_limit.py)
+SHARED_CACHE = {
+    'BACKEND': os.getenv('SHARED_CACHE_BACKEND', 'redis' if REDIS_URL else 'sqlite'),  # redis, sqlite (one host) or memory (one process)
+    'REDIS_URL': REDIS_URL,
+    'SQLITE_PATH': os.getenv('SHARED_CACHE_SQLITE_PATH', os.path.join(tempfile.gettempdir(), 'aicc_shared_cache.sqlite3')),
+    'KEY_PREFIX': os.getenv('SHARED_CACHE_KEY_PREFIX', 'aicc'),
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -244,6 +286,11 @@ PROJECT_API_KEY_SETTINGS = {
     'VALIDATION_ENABLED': True,
     'VALIDATION_TIMEOUT': 10,  # seconds
     'USAGE_TRACKING': True,
+    'DERIVED_KEY_CACHE_SIZE': 256,  # Projects whose derived Fernet key is kept in memory
+    'DERIVED_KEY_CACHE_TTL': 3600,  # seconds
+    'PROVIDER_CACHE_SIZE': 128,  # Ready LLM provider instances per process
+    'PROVIDER_CACHE_TTL': 300,  # seconds
+    'KEY_GENERATION_TTL': 30 * 86400,  # seconds a project's shared key generation counter is kept
 }
 
 # Milvus Vector Database Settings
@@ -263,11 +310,135 @@ MILVUS_CONFIG = {
     'secure': False,  # Set to True for TLS connections
 }
 
+# Collection metadata cached by MilvusSearchService (django_milvus_search/collection_cache.py)
+MILVUS_METADATA_CACHE = {
+    'REFRESH_INTERVAL': int(os.getenv('MILVUS_METADATA_REFRESH_INTERVAL', '60')),  # Seconds before background refresh
+    'MISSING_TTL': int(os.getenv('MILVUS_METADATA_MISSING_TTL', '5')),  # Seconds a missing collection is remembered
+}
+
 # Vector Search Settings
 VECTOR_EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
 VECTOR_DIMENSION = 384
 VECTOR_SEARCH_LIMIT = 10
 
+# Batched chunk embedding during document ingestion (vector_search/enhanced_hierarchical_processor.py)
+VECTOR_EMBEDDING_BATCH = {
+    'MAX_BATCH_TOKENS': int(os.getenv('VECTOR_EMBEDDING_MAX_BATCH_TOKENS', '8192')),  # Padded tokens per encode call
+    'MAX_BATCH_SIZE': int(os.getenv('VECTOR_EMBEDDING_MAX_BATCH_SIZE', '64')),  # Texts per encode call
+    'DOCUMENT_WINDOW': int(os.getenv('VECTOR_EMBEDDING_DOCUMENT_WINDOW', '8')),  # Documents whose chunks are encoded together
+}
+
+# Shared SentenceTransformer instances for ingestion, DocAware, evaluator and chatbot (vector_search/model_registry.py)
+EMBEDDING_MODEL_REGISTRY = {
+    'DEVICE': os.getenv('EMBEDDING_MODEL_DEVICE', 'cpu'),
+    'TORCH_NUM_THREADS': int(os.getenv('EMBEDDING_TORCH_NUM_THREADS', '0')),  # 0 keeps torch's default
+    'WARMUP_MODELS': [name.strip() for name in os.getenv('EMBEDDING_WARMUP_MODELS', '').split(',') if name.strip()],  # Loaded at startup
+}
+
+# Query embedding cache for DocAware, hierarchical search and the public chatbot (vector_search/query_embedding_cache.py)
+QUERY_EMBEDDING_CACHE = {
+    'ENABLED': os.getenv('QUERY_EMBEDDING_CACHE_ENABLED', 'True').lower() == 'true',
+    'MAX_ENTRIES': int(os.getenv('QUERY_EMBEDDING_CACHE_SIZE', '4096')),  # Embeddings kept per process
+    'SHARED_CACHE_ALIAS': os.getenv('QUERY_EMBEDDING_SHARED_CACHE', ''),  # Django cache alias shared across processes; empty disables
+    'SHARED_CACHE_TTL': int(os.getenv('QUERY_EMBEDDING_SHARED_CACHE_TTL', '3600')),  # seconds
+}
+
+# Document ingestion workers (vector_search/ingestion.py)
+VECTOR_INGESTION = {
+    'WORKERS': int(os.getenv('VECTOR_INGESTION_WORKERS', '2')),  # Worker processes; 1 processes in the calling thread
+    'DOCUMENTS_PER_TASK': int(os.getenv('VECTOR_INGESTION_DOCUMENTS_PER_TASK', '4')),  # Documents handed to a worker at once
+    'HEARTBEAT_INTERVAL': int(os.getenv('VECTOR_INGESTION_HEARTBEAT_INTERVAL', '10')),  # Seconds between run heartbeats
+    'STALE_RUN_TIMEOUT': int(os.getenv('VECTOR_INGESTION_STALE_RUN_TIMEOUT', '120')),  # Seconds without heartbeat before a run counts as crashed
+    'RESUME_ON_STARTUP': os.getenv('VECTOR_INGESTION_RESUME_ON_STARTUP', 'True').lower() == 'true',
+}
+
+# BM25 keyword index per project collection, kept in step at ingest (vector_search/keyword_index.py)
+KEYWORD_INDEX = {
+    'ENABLED': os.getenv('KEYWORD_INDEX_ENABLED', 'True').lower() == 'true',
+    'DIRECTORY': os.getenv('KEYWORD_INDEX_DIR', os.path.join(MEDIA_ROOT, 'keyword_index')),  # One SQLite FTS5 file per collection
+    'SECTION_TITLE_WEIGHT': float(os.getenv('KEYWORD_INDEX_SECTION_TITLE_WEIGHT', '2.0')),  # bm25() weight relative to chunk content
+    'FILE_NAME_WEIGHT': float(os.getenv('KEYWORD_INDEX_FILE_NAME_WEIGHT', '1.5')),
+}
+
+# DocAware hybrid search: reciprocal-rank fusion of semantic and keyword results (agent_orchestration/docaware/service.py)
+DOCAWARE_HYBRID_SEARCH = {
+    'CANDIDATE_MULTIPLIER': int(os.getenv('DOCAWARE_HYBRID_CANDIDATE_MULTIPLIER', '3')),  # Each ranking contributes search_limit x this candidates
+}
+
+# Workflow node scheduling (agent_orchestration/dag_scheduler.py)
+WORKFLOW_SCHEDULER = {
+    'MAX_CONCURRENT_NODES': int(os.getenv('WORKFLOW_MAX_CONCURRENT_NODES', '4')),  # Agent nodes running at once per workflow execution
+    'MAX_CONCURRENT_DELEGATIONS': int(os.getenv('WORKFLOW_MAX_CONCURRENT_DELEGATIONS', '6')),  # Delegate calls running at once per GroupChatManager (node setting max_concurrent_delegations overrides)
+}
+
+# Subquery-to-delegate routing for GroupChatManager intelligent delegation (agent_orchestration/delegate_router.py)
+DELEGATE_ROUTING = {
+    'EMBEDDING_FAST_PATH': os.getenv('DELEGATE_ROUTING_EMBEDDING_FAST_PATH', 'True').lower() == 'true',  # Skip the LLM when one delegate description clearly matches
+    'FAST_PATH_MIN_SIMILARITY': float(os.getenv('DELEGATE_ROUTING_MIN_SIMILARITY', '0.5')),  # Cosine similarity to the best delegate description
+    'FAST_PATH_MIN_MARGIN': float(os.getenv('DELEGATE_ROUTING_MIN_MARGIN', '0.15')),  # Lead over the runner-up delegate
+    'CACHE_SIZE': int(os.getenv('DELEGATE_ROUTING_CACHE_SIZE', '1024')),  # Routing decisions kept per process
+    'CACHE_TTL': int(os.getenv('DELEGATE_ROUTING_CACHE_TTL', '3600')),  # seconds
+}
+
+# Early termination of reflection loops (agent_orchestration/reflection_convergence.py); connections can set convergence_threshold / convergence_method
+REFLECTION_CONVERGENCE = {
+    'METHOD': os.getenv('REFLECTION_CONVERGENCE_METHOD', 'edit_distance'),  # edit_distance or embedding
+    'THRESHOLD': float(os.getenv('REFLECTION_CONVERGENCE_THRESHOLD', '0.05')),  # Stop once a round changes the answer less than this (0 disables)
+}
+
+# Compiled workflow execution plans (agent_orchestration/execution_plan.py)
+WORKFLOW_PLAN_CACHE = {
+    'MAX_ENTRIES': int(os.getenv('WORKFLOW_PLAN_CACHE_SIZE', '256')),  # Distinct graph structures kept per process
+}
+
+# Batched execution message log (agent_orchestration/execution_log.py)
+WORKFLOW_EVENT_LOG = {
+    'FLUSH_SIZE': int(os.getenv('WORKFLOW_EVENT_LOG_FLUSH_SIZE', '20')),  # Buffered messages per batch insert
+    'FLUSH_INTERVAL': float(os.getenv('WORKFLOW_EVENT_LOG_FLUSH_INTERVAL', '2.0')),  # Max seconds a message waits in the buffer
+}
+
+# Stop / resume / human input signals to running executions (agent_orchestration/execution_control.py)
+EXECUTION_CONTROL = {
+    'SHARED_POLL_INTERVAL': float(os.getenv('EXECUTION_CONTROL_SHARED_POLL_INTERVAL', '0.25')),  # Min seconds between signal reads from the shared store
+    'FALLBACK_POLL_SECONDS': float(os.getenv('EXECUTION_CONTROL_FALLBACK_POLL_SECONDS', '15')),  # Seconds between status reads from the database; 0 disables
+    'RESULT_WAIT_SECONDS': float(os.getenv('EXECUTION_CONTROL_RESULT_WAIT_SECONDS', '5')),  # Max wait for a resumed reflection's result
+}
+
+# Background job queue and worker (agent_orchestration/jobs.py)
+BACKGROUND_JOBS = {
+    'WORKER_CONCURRENCY': int(os.getenv('BACKGROUND_JOB_WORKER_CONCURRENCY', '4')),  # Jobs one worker runs at once
+    'MAX_CONCURRENT_PER_PROJECT': int(os.getenv('BACKGROUND_JOB_MAX_PER_PROJECT', '2')),  # Running jobs per project across all workers; 0 disables the limit
+    'POLL_INTERVAL': float(os.getenv('BACKGROUND_JOB_POLL_INTERVAL', '1.0')),  # Seconds between queue polls when idle
+    'HEARTBEAT_INTERVAL': int(os.getenv('BACKGROUND_JOB_HEARTBEAT_INTERVAL', '10')),  # Seconds between heartbeats / cancel checks
+    'STALE_JOB_TIMEOUT': int(os.getenv('BACKGROUND_JOB_STALE_TIMEOUT', '120')),  # Seconds without heartbeat before a job is requeued
+    'MAX_ATTEMPTS': int(os.getenv('BACKGROUND_JOB_MAX_ATTEMPTS', '3')),  # Attempts per job (human input resumes always 1)
+    'RETRY_BACKOFF': int(os.getenv('BACKGROUND_JOB_RETRY_BACKOFF', '10')),  # Seconds before the first retry, doubled per attempt
+    'EMBEDDED_WORKER': os.getenv('BACKGROUND_JOB_EMBEDDED_WORKER', 'True').lower() == 'true',  # Run a worker thread in web processes; disable when running run_job_worker
+}
+
+# CSV evaluation runner (agent_orchestration/workflow_evaluator.py)
+WORKFLOW_EVALUATION = {
+    'ROW_CONCURRENCY': int(os.getenv('WORKFLOW_EVALUATION_ROW_CONCURRENCY', '8')),  # Rows whose workflow runs at once
+    'SCORING_BATCH_SIZE': int(os.getenv('WORKFLOW_EVALUATION_SCORING_BATCH_SIZE', '32')),  # Finished rows scored and saved together
+    'FLUSH_INTERVAL': float(os.getenv('WORKFLOW_EVALUATION_FLUSH_INTERVAL', '5.0')),  # Max seconds a finished row waits before a partial batch is scored
+    'BERT_SCORE_LANG': os.getenv('WORKFLOW_EVALUATION_BERT_SCORE_LANG', 'en'),  # Language selecting the BERTScore model
+}
+
+# Template usage event store and rollups (templates/advanced/analytics_store.py)
+TEMPLATE_ANALYTICS = {
+    'STORE_PATH': os.getenv('TEMPLATE_ANALYTICS_STORE_PATH', ''),  # '' keeps events.sqlite3 in logs/analytics
+    'RAW_RETENTION_DAYS': int(os.getenv('TEMPLATE_ANALYTICS_RAW_RETENTION_DAYS', '30')),  # Days raw events are kept (0 = forever)
+    'ROLLUP_RETENTION_DAYS': int(os.getenv('TEMPLATE_ANALYTICS_ROLLUP_RETENTION_DAYS', '400')),  # Days daily rollups are kept (0 = forever)
+}
+
+# Background health sampling for template health endpoints (templates/advanced/health_monitoring.py)
+TEMPLATE_HEALTH = {
+    'SAMPLE_INTERVAL': float(os.getenv('TEMPLATE_HEALTH_SAMPLE_INTERVAL', '30')),  # Seconds between health samples
+    'HISTORY_SIZE': int(os.getenv('TEMPLATE_HEALTH_HISTORY_SIZE', '240')),  # Samples kept for trend graphs
+    'CHECK_NETWORK': os.getenv('TEMPLATE_HEALTH_CHECK_NETWORK', 'True').lower() == 'true',  # Probe backend/frontend URLs each sample
+    'NETWORK_TIMEOUT': float(os.getenv('TEMPLATE_HEALTH_NETWORK_TIMEOUT', '2')),  # Seconds per connectivity probe
+}
+
 # Google API Settings (for PDF text extraction using Gemini)
 GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY', '')  # Load from environment
 GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-1.5-flash')  # Model for PDF/image text extraction
@@ -278,6 +449,25 @@ OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo')  # Model for content s
 OPENAI_MAX_TOKENS = int(os.getenv('OPENAI_MAX_TOKENS', '150'))  # Maximum tokens for summary generation
 OPENAI_TEMPERATURE = float(os.getenv('OPENAI_TEMPERATURE', '0.3'))  # Lower temperature for more focused summaries
 
+# Concurrent chunk summary/topic generation during ingestion (vector_search/summarization/pipeline.py)
+CHUNK_SUMMARIZATION = {
+    'MAX_CONCURRENCY': int(os.getenv('CHUNK_SUMMARIZATION_CONCURRENCY', '8')),  # Chunks summarized at once
+    'REQUESTS_PER_MINUTE': int(os.getenv('CHUNK_SUMMARIZATION_RPM', '300')),  # Per-project request budget
+    'TOKENS_PER_MINUTE': int(os.getenv('CHUNK_SUMMARIZATION_TPM', '150000')),  # Per-project token budget
+    'MAX_RETRIES': int(os.getenv('CHUNK_SUMMARIZATION_MAX_RETRIES', '3')),
+    'RETRY_BASE_DELAY': float(os.getenv('CHUNK_SUMMARIZATION_RETRY_DELAY', '1.0')),  # Seconds, exponential with jitter
+    'COMBINED_CALL': os.getenv('CHUNK_SUMMARIZATION_COMBINED', 'False').lower() == 'true',  # One call for summary+topic
+}
+
+# Pooled HTTP client for LLM provider calls (llm_eval/providers/http_pool.py)
+LLM_HTTP_POOL = {
+    'LIMIT': int(os.getenv('LLM_HTTP_POOL_LIMIT', '100')),  # Total connections per event loop
+    'LIMIT_PER_HOST': int(os.getenv('LLM_HTTP_POOL_LIMIT_PER_HOST', '20')),  # Connections per provider host
+    'KEEPALIVE_TIMEOUT': int(os.getenv('LLM_HTTP_POOL_KEEPALIVE', '60')),  # Seconds idle connections stay open
+    'DNS_CACHE_TTL': int(os.getenv('LLM_HTTP_POOL_DNS_TTL', '300')),  # Seconds provider hosts stay resolved
+    'CONNECT_TIMEOUT': int(os.getenv('LLM_HTTP_POOL_CONNECT_TIMEOUT', '10')),
+}
+
 # Logging Configuration with Timestamp-based Files
 from datetime import datetime
 
@@ -0,0 +1,336 @@
+"""
+Shared counter store
+====================
+
+Atomic read-modify-write primitives shared by every worker process, for rate
+limits and usage quotas. Django's cache API only offers get/set (and a
+non-atomic ``incr`` on most backends), which lets concurrent requests in
+different processes read the same count and all pass.
+
+Backends (``SHARED_CACHE['BACKEND']``):
+
+- ``redis``: one Lua script per operation, so each check-and-update is a
+  single atomic step on the server (and uses the server clock).
+- ``sqlite``: a SQLite file updated inside ``BEGIN IMMEDIATE`` transactions.
+  Atomic across processes on one host; the default when no Redis URL is
+  configured and the stand-in used by tests.
+- ``memory``: per-process dict behind a lock (single-process tools only).
+
+A Redis backend that cannot be reached at startup falls back to SQLite.
+"""
+
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SHARED_CACHE_SETTINGS = {
+    'BACKEND': 'sqlite',
+    'REDIS_URL': '',
+    'SQLITE_PATH': os.path.join(tempfile.gettempdir(), 'aicc_shared_cache.sqlite3'),
+    'KEY_PREFIX': 'aicc',
+}
+
+# SQLite rows past expiry are purged every this many writes
+PURGE_EVERY = 500
+
+
+def get_shared_cache_settings() -> Dict[str, Any]:
+    """Merge ``settings.SHARED_CACHE`` over the defaults"""
+    cache_settings = dict(DEFAULT_SHARED_CACHE_SETTINGS)
+    cache_settings.update(getattr(settings, 'SHARED_CACHE', {}) or {})
+    return cache_settings
+
+
+def _gcra(tat: Optional[float], now: float, emission_interval: float, period: float,
+          cost: int) -> Tuple[bool, float, Optional[float]]:
+    """
+    Generic cell rate algorithm step (token bucket of ``period / emission_interval``
+    tokens). Returns (allowed, seconds of the window in use, new TAT to store or
+    None). A denied request stores nothing; ``cost=0`` only inspects.
+    """
+    tat = max(tat or now, now)
+    new_tat = tat + emission_interval * cost
+    if new_tat - period > now:
+        return False, tat - now, None
+    return True, new_tat - now, (new_tat if cost else None)
+
+
+class SharedCounterStore(ABC):
+    """Interface of the store backends"""
+
+    name = 'base'
+
+    def __init__(self, key_prefix: str = ''):
+        self.key_prefix = key_prefix
+
+    def _key(self, key: str) -> str:
+        return f"{self.key_prefix}:{key}" if self.key_prefix else key
+
+    @abstractmethod
+    def gcra(self, key: str, emission_interval: float, period: float, cost: int = 1) -> Tuple[bool, float]:
+        """
+        Atomically apply one GCRA step to ``key``. Returns (allowed, seconds of
+        the period in use after the step).
+        """
+        pass
+
+    @abstractmethod
+    def incr_capped(self, key: str, amount: int, limit: Optional[int], ttl: int) -> Tuple[bool, int]:
+        """
+        Atomically add ``amount`` to the counter unless that would exceed
+        ``limit`` (None: no limit). The counter expires ``ttl`` seconds after it
+        was created. Returns (added, count).
+        """
+        pass
+
+    @abstractmethod
+    def get_count(self, key: str) -> int:
+        """Current value of a counter (0 when missing or expired)"""
+        pass
+
+    @abstractmethod
+    def delete(self, key: str):
+        """Remove a counter"""
+        pass
+
+
+class MemoryCounterStore(SharedCounterStore):
+    """Per-process store; only correct with a single worker process"""
+
+    name = 'memory'
+
+    def __init__(self, key_prefix: str = ''):
+        super().__init__(key_prefix)
+        self._values: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def _read(self, key: str, now: float) -> Optional[float]:
+        entry = self._values.get(key)
+        if entry is None or entry[1] <= now:
+            return None
+        return entry[0]
+
+    def gcra(self, key, emission_interval, period, cost=1):
+        key = self._key(key)
+        with self._lock:
+            now = time.time()
+            allowed, used, new_tat = _gcra(self._read(key, now), now, emission_interval, period, cost)
+            if new_tat is not None:
+                self._values[key] = (new_tat, new_tat)
+            return allowed, used
+
+    def incr_capped(self, key, amount, limit, ttl):
+        key = self._key(key)
+        with self._lock:
+            now = time.time()
+            entry = self._values.get(key)
+            if entry is None or entry[1] <= now:
+                entry = (0, now + ttl)
+            count = int(entry[0])
+            if limit is not None and count + amount > limit:
+                return False, count
+            self._values[key] = (count + amount, entry[1])
+            return True, count + amount
+
+    def get_count(self, key):
+        with self._lock:
+            return int(self._read(self._key(key), time.time()) or 0)
+
+    def delete(self, key):
+        with self._lock:
+            self._values.pop(self._key(key), None)
+
+
+class SQLiteCounterStore(SharedCounterStore):
+    """Counters in a SQLite file, updated under BEGIN IMMEDIATE (one writer at a time)"""
+
+    name = 'sqlite'
+
+    def __init__(self, path: str, key_prefix: str = ''):
+        super().__init__(key_prefix)
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = self._connection()
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS counters ('
+            'key TEXT PRIMARY KEY, value REAL NOT NULL, expires_at REAL NOT NULL)'
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def _transaction(self, operation):
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            result = operation(connection, time.time())
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        self._writes += 1
+        if self._writes % PURGE_EVERY == 0:
+            connection.execute('DELETE FROM counters WHERE expires_at <= ?', (time.time(),))
+        return result
+
+    @staticmethod
+    def _read(connection, key: str, now: float):
+        row = connection.execute(
+            'SELECT value, expires_at FROM counters WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None or row[1] <= now:
+            return None
+        return row
+
+    def gcra(self, key, emission_interval, period, cost=1):
+        key = self._key(key)
+
+        def operation(connection, now):
+            row = self._read(connection, key, now)
+            allowed, used, new_tat = _gcra(row[0] if row else None, now, emission_interval, period, cost)
+            if new_tat is not None:
+                connection.execute(
+                    'INSERT OR REPLACE INTO counters (key, value, expires_at) VALUES (?, ?, ?)',
+                    (key, new_tat, new_tat)
+                )
+            return allowed, used
+
+        return self._transaction(operation)
+
+    def incr_capped(self, key, amount, limit, ttl):
+        key = self._key(key)
+
+        def operation(connection, now):
+            row = self._read(connection, key, now)
+            count, expires_at = (int(row[0]), row[1]) if row else (0, now + ttl)
+            if limit is not None and count + amount > limit:
+                return False, count
+            connection.execute(
+                'INSERT OR REPLACE INTO counters (key, value, expires_at) VALUES (?, ?, ?)',
+                (key, count + amount, expires_at)
+            )
+            return True, count + amount
+
+        return self._transaction(operation)
+
+    def get_count(self, key):
+        row = self._read(self._connection(), self._key(key), time.time())
+        return int(row[0]) if row else 0
+
+    def delete(self, key):
+        self._connection().execute('DELETE FROM counters WHERE key = ?', (self._key(key),))
+
+
+# KEYS[1]: counter; ARGV: emission interval, period, cost. Uses the server clock.
+_REDIS_GCRA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local interval = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then tat = now end
+local new_tat = tat + interval * cost
+if new_tat - period > now then
+    return {0, tostring(tat - now)}
+end
+if cost > 0 then
+    redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.max(1, math.ceil((new_tat - now) * 1000)))
+end
+return {1, tostring(new_tat - now)}
+"""
+
+# KEYS[1]: counter; ARGV: amount, limit (-1: none), ttl seconds
+_REDIS_INCR_CAPPED = """
+local count = tonumber(redis.call('GET', KEYS[1]) or '0')
+local amount = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+if limit >= 0 and count + amount > limit then
+    return {0, count}
+end
+count = redis.call('INCRBY', KEYS[1], amount)
+if count == amount then
+    redis.call('EXPIRE', KEYS[1], tonumber(ARGV[3]))
+end
+return {1, count}
+"""
+
+
+class RedisCounterStore(SharedCounterStore):
+    """Counters in Redis; every operation is one Lua script"""
+
+    name = 'redis'
+
+    def __init__(self, url: str, key_prefix: str = ''):
+        super().__init__(key_prefix)
+        import redis
+
+        self.client = redis.Redis.from_url(url, socket_timeout=2, socket_connect_timeout=2)
+        self.client.ping()
+        self._gcra_script = self.client.register_script(_REDIS_GCRA)
+        self._incr_script = self.client.register_script(_REDIS_INCR_CAPPED)
+
+    def gcra(self, key, emission_interval, period, cost=1):
+        allowed, used = self._gcra_script(keys=[self._key(key)], args=[emission_interval, period, cost])
+        return bool(allowed), float(used)
+
+    def incr_capped(self, key, amount, limit, ttl):
+        added, count = self._incr_script(
+            keys=[self._key(key)], args=[amount, -1 if limit is None else limit, max(1, int(ttl))]
+        )
+        return bool(added), int(count)
+
+    def get_count(self, key):
+        value = self.client.get(self._key(key))
+        return int(value) if value else 0
+
+    def delete(self, key):
+        self.client.delete(self._key(key))
+
+
+_store: Optional[SharedCounterStore] = None
+_store_lock = threading.Lock()
+
+
+def _create_store(cache_settings: Dict[str, Any]) -> SharedCounterStore:
+    backend = cache_settings['BACKEND']
+    prefix = cache_settings['KEY_PREFIX']
+    if backend == 'redis':
+        try:
+            return RedisCounterStore(cache_settings['REDIS_URL'], key_prefix=prefix)
+        except Exception as e:
+            logger.warning(f"⚠️ SHARED CACHE: Redis unavailable ({e}), falling back to SQLite at {cache_settings['SQLITE_PATH']}")
+    elif backend == 'memory':
+        return MemoryCounterStore(key_prefix=prefix)
+    return SQLiteCounterStore(cache_settings['SQLITE_PATH'], key_prefix=prefix)
+
+
+def get_shared_store() -> SharedCounterStore:
+    """Process-wide shared counter store"""
+    global _store
+
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = _create_store(get_shared_cache_settings())
+                logger.info(f"🗄️ SHARED CACHE: Using {_store.name} counter store")
+    return _store
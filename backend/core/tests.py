@@ -0,0 +1,123 @@
+"""
+Tests for the shared counter store and the limits built on it
+"""
+import os
+import tempfile
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from .rate_limit import check_rate_limit, consume_daily_quota, peek_rate_limit
+from .shared_cache import SharedCounterStore, SQLiteCounterStore
+
+
+class SQLiteStoreTestCase(SimpleTestCase):
+    """Each test gets a fresh SQLite store and a clock it can move forward"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'counters.sqlite3')
+        self.store = SQLiteCounterStore(self.path, key_prefix='test')
+
+        self.now = time.time()
+        clock = mock.patch('core.shared_cache.time.time', side_effect=lambda: self.now)
+        clock.start()
+        self.addCleanup(clock.stop)
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+class SharedCounterStoreTests(SimpleTestCase):
+
+    def test_base_class_is_abstract(self):
+        with self.assertRaises(TypeError):
+            SharedCounterStore()
+
+
+class RateLimitTests(SQLiteStoreTestCase):
+
+    def test_allows_limit_requests_then_denies(self):
+        results = [check_rate_limit('user:1', 3, period=60, store=self.store) for _ in range(4)]
+
+        self.assertEqual([result.allowed for result in results], [True, True, True, False])
+        self.assertEqual([result.remaining for result in results[:3]], [2, 1, 0])
+        # One token (60s / 3) drains before the next request is allowed
+        self.assertEqual(results[3].retry_after, 20)
+
+    def test_bucket_refills_continuously(self):
+        for _ in range(3):
+            check_rate_limit('user:1', 3, period=60, store=self.store)
+
+        self.advance(19)
+        self.assertFalse(check_rate_limit('user:1', 3, period=60, store=self.store).allowed)
+        self.advance(1)
+        self.assertTrue(check_rate_limit('user:1', 3, period=60, store=self.store).allowed)
+        self.assertFalse(check_rate_limit('user:1', 3, period=60, store=self.store).allowed)
+
+    def test_bucket_is_full_again_after_period(self):
+        for _ in range(3):
+            check_rate_limit('user:1', 3, period=60, store=self.store)
+
+        self.advance(60)
+
+        self.assertEqual(peek_rate_limit('user:1', 3, period=60, store=self.store).remaining, 3)
+
+    def test_peek_does_not_consume(self):
+        check_rate_limit('user:1', 3, period=60, store=self.store)
+
+        for _ in range(5):
+            self.assertEqual(peek_rate_limit('user:1', 3, period=60, store=self.store).remaining, 2)
+
+    def test_keys_are_independent(self):
+        for _ in range(3):
+            check_rate_limit('user:1', 3, period=60, store=self.store)
+
+        self.assertTrue(check_rate_limit('user:2', 3, period=60, store=self.store).allowed)
+
+    def test_stores_on_the_same_file_share_buckets(self):
+        other_process_store = SQLiteCounterStore(self.path, key_prefix='test')
+        for _ in range(3):
+            check_rate_limit('user:1', 3, period=60, store=self.store)
+
+        self.assertFalse(check_rate_limit('user:1', 3, period=60, store=other_process_store).allowed)
+
+    def test_no_limit_always_allows(self):
+        for _ in range(10):
+            self.assertTrue(check_rate_limit('user:1', None, store=self.store).allowed)
+
+
+class DailyQuotaTests(SQLiteStoreTestCase):
+
+    def test_refuses_use_past_the_limit(self):
+        self.assertEqual(consume_daily_quota('project:1', 5, amount=2, store=self.store), (True, 2))
+        self.assertEqual(consume_daily_quota('project:1', 5, amount=2, store=self.store), (True, 4))
+        # 4 + 2 would exceed the limit: refused and not counted
+        self.assertEqual(consume_daily_quota('project:1', 5, amount=2, store=self.store), (False, 4))
+        # Reaching the limit exactly is allowed
+        self.assertEqual(consume_daily_quota('project:1', 5, amount=1, store=self.store), (True, 5))
+        self.assertEqual(consume_daily_quota('project:1', 5, amount=1, store=self.store), (False, 5))
+
+    def test_without_limit_only_counts(self):
+        for expected in range(1, 4):
+            self.assertEqual(consume_daily_quota('project:1', None, store=self.store), (True, expected))
+
+    def test_counter_expires_after_ttl(self):
+        self.assertEqual(self.store.incr_capped('quota', 3, 3, ttl=60), (True, 3))
+        self.assertEqual(self.store.incr_capped('quota', 1, 3, ttl=60), (False, 3))
+
+        self.advance(59)
+        self.assertEqual(self.store.get_count('quota'), 3)
+        self.advance(1)
+        self.assertEqual(self.store.get_count('quota'), 0)
+        self.assertEqual(self.store.incr_capped('quota', 1, 3, ttl=60), (True, 1))
+
+    def test_ttl_runs_from_creation_not_last_use(self):
+        self.store.incr_capped('quota', 1, None, ttl=60)
+        self.advance(40)
+        self.store.incr_capped('quota', 1, None, ttl=60)
+        self.advance(20)
+
+        self.assertEqual(self.store.get_count('quota'), 0)
@@ -37,6 +37,7 @@ from api.universal_project_views import UniversalProjectViewSet
 # Import agent orchestration views
 from agent_orchestration.workflow_views import AgentWorkflowViewSet
 from agent_orchestration.debug_views import debug_workflows
+from agent_orchestration import job_views
 
 # Import vector search views for main endpoints
 from vector_search import api_views
@@ -131,6 +132,11 @@ urlpatterns = [
         'get': 'evaluation_results'
     }), name='project-workflow-evaluation-results'),
     
+    # ⏳ Background jobs (workflow runs, evaluations, human input resumes)
+    path('api/projects/<uuid:project_id>/jobs/', job_views.project_jobs, name='project-jobs'),
+    path('api/projects/<uuid:project_id>/jobs/<uuid:job_id>/', job_views.job_detail, name='project-job-detail'),
+    path('api/projects/<uuid:project_id>/jobs/<uuid:job_id>/cancel/', job_views.cancel_job, name='project-job-cancel'),
+    
     # PHASE 3: Universal Processing Endpoints (Consolidated via UniversalProjectViewSet)
     # All processing now handled through UniversalProjectViewSet actions:
     # - /api/projects/{project_id}/process_documents/ (POST)
@@ -0,0 +1,147 @@
+"""
+Per-collection metadata cache for Milvus search operations
+
+Keeps existence, load state, vector field, dimension, metric and index type of
+each collection so that a search only issues the search RPC itself. Entries
+are refreshed in the background once older than ``REFRESH_INTERVAL`` and
+dropped whenever a collection is created, dropped or re-indexed through
+``invalidate_collection_metadata``.
+
+Imports nothing from pymilvus, so code that manages collections can call the
+invalidation hook cheaply.
+"""
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+
+from .models import CollectionMetadata
+
+
+DEFAULT_METADATA_CACHE_SETTINGS = {
+    'REFRESH_INTERVAL': 60,  # seconds before an entry is refreshed in the background
+    'MISSING_TTL': 5,  # seconds a "collection does not exist" answer is trusted
+}
+
+
+def get_metadata_cache_settings() -> Dict[str, Any]:
+    """Merge ``settings.MILVUS_METADATA_CACHE`` over the defaults"""
+    cache_settings = dict(DEFAULT_METADATA_CACHE_SETTINGS)
+    cache_settings.update(getattr(settings, 'MILVUS_METADATA_CACHE', {}) or {})
+    return cache_settings
+
+
+class CollectionMetadataCache:
+    """Thread-safe map of collection name -> CollectionMetadata"""
+
+    def __init__(self, refresh_interval: float = 60, missing_ttl: float = 5):
+        self.refresh_interval = refresh_interval
+        self.missing_ttl = missing_ttl
+        self._entries: Dict[str, CollectionMetadata] = {}
+        self._generations: Dict[str, int] = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.invalidations = 0
+
+    def get(self, collection_name: str) -> Optional[CollectionMetadata]:
+        """Cached metadata, or None when absent (or a stale "missing" answer)"""
+        with self._lock:
+            metadata = self._entries.get(collection_name)
+            if metadata is not None and not metadata.exists and \
+                    time.time() - metadata.fetched_at > self.missing_ttl:
+                del self._entries[collection_name]
+                metadata = None
+            if metadata is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return metadata
+
+    def generation(self, collection_name: str) -> int:
+        with self._lock:
+            return self._generations.get(collection_name, 0)
+
+    def put(self, metadata: CollectionMetadata, generation: Optional[int] = None) -> bool:
+        """
+        Store metadata. When ``generation`` is given (a background refresh), the
+        entry is only stored if the collection was not invalidated meanwhile.
+        """
+        with self._lock:
+            name = metadata.collection_name
+            if generation is not None and self._generations.get(name, 0) != generation:
+                return False
+            self._entries[name] = metadata
+            return True
+
+    def claim_refresh(self, metadata: CollectionMetadata) -> Optional[int]:
+        """
+        Return the current generation if ``metadata`` is due for a background
+        refresh and no refresh is running yet for it, else None.
+        """
+        if not metadata.exists or time.time() - metadata.fetched_at < self.refresh_interval:
+            return None
+        with self._lock:
+            name = metadata.collection_name
+            if name in self._refreshing:
+                return None
+            self._refreshing.add(name)
+            self.refreshes += 1
+            return self._generations.get(name, 0)
+
+    def finish_refresh(self, collection_name: str):
+        with self._lock:
+            self._refreshing.discard(collection_name)
+
+    def invalidate(self, collection_name: Optional[str] = None) -> int:
+        """Drop one collection's entry (or all entries); returns entries removed"""
+        with self._lock:
+            names = [collection_name] if collection_name else list(self._entries)
+            removed = 0
+            for name in names:
+                self._generations[name] = self._generations.get(name, 0) + 1
+                if self._entries.pop(name, None) is not None:
+                    removed += 1
+            self.invalidations += removed
+            return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'background_refreshes': self.refreshes,
+                'invalidations': self.invalidations,
+                'refresh_interval_seconds': self.refresh_interval,
+            }
+
+
+_metadata_cache: Optional[CollectionMetadataCache] = None
+_metadata_cache_lock = threading.Lock()
+
+
+def get_collection_metadata_cache() -> CollectionMetadataCache:
+    """Process-wide collection metadata cache"""
+    global _metadata_cache
+
+    if _metadata_cache is None:
+        with _metadata_cache_lock:
+            if _metadata_cache is None:
+                cache_settings = get_metadata_cache_settings()
+                _metadata_cache = CollectionMetadataCache(
+                    refresh_interval=cache_settings['REFRESH_INTERVAL'],
+                    missing_ttl=cache_settings['MISSING_TTL'],
+                )
+    return _metadata_cache
+
+
+def invalidate_collection_metadata(collection_name: Optional[str] = None) -> int:
+    """Call after creating, dropping or re-indexing a collection (None clears everything)"""
+    return get_collection_metadata_cache().invalidate(collection_name)
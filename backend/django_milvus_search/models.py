@@ -113,6 +113,33 @@ class SearchResult:
         }
 
 
+@dataclass
+class CollectionMetadata:
+    """Control-plane facts about a collection, cached so searches skip describe/load calls"""
+    collection_name: str
+    exists: bool
+    is_loaded: bool = False
+    vector_field: Optional[str] = None
+    dimension: Optional[int] = None
+    metric_type: Optional[str] = None
+    index_type: Optional[str] = None
+    collection: Any = field(default=None, repr=False)  # pymilvus Collection handle
+    fetched_at: float = 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for serialization"""
+        return {
+            "collection_name": self.collection_name,
+            "exists": self.exists,
+            "is_loaded": self.is_loaded,
+            "vector_field": self.vector_field,
+            "dimension": self.dimension,
+            "metric_type": self.metric_type,
+            "index_type": self.index_type,
+            "fetched_at": self.fetched_at,
+        }
+
+
 @dataclass
 class AlgorithmConfiguration:
     """Configuration for a specific algorithm test"""
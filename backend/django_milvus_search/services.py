@@ -18,8 +18,9 @@ except ImportError:
 
 from .models import (
     ConnectionConfig, SearchRequest, SearchResult, SearchParams,
-    IndexType, MetricType
+    IndexType, MetricType, CollectionMetadata
 )
+from .collection_cache import get_collection_metadata_cache
 from .exceptions import (
     MilvusConnectionError, MilvusSearchError, MilvusConfigurationError,
     MilvusCollectionError
@@ -140,88 +141,80 @@ class MilvusSearchService:
         self.metrics['total_searches'] += 1
         
         try:
-            with self.get_connection() as conn_alias:
-                collection = Collection(request.collection_name, using=conn_alias)
-                
-                # Check if collection exists and is loaded
-                if not utility.has_collection(request.collection_name, using=conn_alias):
+            # Existence, load state and vector field come from the metadata cache,
+            # so the search RPC is the only call to Milvus on this path
+            metadata = self.get_collection_metadata(request.collection_name)
+            if not metadata.exists:
+                raise MilvusCollectionError(f"Collection '{request.collection_name}' does not exist")
+            if not metadata.vector_field:
+                raise MilvusSearchError(f"No vector field found in collection {request.collection_name}")
+            
+            # Prepare search parameters
+            search_params = {}
+            if request.search_params:
+                search_params = request.search_params.to_dict()
+            
+            # Add index and metric type to search params
+            search_params.update({
+                "metric_type": request.metric_type.value,
+            })
+            
+            # Perform search
+            search_start = time.time()
+            
+            try:
+                results = self._search_collection(metadata, request, search_params)
+            except MilvusException as e:
+                # Collection may have been dropped, recreated or released since it was cached
+                logger.info(f"Search on cached collection {request.collection_name} failed ({e}), refreshing metadata")
+                get_collection_metadata_cache().invalidate(request.collection_name)
+                metadata = self.get_collection_metadata(request.collection_name)
+                if not metadata.exists:
                     raise MilvusCollectionError(f"Collection '{request.collection_name}' does not exist")
-                
-                # Load collection if not loaded
-                try:
-                    collection.load()
-                except Exception as e:
-                    logger.debug(f"Collection already loaded or load failed: {e}")
-                
-                # Prepare search parameters
-                search_params = {}
-                if request.search_params:
-                    search_params = request.search_params.to_dict()
-                
-                # Add index and metric type to search params
-                search_params.update({
-                    "metric_type": request.metric_type.value,
-                })
-                
-                # Perform search
-                search_start = time.time()
-                
-                # Auto-detect vector field name
-                vector_field = self._detect_vector_field_name(collection)
-                if not vector_field:
-                    raise MilvusSearchError(f"No vector field found in collection {request.collection_name}")
-                
-                results = collection.search(
-                    data=request.query_vectors,
-                    anns_field=vector_field,  # Use detected field name
-                    param=search_params,
-                    limit=request.limit,
-                    offset=request.offset,
-                    output_fields=request.output_fields,
-                    expr=request.filter_expression
-                )
-                search_time = time.time() - search_start
-                
-                # Process results
-                hits = []
-                total_results = len(results[0]) if results else 0
-                
-                for result in results:
-                    for hit in result:
-                        hit_data = {
-                            "id": hit.id,
-                            "distance": hit.distance,
-                            "score": 1.0 - hit.distance if request.metric_type == MetricType.L2 else hit.distance,
-                        }
-                        
-                        # Add output fields if available
-                        if hasattr(hit, 'entity'):
-                            for field, value in hit.entity.fields.items():
-                                hit_data[field] = value
-                        
-                        hits.append(hit_data)
-                
-                # Create result object
-                result_obj = SearchResult(
-                    hits=hits,
-                    search_time=search_time,
-                    total_results=total_results,
-                    algorithm_used=f"{request.index_type.value}+{request.metric_type.value}",
-                    parameters_used=search_params,
-                    collection_name=request.collection_name
-                )
-                
-                self.metrics['successful_searches'] += 1
-                self.metrics['total_search_time'] += search_time
-                
-                if self.enable_monitoring:
-                    logger.info(f"Search completed in {search_time:.4f}s, found {total_results} results")
-                    # Log project isolation info if collection name contains project ID
-                    if request.collection_name and '_' in request.collection_name:
-                        logger.debug(f"📦 PROJECT ISOLATION: Search performed on collection {request.collection_name} (thread-safe)")
-                
-                return result_obj
-                
+                results = self._search_collection(metadata, request, search_params)
+            
+            search_time = time.time() - search_start
+            
+            # Process results
+            hits = []
+            total_results = len(results[0]) if results else 0
+            
+            for result in results:
+                for hit in result:
+                    hit_data = {
+                        "id": hit.id,
+                        "distance": hit.distance,
+                        "score": 1.0 - hit.distance if request.metric_type == MetricType.L2 else hit.distance,
+                    }
+                    
+                    # Add output fields if available
+                    if hasattr(hit, 'entity'):
+                        for field, value in hit.entity.fields.items():
+                            hit_data[field] = value
+                    
+                    hits.append(hit_data)
+            
+            # Create result object
+            result_obj = SearchResult(
+                hits=hits,
+                search_time=search_time,
+                total_results=total_results,
+                algorithm_used=f"{request.index_type.value}+{request.metric_type.value}",
+                parameters_used=search_params,
+                collection_name=request.collection_name
+            )
+            
+            self.metrics['successful_searches'] += 1
+            self.metrics['total_search_time'] += search_time
+            
+            if self.enable_monitoring:
+                logger.info(f"Search completed in {search_time:.4f}s, found {total_results} results")
+                # Log project isolation info if collection name contains project ID
+                if request.collection_name and '_' in request.collection_name:
+                    logger.debug(f"📦 PROJECT ISOLATION: Search performed on collection {request.collection_name} (thread-safe)")
+            
+            return result_obj
+            
         except Exception as e:
             self.metrics['failed_searches'] += 1
             logger.error(f"Search failed: {e}")
@@ -273,6 +266,91 @@ class MilvusSearchService:
         
         return results
     
+    def _search_collection(self, metadata: CollectionMetadata, request: SearchRequest,
+                           search_params: Dict[str, Any]):
+        """The search RPC against a cached collection handle"""
+        return metadata.collection.search(
+            data=request.query_vectors,
+            anns_field=metadata.vector_field,  # Use detected field name
+            param=search_params,
+            limit=request.limit,
+            offset=request.offset,
+            output_fields=request.output_fields,
+            expr=request.filter_expression
+        )
+    
+    def get_collection_metadata(self, collection_name: str, refresh: bool = False) -> CollectionMetadata:
+        """
+        Cached metadata for a collection, loading it on first use. Entries older
+        than the refresh interval are served as-is while a background refresh runs.
+        """
+        metadata_cache = get_collection_metadata_cache()
+        metadata = None if refresh else metadata_cache.get(collection_name)
+        if metadata is None:
+            generation = metadata_cache.generation(collection_name)
+            metadata = self._load_collection_metadata(collection_name)
+            metadata_cache.put(metadata, generation)
+            return metadata
+        
+        generation = metadata_cache.claim_refresh(metadata)
+        if generation is not None:
+            self.executor.submit(self._refresh_collection_metadata, collection_name, generation)
+        return metadata
+    
+    def _refresh_collection_metadata(self, collection_name: str, generation: int):
+        metadata_cache = get_collection_metadata_cache()
+        try:
+            metadata_cache.put(self._load_collection_metadata(collection_name), generation)
+        except Exception as e:
+            logger.warning(f"Background metadata refresh failed for {collection_name}: {e}")
+            metadata_cache.invalidate(collection_name)
+        finally:
+            metadata_cache.finish_refresh(collection_name)
+    
+    def _load_collection_metadata(self, collection_name: str) -> CollectionMetadata:
+        """Describe a collection: existence, load, vector field, dimension and index"""
+        with self.get_connection() as conn_alias:
+            if not utility.has_collection(collection_name, using=conn_alias):
+                return CollectionMetadata(collection_name=collection_name, exists=False, fetched_at=time.time())
+            
+            collection = Collection(collection_name, using=conn_alias)
+            
+            # Load collection if not loaded
+            is_loaded = True
+            try:
+                collection.load()
+            except Exception as e:
+                logger.debug(f"Collection already loaded or load failed: {e}")
+                is_loaded = False
+            
+            vector_field = self._detect_vector_field_name(collection)
+            
+            dimension = None
+            for schema_field in collection.schema.fields:
+                if schema_field.name == vector_field:
+                    dimension = (getattr(schema_field, 'params', None) or {}).get('dim')
+            
+            metric_type = index_type = None
+            for index in collection.indexes:
+                if getattr(index, 'field_name', None) == vector_field:
+                    params = index.params or {}
+                    metric_type = params.get('metric_type')
+                    index_type = params.get('index_type')
+            
+            logger.debug(f"Cached metadata for collection {collection_name}: field={vector_field}, "
+                         f"dim={dimension}, metric={metric_type}, index={index_type}")
+            return CollectionMetadata(
+                collection_name=collection_name,
+                exists=True,
+                is_loaded=is_loaded,
+                vector_field=vector_field,
+                dimension=int(dimension) if dimension else None,
+                metric_type=metric_type,
+                index_type=index_type,
+                collection=collection,
+                fetched_at=time.time()
+            )
+    
     def _detect_vector_field_name(self, collection) -> Optional[str]:
         """
         Automatically detect the vector field name in a collection
@@ -384,6 +462,7 @@ class MilvusSearchService:
     def get_metrics(self) -> Dict[str, Any]:
         """Get performance metrics"""
         metrics = self.metrics.copy()
+        metrics['collection_metadata_cache'] = get_collection_metadata_cache().get_stats()
         if metrics['successful_searches'] > 0:
             metrics['average_search_time'] = metrics['total_search_time'] / metrics['successful_searches']
         else:
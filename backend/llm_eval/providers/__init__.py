@@ -1,6 +1,10 @@
 from .openai_provider import OpenAIProvider
 from .gemini_provider import GeminiProvider
 from .claude_provider import ClaudeProvider
+from .base import LLMResponse, LLMStreamChunk
+from .http_pool import (
+    get_http_session, close_http_session, close_all_http_sessions, get_http_pool_stats, run_with_http_pool
+)
 
 PROVIDER_REGISTRY = {
     'openai': OpenAIProvider,
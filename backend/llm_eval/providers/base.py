@@ -1,10 +1,16 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, AsyncIterator, Awaitable, Callable, Tuple
 import asyncio
 import aiohttp
+import json
+import logging
 import time
 from dataclasses import dataclass
 
+from .http_pool import get_http_session
+
+logger = logging.getLogger(__name__)
+
 @dataclass
 class LLMResponse:
     text: str
@@ -14,6 +20,43 @@ class LLMResponse:
     token_count: Optional[int] = None
     cost_estimate: Optional[float] = None
     error: Optional[str] = None
+    connection_stats: Optional[Dict[str, Any]] = None  # Pooled HTTP connection reuse/latency for this call
+    first_token_ms: Optional[int] = None  # Time to first streamed token (streaming calls only)
+
+@dataclass
+class LLMStreamChunk:
+    """Incremental piece of a streamed completion; the last chunk carries the full response"""
+    delta: str = ""
+    done: bool = False
+    response: Optional[LLMResponse] = None
+
+
+async def iter_sse_events(stream: aiohttp.StreamReader) -> AsyncIterator[Tuple[Optional[str], str]]:
+    """
+    Parse a text/event-stream body into (event_name, data) pairs.
+    Multi-line data fields are joined with newlines as per the SSE spec.
+    """
+    event_name = None
+    data_lines = []
+    async for raw_line in stream:
+        line = raw_line.decode('utf-8').rstrip('\r\n')
+        if not line:
+            if data_lines:
+                yield event_name, '\n'.join(data_lines)
+            event_name = None
+            data_lines = []
+            continue
+        if line.startswith(':'):
+            continue  # SSE comment / keep-alive
+        field, _, value = line.partition(':')
+        value = value[1:] if value.startswith(' ') else value
+        if field == 'event':
+            event_name = value
+        elif field == 'data':
+            data_lines.append(value)
+    if data_lines:
+        yield event_name, '\n'.join(data_lines)
+
 
 class LLMProvider(ABC):
     """Abstract base class for all LLM providers"""
@@ -48,3 +91,134 @@ class LLMProvider(ABC):
     def estimate_cost(self, token_count: Optional[int]) -> Optional[float]:
         """Estimate cost based on token count - override in subclasses"""
         return None
+    
+    # ------------------------------------------------------------------
+    # Streaming
+    # ------------------------------------------------------------------
+    
+    supports_streaming = False
+    
+    def get_stream_url(self) -> str:
+        """URL of the provider's streaming endpoint - override in subclasses"""
+        raise NotImplementedError
+    
+    def format_stream_request_body(self, prompt: str, **kwargs) -> Dict[str, Any]:
+        """Request body for a streaming call - override in subclasses"""
+        raise NotImplementedError
+    
+    def parse_stream_event(self, event_name: Optional[str], data: Dict[str, Any]) -> tuple[str, Optional[int]]:
+        """
+        Parse one decoded stream event and return (text_delta, token_count).
+        Raise ValueError for provider error events.
+        """
+        raise NotImplementedError
+    
+    def is_stream_terminator(self, data: str) -> bool:
+        """Whether a raw SSE data payload marks the end of the stream"""
+        return data.strip() == '[DONE]'
+    
+    async def stream_response(self, prompt: str, **kwargs) -> AsyncIterator[LLMStreamChunk]:
+        """
+        Stream a completion as it is generated.
+        Yields text deltas followed by a final chunk (done=True) holding the
+        complete LLMResponse, including any error. Providers without a
+        streaming endpoint yield their full response as a single delta.
+        """
+        if not self.supports_streaming:
+            response = await self.generate_response(prompt, **kwargs)
+            if response.text:
+                yield LLMStreamChunk(delta=response.text)
+            yield LLMStreamChunk(done=True, response=response)
+            return
+        
+        start_time = time.time()
+        first_token_ms = None
+        text_parts = []
+        token_count = None
+        connection_stats: Dict[str, Any] = {}
+        
+        def build_response(error: Optional[str] = None) -> LLMResponse:
+            text = "".join(text_parts)
+            if not error and not text.strip():
+                error = f"{self.provider_name.capitalize()} API returned empty response content"
+            return LLMResponse(
+                text=text if not error else "",
+                model=self.model,
+                provider=self.provider_name,
+                response_time_ms=int((time.time() - start_time) * 1000),
+                token_count=token_count,
+                cost_estimate=self.estimate_cost(token_count) if not error else None,
+                error=error,
+                connection_stats=connection_stats,
+                first_token_ms=first_token_ms
+            )
+        
+        try:
+            session = get_http_session()
+            async with session.post(
+                self.get_stream_url(),
+                headers=self.get_headers(),
+                json=self.format_stream_request_body(prompt, **kwargs),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                trace_request_ctx=connection_stats
+            ) as response:
+                if response.status != 200:
+                    try:
+                        error_data = await response.json(content_type=None)
+                        error_message = error_data.get("error", {}).get("message", "Unknown error")
+                    except Exception:
+                        error_message = f"HTTP {response.status}"
+                    yield LLMStreamChunk(done=True, response=build_response(error_message))
+                    return
+                
+                async for event_name, raw_data in iter_sse_events(response.content):
+                    if self.is_stream_terminator(raw_data):
+                        break
+                    try:
+                        delta, event_tokens = self.parse_stream_event(event_name, json.loads(raw_data))
+                    except ValueError as stream_error:
+                        yield LLMStreamChunk(done=True, response=build_response(str(stream_error)))
+                        return
+                    if event_tokens is not None:
+                        token_count = event_tokens
+                    if delta:
+                        if first_token_ms is None:
+                            first_token_ms = int((time.time() - start_time) * 1000)
+                        text_parts.append(delta)
+                        yield LLMStreamChunk(delta=delta)
+            
+            yield LLMStreamChunk(done=True, response=build_response())
+        
+        except Exception as e:
+            logger.warning(f"⚠️ {self.provider_name.upper()}: Streaming call failed: {e}")
+            yield LLMStreamChunk(done=True, response=build_response(str(e) or type(e).__name__))
+    
+    async def generate_response_streaming(
+        self,
+        prompt: str,
+        on_token: Optional[Callable[[str], Awaitable[None]]] = None,
+        **kwargs
+    ) -> LLMResponse:
+        """
+        Same contract as generate_response, but tokens are handed to on_token
+        as they arrive. A failing on_token callback never aborts generation.
+        """
+        final_response = None
+        async for chunk in self.stream_response(prompt, **kwargs):
+            if chunk.done:
+                final_response = chunk.response
+            elif chunk.delta and on_token:
+                try:
+                    await on_token(chunk.delta)
+                except Exception as callback_error:
+                    logger.warning(f"⚠️ {self.provider_name.upper()}: Token callback failed: {callback_error}")
+        
+        if final_response is None:
+            final_response = LLMResponse(
+                text="",
+                model=self.model,
+                provider=self.provider_name,
+                response_time_ms=0,
+                error="Stream ended without a final response"
+            )
+        return final_response
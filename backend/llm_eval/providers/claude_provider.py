@@ -2,6 +2,7 @@ import aiohttp
 import time
 import logging
 from .base import LLMProvider, LLMResponse
+from .http_pool import get_http_session
 from typing import Dict, Any, Optional
 
 logger = logging.getLogger(__name__)
@@ -57,6 +58,33 @@ class ClaudeProvider(LLMProvider):
         token_count = response_data.get("usage", {}).get("output_tokens")
         return text, token_count
     
+    supports_streaming = True
+    
+    def get_stream_url(self) -> str:
+        return self.base_url
+    
+    def format_stream_request_body(self, prompt: str, **kwargs) -> Dict[str, Any]:
+        body = self.format_request_body(prompt, **kwargs)
+        body["stream"] = True
+        return body
+    
+    def parse_stream_event(self, event_name: Optional[str], data: Dict[str, Any]) -> tuple[str, Optional[int]]:
+        event_type = data.get("type", event_name)
+        
+        if event_type == "error":
+            raise ValueError(data.get("error", {}).get("message", "Unknown streaming error"))
+        
+        if event_type == "content_block_delta":
+            delta = data.get("delta", {})
+            if delta.get("type") == "text_delta":
+                return delta.get("text") or "", None
+        
+        if event_type == "message_delta":
+            # Output token usage arrives with the final message_delta
+            return "", data.get("usage", {}).get("output_tokens")
+        
+        return "", None
+    
     def estimate_cost(self, token_count: Optional[int]) -> Optional[float]:
         if not token_count:
             return None
@@ -66,58 +94,63 @@ class ClaudeProvider(LLMProvider):
         start_time = time.time()
         
         try:
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout)) as session:
-                async with session.post(
-                    self.base_url,
-                    headers=self.get_headers(),
-                    json=self.format_request_body(prompt, **kwargs)
-                ) as response:
-                    response_time_ms = int((time.time() - start_time) * 1000)
-                    
-                    if response.status == 200:
-                        data = await response.json()
-                        try:
-                            text, token_count = self.parse_response(data)
-                            
-                            # Double-check that text is not empty after parsing
-                            if not text or not text.strip():
-                                error_msg = "Claude API returned empty response content"
-                                logger.warning(f"⚠️ CLAUDE: {error_msg}. Response data: {data}")
-                                return LLMResponse(
-                                    text="",
-                                    model=self.model,
-                                    provider="claude",
-                                    response_time_ms=response_time_ms,
-                                    error=error_msg
-                                )
-                            
-                            return LLMResponse(
-                                text=text,
-                                model=self.model,
-                                provider="claude",
-                                response_time_ms=response_time_ms,
-                                token_count=token_count,
-                                cost_estimate=self.estimate_cost(token_count)
-                            )
-                        except ValueError as parse_error:
-                            # parse_response raised an error - return it as error
+            # Pooled keep-alive session shared by all providers on this event loop
+            session = get_http_session()
+            connection_stats: Dict[str, Any] = {}
+            async with session.post(
+                self.base_url,
+                headers=self.get_headers(),
+                json=self.format_request_body(prompt, **kwargs),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                trace_request_ctx=connection_stats
+            ) as response:
+                response_time_ms = int((time.time() - start_time) * 1000)
+                
+                if response.status == 200:
+                    data = await response.json()
+                    try:
+                        text, token_count = self.parse_response(data)
+                        
+                        # Double-check that text is not empty after parsing
+                        if not text or not text.strip():
+                            error_msg = "Claude API returned empty response content"
+                            logger.warning(f"⚠️ CLAUDE: {error_msg}. Response data: {data}")
                             return LLMResponse(
                                 text="",
                                 model=self.model,
                                 provider="claude",
                                 response_time_ms=response_time_ms,
-                                error=str(parse_error)
+                                error=error_msg
                             )
-                    else:
-                        error_data = await response.json()
+                        
+                        return LLMResponse(
+                            text=text,
+                            model=self.model,
+                            provider="claude",
+                            response_time_ms=response_time_ms,
+                            token_count=token_count,
+                            cost_estimate=self.estimate_cost(token_count),
+                            connection_stats=connection_stats
+                        )
+                    except ValueError as parse_error:
+                        # parse_response raised an error - return it as error
                         return LLMResponse(
                             text="",
                             model=self.model,
                             provider="claude",
                             response_time_ms=response_time_ms,
-                            error=error_data.get("error", {}).get("message", "Unknown error")
+                            error=str(parse_error)
                         )
-                        
+                else:
+                    error_data = await response.json()
+                    return LLMResponse(
+                        text="",
+                        model=self.model,
+                        provider="claude",
+                        response_time_ms=response_time_ms,
+                        error=error_data.get("error", {}).get("message", "Unknown error")
+                    )
+                    
         except Exception as e:
             response_time_ms = int((time.time() - start_time) * 1000)
             return LLMResponse(
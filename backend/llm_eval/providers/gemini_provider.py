@@ -2,6 +2,7 @@ import aiohttp
 import time
 import logging
 from .base import LLMProvider, LLMResponse
+from .http_pool import get_http_session
 from typing import Dict, Any, Optional
 
 logger = logging.getLogger(__name__)
@@ -21,6 +22,7 @@ class GeminiProvider(LLMProvider):
         # Use mapped model name if available
         self.model = model_mapping.get(model, model)
         self.base_url = f"https://generativelanguage.googleapis.com/v1beta/models/{self.model}:generateContent"
+        self.stream_url = f"https://generativelanguage.googleapis.com/v1beta/models/{self.model}:streamGenerateContent"
     
     def get_headers(self) -> Dict[str, str]:
         return {
@@ -73,6 +75,31 @@ class GeminiProvider(LLMProvider):
         token_count = None
         return text, token_count
     
+    supports_streaming = True
+    
+    def get_stream_url(self) -> str:
+        # alt=sse switches the response from a JSON array to server-sent events
+        return f"{self.stream_url}?alt=sse&key={self.api_key}"
+    
+    def format_stream_request_body(self, prompt: str, **kwargs) -> Dict[str, Any]:
+        return self.format_request_body(prompt, **kwargs)
+    
+    def parse_stream_event(self, event_name: Optional[str], data: Dict[str, Any]) -> tuple[str, Optional[int]]:
+        if "error" in data:
+            raise ValueError(data["error"].get("message", "Unknown streaming error"))
+        
+        candidates = data.get("candidates") or []
+        if not candidates:
+            return "", None
+        
+        first_candidate = candidates[0]
+        if first_candidate.get("finishReason") == "SAFETY":
+            raise ValueError("Response was blocked by safety filters")
+        
+        parts = first_candidate.get("content", {}).get("parts") or []
+        # Gemini doesn't return token count in the same way
+        return "".join(part.get("text") or "" for part in parts), None
+    
     def estimate_cost(self, token_count: Optional[int]) -> Optional[float]:
         if not token_count:
             return None
@@ -84,58 +111,63 @@ class GeminiProvider(LLMProvider):
         try:
             url = f"{self.base_url}?key={self.api_key}"
             
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout)) as session:
-                async with session.post(
-                    url,
-                    headers=self.get_headers(),
-                    json=self.format_request_body(prompt, **kwargs)
-                ) as response:
-                    response_time_ms = int((time.time() - start_time) * 1000)
-                    
-                    if response.status == 200:
-                        data = await response.json()
-                        try:
-                            text, token_count = self.parse_response(data)
-                            
-                            # Double-check that text is not empty after parsing
-                            if not text or not text.strip():
-                                error_msg = "Gemini API returned empty response content"
-                                logger.warning(f"⚠️ GEMINI: {error_msg}. Response data: {data}")
-                                return LLMResponse(
-                                    text="",
-                                    model=self.model,
-                                    provider="gemini",
-                                    response_time_ms=response_time_ms,
-                                    error=error_msg
-                                )
-                            
-                            return LLMResponse(
-                                text=text,
-                                model=self.model,
-                                provider="gemini",
-                                response_time_ms=response_time_ms,
-                                token_count=token_count,
-                                cost_estimate=self.estimate_cost(token_count)
-                            )
-                        except ValueError as parse_error:
-                            # parse_response raised an error - return it as error
+            # Pooled keep-alive session shared by all providers on this event loop
+            session = get_http_session()
+            connection_stats: Dict[str, Any] = {}
+            async with session.post(
+                url,
+                headers=self.get_headers(),
+                json=self.format_request_body(prompt, **kwargs),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                trace_request_ctx=connection_stats
+            ) as response:
+                response_time_ms = int((time.time() - start_time) * 1000)
+                
+                if response.status == 200:
+                    data = await response.json()
+                    try:
+                        text, token_count = self.parse_response(data)
+                        
+                        # Double-check that text is not empty after parsing
+                        if not text or not text.strip():
+                            error_msg = "Gemini API returned empty response content"
+                            logger.warning(f"⚠️ GEMINI: {error_msg}. Response data: {data}")
                             return LLMResponse(
                                 text="",
                                 model=self.model,
                                 provider="gemini",
                                 response_time_ms=response_time_ms,
-                                error=str(parse_error)
+                                error=error_msg
                             )
-                    else:
-                        error_data = await response.json()
+                        
+                        return LLMResponse(
+                            text=text,
+                            model=self.model,
+                            provider="gemini",
+                            response_time_ms=response_time_ms,
+                            token_count=token_count,
+                            cost_estimate=self.estimate_cost(token_count),
+                            connection_stats=connection_stats
+                        )
+                    except ValueError as parse_error:
+                        # parse_response raised an error - return it as error
                         return LLMResponse(
                             text="",
                             model=self.model,
                             provider="gemini",
                             response_time_ms=response_time_ms,
-                            error=error_data.get("error", {}).get("message", "Unknown error")
+                            error=str(parse_error)
                         )
-                        
+                else:
+                    error_data = await response.json()
+                    return LLMResponse(
+                        text="",
+                        model=self.model,
+                        provider="gemini",
+                        response_time_ms=response_time_ms,
+                        error=error_data.get("error", {}).get("message", "Unknown error")
+                    )
+                    
         except Exception as e:
             response_time_ms = int((time.time() - start_time) * 1000)
             return LLMResponse(
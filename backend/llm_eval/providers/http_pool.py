@@ -0,0 +1,345 @@
+"""
+Pooled HTTP Client Layer for LLM Providers
+==========================================
+
+Process-wide registry of keep-alive ``aiohttp.ClientSession`` objects shared by
+all LLM providers. ``aiohttp`` sessions are bound to the event loop that created
+them, so the registry holds one session per running loop:
+
+- Long-lived loops (ASGI / channels workers) reuse a single warm session for the
+  lifetime of the process.
+- Short-lived loops (``asyncio.run`` inside a sync view or job) reuse the
+  session for every LLM turn of that run. Start them with ``run_with_http_pool``
+  so the session and its keep-alive sockets are closed before the loop ends;
+  closing a loop does not close them. Sessions of loops that closed without it
+  are pruned on next access.
+
+Connection reuse, new-connection handshake time and pool wait time are recorded
+through ``aiohttp`` tracing so the saved TCP+TLS latency is observable.
+"""
+
+import asyncio
+import atexit
+import logging
+import threading
+import time
+import weakref
+from typing import Any, Awaitable, Dict, Optional, Set, TypeVar
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SETTINGS = {
+    'LIMIT': 100,               # Total simultaneous connections per session
+    'LIMIT_PER_HOST': 20,       # Simultaneous connections per provider host
+    'KEEPALIVE_TIMEOUT': 60,    # Seconds an idle connection is kept open
+    'DNS_CACHE_TTL': 300,       # Seconds resolved provider hosts are cached
+    'CONNECT_TIMEOUT': 10,      # Seconds allowed for TCP+TLS connect
+}
+
+
+def _get_pool_settings() -> Dict[str, Any]:
+    """Merge ``settings.LLM_HTTP_POOL`` over the defaults (Django is optional here)"""
+    pool_settings = dict(DEFAULT_POOL_SETTINGS)
+    try:
+        from django.conf import settings
+        pool_settings.update(getattr(settings, 'LLM_HTTP_POOL', {}) or {})
+    except Exception:
+        pass
+    return pool_settings
+
+
+class HTTPPoolStats:
+    """
+    Thread-safe counters for pooled connection usage across all sessions
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.new_connections = 0
+            self.reused_connections = 0
+            self.queued_requests = 0
+            self.total_connect_ms = 0.0
+            self.total_queue_wait_ms = 0.0
+            self.dns_cache_hits = 0
+            self.dns_cache_misses = 0
+            self.sessions_created = 0
+            self.sessions_closed = 0
+
+    def record(self, **increments):
+        with self._lock:
+            for name, value in increments.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            avg_connect_ms = self.total_connect_ms / self.new_connections if self.new_connections else 0.0
+            acquired = self.new_connections + self.reused_connections
+            return {
+                'requests': self.requests,
+                'new_connections': self.new_connections,
+                'reused_connections': self.reused_connections,
+                'reuse_ratio': round(self.reused_connections / acquired, 3) if acquired else 0.0,
+                'avg_connect_ms': round(avg_connect_ms, 2),
+                'total_connect_ms': round(self.total_connect_ms, 2),
+                # Every reused connection skipped one TCP+TLS handshake
+                'estimated_handshake_ms_saved': round(avg_connect_ms * self.reused_connections, 2),
+                'queued_requests': self.queued_requests,
+                'total_queue_wait_ms': round(self.total_queue_wait_ms, 2),
+                'dns_cache_hits': self.dns_cache_hits,
+                'dns_cache_misses': self.dns_cache_misses,
+                'sessions_created': self.sessions_created,
+                'sessions_closed': self.sessions_closed,
+            }
+
+
+_stats = HTTPPoolStats()
+
+
+def _request_ctx(trace_config_ctx) -> Optional[Dict[str, Any]]:
+    """Per-request stats dict passed by providers via ``trace_request_ctx``"""
+    ctx = getattr(trace_config_ctx, 'trace_request_ctx', None)
+    return ctx if isinstance(ctx, dict) else None
+
+
+async def _on_request_start(session, trace_config_ctx, params):
+    _stats.record(requests=1)
+
+
+async def _on_connection_queued_start(session, trace_config_ctx, params):
+    trace_config_ctx.queued_at = time.perf_counter()
+
+
+async def _on_connection_queued_end(session, trace_config_ctx, params):
+    wait_ms = (time.perf_counter() - getattr(trace_config_ctx, 'queued_at', time.perf_counter())) * 1000
+    _stats.record(queued_requests=1, total_queue_wait_ms=wait_ms)
+    ctx = _request_ctx(trace_config_ctx)
+    if ctx is not None:
+        ctx['queue_wait_ms'] = round(wait_ms, 2)
+
+
+async def _on_connection_create_start(session, trace_config_ctx, params):
+    trace_config_ctx.connect_started_at = time.perf_counter()
+
+
+async def _on_connection_create_end(session, trace_config_ctx, params):
+    connect_ms = (time.perf_counter() - getattr(trace_config_ctx, 'connect_started_at', time.perf_counter())) * 1000
+    _stats.record(new_connections=1, total_connect_ms=connect_ms)
+    ctx = _request_ctx(trace_config_ctx)
+    if ctx is not None:
+        ctx['connection_reused'] = False
+        ctx['connect_ms'] = round(connect_ms, 2)
+
+
+async def _on_connection_reuseconn(session, trace_config_ctx, params):
+    _stats.record(reused_connections=1)
+    ctx = _request_ctx(trace_config_ctx)
+    if ctx is not None:
+        ctx['connection_reused'] = True
+        ctx['connect_ms'] = 0.0
+
+
+async def _on_dns_cache_hit(session, trace_config_ctx, params):
+    _stats.record(dns_cache_hits=1)
+
+
+async def _on_dns_cache_miss(session, trace_config_ctx, params):
+    _stats.record(dns_cache_misses=1)
+
+
+def _build_trace_config() -> aiohttp.TraceConfig:
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(_on_request_start)
+    trace_config.on_connection_queued_start.append(_on_connection_queued_start)
+    trace_config.on_connection_queued_end.append(_on_connection_queued_end)
+    trace_config.on_connection_create_start.append(_on_connection_create_start)
+    trace_config.on_connection_create_end.append(_on_connection_create_end)
+    trace_config.on_connection_reuseconn.append(_on_connection_reuseconn)
+    trace_config.on_dns_cache_hit.append(_on_dns_cache_hit)
+    trace_config.on_dns_cache_miss.append(_on_dns_cache_miss)
+    return trace_config
+
+
+# session.close() tasks scheduled while pruning, kept referenced until they finish
+_closing_tasks: Set[asyncio.Task] = set()
+
+
+class HTTPSessionRegistry:
+    """
+    One pooled ``ClientSession`` per event loop, created lazily on first use
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # id(loop) -> (weakref to loop, session)
+        self._sessions: Dict[int, tuple] = {}
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """
+        Return the pooled session for the running event loop.
+        Must be called from inside a coroutine.
+        """
+        loop = asyncio.get_running_loop()
+        loop_key = id(loop)
+
+        with self._lock:
+            entry = self._sessions.get(loop_key)
+            if entry is not None:
+                loop_ref, session = entry
+                if loop_ref() is loop and not session.closed:
+                    return session
+
+            self._prune_closed_loops_locked()
+            session = self._create_session()
+            self._sessions[loop_key] = (weakref.ref(loop), session)
+
+        _stats.record(sessions_created=1)
+        logger.info(f"🔌 HTTP POOL: Created pooled session for event loop {loop_key} ({len(self._sessions)} active)")
+        return session
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        pool_settings = _get_pool_settings()
+        connector = aiohttp.TCPConnector(
+            limit=pool_settings['LIMIT'],
+            limit_per_host=pool_settings['LIMIT_PER_HOST'],
+            keepalive_timeout=pool_settings['KEEPALIVE_TIMEOUT'],
+            ttl_dns_cache=pool_settings['DNS_CACHE_TTL'],
+            use_dns_cache=True,
+        )
+        # Per-request total timeouts are set by each provider; only bound connect here
+        timeout = aiohttp.ClientTimeout(total=None, connect=pool_settings['CONNECT_TIMEOUT'])
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=timeout,
+            trace_configs=[_build_trace_config()],
+        )
+
+    def _prune_closed_loops_locked(self):
+        """Drop sessions whose loop has gone away (e.g. after ``asyncio.run`` returned)"""
+        for loop_key, (loop_ref, session) in list(self._sessions.items()):
+            loop = loop_ref()
+            if loop is None or loop.is_closed():
+                del self._sessions[loop_key]
+                self._dispose_orphaned_session(session)
+
+    @staticmethod
+    def _dispose_orphaned_session(session: aiohttp.ClientSession):
+        """
+        Mark a session whose loop has closed as closed. Its sockets were left
+        open by the loop and can no longer be closed cleanly (they are freed by
+        GC), which is why short-lived loops should use ``run_with_http_pool``.
+        ``session.close()`` is awaited on the caller's running loop, or on a
+        throwaway loop when there is none.
+        """
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is not None:
+            # Held until done: the loop only keeps a weak reference to tasks
+            task = running_loop.create_task(session.close())
+            _closing_tasks.add(task)
+            task.add_done_callback(_closing_tasks.discard)
+        else:
+            asyncio.run(session.close())
+        _stats.record(sessions_closed=1)
+
+    async def close_current(self):
+        """Close the pooled session of the running event loop"""
+        loop_key = id(asyncio.get_running_loop())
+        with self._lock:
+            entry = self._sessions.pop(loop_key, None)
+        if entry is not None and not entry[1].closed:
+            await entry[1].close()
+            _stats.record(sessions_closed=1)
+            logger.info(f"🔌 HTTP POOL: Closed pooled session for event loop {loop_key}")
+
+    def close_all(self):
+        """
+        Close every pooled session. Sessions of running loops are closed on
+        their own loop, idle loops are driven to completion, closed loops are
+        disposed without awaiting.
+        """
+        with self._lock:
+            entries = list(self._sessions.values())
+            self._sessions.clear()
+
+        for loop_ref, session in entries:
+            loop = loop_ref()
+            if session.closed:
+                continue
+            try:
+                if loop is None or loop.is_closed():
+                    self._dispose_orphaned_session(session)
+                elif loop.is_running():
+                    asyncio.run_coroutine_threadsafe(session.close(), loop)
+                    _stats.record(sessions_closed=1)
+                else:
+                    loop.run_until_complete(session.close())
+                    _stats.record(sessions_closed=1)
+            except Exception as e:
+                logger.warning(f"⚠️ HTTP POOL: Failed to close pooled session cleanly: {e}")
+
+    def active_sessions(self) -> int:
+        with self._lock:
+            return sum(
+                1 for loop_ref, session in self._sessions.values()
+                if not session.closed and loop_ref() is not None and not loop_ref().is_closed()
+            )
+
+
+_registry = HTTPSessionRegistry()
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Get the pooled HTTP session for the running event loop"""
+    return _registry.get_session()
+
+
+async def close_http_session():
+    """Close the pooled HTTP session of the running event loop"""
+    await _registry.close_current()
+
+
+T = TypeVar('T')
+
+
+async def _closing_http_session(awaitable: Awaitable[T]) -> T:
+    try:
+        return await awaitable
+    finally:
+        await close_http_session()
+
+
+def run_with_http_pool(awaitable: Awaitable[T]) -> T:
+    """
+    ``asyncio.run`` for work that may call LLM providers: the loop's pooled
+    session and its keep-alive sockets are closed before the loop ends
+    """
+    return asyncio.run(_closing_http_session(awaitable))
+
+
+def close_all_http_sessions():
+    """Close all pooled HTTP sessions (process shutdown)"""
+    _registry.close_all()
+
+
+def get_http_pool_stats() -> Dict[str, Any]:
+    """Aggregate connection pool statistics for all pooled sessions"""
+    stats = _stats.snapshot()
+    stats['active_sessions'] = _registry.active_sessions()
+    return stats
+
+
+def reset_http_pool_stats():
+    """Reset pool counters (active sessions are unaffected)"""
+    _stats.reset()
+
+
+atexit.register(close_all_http_sessions)
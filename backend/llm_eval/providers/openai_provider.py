@@ -2,6 +2,7 @@ import aiohttp
 import time
 import logging
 from .base import LLMProvider, LLMResponse
+from .http_pool import get_http_session
 from typing import Dict, Any, Optional
 
 logger = logging.getLogger(__name__)
@@ -55,6 +56,34 @@ class OpenAIProvider(LLMProvider):
         token_count = response_data.get("usage", {}).get("total_tokens")
         return text, token_count
     
+    supports_streaming = True
+    
+    def get_stream_url(self) -> str:
+        return self.base_url
+    
+    def format_stream_request_body(self, prompt: str, **kwargs) -> Dict[str, Any]:
+        body = self.format_request_body(prompt, **kwargs)
+        body["stream"] = True
+        # Final chunk carries usage so token counts match non-streaming calls
+        body["stream_options"] = {"include_usage": True}
+        return body
+    
+    def parse_stream_event(self, event_name: Optional[str], data: Dict[str, Any]) -> tuple[str, Optional[int]]:
+        if "error" in data:
+            raise ValueError(data["error"].get("message", "Unknown streaming error"))
+        
+        token_count = (data.get("usage") or {}).get("total_tokens")
+        choices = data.get("choices") or []
+        if not choices:
+            return "", token_count
+        
+        finish_reason = choices[0].get("finish_reason")
+        if finish_reason == "content_filter":
+            raise ValueError("Response was filtered by content safety filters")
+        
+        delta = choices[0].get("delta") or {}
+        return delta.get("content") or "", token_count
+    
     def estimate_cost(self, token_count: Optional[int]) -> Optional[float]:
         if not token_count:
             return None
@@ -68,58 +97,63 @@ class OpenAIProvider(LLMProvider):
         start_time = time.time()
         
         try:
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout)) as session:
-                async with session.post(
-                    self.base_url,
-                    headers=self.get_headers(),
-                    json=self.format_request_body(prompt, **kwargs)
-                ) as response:
-                    response_time_ms = int((time.time() - start_time) * 1000)
-                    
-                    if response.status == 200:
-                        data = await response.json()
-                        try:
-                            text, token_count = self.parse_response(data)
-                            
-                            # Double-check that text is not empty after parsing
-                            if not text or not text.strip():
-                                error_msg = "OpenAI API returned empty response content"
-                                logger.warning(f"⚠️ OPENAI: {error_msg}. Response data: {data}")
-                                return LLMResponse(
-                                    text="",
-                                    model=self.model,
-                                    provider="openai",
-                                    response_time_ms=response_time_ms,
-                                    error=error_msg
-                                )
-                            
-                            return LLMResponse(
-                                text=text,
-                                model=self.model,
-                                provider="openai",
-                                response_time_ms=response_time_ms,
-                                token_count=token_count,
-                                cost_estimate=self.estimate_cost(token_count)
-                            )
-                        except ValueError as parse_error:
-                            # parse_response raised an error - return it as error
+            # Pooled keep-alive session shared by all providers on this event loop
+            session = get_http_session()
+            connection_stats: Dict[str, Any] = {}
+            async with session.post(
+                self.base_url,
+                headers=self.get_headers(),
+                json=self.format_request_body(prompt, **kwargs),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                trace_request_ctx=connection_stats
+            ) as response:
+                response_time_ms = int((time.time() - start_time) * 1000)
+                
+                if response.status == 200:
+                    data = await response.json()
+                    try:
+                        text, token_count = self.parse_response(data)
+                        
+                        # Double-check that text is not empty after parsing
+                        if not text or not text.strip():
+                            error_msg = "OpenAI API returned empty response content"
+                            logger.warning(f"⚠️ OPENAI: {error_msg}. Response data: {data}")
                             return LLMResponse(
                                 text="",
                                 model=self.model,
                                 provider="openai",
                                 response_time_ms=response_time_ms,
-                                error=str(parse_error)
+                                error=error_msg
                             )
-                    else:
-                        error_data = await response.json()
+                        
+                        return LLMResponse(
+                            text=text,
+                            model=self.model,
+                            provider="openai",
+                            response_time_ms=response_time_ms,
+                            token_count=token_count,
+                            cost_estimate=self.estimate_cost(token_count),
+                            connection_stats=connection_stats
+                        )
+                    except ValueError as parse_error:
+                        # parse_response raised an error - return it as error
                         return LLMResponse(
                             text="",
                             model=self.model,
                             provider="openai",
                             response_time_ms=response_time_ms,
-                            error=error_data.get("error", {}).get("message", "Unknown error")
+                            error=str(parse_error)
                         )
-                        
+                else:
+                    error_data = await response.json()
+                    return LLMResponse(
+                        text="",
+                        model=self.model,
+                        provider="openai",
+                        response_time_ms=response_time_ms,
+                        error=error_data.get("error", {}).get("message", "Unknown error")
+                    )
+                    
         except Exception as e:
             response_time_ms = int((time.time() - start_time) * 1000)
             return LLMResponse(
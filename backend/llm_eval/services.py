@@ -1,6 +1,10 @@
 import asyncio
 from typing import List, Dict, Any
+from asgiref.sync import sync_to_async
 from django.contrib.auth import get_user_model
+from django.db.models import F
+from django.utils import timezone
+from core.rate_limit import consume_daily_quota
 from users.models import APIKeyConfig, LLMProvider, LLMComparison, LLMResponse as LLMResponseModel, DashboardIcon
 from .providers import get_provider_class
 from .encryption import decrypt_api_key
@@ -48,6 +52,26 @@ class LLMComparisonService:
             is_active=True
         ).first()
     
+    def reserve_api_key_usage(self, api_config: APIKeyConfig) -> bool:
+        """
+        Count one call against the key's daily limit before it is made. The
+        check-and-increment is atomic in the shared counter store, so parallel
+        comparisons can't overshoot the limit; usage_count_today mirrors it for
+        the admin.
+        """
+        allowed, _ = consume_daily_quota(f"llm_eval:api_key:{api_config.id}", api_config.usage_limit_daily)
+        if not allowed:
+            return False
+        
+        today = timezone.localdate()
+        updated = APIKeyConfig.objects.filter(id=api_config.id, last_reset_date=today).update(
+            usage_count_today=F('usage_count_today') + 1
+        )
+        if not updated:
+            # First call of a new day
+            APIKeyConfig.objects.filter(id=api_config.id).update(usage_count_today=1, last_reset_date=today)
+        return True
+    
     async def run_comparison(self, prompt: str, provider_ids: List[int], **kwargs) -> Dict[str, Any]:
         """Run parallel comparison across multiple LLM providers"""
         comparison = LLMComparison.objects.create(
@@ -77,8 +101,8 @@ class LLMComparisonService:
     async def _query_single_provider(self, comparison, provider, api_config, prompt, **kwargs):
         """Query a single LLM provider"""
         try:
-            # Check usage limits
-            if api_config.usage_limit_daily and api_config.usage_count_today >= api_config.usage_limit_daily:
+            # Check and count usage against the daily limit
+            if not await sync_to_async(self.reserve_api_key_usage)(api_config):
                 raise Exception(f"Daily usage limit exceeded for {provider.name}")
             
             # Get provider class and create instance
@@ -109,10 +133,6 @@ class LLMComparisonService:
                 error_message=response.error or ''
             )
             
-            # Update usage count
-            api_config.usage_count_today += 1
-            api_config.save()
-            
             return {
                 'provider_name': provider.name,
                 'response_id': llm_response.id,
@@ -163,6 +163,11 @@ class LLMComparisonViewSet(viewsets.ModelViewSet):
                         if not api_config:
                             errors.append(f"No API key configured for {provider.name}")
                             continue
+                        
+                        # Count the call against the key's daily limit before making it
+                        if not service.reserve_api_key_usage(api_config):
+                            errors.append(f"Daily usage limit exceeded for {provider.name}")
+                            continue
                             
                         # Import and create provider instance
                         from llm_eval.providers import get_provider_class
@@ -233,10 +238,6 @@ class LLMComparisonViewSet(viewsets.ModelViewSet):
                                 successful_responses += 1
                                 print(f"✅ Successfully created response for {provider.name}")
                                 
-                                # Update usage count
-                                api_config.usage_count_today += 1
-                                api_config.save()
-                                
                             else:
                                 print(f"❌ OpenAI API error - Status: {response.status_code}")
                                 print(f"❌ Response content: {response.content}")
@@ -405,10 +406,6 @@ class LLMComparisonViewSet(viewsets.ModelViewSet):
                                     
                                     successful_responses += 1
                                     print(f"✅ Successfully created response for {provider.name}")
-                                    
-                                    # Update usage count
-                                    api_config.usage_count_today += 1
-                                    api_config.save()
                                 elif safety_blocked:
                                     # Handle safety filter blocks specifically
                                     LLMResponse.objects.create(
@@ -524,10 +521,6 @@ class LLMComparisonViewSet(viewsets.ModelViewSet):
                                     
                                     successful_responses += 1
                                     print(f"✅ Successfully created response for {provider.name}")
-                                    
-                                    # Update usage count
-                                    api_config.usage_count_today += 1
-                                    api_config.save()
                                 else:
                                     error_msg = "Invalid response format from Claude API"
                                     LLMResponse.objects.create(
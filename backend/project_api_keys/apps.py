@@ -6,3 +6,7 @@ class ProjectApiKeysConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'project_api_keys'
     verbose_name = 'Project API Key Management'
+    
+    def ready(self):
+        """Register cache invalidation signals"""
+        from . import signals  # noqa: F401
@@ -0,0 +1,44 @@
+# backend/project_api_keys/cache.py
+
+import logging
+from typing import Optional
+
+from django.conf import settings
+
+from core.shared_cache import get_shared_store
+
+logger = logging.getLogger(__name__)
+
+# Kept far longer than any process-local cache entry lives, so a counter that
+# expires and restarts cannot make an old cached entry current again
+DEFAULT_KEY_GENERATION_TTL = 30 * 86400  # seconds
+
+
+def _key_generation_key(project_id: str) -> str:
+    return f"api_key_gen:{project_id}"
+
+
+def get_key_generation(project_id: str, store=None) -> Optional[int]:
+    """
+    Shared generation of a project's API keys, bumped on every key change.
+    Include it in the key of anything cached from a project's keys so a change
+    made in one worker process retires the entries in all of them. None when
+    the shared store is unavailable: callers should not use cached entries.
+    """
+    try:
+        return (store or get_shared_store()).get_count(_key_generation_key(project_id))
+    except Exception as e:
+        logger.warning(f"⚠️ API KEY CACHE: Shared store unavailable, bypassing cache for project {project_id}: {e}")
+        return None
+
+
+def bump_key_generation(project_id: str, store=None) -> Optional[int]:
+    """Start a new generation for a project's API keys; returns it (None if the store failed)"""
+    key_settings = getattr(settings, 'PROJECT_API_KEY_SETTINGS', {})
+    ttl = int(key_settings.get('KEY_GENERATION_TTL', DEFAULT_KEY_GENERATION_TTL))
+    try:
+        _, generation = (store or get_shared_store()).incr_capped(_key_generation_key(project_id), 1, None, ttl)
+        return generation
+    except Exception as e:
+        logger.error(f"❌ API KEY CACHE: Failed to publish key change for project {project_id} to other processes: {e}")
+        return None
@@ -6,14 +6,23 @@ from cryptography.fernet import Fernet
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
 
+from core.ttl_cache import TTLCache
+
 class ProjectAPIKeyEncryption:
     """
     Handles encryption/decryption of project-specific API keys using project-isolated keys.
     Each project gets its own encryption derived from the base key + project ID.
+    Derived keys are cached per project because PBKDF2 derivation is deliberately slow.
     """
     
     def __init__(self):
         self.base_key = self._get_base_encryption_key()
+        key_settings = getattr(settings, 'PROJECT_API_KEY_SETTINGS', {})
+        self._key_cache = TTLCache(
+            'derived_project_keys',
+            maxsize=key_settings.get('DERIVED_KEY_CACHE_SIZE', 256),
+            ttl=key_settings.get('DERIVED_KEY_CACHE_TTL', 3600)
+        )
     
     def _get_base_encryption_key(self) -> bytes:
         """Get the base encryption key from environment"""
@@ -31,6 +40,14 @@ class ProjectAPIKeyEncryption:
             raise ImproperlyConfigured(f"Invalid encryption key format: {e}")
     
     def _get_project_key(self, project_id: str) -> Fernet:
+        """Get project-specific encryption key, deriving it on cache miss"""
+        fernet = self._key_cache.get(project_id)
+        if fernet is None:
+            fernet = self._derive_project_key(project_id)
+            self._key_cache.set(project_id, fernet)
+        return fernet
+    
+    def _derive_project_key(self, project_id: str) -> Fernet:
         """Generate project-specific encryption key derived from base key + project ID"""
         from cryptography.hazmat.primitives import hashes
         from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
@@ -51,6 +68,10 @@ class ProjectAPIKeyEncryption:
         
         return Fernet(fernet_key)
     
+    def get_cache_stats(self) -> dict:
+        """Derived key cache hit/miss counters"""
+        return self._key_cache.get_stats()
+    
     def encrypt_api_key(self, project_id: str, api_key: str) -> str:
         """Encrypt API key for specific project"""
         if not api_key or not api_key.strip():
@@ -4,6 +4,7 @@ import logging
 import asyncio
 from typing import Dict, Optional, List, Tuple
 from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import F
 from django.utils import timezone
 from asgiref.sync import sync_to_async
 
@@ -71,6 +72,20 @@ class ProjectAPIKeyService:
             logger.error(f"❌ Failed to retrieve API key for project {project_name} - {provider_type}: {e}")
             return None
 
+    def record_api_key_usage(self, project: IntelliDocProject, provider_type: str):
+        """
+        Update usage tracking without decrypting the key.
+        Used when a cached provider instance serves the request.
+        """
+        try:
+            ProjectAPIKey.objects.filter(
+                project=project,
+                provider_type=provider_type,
+                is_active=True
+            ).update(usage_count=F('usage_count') + 1, last_used_at=timezone.now())
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to record API key usage for project {project.name} - {provider_type}: {e}")
+
     async def get_project_api_key_async(self, project: IntelliDocProject, provider_type: str) -> Optional[str]:
         """
         Get decrypted API key for a project and provider (async version)
@@ -0,0 +1,58 @@
+"""
+Signals for project API key changes
+Retires cached LLM provider instances when a project's API key is created,
+updated or deleted: the project's key generation on the shared counter store
+is bumped (seen by every worker process) and listeners in this process are
+notified so they can drop their entries straight away.
+"""
+import logging
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+from typing import Optional
+
+from users.models import ProjectAPIKey
+from .cache import bump_key_generation
+
+logger = logging.getLogger(__name__)
+
+# Sent with project_id (str, or None for "all projects") and provider_type after a key changes
+project_api_key_changed = Signal()
+
+# Saves that only touch usage tracking do not change the key material
+USAGE_TRACKING_FIELDS = {'usage_count', 'last_used_at'}
+
+
+def _project_uuid(instance: ProjectAPIKey) -> Optional[str]:
+    try:
+        return str(instance.project.project_id)
+    except Exception:
+        # Project row already gone (cascade delete) - caller falls back to a full flush
+        return None
+
+
+def invalidate_project_api_key_caches(project_id: Optional[str], provider_type: str):
+    """
+    Retire cached credentials for a project/provider and notify listeners.
+    Without a project id (project already deleted) only this process is
+    flushed; nothing can use a deleted project's keys anyway.
+    """
+    if project_id:
+        bump_key_generation(project_id)
+    project_api_key_changed.send(
+        sender=ProjectAPIKey,
+        project_id=project_id,
+        provider_type=provider_type
+    )
+    logger.info(f"🔑 SIGNAL: Invalidated cached credentials for project {project_id} - {provider_type}")
+
+
+@receiver(post_save, sender=ProjectAPIKey)
+def invalidate_caches_on_key_save(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= USAGE_TRACKING_FIELDS:
+        return
+    invalidate_project_api_key_caches(_project_uuid(instance), instance.provider_type)
+
+
+@receiver(post_delete, sender=ProjectAPIKey)
+def invalidate_caches_on_key_delete(sender, instance, **kwargs):
+    invalidate_project_api_key_caches(_project_uuid(instance), instance.provider_type)
@@ -3,18 +3,15 @@ Advanced Embedding Strategies for Large Chunks
 Supports multiple approaches to handle large text content
 """
 
+import importlib.util
 import logging
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 import numpy as np
 
-# Try importing various embedding models
-try:
-    from sentence_transformers import SentenceTransformer
-    SENTENCE_TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    SENTENCE_TRANSFORMERS_AVAILABLE = False
+# Models themselves are loaded through the shared registry; only check availability here
+SENTENCE_TRANSFORMERS_AVAILABLE = importlib.util.find_spec('sentence_transformers') is not None
 
 try:
     import torch
@@ -22,6 +19,8 @@ try:
 except ImportError:
     TORCH_AVAILABLE = False
 
+from vector_search.model_registry import get_sentence_transformer
+
 logger = logging.getLogger('public_chatbot.embeddings')
 
 
@@ -110,18 +109,23 @@ class LargeChunkEmbedder:
         """
         self.strategy = strategy
         
+        self.model_name = model_name
+        self.config = self._create_config()
+        
         # Upgrade to better model if requested and available
         if use_enhanced_model and SENTENCE_TRANSFORMERS_AVAILABLE:
             self.model_name = self._select_best_available_model()
-        else:
-            self.model_name = model_name
+            self.config = self._create_config()
             
         self.model = None
-        self.config = self._create_config()
         self._initialize_model()
         
         logger.info(f"🧠 EMBEDDER: Initialized with {strategy.value} strategy using {self.model_name}")
     
+    def _device(self) -> Optional[str]:
+        """GPU when the config enables it, otherwise the registry's default device"""
+        return 'cuda' if self.config.use_gpu else None
+    
     def _select_best_available_model(self) -> str:
         """
         Select the best available embedding model for large chunks
@@ -136,7 +140,8 @@ class LargeChunkEmbedder:
             
             for model_name in preferred_models:
                 try:
-                    test_model = SentenceTransformer(model_name)
+                    # Loaded through the shared registry, so the probe load is the model later used
+                    get_sentence_transformer(model_name, self._device())
                     logger.info(f"🧠 EMBEDDER: Successfully loaded enhanced model {model_name}")
                     return model_name
                 except Exception as e:
@@ -170,11 +175,10 @@ class LargeChunkEmbedder:
             if not SENTENCE_TRANSFORMERS_AVAILABLE:
                 raise ImportError("SentenceTransformers not available")
             
-            self.model = SentenceTransformer(self.model_name)
+            # Process-wide shared instance for this model and device
+            self.model = get_sentence_transformer(self.model_name, self._device())
             
-            # Configure device
             if self.config.use_gpu:
-                self.model = self.model.cuda()
                 logger.info(f"🧠 EMBEDDER: Using GPU acceleration")
             
             # Get actual model specifications
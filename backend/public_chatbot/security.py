@@ -4,9 +4,10 @@ Enhanced security checks for file uploads and content validation
 """
 import os
 import re
+import codecs
 import hashlib
 import logging
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Tuple, Optional
 from pathlib import Path
 import tempfile
 # Optional python-magic for enhanced MIME type detection
@@ -23,6 +24,21 @@ from django.utils import timezone
 
 logger = logging.getLogger('public_chatbot.security')
 
+# Byte signatures of executables and scripts (signature, description)
+MALWARE_SIGNATURES = [
+    (b'MZ\x90\x00', 'PE executable header'),
+    (b'PK\x03\x04', 'ZIP archive'),  # could contain executables
+    (b'\x7fELF', 'ELF executable'),
+    (b'\xca\xfe\xba\xbe', 'Java class file'),
+    (b'<?php', 'PHP script'),
+    (b'<script', 'JavaScript'),
+    (b'javascript:', 'JavaScript URL'),
+    (b'vbscript:', 'VBScript URL'),
+]
+
+# Formats that are ZIP containers by design, so the ZIP signature is expected
+ZIP_CONTAINER_EXTENSIONS = {'.docx', '.xlsx'}
+
 
 class DocumentSecurityValidator:
     """
@@ -59,22 +75,24 @@ class DocumentSecurityValidator:
         '.xlsx': 30 * 1024 * 1024,   # 30MB
     }
     
-    # Content validation patterns (dangerous content)
+    # Content validation patterns (dangerous content). Every repeat is bounded
+    # and stops at the next opening delimiter, so a search costs linear time
+    # even on adversarial input such as a file of repeated "<%" or "{".
     DANGEROUS_CONTENT_PATTERNS = [
-        r'<script[^>]*>.*?</script>',                    # JavaScript
+        r'<script[^<>]{0,1024}>[^<]{0,4096}</script>',  # JavaScript
         r'javascript:',                                  # JavaScript protocol
-        r'data:.*base64',                               # Base64 data URLs
+        r'data:[^,\s]{0,100}base64',                     # Base64 data URLs
         r'vbscript:',                                   # VBScript
-        r'on\w+\s*=',                                   # Event handlers
+        r'on\w{1,30}\s*=',                              # Event handlers
         r'eval\s*\(',                                   # Eval functions
         r'exec\s*\(',                                   # Exec functions
         r'system\s*\(',                                 # System calls
         r'shell_exec\s*\(',                             # Shell execution
         r'<?php',                                       # PHP code
-        r'<%.*%>',                                      # ASP/JSP code
-        r'\$\{.*\}',                                    # Template injection
-        r'{{.*}}',                                      # Template injection
-        r'<%=.*%>',                                     # Server-side includes
+        r'<%[^%]{0,4096}%>',                            # ASP/JSP code
+        r'\$\{[^{}]{0,4096}\}',                         # Template injection
+        r'\{\{[^{}]{0,4096}\}\}',                       # Template injection
+        r'<%=[^%]{0,4096}%>',                           # Server-side includes
     ]
     
     # Suspicious text patterns
@@ -178,15 +196,15 @@ class DocumentSecurityValidator:
             if hasattr(file_obj, 'content_type'):
                 self._validate_mime_type(file_obj, file_errors)
             
-            # Content validation (for small files only)
-            if file_obj.size < 5 * 1024 * 1024:  # Only scan files < 5MB
-                self._validate_file_content(file_obj, file_warnings)
+            # Content validation (one streaming pass, so memory stays flat for any size)
+            sha256 = self._validate_file_content(file_obj, file_warnings)
             
             return {
                 'valid': len(file_errors) == 0,
                 'errors': file_errors,
                 'warnings': file_warnings,
-                'scanned': True
+                'scanned': True,
+                'sha256': sha256
             }
             
         except Exception as e:
@@ -293,34 +311,37 @@ class DocumentSecurityValidator:
                     'message': f'MIME type {declared_type} doesn\'t match extension {extension}'
                 })
     
-    def _validate_file_content(self, file_obj: UploadedFile, warnings: List[str]):
-        """Validate file content for security issues"""
+    def _validate_file_content(self, file_obj: UploadedFile, warnings: List[str]) -> Optional[str]:
+        """Validate file content for security issues; returns the content's SHA-256"""
         try:
-            # Read first 64KB for content analysis
-            file_obj.seek(0)
-            sample_content = file_obj.read(65536).decode('utf-8', errors='ignore')
-            file_obj.seek(0)  # Reset file pointer
+            scan = get_upload_scanner().scan(file_obj)
+            
+            # Check for executable / script signatures
+            extension = Path(file_obj.name).suffix.lower()
+            signature_descriptions = dict(MALWARE_SIGNATURES)
+            for signature in scan['signatures']:
+                if signature == b'PK\x03\x04' and extension in ZIP_CONTAINER_EXTENSIONS:
+                    continue
+                warnings.append(f"File signature detected: {signature_descriptions.get(signature, signature)}")
             
             # Check for dangerous content patterns
-            for pattern in self.DANGEROUS_CONTENT_PATTERNS:
-                if re.search(pattern, sample_content, re.IGNORECASE | re.DOTALL):
-                    warnings.append(f"Suspicious content pattern detected: {pattern[:30]}...")
+            for pattern in scan['dangerous_patterns']:
+                warnings.append(f"Suspicious content pattern detected: {pattern[:30]}...")
             
-            # Check for sensitive information
-            for pattern in self.SUSPICIOUS_TEXT_PATTERNS:
-                matches = re.finditer(pattern, sample_content, re.IGNORECASE)
-                for match in matches:
-                    warnings.append(f"Potential sensitive information: {match.group()[:30]}...")
-                    break  # Only report first match per pattern
+            # Check for sensitive information (first match per pattern)
+            for match_text in scan['sensitive_matches'].values():
+                warnings.append(f"Potential sensitive information: {match_text[:30]}...")
             
             # Check for excessive binary content (could be embedded files)
-            binary_ratio = sum(1 for c in sample_content if ord(c) > 127) / len(sample_content)
-            if binary_ratio > 0.3:  # More than 30% non-ASCII
-                warnings.append(f"High binary content ratio: {binary_ratio:.2f}")
+            if scan['binary_ratio'] > 0.3:  # More than 30% non-ASCII
+                warnings.append(f"High binary content ratio: {scan['binary_ratio']:.2f}")
+            
+            return scan['sha256']
                 
         except Exception as e:
             # Content validation is optional, so don't fail the upload
             logger.warning(f"🔒 SECURITY: Content validation failed for {file_obj.name}: {e}")
+            return None
     
     def generate_security_report(self, validation_result: Dict[str, Any]) -> str:
         """Generate a human-readable security report"""
@@ -369,37 +390,154 @@ class DocumentSecurityValidator:
         return "\n".join(report_lines)
 
 
+class StreamingUploadScanner:
+    """
+    Scans an upload in one pass of fixed-size chunks: SHA-256, byte
+    signatures, dangerous / sensitive text patterns and the non-ASCII ratio,
+    with memory bounded by the chunk size whatever the file size.
+    
+    Every pattern is searched on each chunk while it is in cache and drops
+    out once it has matched (each is reported once, at its first match).
+    Consecutive chunks overlap so matches across a boundary are found; like
+    the old 64KB sample, a single match cannot span more than a chunk.
+    
+    Text patterns run on an ASCII-lowercased copy of the chunk with their
+    literals lowercased, which keeps re's fast literal search that
+    re.IGNORECASE turns off; signatures are case-sensitive substring
+    searches on the original bytes.
+    
+    The patterns only see the first PATTERN_SCAN_LIMIT bytes, so the regex
+    cost of an upload has a fixed ceiling; the hash, signatures and binary
+    ratio still cover the whole file.
+    """
+    
+    CHUNK_SIZE = 64 * 1024
+    OVERLAP = 4 * 1024
+    PATTERN_SCAN_LIMIT = 5 * 1024 * 1024
+    
+    def __init__(self, signatures: List[Tuple[bytes, str]], dangerous_patterns: List[str],
+                 sensitive_patterns: List[str]):
+        self.signatures = [signature for signature, _description in signatures]
+        # (kind, pattern, compiled lowercased pattern)
+        self._text_patterns = [
+            ('dangerous', pattern, re.compile(_lowercase_pattern(pattern).encode('utf-8'), re.DOTALL))
+            for pattern in dangerous_patterns
+        ] + [
+            ('sensitive', pattern, re.compile(_lowercase_pattern(pattern).encode('utf-8')))
+            for pattern in sensitive_patterns
+        ]
+    
+    def _match(self, buffer: bytes, remaining_signatures: set, remaining_patterns: set,
+               found: Dict[Any, bytes]):
+        """Record the first match in ``buffer`` of every signature / pattern index still remaining"""
+        for index in list(remaining_signatures):
+            if self.signatures[index] in buffer:
+                found[('signature', index)] = self.signatures[index]
+                remaining_signatures.discard(index)
+        if remaining_patterns:
+            lowered = buffer.lower()
+            for index in list(remaining_patterns):
+                match = self._text_patterns[index][2].search(lowered)
+                if match is not None:
+                    found[('pattern', index)] = buffer[match.start():match.end()]
+                    remaining_patterns.discard(index)
+    
+    def scan(self, file_obj) -> Dict[str, Any]:
+        """Scan an uploaded file (read once, from the start; the position is reset after)"""
+        sha256 = hashlib.sha256()
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+        remaining_signatures = set(range(len(self.signatures)))
+        remaining_patterns = set(range(len(self._text_patterns)))
+        found: Dict[Any, bytes] = {}
+        tail = b''
+        size = 0
+        text_chars = 0
+        non_ascii_chars = 0
+        
+        file_obj.seek(0)
+        try:
+            # read() rather than chunks(): in-memory uploads yield their whole content as one chunk
+            for chunk in iter(lambda: file_obj.read(self.CHUNK_SIZE), b''):
+                size += len(chunk)
+                sha256.update(chunk)
+                
+                # Non-ASCII share of the decoded text, as measured on the old text sample
+                text = decoder.decode(chunk)
+                text_chars += len(text)
+                non_ascii_chars += len(text) - len(text.encode('ascii', 'ignore'))
+                
+                if size - len(chunk) >= self.PATTERN_SCAN_LIMIT:
+                    remaining_patterns.clear()
+                if remaining_signatures or remaining_patterns:
+                    buffer = tail + chunk
+                    self._match(buffer, remaining_signatures, remaining_patterns, found)
+                    tail = buffer[-self.OVERLAP:]
+        finally:
+            file_obj.seek(0)
+        
+        result = {
+            'sha256': sha256.hexdigest(),
+            'size': size,
+            'signatures': [],
+            'dangerous_patterns': [],
+            'sensitive_matches': {},
+            'binary_ratio': non_ascii_chars / text_chars if text_chars else 0.0
+        }
+        for index, signature in enumerate(self.signatures):
+            if ('signature', index) in found:
+                result['signatures'].append(signature)
+        for index, (kind, pattern, _) in enumerate(self._text_patterns):
+            if ('pattern', index) not in found:
+                continue
+            if kind == 'dangerous':
+                result['dangerous_patterns'].append(pattern)
+            else:
+                result['sensitive_matches'][pattern] = found[('pattern', index)].decode('utf-8', errors='ignore')
+        return result
+    
+    def find_signatures(self, content: bytes) -> List[int]:
+        """Indexes of the signatures present in ``content``"""
+        return [index for index, signature in enumerate(self.signatures) if signature in content]
+
+
+def _lowercase_pattern(pattern: str) -> str:
+    """Lowercase a regex's literals, leaving escapes such as \\S or \\W alone"""
+    return re.sub(r'\\.|[A-Z]+', lambda m: m.group().lower() if m.group()[0] != '\\' else m.group(), pattern)
+
+
+_upload_scanner: Optional[StreamingUploadScanner] = None
+
+
+def get_upload_scanner() -> StreamingUploadScanner:
+    """Process-wide scanner (its compiled pattern sets are reused across uploads)"""
+    global _upload_scanner
+    
+    if _upload_scanner is None:
+        _upload_scanner = StreamingUploadScanner(
+            MALWARE_SIGNATURES,
+            DocumentSecurityValidator.DANGEROUS_CONTENT_PATTERNS,
+            DocumentSecurityValidator.SUSPICIOUS_TEXT_PATTERNS
+        )
+    return _upload_scanner
+
+
 def scan_for_malware_signatures(file_content: bytes) -> List[str]:
     """
     Basic malware signature detection
     This is a simple implementation - in production, use proper antivirus scanning
     """
-    signatures = [
-        b'MZ\x90\x00',  # PE executable header
-        b'PK\x03\x04',  # ZIP file (could contain executables)
-        b'\x7fELF',     # ELF executable
-        b'\xca\xfe\xba\xbe',  # Java class file
-        b'<?php',       # PHP script
-        b'<script',     # JavaScript
-        b'javascript:',  # JavaScript URL
-        b'vbscript:',   # VBScript URL
-    ]
-    
-    detected = []
-    for i, signature in enumerate(signatures):
-        if signature in file_content:
-            detected.append(f"Signature_{i+1}")
-    
-    return detected
+    return [f"Signature_{i+1}" for i in get_upload_scanner().find_signatures(file_content)]
 
 
 def hash_file_content(file_obj: UploadedFile) -> str:
-    """Generate SHA-256 hash of file content for integrity checking"""
+    """Generate SHA-256 hash of file content for integrity checking (read in chunks)"""
+    sha256 = hashlib.sha256()
     file_obj.seek(0)
-    content = file_obj.read()
+    for chunk in iter(lambda: file_obj.read(StreamingUploadScanner.CHUNK_SIZE), b''):
+        sha256.update(chunk)
     file_obj.seek(0)
     
-    return hashlib.sha256(content).hexdigest()
+    return sha256.hexdigest()
 
 
 def sanitize_filename(filename: str) -> str:
@@ -36,6 +36,27 @@ except ImportError:
 logger = logging.getLogger('public_chatbot')
 
 
+if CHROMADB_AVAILABLE and SENTENCE_TRANSFORMERS_AVAILABLE:
+    class SharedSentenceTransformerEmbeddingFunction(embedding_functions.SentenceTransformerEmbeddingFunction):
+        """
+        ChromaDB SentenceTransformer embedding function backed by the process-wide
+        model registry instead of a private copy of the model
+        """
+        
+        def __init__(self, model_name: str = "all-MiniLM-L6-v2", normalize_embeddings: bool = False):
+            from vector_search.model_registry import get_registry_settings, get_sentence_transformer
+            
+            # Deliberately not calling super().__init__(), which loads its own model;
+            # these are the attributes its __call__ and get_config() use
+            self.model_name = model_name
+            self.device = get_registry_settings()['DEVICE']
+            self.normalize_embeddings = normalize_embeddings
+            self.kwargs = {}
+            self._model = get_sentence_transformer(model_name, self.device)
+else:
+    SharedSentenceTransformerEmbeddingFunction = None
+
+
 class PublicKnowledgeService:
     """
     Completely isolated ChromaDB service for public chatbot
@@ -140,8 +161,8 @@ class PublicKnowledgeService:
             
             # Initialize embedding function (reuse same model as your system)
             if SENTENCE_TRANSFORMERS_AVAILABLE:
-                self.embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
-                    model_name="all-MiniLM-L6-v2"  # Same as your existing system
+                self.embedding_function = SharedSentenceTransformerEmbeddingFunction(
+                    model_name="all-MiniLM-L6-v2"  # Same model instance as your existing system
                 )
                 logger.info("✅ CHROMA: Using SentenceTransformer embeddings")
             else:
@@ -159,6 +180,22 @@ class PublicKnowledgeService:
             logger.error(f"❌ CHROMA: Failed to initialize ChromaDB service: {e}")
             self.is_ready = False
     
+    def _query_input(self, search_query: str) -> Dict[str, Any]:
+        """Query embedding from the shared query cache when our embedding function is in use"""
+        if (SharedSentenceTransformerEmbeddingFunction is None or
+                not isinstance(self.embedding_function, SharedSentenceTransformerEmbeddingFunction)):
+            return {'query_texts': [search_query]}
+        
+        from vector_search.query_embedding_cache import cached_query_embedding
+        embedding = cached_query_embedding(
+            search_query, self.embedding_function.model_name,
+            lambda text: self.embedding_function._model.encode(
+                [text], convert_to_numpy=True, normalize_embeddings=self.embedding_function.normalize_embeddings
+            )[0],
+            normalize=self.embedding_function.normalize_embeddings
+        )
+        return {'query_embeddings': [embedding.tolist()]}
+    
     def _get_or_create_collection(self):
         """Get or create public knowledge collection"""
         try:
@@ -366,7 +403,7 @@ Please provide ONLY the rephrased query, nothing else:"""
             
             # Perform vector search in ChromaDB (isolated from your Milvus)
             results = self.collection.query(
-                query_texts=[search_query],
+                **self._query_input(search_query),
                 n_results=min(limit, 15),  # Max 15 results to get top 10 quality ones
                 include=['documents', 'metadatas', 'distances']
             )
@@ -0,0 +1,45 @@
+"""
+Tests for the Public Chatbot upload scanner
+"""
+import io
+import time
+
+from django.test import SimpleTestCase
+
+from .security import StreamingUploadScanner, get_upload_scanner
+
+
+class StreamingUploadScannerTests(SimpleTestCase):
+    """The scanner's regex cost must stay linear on adversarial uploads"""
+
+    # Generous for a slow CI box; the old DOTALL patterns took minutes here
+    TIME_BUDGET_SECONDS = 5.0
+
+    PATHOLOGICAL_UNITS = [b'<%', b'{', b'${', b'<script', b'data:', b'on']
+
+    def _scan(self, content: bytes):
+        return get_upload_scanner().scan(io.BytesIO(content))
+
+    def test_pathological_input_scans_within_budget(self):
+        for unit in self.PATHOLOGICAL_UNITS:
+            with self.subTest(unit=unit):
+                content = unit * (1024 * 1024 // len(unit))
+                started = time.process_time()
+                self._scan(content)
+                self.assertLess(time.process_time() - started, self.TIME_BUDGET_SECONDS)
+
+    def test_bounded_patterns_still_match(self):
+        result = self._scan(b'Hello <% Response.Write(1) %> and {{ user.name }} and ${env.HOME}')
+
+        self.assertIn(r'<%[^%]{0,4096}%>', result['dangerous_patterns'])
+        self.assertIn(r'\{\{[^{}]{0,4096}\}\}', result['dangerous_patterns'])
+        self.assertIn(r'\$\{[^{}]{0,4096}\}', result['dangerous_patterns'])
+
+    def test_patterns_stop_at_scan_limit(self):
+        padding = b'x' * StreamingUploadScanner.PATTERN_SCAN_LIMIT
+        result = self._scan(padding + b'<% payload %> <script')
+
+        self.assertEqual(result['dangerous_patterns'], [])
+        # Signatures and the hash still cover the whole file
+        self.assertIn(b'<script', result['signatures'])
+        self.assertEqual(result['size'], len(padding) + 21)
@@ -8,24 +8,18 @@ from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.utils import timezone
 from django.views.decorators.cache import never_cache
-from django.core.cache import cache
 import json
 import logging
 import hashlib
+from functools import wraps
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 
-# Rate limiting (install: pip install django-ratelimit)
-try:
-    from django_ratelimit.decorators import ratelimit
-    RATELIMIT_AVAILABLE = True
-except ImportError:
-    RATELIMIT_AVAILABLE = False
-    # Fallback decorator that does nothing
-    def ratelimit(*args, **kwargs):
-        def decorator(func):
-            return func
-        return decorator
+# Rate limiting: token bucket in the shared counter store (holds across worker processes)
+from core.rate_limit import check_rate_limit
+
+# Requests per minute allowed from one client IP
+PUBLIC_CHATBOT_RATE_LIMIT_PER_MINUTE = 10
 
 # Import isolated services
 from .services import PublicKnowledgeService, ChatbotSecurityService
@@ -100,26 +94,25 @@ def _add_cors_headers(response, request):
 
 
 def _rate_limit_decorator():
-    """Apply rate limiting if django-ratelimit is available"""
-    if RATELIMIT_AVAILABLE:
-        return ratelimit(key='ip', rate='10/m', method='POST', block=True)
-    else:
-        # Custom rate limiting fallback
-        def decorator(func):
-            def wrapper(request, *args, **kwargs):
+    """Rate limit POST requests per client IP"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(request, *args, **kwargs):
+            if request.method == 'POST':
                 client_ip = _get_client_ip(request)
-                
-                # Check custom rate limiting
-                if _is_rate_limited(client_ip):
-                    return JsonResponse({
+                retry_after = _is_rate_limited(client_ip)
+                if retry_after:
+                    response = JsonResponse({
                         'status': 'error',
                         'error': 'Rate limit exceeded. Please try again later.',
-                        'retry_after': 60
+                        'retry_after': retry_after
                     }, status=429)
-                
-                return func(request, *args, **kwargs)
-            return wrapper
-        return decorator
+                    response['Retry-After'] = str(retry_after)
+                    return response
+            
+            return func(request, *args, **kwargs)
+        return wrapper
+    return decorator
 
 
 def _get_client_ip(request) -> str:
@@ -170,23 +163,13 @@ def _is_private_ip(ip: str) -> bool:
         return False
 
 
-def _is_rate_limited(ip_address: str) -> bool:
-    """Custom rate limiting implementation"""
-    try:
-        # Use cache for simple rate limiting
-        cache_key = f"rate_limit_{ip_address}"
-        current_count = cache.get(cache_key, 0)
-        
-        if current_count >= 10:  # 10 requests per minute
-            return True
-        
-        # Increment counter
-        cache.set(cache_key, current_count + 1, 60)  # 60 seconds
-        return False
-        
-    except Exception as e:
-        logger.error(f"Rate limiting error for {ip_address}: {e}")
-        return False  # Allow on error
+def _is_rate_limited(ip_address: str) -> Optional[int]:
+    """Consume one request for this IP; returns seconds to wait when over the limit, else None"""
+    result = check_rate_limit(f"public_chatbot:ip:{ip_address}", PUBLIC_CHATBOT_RATE_LIMIT_PER_MINUTE, 60)
+    if not result.allowed:
+        logger.warning(f"🚦 PUBLIC CHATBOT: Rate limit exceeded for {ip_address}, retry after {result.retry_after}s")
+        return result.retry_after
+    return None
 
 
 @csrf_exempt
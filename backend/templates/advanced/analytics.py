@@ -17,11 +17,13 @@ from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 from pathlib import Path
-from collections import defaultdict, Counter
+from collections import Counter
 import statistics
 from django.db import models
 from django.utils import timezone
 
+from .analytics_store import get_analytics_store
+
 logger = logging.getLogger(__name__)
 
 
@@ -88,6 +90,8 @@ class TemplateAnalyticsService:
     def __init__(self):
         self.analytics_base_path = Path("logs/analytics")
         self.analytics_base_path.mkdir(parents=True, exist_ok=True)
+        # Append-only event store with per-template, per-day rollups
+        self.event_store = get_analytics_store(self.analytics_base_path)
         logger.info("Initialized TemplateAnalyticsService")
     
     def track_template_usage(self, template_id: str, action: str, 
@@ -103,22 +107,8 @@ class TemplateAnalyticsService:
                 'metadata': metadata or {}
             }
             
-            # Save to daily usage log
-            date_str = datetime.now().strftime('%Y-%m-%d')
-            usage_log_path = self.analytics_base_path / f"usage_{date_str}.json"
-            
-            # Load existing events
-            if usage_log_path.exists():
-                with open(usage_log_path, 'r') as f:
-                    events = json.load(f)
-            else:
-                events = []
-            
-            events.append(usage_event)
-            
-            # Save updated events
-            with open(usage_log_path, 'w') as f:
-                json.dump(events, f, indent=2)
+            # Append the event and update its rollups in one transaction
+            self.event_store.append(usage_event)
             
             logger.info(f"Template usage tracked successfully")
             
@@ -136,56 +126,33 @@ class TemplateAnalyticsService:
             end_date = datetime.now()
             start_date = end_date - timedelta(days=days)
             
-            usage_events = self._get_usage_events(template_id, start_date, end_date)
-            
-            # Calculate metrics
-            total_projects = len(set(event.get('metadata', {}).get('project_id') 
-                                   for event in usage_events 
-                                   if event.get('metadata', {}).get('project_id')))
-            
-            active_projects = len(set(event.get('metadata', {}).get('project_id') 
-                                    for event in usage_events 
-                                    if event.get('action') in ['project_access', 'document_upload']
-                                    and event.get('metadata', {}).get('project_id')))
-            
-            completed_projects = len(set(event.get('metadata', {}).get('project_id') 
-                                       for event in usage_events 
-                                       if event.get('action') == 'project_completed'
-                                       and event.get('metadata', {}).get('project_id')))
-            
-            total_documents = sum(event.get('metadata', {}).get('document_count', 0) 
-                                for event in usage_events 
-                                if event.get('action') == 'document_upload')
-            
-            processing_times = [event.get('metadata', {}).get('processing_time', 0) 
-                              for event in usage_events 
-                              if event.get('action') == 'document_processed' 
-                              and event.get('metadata', {}).get('processing_time')]
+            # Calculate metrics from the daily rollups
+            usage = self.event_store.usage_summary(
+                template_id, start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')
+            )
             
-            total_processing_time = sum(processing_times)
-            average_project_duration = statistics.mean(processing_times) if processing_times else 0
+            total_processing_time = usage['processing_time_total']
+            average_project_duration = (total_processing_time / usage['processing_count']
+                                        if usage['processing_count'] else 0)
             
             # Calculate success rate
-            successful_events = len([e for e in usage_events if e.get('metadata', {}).get('success', True)])
-            success_rate = successful_events / len(usage_events) if usage_events else 0
+            success_rate = usage['successes'] / usage['events'] if usage['events'] else 0
             
             # Get user satisfaction (placeholder - would integrate with feedback system)
             user_satisfaction_score = 4.2  # Default value
             
             # Get creation date
-            created_date = min(datetime.fromisoformat(event['timestamp']) 
-                             for event in usage_events) if usage_events else datetime.now()
+            created_date = datetime.fromtimestamp(usage['first_ts']) if usage['first_ts'] else datetime.now()
             
             # Get last used date
-            last_used = max(datetime.fromisoformat(event['timestamp']) 
-                          for event in usage_events) if usage_events else datetime.now()
+            last_used = datetime.fromtimestamp(usage['last_ts']) if usage['last_ts'] else datetime.now()
             
             metrics = TemplateUsageMetrics(
                 template_id=template_id,
-                total_projects=total_projects,
-                active_projects=active_projects,
-                completed_projects=completed_projects,
-                total_documents_processed=total_documents,
+                total_projects=usage['total_projects'],
+                active_projects=usage['active_projects'],
+                completed_projects=usage['completed_projects'],
+                total_documents_processed=usage['documents'],
                 total_processing_time=total_processing_time,
                 average_project_duration=average_project_duration,
                 success_rate=success_rate,
@@ -264,39 +231,22 @@ class TemplateAnalyticsService:
             end_date = datetime.now()
             start_date = end_date - timedelta(days=days)
             
-            behavior_events = self._get_behavior_events(template_id, start_date, end_date)
-            
-            # Calculate behavior metrics
-            sessions = defaultdict(list)
-            for event in behavior_events:
-                session_id = event.get('metadata', {}).get('session_id')
-                if session_id:
-                    sessions[session_id].append(event)
+            # Session and feature rollups of events tracked with session_id / feature metadata
+            behavior = self.event_store.behavior_summary(
+                template_id, start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')
+            )
             
             # Bounce rate (sessions with only one event)
-            bounce_sessions = len([s for s in sessions.values() if len(s) == 1])
-            bounce_rate = bounce_sessions / len(sessions) if sessions else 0
-            
-            # Session duration
-            session_durations = []
-            for session_events in sessions.values():
-                if len(session_events) > 1:
-                    start_time = min(datetime.fromisoformat(e['timestamp']) for e in session_events)
-                    end_time = max(datetime.fromisoformat(e['timestamp']) for e in session_events)
-                    duration = (end_time - start_time).total_seconds()
-                    session_durations.append(duration)
+            bounce_rate = behavior['bounced_sessions'] / behavior['sessions'] if behavior['sessions'] else 0
             
-            session_duration_avg = statistics.mean(session_durations) if session_durations else 0
+            # Session duration (sessions with more than one event)
+            session_duration_avg = behavior['session_duration_avg']
             
             # Pages per session
-            pages_per_session = statistics.mean([len(s) for s in sessions.values()]) if sessions else 0
+            pages_per_session = behavior['events_per_session']
             
             # Feature usage
-            feature_usage = Counter()
-            for event in behavior_events:
-                feature = event.get('metadata', {}).get('feature')
-                if feature:
-                    feature_usage[feature] += 1
+            feature_usage = Counter(behavior['feature_usage'])
             
             most_used_features = [feature for feature, _ in feature_usage.most_common(5)]
             least_used_features = [feature for feature, _ in feature_usage.most_common()[-5:]]
@@ -416,31 +366,6 @@ class TemplateAnalyticsService:
             logger.error(f"Error generating analytics report: {str(e)}")
             raise
     
-    def _get_usage_events(self, template_id: str, start_date: datetime, end_date: datetime) -> List[Dict]:
-        """Get usage events for a template within date range"""
-        events = []
-        
-        current_date = start_date
-        while current_date <= end_date:
-            date_str = current_date.strftime('%Y-%m-%d')
-            usage_log_path = self.analytics_base_path / f"usage_{date_str}.json"
-            
-            if usage_log_path.exists():
-                try:
-                    with open(usage_log_path, 'r') as f:
-                        daily_events = json.load(f)
-                    
-                    # Filter events for this template
-                    template_events = [e for e in daily_events if e.get('template_id') == template_id]
-                    events.extend(template_events)
-                    
-                except Exception as e:
-                    logger.warning(f"Error reading usage log {usage_log_path}: {str(e)}")
-            
-            current_date += timedelta(days=1)
-        
-        return events
-    
     def _get_performance_events(self, template_id: str, start_date: datetime, end_date: datetime) -> List[Dict]:
         """Get performance events for a template"""
         # Placeholder - would integrate with actual performance monitoring
@@ -454,21 +379,6 @@ class TemplateAnalyticsService:
             }
         ]
     
-    def _get_behavior_events(self, template_id: str, start_date: datetime, end_date: datetime) -> List[Dict]:
-        """Get user behavior events for a template"""
-        # Placeholder - would integrate with user behavior tracking
-        return [
-            {
-                'template_id': template_id,
-                'action': 'page_view',
-                'timestamp': datetime.now().isoformat(),
-                'metadata': {
-                    'session_id': 'session_123',
-                    'feature': 'document_upload'
-                }
-            }
-        ]
-    
     def _get_all_template_ids(self) -> List[str]:
         """Get all available template IDs"""
         # Placeholder - would get from actual template discovery
@@ -0,0 +1,312 @@
+"""
+Template Analytics Event Store
+
+Append-only SQLite store for template usage events, with per-template,
+per-day rollups updated in the same transaction as each insert:
+
+- ``daily_rollups``: event, success, document and processing-time totals
+- ``daily_projects``: projects seen / active / completed per day
+- ``daily_features``: feature usage counts per day
+- ``sessions``: first/last event and event count per session
+
+Reports read the rollups; raw events are only kept for
+``RAW_RETENTION_DAYS`` and rollups for ``ROLLUP_RETENTION_DAYS``. Writes run
+under ``BEGIN IMMEDIATE``, so concurrent processes never lose events.
+Legacy ``usage_<date>.json`` files in the analytics directory are imported
+once when the store is opened.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEMPLATE_ANALYTICS_SETTINGS = {
+    'STORE_PATH': '',  # '' keeps events.sqlite3 in the analytics directory
+    'RAW_RETENTION_DAYS': 30,  # Days raw events are kept; 0 keeps them forever
+    'ROLLUP_RETENTION_DAYS': 400,  # Days rollups are kept; 0 keeps them forever
+}
+
+# Expired rows are rotated out every this many writes
+ROTATE_EVERY = 1000
+
+# daily_projects.flags bits
+PROJECT_SEEN = 1
+PROJECT_ACTIVE = 2
+PROJECT_COMPLETED = 4
+
+ACTIVE_PROJECT_ACTIONS = ('project_access', 'document_upload')
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS events ('
+    'id INTEGER PRIMARY KEY AUTOINCREMENT, template_id TEXT NOT NULL, action TEXT NOT NULL, '
+    'timestamp TEXT NOT NULL, day TEXT NOT NULL, metadata TEXT NOT NULL)',
+    'CREATE INDEX IF NOT EXISTS events_template_day ON events (template_id, day)',
+    'CREATE INDEX IF NOT EXISTS events_day ON events (day)',
+    'CREATE TABLE IF NOT EXISTS daily_rollups ('
+    'template_id TEXT NOT NULL, day TEXT NOT NULL, events INTEGER NOT NULL, successes INTEGER NOT NULL, '
+    'documents INTEGER NOT NULL, processing_time_total REAL NOT NULL, processing_count INTEGER NOT NULL, '
+    'first_ts REAL NOT NULL, last_ts REAL NOT NULL, PRIMARY KEY (template_id, day))',
+    'CREATE INDEX IF NOT EXISTS daily_rollups_day ON daily_rollups (day)',
+    'CREATE TABLE IF NOT EXISTS daily_projects ('
+    'template_id TEXT NOT NULL, day TEXT NOT NULL, project_id TEXT NOT NULL, flags INTEGER NOT NULL, '
+    'PRIMARY KEY (template_id, day, project_id))',
+    'CREATE TABLE IF NOT EXISTS daily_features ('
+    'template_id TEXT NOT NULL, day TEXT NOT NULL, feature TEXT NOT NULL, count INTEGER NOT NULL, '
+    'PRIMARY KEY (template_id, day, feature))',
+    'CREATE TABLE IF NOT EXISTS sessions ('
+    'template_id TEXT NOT NULL, session_id TEXT NOT NULL, day TEXT NOT NULL, first_ts REAL NOT NULL, '
+    'last_ts REAL NOT NULL, events INTEGER NOT NULL, PRIMARY KEY (template_id, session_id))',
+    'CREATE INDEX IF NOT EXISTS sessions_template_day ON sessions (template_id, day)',
+)
+
+
+def get_template_analytics_settings() -> Dict[str, Any]:
+    """Merge ``settings.TEMPLATE_ANALYTICS`` over the defaults"""
+    analytics_settings = dict(DEFAULT_TEMPLATE_ANALYTICS_SETTINGS)
+    analytics_settings.update(getattr(settings, 'TEMPLATE_ANALYTICS', {}) or {})
+    return analytics_settings
+
+
+def _day(value) -> str:
+    return value.strftime('%Y-%m-%d')
+
+
+class AnalyticsEventStore:
+    """Usage events and their rollups in one SQLite file"""
+
+    def __init__(self, path: str, raw_retention_days: int = 30, rollup_retention_days: int = 400):
+        self.path = path
+        self.raw_retention_days = raw_retention_days
+        self.rollup_retention_days = rollup_retention_days
+        self._local = threading.local()
+        self._writes = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = self._connection()
+        for statement in _SCHEMA:
+            connection.execute(statement)
+        self.rotate()
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def _transaction(self, operation):
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            result = operation(connection)
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        self._writes += 1
+        if self._writes % ROTATE_EVERY == 0:
+            self.rotate()
+        return result
+
+    @staticmethod
+    def _append(connection, event: Dict[str, Any]):
+        template_id = event['template_id']
+        action = event['action']
+        metadata = event.get('metadata') or {}
+        timestamp = datetime.fromisoformat(event['timestamp'])
+        day = _day(timestamp)
+        ts = timestamp.timestamp()
+
+        connection.execute(
+            'INSERT INTO events (template_id, action, timestamp, day, metadata) VALUES (?, ?, ?, ?, ?)',
+            (template_id, action, event['timestamp'], day, json.dumps(metadata, default=str))
+        )
+
+        documents = metadata.get('document_count', 0) if action == 'document_upload' else 0
+        processing_time = metadata.get('processing_time') if action == 'document_processed' else None
+        connection.execute(
+            'INSERT INTO daily_rollups (template_id, day, events, successes, documents, processing_time_total, '
+            'processing_count, first_ts, last_ts) VALUES (?, ?, 1, ?, ?, ?, ?, ?, ?) '
+            'ON CONFLICT (template_id, day) DO UPDATE SET events = events + 1, '
+            'successes = successes + excluded.successes, documents = documents + excluded.documents, '
+            'processing_time_total = processing_time_total + excluded.processing_time_total, '
+            'processing_count = processing_count + excluded.processing_count, '
+            'first_ts = MIN(first_ts, excluded.first_ts), last_ts = MAX(last_ts, excluded.last_ts)',
+            (template_id, day, 1 if metadata.get('success', True) else 0, documents or 0,
+             processing_time or 0, 1 if processing_time else 0, ts, ts)
+        )
+
+        project_id = metadata.get('project_id')
+        if project_id:
+            flags = PROJECT_SEEN
+            if action in ACTIVE_PROJECT_ACTIONS:
+                flags |= PROJECT_ACTIVE
+            elif action == 'project_completed':
+                flags |= PROJECT_COMPLETED
+            connection.execute(
+                'INSERT INTO daily_projects (template_id, day, project_id, flags) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (template_id, day, project_id) DO UPDATE SET flags = flags | excluded.flags',
+                (template_id, day, str(project_id), flags)
+            )
+
+        feature = metadata.get('feature')
+        if feature:
+            connection.execute(
+                'INSERT INTO daily_features (template_id, day, feature, count) VALUES (?, ?, ?, 1) '
+                'ON CONFLICT (template_id, day, feature) DO UPDATE SET count = count + 1',
+                (template_id, day, str(feature))
+            )
+
+        session_id = metadata.get('session_id')
+        if session_id:
+            connection.execute(
+                'INSERT INTO sessions (template_id, session_id, day, first_ts, last_ts, events) '
+                'VALUES (?, ?, ?, ?, ?, 1) ON CONFLICT (template_id, session_id) DO UPDATE SET '
+                'events = events + 1, first_ts = MIN(first_ts, excluded.first_ts), '
+                'last_ts = MAX(last_ts, excluded.last_ts), day = MIN(day, excluded.day)',
+                (template_id, str(session_id), day, ts, ts)
+            )
+
+    def append(self, event: Dict[str, Any]):
+        """Record one event (``template_id``, ``action``, ISO ``timestamp``, ``metadata``)"""
+        self._transaction(lambda connection: self._append(connection, event))
+
+    def append_many(self, events: Iterable[Dict[str, Any]]) -> int:
+        def operation(connection):
+            count = 0
+            for event in events:
+                self._append(connection, event)
+                count += 1
+            return count
+
+        return self._transaction(operation)
+
+    def rotate(self, today: Optional[date] = None):
+        """Drop raw events and rollups past their retention"""
+        today = today or datetime.now().date()
+        connection = self._connection()
+        if self.raw_retention_days > 0:
+            connection.execute('DELETE FROM events WHERE day < ?', (_day(today - timedelta(days=self.raw_retention_days)),))
+        if self.rollup_retention_days > 0:
+            cutoff = _day(today - timedelta(days=self.rollup_retention_days))
+            for table in ('daily_rollups', 'daily_projects', 'daily_features', 'sessions'):
+                connection.execute(f'DELETE FROM {table} WHERE day < ?', (cutoff,))
+
+    def usage_summary(self, template_id: str, start_day: str, end_day: str) -> Dict[str, Any]:
+        """Totals of one template's daily rollups between two days (inclusive)"""
+        connection = self._connection()
+        row = connection.execute(
+            'SELECT COALESCE(SUM(events), 0), COALESCE(SUM(successes), 0), COALESCE(SUM(documents), 0), '
+            'COALESCE(SUM(processing_time_total), 0), COALESCE(SUM(processing_count), 0), MIN(first_ts), MAX(last_ts) '
+            'FROM daily_rollups WHERE template_id = ? AND day BETWEEN ? AND ?',
+            (template_id, start_day, end_day)
+        ).fetchone()
+        projects = connection.execute(
+            'SELECT COUNT(*), COALESCE(SUM(active), 0), COALESCE(SUM(completed), 0) FROM ('
+            'SELECT MAX(flags & ?) != 0 AS active, MAX(flags & ?) != 0 AS completed FROM daily_projects '
+            'WHERE template_id = ? AND day BETWEEN ? AND ? GROUP BY project_id)',
+            (PROJECT_ACTIVE, PROJECT_COMPLETED, template_id, start_day, end_day)
+        ).fetchone()
+        return {
+            'events': row[0],
+            'successes': row[1],
+            'documents': row[2],
+            'processing_time_total': row[3],
+            'processing_count': row[4],
+            'first_ts': row[5],
+            'last_ts': row[6],
+            'total_projects': projects[0],
+            'active_projects': projects[1],
+            'completed_projects': projects[2],
+        }
+
+    def behavior_summary(self, template_id: str, start_day: str, end_day: str) -> Dict[str, Any]:
+        """Session and feature rollups of one template for sessions starting between two days"""
+        connection = self._connection()
+        sessions = connection.execute(
+            'SELECT COUNT(*), COALESCE(SUM(events = 1), 0), AVG(events), '
+            'AVG(CASE WHEN events > 1 THEN last_ts - first_ts END) '
+            'FROM sessions WHERE template_id = ? AND day BETWEEN ? AND ?',
+            (template_id, start_day, end_day)
+        ).fetchone()
+        features = connection.execute(
+            'SELECT feature, SUM(count) AS total FROM daily_features '
+            'WHERE template_id = ? AND day BETWEEN ? AND ? GROUP BY feature ORDER BY total DESC, feature',
+            (template_id, start_day, end_day)
+        ).fetchall()
+        return {
+            'sessions': sessions[0],
+            'bounced_sessions': sessions[1],
+            'events_per_session': sessions[2] or 0,
+            'session_duration_avg': sessions[3] or 0,
+            'feature_usage': {feature: total for feature, total in features},
+        }
+
+    def events(self, template_id: str, start_day: str, end_day: str) -> List[Dict[str, Any]]:
+        """Raw events still within ``RAW_RETENTION_DAYS``"""
+        rows = self._connection().execute(
+            'SELECT template_id, action, timestamp, metadata FROM events '
+            'WHERE template_id = ? AND day BETWEEN ? AND ? ORDER BY id',
+            (template_id, start_day, end_day)
+        ).fetchall()
+        return [
+            {'template_id': row[0], 'action': row[1], 'timestamp': row[2], 'metadata': json.loads(row[3])}
+            for row in rows
+        ]
+
+    def import_legacy_logs(self, directory: Path) -> int:
+        """Import ``usage_<date>.json`` arrays once; imported files are renamed ``*.imported``"""
+        imported = 0
+        for log_path in sorted(directory.glob('usage_*.json')):
+            # Claim the file first so concurrent processes do not import it twice
+            claimed = log_path.with_name(f"{log_path.name}.importing-{os.getpid()}")
+            try:
+                os.replace(log_path, claimed)
+            except FileNotFoundError:
+                continue
+            try:
+                with open(claimed, 'r') as f:
+                    events = [event for event in json.load(f) if event.get('template_id') and event.get('timestamp')]
+                imported += self.append_many(events)
+                os.replace(claimed, log_path.with_name(f"{log_path.name}.imported"))
+            except Exception as e:
+                logger.warning(f"Error importing usage log {log_path}: {str(e)}")
+                os.replace(claimed, log_path)
+        if imported:
+            logger.info(f"Imported {imported} usage events from legacy logs in {directory}")
+        return imported
+
+
+_stores: Dict[str, AnalyticsEventStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_analytics_store(analytics_dir: Path) -> AnalyticsEventStore:
+    """Process-wide store for ``analytics_dir`` (or ``TEMPLATE_ANALYTICS['STORE_PATH']``)"""
+    analytics_settings = get_template_analytics_settings()
+    path = analytics_settings['STORE_PATH'] or str(analytics_dir / 'events.sqlite3')
+    store = _stores.get(path)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(path)
+            if store is None:
+                store = AnalyticsEventStore(
+                    path,
+                    raw_retention_days=int(analytics_settings['RAW_RETENTION_DAYS']),
+                    rollup_retention_days=int(analytics_settings['ROLLUP_RETENTION_DAYS'])
+                )
+                store.import_legacy_logs(analytics_dir)
+                _stores[path] = store
+    return store
@@ -9,11 +9,18 @@ Provides comprehensive system health monitoring including:
 - Error rate tracking
 - System dependency health
 - Automated health reporting
+
+Health is sampled by a background thread every ``SAMPLE_INTERVAL`` seconds
+(CPU, memory, disk, service connectivity and every template's
+availability). Health requests serve the latest snapshot and a rolling
+history for trend graphs instead of running the checks themselves.
 """
 
 import logging
 import psutil
 import requests
+import threading
+from collections import deque
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
@@ -21,8 +28,27 @@ from pathlib import Path
 import json
 import time
 
+from django.conf import settings
+
 logger = logging.getLogger(__name__)
 
+DEFAULT_TEMPLATE_HEALTH_SETTINGS = {
+    'SAMPLE_INTERVAL': 30,  # Seconds between health samples
+    'HISTORY_SIZE': 240,  # Samples kept for trend graphs
+    'FIRST_SAMPLE_WAIT': 15,  # Max seconds a request waits for the first sample
+    'CHECK_NETWORK': True,  # Probe the backend/frontend URLs on each sample
+    'NETWORK_TIMEOUT': 2,  # Seconds per connectivity probe
+    'BACKEND_URL': 'http://localhost:8000/api/',
+    'FRONTEND_URL': 'http://localhost:5173',
+}
+
+
+def get_template_health_settings() -> Dict[str, Any]:
+    """Merge ``settings.TEMPLATE_HEALTH`` over the defaults"""
+    health_settings = dict(DEFAULT_TEMPLATE_HEALTH_SETTINGS)
+    health_settings.update(getattr(settings, 'TEMPLATE_HEALTH', {}) or {})
+    return health_settings
+
 
 @dataclass
 class HealthStatus:
@@ -70,6 +96,10 @@ class TemplateHealthMonitor:
         self.template_base_path = Path("templates/template_definitions")
         logger.info("Initialized TemplateHealthMonitor")
     
+    @property
+    def sampler(self) -> 'HealthSampler':
+        return ensure_health_sampler(self)
+    
     def check_template_availability(self, template_id: str) -> HealthStatus:
         """Check if template is available and accessible"""
         logger.info(f"Checking template availability: {template_id}")
@@ -136,12 +166,21 @@ class TemplateHealthMonitor:
             )
     
     def check_system_resources(self) -> HealthStatus:
-        """Check system resource health"""
-        logger.info("Checking system resources")
+        """System resource health from the latest sample"""
+        snapshot = self.sampler.latest()
+        if snapshot is not None:
+            for component in snapshot.components:
+                if component.component == "system_resources":
+                    return component
+        return self._check_system_resources()
+    
+    def _check_system_resources(self) -> HealthStatus:
+        """Measure system resource health (run by the sampler)"""
+        logger.debug("Checking system resources")
         
         try:
-            # CPU usage
-            cpu_percent = psutil.cpu_percent(interval=1)
+            # CPU usage since the previous sample (non-blocking; the first call reports 0)
+            cpu_percent = psutil.cpu_percent(interval=None)
             
             # Memory usage
             memory = psutil.virtual_memory()
@@ -170,11 +209,11 @@ class TemplateHealthMonitor:
                 issues.append(f"High disk usage: {disk_percent:.1f}%")
                 status = "critical"
             
-            if not network_status['backend_accessible']:
+            if network_status.get('backend_accessible') is False:
                 issues.append("Backend server not accessible")
                 status = "critical"
             
-            if not network_status['frontend_accessible']:
+            if network_status.get('frontend_accessible') is False:
                 issues.append("Frontend server not accessible")
                 status = "warning"
             
@@ -204,19 +243,38 @@ class TemplateHealthMonitor:
             )
     
     def get_system_health(self) -> SystemHealthReport:
-        """Get comprehensive system health report"""
-        logger.info("Getting system health report")
+        """Latest sampled system health report"""
+        snapshot = self.sampler.latest(wait=get_template_health_settings()['FIRST_SAMPLE_WAIT'])
+        if snapshot is None:
+            return SystemHealthReport(
+                overall_status="unknown",
+                timestamp=datetime.now(),
+                components=[],
+                system_metrics={},
+                recommendations=["Health sampler has not produced a sample yet"]
+            )
+        return snapshot
+    
+    def get_health_history(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Rolling health samples, oldest first"""
+        return self.sampler.history(limit)
+    
+    def _build_system_health(self) -> SystemHealthReport:
+        """Run every health check once (run by the sampler)"""
+        logger.debug("Building system health report")
         
         try:
             components = []
             
             # Check system resources
-            components.append(self.check_system_resources())
+            components.append(self._check_system_resources())
             
             # Check all templates
             template_ids = self._get_all_template_ids()
             for template_id in template_ids:
-                components.append(self.check_template_availability(template_id))
+                template_status = self.check_template_availability(template_id)
+                template_status.details = {**(template_status.details or {}), "template_id": template_id}
+                components.append(template_status)
             
             # Calculate overall system health
             critical_components = len([c for c in components if c.status == "critical"])
@@ -255,10 +313,7 @@ class TemplateHealthMonitor:
                 recommendations=recommendations
             )
             
-            # Save system health report
-            self._save_system_health_report(report)
-            
-            logger.info(f"System health report generated: {overall_status}")
+            logger.debug(f"System health report generated: {overall_status}")
             return report
             
         except Exception as e:
@@ -276,13 +331,15 @@ class TemplateHealthMonitor:
         logger.info(f"Getting template health report: {template_id}")
         
         try:
-            availability_check = self.check_template_availability(template_id)
+            availability_check = self._sampled_template_availability(template_id)
             
             # Calculate overall template health
             overall_status = availability_check.status
             
-            # Calculate metrics
-            availability = 100.0 if availability_check.status == "healthy" else 0.0
+            # Calculate metrics (availability over the sampled history when there is one)
+            availability = self.sampler.template_availability(template_id)
+            if availability is None:
+                availability = 100.0 if availability_check.status == "healthy" else 0.0
             performance_score = 95.0 if availability_check.status == "healthy" else 0.0
             error_rate = 0.0
             
@@ -325,20 +382,36 @@ class TemplateHealthMonitor:
                 recommendations=["Contact system administrator"]
             )
     
-    def _check_network_connectivity(self) -> Dict[str, bool]:
-        """Check network connectivity to services"""
+    def _sampled_template_availability(self, template_id: str) -> HealthStatus:
+        """Template availability from the latest sample, checked directly for unsampled templates"""
+        snapshot = self.sampler.latest()
+        if snapshot is not None:
+            for component in snapshot.components:
+                if component.component == "template_availability" and (component.details or {}).get("template_id") == template_id:
+                    return component
+        return self.check_template_availability(template_id)
+    
+    def _check_network_connectivity(self) -> Dict[str, Optional[bool]]:
+        """Check network connectivity to services (None when probing is disabled)"""
+        health_settings = get_template_health_settings()
+        if not health_settings['CHECK_NETWORK']:
+            return {
+                "backend_accessible": None,
+                "frontend_accessible": None
+            }
+        timeout = health_settings['NETWORK_TIMEOUT']
         try:
             backend_accessible = False
             frontend_accessible = False
             
             try:
-                response = requests.get("http://localhost:8000/api/", timeout=5)
+                response = requests.get(health_settings['BACKEND_URL'], timeout=timeout)
                 backend_accessible = response.status_code == 200
             except:
                 pass
             
             try:
-                response = requests.get("http://localhost:5173", timeout=5)
+                response = requests.get(health_settings['FRONTEND_URL'], timeout=timeout)
                 frontend_accessible = response.status_code in [200, 404]
             except:
                 pass
@@ -386,3 +459,104 @@ class TemplateHealthMonitor:
             
         except Exception as e:
             logger.error(f"Error saving system health report: {str(e)}")
+
+
+class HealthSampler:
+    """Background thread keeping the latest health snapshot and a rolling history"""
+    
+    def __init__(self, monitor: TemplateHealthMonitor, interval: float = 30, history_size: int = 240):
+        self.monitor = monitor
+        self.interval = interval
+        self._latest: Optional[SystemHealthReport] = None
+        self._history = deque(maxlen=max(1, history_size))
+        self._lock = threading.Lock()
+        self._first_sample = threading.Event()
+        self._stop_event = threading.Event()
+        self._last_saved_status = None
+    
+    def sample(self) -> SystemHealthReport:
+        """Take one sample, publish it and persist it when the overall status changed"""
+        report = self.monitor._build_system_health()
+        resources = next((c.details or {} for c in report.components if c.component == "system_resources"), {})
+        point = {
+            "timestamp": report.timestamp.isoformat(),
+            "overall_status": report.overall_status,
+            "cpu_percent": resources.get("cpu_percent"),
+            "memory_percent": resources.get("memory_percent"),
+            "disk_percent": resources.get("disk_percent"),
+            "templates": {
+                c.details["template_id"]: c.status
+                for c in report.components
+                if c.component == "template_availability" and c.details and "template_id" in c.details
+            }
+        }
+        with self._lock:
+            self._latest = report
+            self._history.append(point)
+        self._first_sample.set()
+        
+        # A report file per status change rather than per request
+        if report.overall_status != self._last_saved_status:
+            self.monitor._save_system_health_report(report)
+            self._last_saved_status = report.overall_status
+        return report
+    
+    def run(self) -> None:
+        # cpu_percent(interval=None) measures since the previous call, so prime it first
+        try:
+            psutil.cpu_percent(interval=None)
+        except Exception:
+            pass
+        self._stop_event.wait(min(1.0, self.interval))
+        while not self._stop_event.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                logger.error(f"Error sampling system health: {str(e)}")
+            self._stop_event.wait(self.interval)
+    
+    def stop(self) -> None:
+        self._stop_event.set()
+    
+    def latest(self, wait: float = 0) -> Optional[SystemHealthReport]:
+        """Latest snapshot, waiting up to ``wait`` seconds for the first one"""
+        if wait and not self._first_sample.is_set():
+            self._first_sample.wait(wait)
+        with self._lock:
+            return self._latest
+    
+    def history(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            points = list(self._history)
+        return points[-limit:] if limit else points
+    
+    def template_availability(self, template_id: str) -> Optional[float]:
+        """Percentage of sampled history in which the template was healthy (None if never sampled)"""
+        statuses = [point["templates"][template_id] for point in self.history() if template_id in point["templates"]]
+        if not statuses:
+            return None
+        return 100.0 * statuses.count("healthy") / len(statuses)
+
+
+_health_sampler: Optional[HealthSampler] = None
+_health_sampler_lock = threading.Lock()
+
+
+def ensure_health_sampler(monitor: TemplateHealthMonitor) -> HealthSampler:
+    """Start the process-wide health sampler thread on first use"""
+    global _health_sampler
+    
+    if _health_sampler is None:
+        with _health_sampler_lock:
+            if _health_sampler is None:
+                health_settings = get_template_health_settings()
+                sampler = HealthSampler(
+                    monitor,
+                    interval=float(health_settings['SAMPLE_INTERVAL']),
+                    history_size=int(health_settings['HISTORY_SIZE'])
+                )
+                thread = threading.Thread(target=sampler.run, name='template-health-sampler', daemon=True)
+                thread.start()
+                _health_sampler = sampler
+                logger.info(f"Started template health sampler (every {sampler.interval:g}s)")
+    return _health_sampler
@@ -288,6 +288,30 @@ class AdvancedTemplateManagementMixin:
                 'error': f'System health error: {str(e)}'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
+    @action(detail=False, methods=['get'])
+    def health_history(self, request):
+        """Get sampled system health history for trend graphs"""
+        logger.info("Getting system health history")
+        
+        try:
+            limit = request.query_params.get('limit')
+            history = self.health_monitor.get_health_history(int(limit) if limit else None)
+            
+            return Response({
+                'samples': history,
+                'count': len(history)
+            })
+            
+        except ValueError:
+            return Response({
+                'error': 'limit must be an integer'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            logger.error(f"Error getting system health history: {str(e)}")
+            return Response({
+                'error': f'System health history error: {str(e)}'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
     @action(detail=True, methods=['get'])
     def template_health(self, request, pk=None):
         """Get health status for a specific template"""
@@ -0,0 +1,23 @@
+# Generated migration to add content hashes for incremental re-indexing
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_add_template_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documentvectorstatus',
+            name='source_hash',
+            field=models.CharField(blank=True, help_text='SHA-256 of the source file bytes when last vectorized', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='documentchunk',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, help_text='SHA-256 of chunk content and section title', max_length=64),
+        ),
+    ]
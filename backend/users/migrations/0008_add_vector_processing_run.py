@@ -0,0 +1,44 @@
+# Generated migration for durable document ingestion runs
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_add_vector_content_hashes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VectorProcessingRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('run_id', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('status', models.CharField(choices=[('RUNNING', 'Running'), ('STOPPED', 'Stopped'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed'), ('INTERRUPTED', 'Interrupted')], default='RUNNING', max_length=20)),
+                ('stop_requested', models.BooleanField(default=False, help_text='Checked by ingestion workers between documents and stages')),
+                ('worker_count', models.IntegerField(default=1)),
+                ('total_documents', models.IntegerField(default=0, help_text='New or changed documents scheduled in this run')),
+                ('completed_documents', models.IntegerField(default=0)),
+                ('failed_documents', models.IntegerField(default=0)),
+                ('unchanged_documents', models.IntegerField(default=0)),
+                ('current_document_ids', models.JSONField(blank=True, default=list, help_text='Documents currently in flight')),
+                ('error_message', models.TextField(blank=True)),
+                ('host', models.CharField(blank=True, help_text='host:pid of the coordinating process', max_length=255)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vector_processing_runs', to='users.intellidocproject')),
+                ('resumed_from', models.ForeignKey(blank=True, help_text='Interrupted run this run resumed', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='resumed_by', to='users.vectorprocessingrun')),
+            ],
+            options={
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='vectorprocessingrun',
+            index=models.Index(fields=['project', 'status'], name='users_vecrun_project_idx'),
+        ),
+    ]
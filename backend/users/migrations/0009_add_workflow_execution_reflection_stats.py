@@ -0,0 +1,18 @@
+# Generated migration to record reflection convergence on workflow executions
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_add_vector_processing_run'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workflowexecution',
+            name='reflection_stats',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -860,6 +860,7 @@ class DocumentVectorStatus(models.Model):
     status = models.CharField(max_length=20, choices=VectorProcessingStatus.choices, default=VectorProcessingStatus.PENDING)
     vector_id = models.CharField(max_length=100, blank=True, help_text="Milvus vector ID")
     content_length = models.IntegerField(default=0)
+    source_hash = models.CharField(max_length=64, blank=True, help_text='SHA-256 of the source file bytes when last vectorized')
     embedding_dimension = models.IntegerField(default=384)
     processing_time_ms = models.IntegerField(null=True, blank=True)
     error_message = models.TextField(blank=True)
@@ -892,6 +893,7 @@ class DocumentChunk(models.Model):
     chunk_type = models.CharField(max_length=50, default='content', help_text='Type of chunk (content, header, section, etc.)')
     section_title = models.CharField(max_length=500, blank=True, help_text='Section title or heading')
     content_length = models.IntegerField(default=0, help_text='Length of chunk content in characters')
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True, help_text='SHA-256 of chunk content and section title')
     has_embedding = models.BooleanField(default=False, help_text='Whether chunk has vector embedding')
     vector_id = models.CharField(max_length=100, blank=True, help_text='Vector database ID for this chunk')
     
@@ -938,6 +940,51 @@ class DocumentChunk(models.Model):
         return ", ".join(status) if status else "No AI processing"
 
 
+class VectorProcessingRunStatus(models.TextChoices):
+    RUNNING = 'RUNNING', 'Running'
+    STOPPED = 'STOPPED', 'Stopped'
+    COMPLETED = 'COMPLETED', 'Completed'
+    FAILED = 'FAILED', 'Failed'
+    INTERRUPTED = 'INTERRUPTED', 'Interrupted'
+
+
+class VectorProcessingRun(models.Model):
+    """Durable progress and control state of one document ingestion run"""
+    run_id = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    project = models.ForeignKey(IntelliDocProject, on_delete=models.CASCADE, related_name='vector_processing_runs')
+    status = models.CharField(max_length=20, choices=VectorProcessingRunStatus.choices, default=VectorProcessingRunStatus.RUNNING)
+    stop_requested = models.BooleanField(default=False, help_text='Checked by ingestion workers between documents and stages')
+    resumed_from = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='resumed_by',
+                                     help_text='Interrupted run this run resumed')
+
+    # Progress
+    worker_count = models.IntegerField(default=1)
+    total_documents = models.IntegerField(default=0, help_text='New or changed documents scheduled in this run')
+    completed_documents = models.IntegerField(default=0)
+    failed_documents = models.IntegerField(default=0)
+    unchanged_documents = models.IntegerField(default=0)
+    current_document_ids = models.JSONField(default=list, blank=True, help_text='Documents currently in flight')
+    error_message = models.TextField(blank=True)
+
+    # Liveness
+    host = models.CharField(max_length=255, blank=True, help_text='host:pid of the coordinating process')
+    started_at = models.DateTimeField(auto_now_add=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['project', 'status'], name='users_vecrun_project_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.project.name} - Run {self.run_id.hex[:8]} ({self.status})"
+
+    @property
+    def is_active(self):
+        return self.status == VectorProcessingRunStatus.RUNNING
+
 
 # ============================================================================
 # AGENT ORCHESTRATION MODELS (Template Independent)
@@ -1293,6 +1340,8 @@ class WorkflowExecution(models.Model):
     executed_nodes = models.JSONField(default=dict)
     # MCP: Store full message data for conversation history persistence
     messages_data = models.JSONField(default=list)
+    # Reflection loops: iterations run and saved by convergence, estimated tokens avoided
+    reflection_stats = models.JSONField(default=dict, blank=True)
     
     # ============================================================================
     # HUMAN INPUT TRACKING FIELDS (UserProxyAgent Implementation - Phase 1)
@@ -1,11 +1,13 @@
 # users/signals.py
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from .models import DocumentVectorStatus, ProjectVectorCollection, VectorProcessingStatus
+from .models import AgentWorkflow, DocumentVectorStatus, ProjectVectorCollection, VectorProcessingStatus
 import logging
 from django.utils import timezone
 from django.db.models import Count
+from agent_orchestration.deployment_rate_limiter import invalidate_allowed_origins
+from agent_orchestration.models import WorkflowAllowedOrigin
 
 logger = logging.getLogger(__name__)
 
@@ -74,3 +76,38 @@ def update_collection_status_on_document_change(sender, instance, created, **kwa
     except Exception as e:
         logger.error(f"Error in signal handler: {e}")
         logger.exception(e)
+
+
+@receiver(post_save, sender=AgentWorkflow)
+def compile_execution_plan_on_workflow_save(sender, instance, update_fields=None, **kwargs):
+    """
+    Compile the saved graph's execution plan so executions and deployed
+    endpoints start from a cached plan; saves that don't touch graph_json
+    (execution stats) keep the current one.
+    """
+    if update_fields and 'graph_json' not in update_fields:
+        return
+    try:
+        from agent_orchestration.execution_plan import get_execution_plan_cache
+        from agent_orchestration.workflow_parser import WorkflowParser
+        
+        if instance.graph_json and instance.graph_json.get('nodes'):
+            get_execution_plan_cache().recompile_for_workflow(
+                str(instance.workflow_id), instance.graph_json, WorkflowParser().compile_execution_plan
+            )
+    except Exception as e:
+        # The executor compiles on first use if this fails
+        logger.warning(f"Could not compile execution plan for workflow {instance.workflow_id}: {e}")
+
+
+@receiver(post_delete, sender=AgentWorkflow)
+def forget_execution_plan_on_workflow_delete(sender, instance, **kwargs):
+    from agent_orchestration.execution_plan import get_execution_plan_cache
+    get_execution_plan_cache().forget_workflow(str(instance.workflow_id))
+
+
+@receiver(post_save, sender=WorkflowAllowedOrigin)
+@receiver(post_delete, sender=WorkflowAllowedOrigin)
+def invalidate_deployment_origins_on_change(sender, instance, **kwargs):
+    """Drop the cached allowed origins read by the deployment CORS middleware"""
+    invalidate_allowed_origins(instance.deployment_id)
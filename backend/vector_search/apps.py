@@ -19,7 +19,7 @@ class VectorSearchConfig(AppConfig):
         
         try:
             # Import here to avoid circular imports
-            from .startup import initialize_vector_search
+            from .startup import initialize_vector_search, schedule_ingestion_resume
             
             logger.info("🎆 AICC IntelliDoc Vector Search App Ready")
             
@@ -30,6 +30,9 @@ class VectorSearchConfig(AppConfig):
                 logger.info("✅ Vector Search ready for processing")
             else:
                 logger.warning("⚠️  Vector Search in fallback mode")
+            
+            # Pick up ingestion runs a previous process left unfinished
+            schedule_ingestion_resume()
                 
         except Exception as e:
             logger.error(f"❌ Vector Search app initialization failed: {e}")
@@ -13,7 +13,9 @@ import numpy as np
 import logging
 from django.conf import settings
 import uuid
+from django_milvus_search.collection_cache import invalidate_collection_metadata
 from .detailed_logger import DocumentProcessingTracker, doc_logger, log_data_state, log_vector_insertion_attempt
+from . import keyword_index
 
 logger = logging.getLogger(__name__)
 
@@ -220,6 +222,7 @@ class MilvusProjectVectorDatabase:
                 self._create_indices()
                 self.collection.load()
                 logger.info(f"Recreated and loaded enhanced collection: {self.collection_name}")
+                invalidate_collection_metadata(self.collection_name)
             
         except Exception as e:
             logger.error(f"Failed to setup enhanced collection {self.collection_name}: {e}")
@@ -259,6 +262,8 @@ class MilvusProjectVectorDatabase:
             self.collection.create_index(field_name="chunk_index")
 
             logger.info(f"Created enhanced indices for collection {self.collection_name}")
+            # Searches cache vector field, metric and index type per collection
+            invalidate_collection_metadata(self.collection_name)
             
         except Exception as e:
             logger.error(f"Failed to create indices for {self.collection_name}: {e}")
@@ -308,6 +313,8 @@ class MilvusProjectVectorDatabase:
             
             # Single flush operation
             self.collection.flush()
+            # Keyword (BM25) index follows the collection
+            keyword_index.index_documents(self.collection_name, chunks_data)
             
             logger.info(f"✅ ATOMIC batch insertion successful for {document_name} - {len(chunks_data)} chunks stored")
             return True
@@ -549,6 +556,7 @@ class MilvusProjectVectorDatabase:
             # Insert into Milvus
             insert_result = self.collection.insert(entities)
             self.collection.flush()
+            keyword_index.index_documents(self.collection_name, [doc_info])
             
             logger.info(f"✅ Enhanced insertion successful for {file_name}")
             return True
@@ -673,6 +681,8 @@ class MilvusProjectVectorDatabase:
         try:
             if utility.has_collection(self.collection_name):
                 utility.drop_collection(self.collection_name)
+                invalidate_collection_metadata(self.collection_name)
+                keyword_index.drop_keyword_index(self.collection_name)
                 logger.info(f"Deleted enhanced collection {self.collection_name}")
                 return True
         except Exception as e:
@@ -685,11 +695,39 @@ class MilvusProjectVectorDatabase:
             expr = f'document_id == "{document_id}"'
             self.collection.delete(expr)
             self.collection.flush()
+            keyword_index.remove_document(self.collection_name, document_id)
             logger.info(f"Deleted document {document_id} from enhanced collection {self.collection_name}")
             return True
         except Exception as e:
             logger.error(f"Failed to delete document {document_id} from enhanced collection {self.collection_name}: {e}")
             return False
 
+    def query_document_chunks(self, document_id: str, output_fields: List[str]) -> List[Dict[str, Any]]:
+        """Fetch stored chunk rows of a document (scalar query, no vector search)"""
+        try:
+            return self.collection.query(
+                expr=f'document_id == "{document_id}"',
+                output_fields=output_fields,
+                limit=16384
+            )
+        except Exception as e:
+            logger.error(f"Failed to query chunks of document {document_id} in {self.collection_name}: {e}")
+            return []
+
+    def delete_chunks(self, chunk_ids: List[str]) -> bool:
+        """Delete specific chunk vectors by chunk_id"""
+        if not chunk_ids:
+            return True
+        try:
+            ids = '", "'.join(chunk_ids)
+            self.collection.delete(f'chunk_id in ["{ids}"]')
+            self.collection.flush()
+            keyword_index.remove_chunks(self.collection_name, chunk_ids)
+            logger.info(f"Deleted {len(chunk_ids)} stale chunks from enhanced collection {self.collection_name}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to delete {len(chunk_ids)} chunks from enhanced collection {self.collection_name}: {e}")
+            return False
+
 # Compatibility alias for backwards compatibility
 ProjectVectorDatabase = create_project_vector_database
@@ -1,12 +1,13 @@
 # backend/vector_search/embeddings.py
-from sentence_transformers import SentenceTransformer
 from typing import List, Optional
 import numpy as np
 import logging
 import os
-from pathlib import Path
 import threading
 
+from .model_registry import get_sentence_transformer
+from .query_embedding_cache import cached_query_embedding
+
 logger = logging.getLogger(__name__)
 
 # Global singleton instance
@@ -26,6 +27,45 @@ def get_embedder_instance(model_name: str = 'all-MiniLM-L6-v2') -> 'DocumentEmbe
     
     return _embedder_instance
 
+# Rough characters-per-token ratio for WordPiece/BPE tokenizers on prose
+CHARS_PER_TOKEN = 4
+
+
+def estimate_token_count(text: str, max_seq_length: Optional[int] = None) -> int:
+    """Cheap token estimate; texts longer than the model window are truncated by the encoder"""
+    tokens = len(text) // CHARS_PER_TOKEN + 2  # [CLS]/[SEP]
+    return min(tokens, max_seq_length) if max_seq_length else tokens
+
+
+def plan_token_budget_batches(token_counts: List[int], max_batch_tokens: int,
+                              max_batch_size: int) -> List[List[int]]:
+    """
+    Group text indices into length-bucketed batches.
+
+    Indices are sorted by length so each batch pads to a similar length, and a
+    batch is closed once ``batch size * longest text`` (the padded token cost)
+    would exceed ``max_batch_tokens`` or ``max_batch_size`` texts are reached.
+    A single text larger than the budget still gets its own batch.
+    """
+    order = sorted(range(len(token_counts)), key=lambda i: token_counts[i])
+    batches: List[List[int]] = []
+    current: List[int] = []
+    longest = 0
+
+    for index in order:
+        candidate_longest = max(longest, token_counts[index])
+        if current and (len(current) >= max_batch_size or
+                        candidate_longest * (len(current) + 1) > max_batch_tokens):
+            batches.append(current)
+            current, candidate_longest = [], token_counts[index]
+        current.append(index)
+        longest = candidate_longest
+
+    if current:
+        batches.append(current)
+    return batches
+
+
 class DocumentEmbedder:
     """Creates semantic embeddings for document text using Sentence Transformers"""
     
@@ -37,17 +77,9 @@ class DocumentEmbedder:
             
             logger.info(f"Initializing DocumentEmbedder with model {model_name}...")
             
-            # Attempt to load the model from a local cache first
-            cache_dir = Path.home() / '.cache' / 'torch' / 'sentence_transformers'
-            model_cache_path = cache_dir / model_name.replace('/', '_')
-            
-            if not model_cache_path.exists() or not any(model_cache_path.iterdir()):
-                logger.warning(f"Model not found in cache ({model_cache_path}). Attempting to download.")
-                # This will raise an error if it fails, which is the desired behavior
-                self.model = SentenceTransformer(model_name, cache_folder=str(cache_dir))
-            else:
-                logger.info(f"Found model in cache. Loading from {model_cache_path}")
-                self.model = SentenceTransformer(str(model_cache_path))
+            # Shared with DocAware, the evaluator and the public chatbot (loads from the local cache first)
+            self.model = get_sentence_transformer(model_name)
+            self.model_name = model_name
 
             self.vector_dim = self.model.get_sentence_embedding_dimension()
             
@@ -77,7 +109,14 @@ class DocumentEmbedder:
             # Re-raise to ensure failures are not silent
             raise
     
-    def batch_create_embeddings(self, texts: List[str]) -> np.ndarray:
+    def create_query_embedding(self, query: str) -> np.ndarray:
+        """Embedding of a search query, served from the query embedding cache when repeated"""
+        if not query or not query.strip():
+            return self.create_embeddings(query)
+        return cached_query_embedding(query, self.model_name, self.create_embeddings)
+    
+    def batch_create_embeddings(self, texts: List[str], batch_size: int = 32,
+                                show_progress_bar: bool = True) -> np.ndarray:
         """Create embeddings for multiple texts in batch"""
         if not texts:
             return np.array([])
@@ -88,8 +127,8 @@ class DocumentEmbedder:
         try:
             embeddings = self.model.encode(
                 processed_texts, 
-                batch_size=32, 
-                show_progress_bar=True,
+                batch_size=batch_size, 
+                show_progress_bar=show_progress_bar,
                 convert_to_numpy=True,
                 normalize_embeddings=True
             )
@@ -98,3 +137,32 @@ class DocumentEmbedder:
             logger.error(f"Failed to create batch embeddings: {e}")
             # Re-raise to ensure failures are not silent
             raise
+
+    def batch_create_embeddings_bucketed(self, texts: List[str], max_batch_tokens: int = 8192,
+                                         max_batch_size: int = 64) -> np.ndarray:
+        """
+        Create embeddings for many texts using token-budgeted, length-bucketed batches.
+
+        Returns one float32 row per input text, in input order. Empty texts get a
+        zero vector, matching ``create_embeddings``.
+        """
+        embeddings = np.zeros((len(texts), self.vector_dim), dtype=np.float32)
+        indices = [i for i, text in enumerate(texts) if text and text.strip()]
+        if not indices:
+            return embeddings
+
+        max_seq_length = getattr(self.model, 'max_seq_length', None)
+        token_counts = [estimate_token_count(texts[i], max_seq_length) for i in indices]
+        batches = plan_token_budget_batches(token_counts, max_batch_tokens, max_batch_size)
+
+        for batch in batches:
+            batch_indices = [indices[position] for position in batch]
+            embeddings[batch_indices] = self.batch_create_embeddings(
+                [texts[i] for i in batch_indices],
+                batch_size=len(batch_indices),
+                show_progress_bar=False
+            )
+
+        logger.info(f"🧮 EMBEDDINGS: Encoded {len(indices)} texts in {len(batches)} bucketed batches "
+                    f"(budget {max_batch_tokens} tokens/batch)")
+        return embeddings
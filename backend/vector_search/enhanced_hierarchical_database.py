@@ -108,18 +108,27 @@ class EnhancedHierarchicalVectorDatabase:
         """Backward compatibility alias for search_documents"""
         return cls.search_documents(project_id, query, limit)
     
-    def insert_hierarchical_document(self, doc_info: HierarchicalDocumentInfo) -> bool:
-        """Insert document with all chunks preserving hierarchical structure using BATCH insertion"""
+    def insert_hierarchical_document(self, doc_info: HierarchicalDocumentInfo,
+                                     chunks: Optional[List[DocumentChunk]] = None) -> bool:
+        """
+        Insert document with all chunks preserving hierarchical structure using BATCH insertion.
+        Pass chunks to insert only a subset (incremental re-indexing).
+        """
         try:
             doc_metadata = doc_info.document_metadata
             file_name = doc_metadata['file_name']
+            chunks = doc_info.chunks if chunks is None else chunks
+
+            if not chunks:
+                logger.info(f"   [DB] No new or changed chunks to insert for document: {file_name}")
+                return True
 
-            logger.info(f"   [DB] Starting BATCH insertion for document: {file_name} ({len(doc_info.chunks)} chunks)")
+            logger.info(f"   [DB] Starting BATCH insertion for document: {file_name} ({len(chunks)} chunks)")
 
             # Prepare all chunks as document info objects for batch insertion
             chunks_data = []
 
-            for i, chunk in enumerate(doc_info.chunks):
+            for i, chunk in enumerate(chunks):
                 try:
                     # Prepare chunk info for the real database
                     chunk_doc_info = {
@@ -199,7 +208,7 @@ class EnhancedHierarchicalVectorDatabase:
             success = self.real_database.batch_insert_document_chunks(chunks_data, file_name)
 
             if success:
-                logger.info(f"   [DB] ✅ Successfully BATCH inserted all {len(doc_info.chunks)} chunks for {file_name}")
+                logger.info(f"   [DB] ✅ Successfully BATCH inserted all {len(chunks)} chunks for {file_name}")
                 return True
             else:
                 logger.error(f"   [DB] ❌ BATCH insertion failed for {file_name}")
@@ -209,6 +218,23 @@ class EnhancedHierarchicalVectorDatabase:
             logger.exception(f"   [DB] 💥 Unhandled error inserting hierarchical document: {e}")
             return False
 
+    def get_indexed_chunks(self, document_id: str) -> Dict[str, Dict[str, Any]]:
+        """Stored chunks of a document keyed by chunk_id, including embedding, summary and topic"""
+        if not hasattr(self.real_database, 'query_document_chunks'):
+            return {}
+        rows = self.real_database.query_document_chunks(
+            document_id,
+            output_fields=['chunk_id', 'chunk_index', 'total_chunks', 'summary', 'topic', 'embedding']
+        )
+        return {row['chunk_id']: row for row in rows if row.get('chunk_id')}
+
+    def delete_chunks(self, chunk_ids: List[str]) -> bool:
+        """Delete stale chunk vectors by chunk_id"""
+        if hasattr(self.real_database, 'delete_chunks'):
+            return self.real_database.delete_chunks(chunk_ids)
+        logger.warning(f"Chunk delete not available, {len(chunk_ids)} stale chunks kept")
+        return False
+
     def search_enhanced_hierarchical(self, 
                                    query_vector: List[float],
                                    filters: Optional[Dict[str, Any]] = None,
@@ -344,7 +370,12 @@ class EnhancedHierarchicalVectorDatabase:
         """Delete document and all associated chunks"""
         try:
             # Use the real database's delete method if available
-            if hasattr(self.real_database, 'delete_documents'):
+            if hasattr(self.real_database, 'delete_document'):
+                success = self.real_database.delete_document(document_id)
+                if success:
+                    logger.info(f"Successfully deleted document {document_id} and all chunks")
+                    return True
+            elif hasattr(self.real_database, 'delete_documents'):
                 success = self.real_database.delete_documents({'document_id': document_id})
                 if success:
                     logger.info(f"Successfully deleted document {document_id} and all chunks")
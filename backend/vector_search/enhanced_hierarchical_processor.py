@@ -8,11 +8,12 @@ from typing import Dict, Any, Generator, List, Optional, Tuple
 from dataclasses import dataclass
 import uuid
 from datetime import datetime
+import hashlib
 import logging
 import re
 
 from .embeddings import DocumentEmbedder
-from .summarization import get_summarizer
+from .summarization import get_summarizer, ChunkSummarizationPipeline, SummarizationRequest
 from .gemini_extractor import get_gemini_extractor, initialize_gemini_extractor
 from project_api_keys.integration_examples import ProjectAwareOpenAISummarizer
 
@@ -57,6 +58,22 @@ def get_file_path(document: Any) -> Optional[str]:
         logger.error(f"Error getting file path for {document.original_filename}: {e}")
         return None
 
+def compute_source_hash(document: Any) -> str:
+    """SHA-256 of the document's stored file bytes, or of its extracted text if the file is missing."""
+    sha256 = hashlib.sha256()
+    file_path = get_file_path(document)
+    if file_path:
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                sha256.update(block)
+    else:
+        sha256.update((getattr(document, 'extraction_text', '') or '').encode('utf-8'))
+    return sha256.hexdigest()
+
+def chunk_content_hash(content: str, section_title: str) -> str:
+    """Hash of everything a chunk's embedding, summary and topic are derived from."""
+    return hashlib.sha256(f"{section_title}\x00{content}".encode('utf-8')).hexdigest()
+
 
 @dataclass
 class DocumentChunk:
@@ -71,6 +88,7 @@ class DocumentChunk:
     section_title: str  # Detected section if any
     embedding: Optional[np.ndarray] = None
     metadata: Dict[str, Any] = None
+    content_hash: str = ''
 
 @dataclass
 class HierarchicalDocumentInfo:
@@ -101,6 +119,16 @@ class EnhancedHierarchicalProcessor:
         self.max_chunk_size = max_chunk_size
         self.supported_extensions = {'.txt', '.pdf', '.docx', '.doc', '.md', '.rtf', '.odt'}
 
+        # Chunk embeddings are encoded in token-budgeted batches across a window of documents
+        from django.conf import settings
+        batch_settings = getattr(settings, 'VECTOR_EMBEDDING_BATCH', {})
+        self.max_batch_tokens = batch_settings.get('MAX_BATCH_TOKENS', 8192)
+        self.max_batch_size = batch_settings.get('MAX_BATCH_SIZE', 64)
+        self.document_window = max(1, batch_settings.get('DOCUMENT_WINDOW', 8))
+        
+        # Previously indexed chunks per document_id, keyed by content hash (see set_reusable_chunks)
+        self.reusable_chunks: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+
         # Use project-specific OpenAI summarizer - NO FALLBACK
         self.summarizer = ProjectAwareOpenAISummarizer(project)
 
@@ -148,13 +176,123 @@ class EnhancedHierarchicalProcessor:
         # Build filename-based hierarchy
         filename_hierarchy = self._build_filename_hierarchy(project_documents)
         
-        for document in project_documents:
+        # Chunk documents a window at a time, then embed the whole window in one bucketed pass
+        for window_start in range(0, len(project_documents), self.document_window):
+            window = project_documents[window_start:window_start + self.document_window]
+            window_infos = []
+            for document in window:
+                try:
+                    doc_info = self._process_document_enhanced(document, filename_hierarchy, defer_enrichment=True)
+                    if doc_info:
+                        window_infos.append(doc_info)
+                except Exception as e:
+                    logger.error(f"Error processing document {document.original_filename}: {e}")
+            
+            # Summaries/topics for every chunk in the window run concurrently
+            self._generate_chunk_ai_content([chunk for doc_info in window_infos for chunk in doc_info.chunks])
+            
+            for doc_info in self._embed_document_window(window_infos):
+                yield doc_info
+    
+    def set_reusable_chunks(self, document_id: str, indexed_chunks: List[Dict[str, Any]]):
+        """
+        Register chunks already indexed for a document. Each entry needs content_hash,
+        chunk_id, summary, topic and embedding; new chunks with a matching hash reuse
+        them instead of being summarised and embedded again.
+        """
+        by_hash: Dict[str, List[Dict[str, Any]]] = {}
+        for indexed in indexed_chunks:
+            by_hash.setdefault(indexed['content_hash'], []).append(indexed)
+        self.reusable_chunks[document_id] = by_hash
+    
+    def _reuse_indexed_chunks(self, chunks: List[DocumentChunk], document_id: str) -> int:
+        """Carry over chunk_id, summary, topic and embedding for unchanged chunks"""
+        by_hash = self.reusable_chunks.pop(document_id, None)
+        if not by_hash:
+            return 0
+        
+        reused = 0
+        for chunk in chunks:
+            candidates = by_hash.get(chunk.content_hash)
+            if not candidates:
+                continue
+            indexed = candidates.pop(0)
+            chunk.chunk_id = indexed['chunk_id']
+            chunk.embedding = np.asarray(indexed['embedding'], dtype=np.float32)
+            chunk.metadata['chunk_id'] = indexed['chunk_id']
+            chunk.metadata['summary'] = indexed.get('summary') or ''
+            chunk.metadata['topic'] = indexed.get('topic') or ''
+            reused += 1
+        
+        logger.info(f"   [4.2] ♻️ Reusing {reused}/{len(chunks)} unchanged chunks from the existing index.")
+        return reused
+    
+    def _embed_document_window(self, doc_infos: List[HierarchicalDocumentInfo]) -> List[HierarchicalDocumentInfo]:
+        """
+        Create chunk and document-level embeddings for a window of documents in
+        token-budgeted batches. Documents whose document-level embedding cannot be
+        created are dropped, as in per-document processing.
+        """
+        if not doc_infos:
+            return []
+        
+        chunks = [chunk for doc_info in doc_infos for chunk in doc_info.chunks if chunk.embedding is None]
+        texts = [chunk.content for chunk in chunks]
+        texts.extend(self._document_embedding_text(doc_info) for doc_info in doc_infos)
+        
+        logger.info(f"🧮 Embedding window of {len(doc_infos)} documents ({len(chunks)} chunks) in bucketed batches...")
+        try:
+            embeddings = self.embedder.batch_create_embeddings_bucketed(
+                texts, max_batch_tokens=self.max_batch_tokens, max_batch_size=self.max_batch_size
+            )
+        except Exception as e:
+            logger.error(f"❌ Batched embedding failed for window, falling back to per-document embedding: {e}")
+            embedded = []
+            for doc_info in doc_infos:
+                try:
+                    self._embed_chunks(doc_info.chunks)
+                    doc_info.embedding = self.embedder.create_embeddings(self._document_embedding_text(doc_info))
+                    embedded.append(doc_info)
+                except Exception as doc_error:
+                    logger.error(f"❌ Failed to create document embedding for {doc_info.document_metadata['file_name']}: {doc_error}")
+            return embedded
+        
+        for chunk, embedding in zip(chunks, embeddings[:len(chunks)]):
+            chunk.embedding = embedding
+        for doc_info, embedding in zip(doc_infos, embeddings[len(chunks):]):
+            doc_info.embedding = embedding
+        
+        logger.info(f"✅ Embedded window of {len(doc_infos)} documents")
+        return doc_infos
+    
+    def _embed_chunks(self, chunks: List[DocumentChunk]):
+        """Embed the chunks of one document in bucketed batches, falling back to one call per chunk"""
+        pending = [chunk for chunk in chunks if chunk.embedding is None]
+        if not pending:
+            return
+        
+        try:
+            embeddings = self.embedder.batch_create_embeddings_bucketed(
+                [chunk.content for chunk in pending],
+                max_batch_tokens=self.max_batch_tokens, max_batch_size=self.max_batch_size
+            )
+            for chunk, embedding in zip(pending, embeddings):
+                chunk.embedding = embedding
+            return
+        except Exception as e:
+            logger.error(f"      ❌ Batched chunk embedding failed, embedding chunks individually: {e}")
+        
+        for i, chunk in enumerate(pending):
             try:
-                doc_info = self._process_document_enhanced(document, filename_hierarchy)
-                if doc_info:
-                    yield doc_info
+                logger.info(f"      [4.2.{i+1}] Creating embedding for chunk {chunk.chunk_index}...")
+                chunk.embedding = self.embedder.create_embeddings(chunk.content)
             except Exception as e:
-                logger.error(f"Error processing document {document.original_filename}: {e}")
+                logger.error(f"      [4.2.{i+1}] ❌ Failed to create embedding for chunk {chunk.chunk_index}: {e}")
+    
+    @staticmethod
+    def _document_embedding_text(doc_info: HierarchicalDocumentInfo) -> str:
+        """Text used for the document-level embedding"""
+        return doc_info.chunks[0].content[:1000]
     
     def _build_filename_hierarchy(self, documents: List[Any]) -> Dict[str, Any]:
         """Build comprehensive filename-based hierarchy"""
@@ -327,8 +465,13 @@ class EnhancedHierarchicalProcessor:
         
         return structure
     
-    def _process_document_enhanced(self, document: Any, filename_hierarchy: Dict[str, Any]) -> Optional[HierarchicalDocumentInfo]:
-        """Process a single document with robust extraction and hierarchical chunking."""
+    def _process_document_enhanced(self, document: Any, filename_hierarchy: Dict[str, Any],
+                                   defer_enrichment: bool = False) -> Optional[HierarchicalDocumentInfo]:
+        """
+        Process a single document with robust extraction and hierarchical chunking.
+        With defer_enrichment the caller generates chunk summaries/topics and embeddings
+        (see process_project_documents_enhanced).
+        """
         logger.info(f"🚀 Starting enhanced processing for document: {document.original_filename} (ID: {document.id})")
         
         try:
@@ -354,28 +497,32 @@ class EnhancedHierarchicalProcessor:
             
             # 4. Create hierarchical chunks
             logger.info(f"   [4/5] CREATING hierarchical chunks...")
-            chunks = self._create_hierarchical_chunks(content, document_metadata, hier_info, content_map)
+            chunks = self._create_hierarchical_chunks(content, document_metadata, hier_info, content_map,
+                                                      enrich=not defer_enrichment)
             
             if not chunks:
                 logger.warning(f"⚠️ No chunks were created for {document.original_filename}. Aborting.")
                 return None
             logger.info(f"   [4/5] ✔️ CHUNKING successful. Created {len(chunks)} chunks.")
 
-            # 5. Create document-level embedding
-            logger.info(f"   [5/5] CREATING document-level embedding...")
-            summary_for_embedding = chunks[0].content[:1000]
-            doc_embedding = self.embedder.create_embeddings(summary_for_embedding)
-            logger.info(f"   [5/5] ✔️ EMBEDDING created for document.")
-            
-            logger.info(f"✅ Successfully processed document: {document.original_filename}")
-            return HierarchicalDocumentInfo(
+            doc_info = HierarchicalDocumentInfo(
                 original_content=content,
                 document_metadata=document_metadata,
                 chunks=chunks,
-                content_map=content_map,
-                embedding=doc_embedding
+                content_map=content_map
             )
             
+            # 5. Create document-level embedding
+            if defer_enrichment:
+                logger.info(f"   [5/5] DEFERRED document-level embedding to batched window.")
+            else:
+                logger.info(f"   [5/5] CREATING document-level embedding...")
+                doc_info.embedding = self.embedder.create_embeddings(self._document_embedding_text(doc_info))
+                logger.info(f"   [5/5] ✔️ EMBEDDING created for document.")
+            
+            logger.info(f"✅ Successfully processed document: {document.original_filename}")
+            return doc_info
+            
         except Exception as e:
             logger.exception(f"💥 Unhandled exception while processing {document.original_filename}: {e}")
             return None
@@ -443,7 +590,8 @@ class EnhancedHierarchicalProcessor:
         return content_map
     
     def _create_hierarchical_chunks(self, content: str, document_metadata: Dict[str, Any], 
-                                  hier_info: Dict[str, Any], content_map: Dict[str, Any]) -> List[DocumentChunk]:
+                                  hier_info: Dict[str, Any], content_map: Dict[str, Any],
+                                  enrich: bool = True) -> List[DocumentChunk]:
         """Create hierarchical chunks, splitting if necessary."""
         chunks = []
         logger.info(f"   [4.1] Determining chunking strategy...")
@@ -467,21 +615,22 @@ class EnhancedHierarchicalProcessor:
             chunks.append(chunk)
         
         # Finalize chunk metadata
-        logger.info(f"   [4.2] Finalizing and creating embeddings for {len(chunks)} chunks...")
+        logger.info(f"   [4.2] Finalizing {len(chunks)} chunks...")
         total_chunks = len(chunks)
         document_metadata['total_chunks'] = total_chunks
-        for i, chunk in enumerate(chunks):
+        for chunk in chunks:
             chunk.total_chunks = total_chunks
             if chunk.metadata:
                 chunk.metadata['total_chunks'] = total_chunks
-            
-            # Generate embeddings for all chunks
-            if chunk.embedding is None:
-                try:
-                    logger.info(f"      [4.2.{i+1}] Creating embedding for chunk {chunk.chunk_index}...")
-                    chunk.embedding = self.embedder.create_embeddings(chunk.content)
-                except Exception as e:
-                    logger.error(f"      [4.2.{i+1}] ❌ Failed to create embedding for chunk {chunk.chunk_index}: {e}")
+        
+        # Unchanged chunks keep their summary, topic and embedding
+        self._reuse_indexed_chunks(chunks, document_metadata['document_id'])
+        
+        # Generate summaries/topics concurrently, then embeddings in bucketed batches
+        if enrich:
+            self._generate_chunk_ai_content(chunks)
+            logger.info(f"   [4.2] Creating embeddings for {len(chunks)} chunks...")
+            self._embed_chunks(chunks)
         
         logger.info(f"   [4.2] ✔️ All chunks finalized.")
         return chunks
@@ -618,7 +767,7 @@ class EnhancedHierarchicalProcessor:
     def _create_single_chunk(self, content: str, chunk_index: int, total_chunks: int,
                            document_metadata: Dict[str, Any], hier_info: Dict[str, Any],
                            chunk_type: str, section_title: str) -> DocumentChunk:
-        """Create a single document chunk and generate its summary and topic."""
+        """Create a single document chunk (summary and topic are added by _generate_chunk_ai_content)."""
         
         logger.info(f"      Creating chunk {chunk_index} ('{chunk_type}' / '{section_title}')...")
         
@@ -628,27 +777,8 @@ class EnhancedHierarchicalProcessor:
         folder_path = '/'.join(path_parts[:-1])
         chunk_hierarchical_path = f"{folder_path}/{file_part}#chunk_{chunk_index:03d}"
         
-        # Generate summary and topic using project-specific OpenAI API key
-        logger.info(f"         -> Generating AI content (summary/topic) using project-specific OpenAI key...")
-        summary_metadata = {'file_name': document_metadata['file_name'], 'section_title': section_title}
-
-        # Summarizer is guaranteed to be available (checked in __init__)
-        summary = self.summarizer.generate_summary(content, summary_metadata) or ""
-        topic = self.summarizer.generate_topic(content, summary_metadata) or ""
-
-        if not summary:
-            logger.warning(f"         -> ⚠️ Failed to generate summary for chunk {chunk_index}, using fallback.")
-            summary = f"Content from {section_title}: {content[:250]}..."
-        else:
-            logger.info(f"         -> ✔️ Summary generated ({len(summary)} chars).")
-
-        if not topic:
-            logger.warning(f"         -> ⚠️ Failed to generate topic for chunk {chunk_index}, using fallback.")
-            topic = section_title.title() if len(section_title.split()) <= 8 else f"{document_metadata['category'].title()} Content"
-        else:
-            logger.info(f"         -> ✔️ Topic generated: '{topic}'.")
-
         chunk_id = str(uuid.uuid4())
+        content_hash = chunk_content_hash(content, section_title)
         chunk_metadata = {
             **document_metadata,
             'chunk_id': chunk_id,
@@ -656,8 +786,9 @@ class EnhancedHierarchicalProcessor:
             'chunk_type': chunk_type,
             'section_title': section_title,
             'content_length': len(content),
-            'summary': summary,
-            'topic': topic,
+            'content_hash': content_hash,
+            'summary': '',  # Filled in by _generate_chunk_ai_content
+            'topic': '',
         }
         
         logger.info(f"      ✔️ Chunk {chunk_index} created successfully.")
@@ -671,9 +802,49 @@ class EnhancedHierarchicalProcessor:
             chunk_type=chunk_type,
             section_title=section_title,
             embedding=None, # Embedding is now created in the main loop
-            metadata=chunk_metadata
+            metadata=chunk_metadata,
+            content_hash=content_hash
         )
     
+    def _generate_chunk_ai_content(self, chunks: List[DocumentChunk]):
+        """
+        Generate summary and topic for chunks using the project-specific OpenAI key.
+        Calls run concurrently within the project's rate budget; chunk order is kept
+        and chunks without AI output get the fallback summary/topic. Chunks that
+        already carry a summary (reused from the index) are skipped.
+        """
+        chunks = [chunk for chunk in chunks if not chunk.metadata.get('summary')]
+        if not chunks:
+            return
+        
+        logger.info(f"         -> Generating AI content (summary/topic) for {len(chunks)} chunks using project-specific OpenAI key...")
+        requests = [
+            SummarizationRequest(
+                content=chunk.content,
+                metadata={'file_name': chunk.metadata['file_name'], 'section_title': chunk.section_title}
+            )
+            for chunk in chunks
+        ]
+        
+        # Summarizer is guaranteed to be available (checked in __init__)
+        pipeline = ChunkSummarizationPipeline(self.summarizer, str(self.project.project_id))
+        results = pipeline.run(requests)
+        
+        for chunk, (summary, topic) in zip(chunks, results):
+            if not summary:
+                logger.warning(f"         -> ⚠️ Failed to generate summary for chunk {chunk.chunk_index}, using fallback.")
+                summary = f"Content from {chunk.section_title}: {chunk.content[:250]}..."
+            
+            if not topic:
+                logger.warning(f"         -> ⚠️ Failed to generate topic for chunk {chunk.chunk_index}, using fallback.")
+                topic = (chunk.section_title.title() if len(chunk.section_title.split()) <= 8
+                         else f"{chunk.metadata['category'].title()} Content")
+            
+            chunk.metadata['summary'] = summary
+            chunk.metadata['topic'] = topic
+        
+        logger.info(f"         -> ✔️ AI content ready for {len(chunks)} chunks.")
+    
     def _extract_document_content(self, document: Any) -> Optional[str]:
         """
         Robustly extracts text content from a document.
@@ -8,7 +8,7 @@ from django.utils import timezone
 from users.models import IntelliDocProject, ProjectDocument, ProjectVectorCollection, VectorProcessingStatus
 from .enhanced_hierarchical_processor import EnhancedHierarchicalProcessor, EnhancedHierarchicalChunkMapper
 from .enhanced_hierarchical_database import EnhancedHierarchicalVectorDatabase
-from .embeddings import DocumentEmbedder
+from .embeddings import get_embedder_instance
 
 logger = logging.getLogger(__name__)
 
@@ -223,11 +223,11 @@ class EnhancedHierarchicalVectorSearchManager:
         """Enhanced search with complete content access"""
         try:
             # Initialize components
-            embedder = DocumentEmbedder()
+            embedder = get_embedder_instance()
             database = EnhancedHierarchicalVectorDatabase(project_id)
             
-            # Create query embedding
-            query_embedding = embedder.create_embeddings(query)
+            # Create query embedding (cached across requests for repeated queries)
+            query_embedding = embedder.create_query_embedding(query)
             
             # Perform enhanced hierarchical search
             results = database.search_enhanced_hierarchical(
@@ -0,0 +1,324 @@
+# Document Ingestion Workers with Durable Progress
+# backend/vector_search/ingestion.py
+
+"""
+Run control and worker pool for project document ingestion.
+
+Progress and stop flags of a run live in ``VectorProcessingRun`` rows, so any
+process can observe or stop a run and a crashed run can be resumed:
+
+- The coordinating process (``EnhancedProjectVectorSearchService``) splits new
+  and changed documents into batches and hands them to a pool of worker
+  processes. Each worker runs extract -> chunk -> summarise -> embed -> insert
+  for its batch, so different documents are in different stages at once.
+- Per-document completion is recorded on ``DocumentVectorStatus`` (with the
+  source hash), which is what makes a resumed run skip finished documents.
+- Runs whose coordinator stopped heartbeating are marked INTERRUPTED and, when
+  enabled, restarted on startup.
+"""
+
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INGESTION_SETTINGS = {
+    'WORKERS': 2,
+    'DOCUMENTS_PER_TASK': 4,
+    'HEARTBEAT_INTERVAL': 10,
+    'STALE_RUN_TIMEOUT': 120,
+    'RESUME_ON_STARTUP': True,
+}
+
+
+def get_ingestion_settings() -> Dict[str, Any]:
+    """Merge ``settings.VECTOR_INGESTION`` over the defaults"""
+    ingestion_settings = dict(DEFAULT_INGESTION_SETTINGS)
+    ingestion_settings.update(getattr(settings, 'VECTOR_INGESTION', {}) or {})
+    return ingestion_settings
+
+
+def _host_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+# ============================================================================
+# DURABLE RUN CONTROL
+# ============================================================================
+
+def _stale_before():
+    return timezone.now() - timedelta(seconds=get_ingestion_settings()['STALE_RUN_TIMEOUT'])
+
+
+def _is_stale(run) -> bool:
+    last_seen = run.heartbeat_at or run.started_at
+    return last_seen < _stale_before()
+
+
+def start_run(project) -> Tuple[Optional[Any], Optional[Any]]:
+    """
+    Create a RUNNING run for the project.
+
+    Returns (run, None) on success or (None, active_run) when another live run
+    already owns the project. A RUNNING run without a recent heartbeat is marked
+    INTERRUPTED and the new run resumes it, as it does any interrupted run not
+    resumed yet.
+
+    Concurrent callers are serialised on the project row, which always exists
+    (locking the RUNNING runs locks nothing when there are none), so only one
+    of them can create a run or resume a given interrupted run.
+    """
+    from users.models import IntelliDocProject, VectorProcessingRun, VectorProcessingRunStatus
+
+    with transaction.atomic():
+        IntelliDocProject.objects.select_for_update().filter(pk=project.pk).first()
+        active_runs = list(
+            VectorProcessingRun.objects
+            .filter(project=project, status=VectorProcessingRunStatus.RUNNING)
+        )
+        resumed_from = None
+        for active in active_runs:
+            if not _is_stale(active):
+                return None, active
+            active.status = VectorProcessingRunStatus.INTERRUPTED
+            active.finished_at = timezone.now()
+            active.error_message = 'Coordinator stopped heartbeating; resumed by a new run'
+            active.current_document_ids = []
+            active.save(update_fields=['status', 'finished_at', 'error_message', 'current_document_ids'])
+            resumed_from = active
+
+        if resumed_from is None:
+            # Pick up a run interrupted earlier (e.g. marked on startup) that nothing resumed yet
+            resumed_from = (VectorProcessingRun.objects
+                            .filter(project=project, status=VectorProcessingRunStatus.INTERRUPTED, resumed_by__isnull=True)
+                            .order_by('-started_at').first())
+
+        run = VectorProcessingRun.objects.create(
+            project=project,
+            resumed_from=resumed_from,
+            host=_host_id(),
+            heartbeat_at=timezone.now()
+        )
+
+    if resumed_from:
+        logger.info(f"🔁 INGESTION: Run {run.run_id} resumes interrupted run {resumed_from.run_id} for project {project.project_id}")
+    else:
+        logger.info(f"🚀 INGESTION: Started run {run.run_id} for project {project.project_id}")
+    return run, None
+
+
+def get_active_run(project_id: str):
+    """Latest RUNNING run of a project, or None"""
+    from users.models import VectorProcessingRun, VectorProcessingRunStatus
+    return (VectorProcessingRun.objects
+            .filter(project__project_id=project_id, status=VectorProcessingRunStatus.RUNNING)
+            .order_by('-started_at').first())
+
+
+def update_run(run_id, **fields):
+    from users.models import VectorProcessingRun
+    VectorProcessingRun.objects.filter(run_id=run_id).update(**fields)
+
+
+def heartbeat(run_id, current_document_ids: Optional[List[str]] = None):
+    fields = {'heartbeat_at': timezone.now()}
+    if current_document_ids is not None:
+        fields['current_document_ids'] = current_document_ids
+    update_run(run_id, **fields)
+
+
+def is_stop_requested(run_id) -> bool:
+    from users.models import VectorProcessingRun
+    return VectorProcessingRun.objects.filter(run_id=run_id, stop_requested=True).exists()
+
+
+def request_stop(project_id: str) -> int:
+    """Flag every RUNNING run of the project to stop; returns the number flagged"""
+    from users.models import VectorProcessingRun, VectorProcessingRunStatus
+    return VectorProcessingRun.objects.filter(
+        project__project_id=project_id, status=VectorProcessingRunStatus.RUNNING
+    ).update(stop_requested=True)
+
+
+def record_document_result(run_id, succeeded: bool):
+    """Count a finished document (called from whichever process processed it)"""
+    field = 'completed_documents' if succeeded else 'failed_documents'
+    update_run(run_id, **{field: F(field) + 1, 'heartbeat_at': timezone.now()})
+
+
+def finish_run(run_id, status: str, error_message: str = ''):
+    update_run(
+        run_id,
+        status=status,
+        error_message=error_message,
+        current_document_ids=[],
+        finished_at=timezone.now(),
+        heartbeat_at=timezone.now()
+    )
+    logger.info(f"🏁 INGESTION: Run {run_id} finished with status {status}")
+
+
+def mark_stale_runs_interrupted() -> List[str]:
+    """Mark RUNNING runs without a recent heartbeat as INTERRUPTED; returns their project ids"""
+    from users.models import VectorProcessingRun, VectorProcessingRunStatus
+    from django.db.models import Q
+
+    stale_before = _stale_before()
+    stale_runs = VectorProcessingRun.objects.filter(status=VectorProcessingRunStatus.RUNNING).filter(
+        Q(heartbeat_at__lt=stale_before) | Q(heartbeat_at__isnull=True, started_at__lt=stale_before)
+    )
+    project_ids = [str(project_id) for project_id in
+                   stale_runs.values_list('project__project_id', flat=True).distinct()]
+    stale_runs.update(
+        status=VectorProcessingRunStatus.INTERRUPTED,
+        finished_at=timezone.now(),
+        current_document_ids=[],
+        error_message='Coordinator stopped heartbeating'
+    )
+    return project_ids
+
+
+def resume_interrupted_runs() -> List[str]:
+    """
+    Restart ingestion for projects whose run crashed. Finished documents are
+    skipped by source hash, so the new run continues where the old one stopped.
+    """
+    from users.models import VectorProcessingRun, VectorProcessingRunStatus
+
+    mark_stale_runs_interrupted()
+    # Interrupted runs that no later run has picked up yet
+    project_ids = [
+        str(project_id) for project_id in
+        VectorProcessingRun.objects.filter(status=VectorProcessingRunStatus.INTERRUPTED, resumed_by__isnull=True)
+        .values_list('project__project_id', flat=True).distinct()
+    ]
+
+    for project_id in project_ids:
+        thread = threading.Thread(target=_resume_project, args=(project_id,), daemon=True)
+        thread.start()
+        logger.info(f"🔁 INGESTION: Resuming interrupted ingestion for project {project_id}")
+    return project_ids
+
+
+def _resume_project(project_id: str):
+    from .services_enhanced import EnhancedVectorSearchManager
+    try:
+        EnhancedVectorSearchManager.process_project_documents(project_id)
+    except Exception as e:
+        logger.error(f"❌ INGESTION: Resume failed for project {project_id}: {e}")
+    finally:
+        close_old_connections()
+
+
+# ============================================================================
+# WORKER POOL
+# ============================================================================
+
+# Per worker process: project_id -> EnhancedProjectVectorSearchService
+_worker_services: Dict[str, Any] = {}
+
+
+def _init_worker():
+    """Initializer for spawned worker processes"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+    # Keeps startup hooks (e.g. resuming interrupted runs) out of worker processes
+    os.environ['VECTOR_INGESTION_WORKER'] = '1'
+    import django
+    django.setup()
+
+
+def _process_batch_in_worker(project_id: str, run_id, document_ids: List[str],
+                             source_hashes: Dict[str, str]) -> List[Dict[str, Any]]:
+    """Worker entry point: run the full ingestion pipeline for a batch of documents"""
+    close_old_connections()
+    try:
+        service = _worker_services.get(project_id)
+        if service is None:
+            from .services_enhanced import EnhancedProjectVectorSearchService
+            service = EnhancedProjectVectorSearchService(project_id)
+            _worker_services[project_id] = service
+        service.run_id = run_id
+        return service.process_document_batch(document_ids, source_hashes)
+    finally:
+        close_old_connections()
+
+
+def _failed_results(document_ids: List[str], error: str) -> List[Dict[str, Any]]:
+    return [{"document_id": document_id, "status": "failed", "error": error} for document_id in document_ids]
+
+
+def execute_batches(service, run_id, batches: List[List[str]], source_hashes: Dict[str, str]) -> List[Dict[str, Any]]:
+    """
+    Process document batches for a run, in worker processes when configured.
+    Returns the per-document results of every batch that ran.
+    """
+    ingestion_settings = get_ingestion_settings()
+    workers = max(1, min(ingestion_settings['WORKERS'], len(batches)))
+    update_run(run_id, worker_count=workers)
+
+    if workers == 1:
+        results = []
+        for batch in batches:
+            if service._should_stop_processing():
+                break
+            heartbeat(run_id, batch)
+            results.extend(service.process_document_batch(batch, source_hashes))
+        return results
+
+    logger.info(f"👷 INGESTION: Processing {len(batches)} batches with {workers} worker processes")
+    results = []
+    # spawn: forked children would inherit the parent's DB connections and torch thread pools
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker
+    )
+    try:
+        futures = {
+            executor.submit(
+                _process_batch_in_worker, service.project_id, run_id, batch,
+                {document_id: source_hashes.get(document_id, '') for document_id in batch}
+            ): batch
+            for batch in batches
+        }
+        pending = set(futures)
+        stop_seen = False
+        while pending:
+            done, pending = wait(pending, timeout=ingestion_settings['HEARTBEAT_INTERVAL'],
+                                 return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.cancelled():
+                    continue
+                try:
+                    results.extend(future.result())
+                except BrokenProcessPool as e:
+                    logger.error(f"❌ INGESTION: Worker process died while processing {futures[future]}: {e}")
+                    results.extend(_failed_results(futures[future], 'Worker process died'))
+                except Exception as e:
+                    logger.error(f"❌ INGESTION: Batch {futures[future]} failed: {e}")
+                    results.extend(_failed_results(futures[future], str(e)))
+
+            in_flight = [document_id for future in pending if future.running() for document_id in futures[future]]
+            heartbeat(run_id, in_flight)
+
+            if not stop_seen and service._should_stop_processing():
+                stop_seen = True
+                cancelled = sum(1 for future in pending if future.cancel())
+                logger.info(f"🛑 INGESTION: Stop requested for run {run_id}, cancelled {cancelled} queued batches")
+                pending = {future for future in pending if not future.cancelled()}
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    return results
@@ -0,0 +1,552 @@
+"""
+Keyword (BM25) index
+====================
+
+Sparse full-text index of a project collection's chunks, so keyword search
+ranks by the query's exact terms (identifiers, codes, names the embedding
+misses) instead of re-scoring semantic hits. One SQLite FTS5 database per
+Milvus collection:
+
+- ``chunk_fts``: content, section title and file name, ranked with FTS5's
+  built-in ``bm25()`` (per-column weights from ``KEYWORD_INDEX``).
+- ``chunk_meta``: chunk_id, document_id and the fields results and content
+  filters need, joined on rowid.
+- ``documents`` and ``folders``: the folder/file tree content filters are
+  picked from, with chunk counts per document and document counts per folder
+  subtree, updated with every chunk insert and delete.
+
+``MilvusProjectVectorDatabase`` mirrors every chunk insert and delete here, so
+the index follows ingestion. A collection that has no complete index yet (it
+was filled before the index existed, or a write here failed) is backfilled
+from Milvus on first use through ``ensure_built``. WAL mode lets ingestion
+worker processes write while searches read.
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KEYWORD_INDEX_SETTINGS = {
+    'ENABLED': True,
+    'DIRECTORY': '',  # '' uses MEDIA_ROOT/keyword_index
+    'CONTENT_WEIGHT': 1.0,  # bm25() column weights
+    'SECTION_TITLE_WEIGHT': 2.0,
+    'FILE_NAME_WEIGHT': 1.5,
+    'MAX_QUERY_TERMS': 32,
+    'BACKFILL_BATCH_SIZE': 1000,  # Milvus rows read per backfill query
+}
+
+# Same token characters as the FTS5 tokenizer below, so query terms and indexed terms agree
+_TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+_TOKENIZER = "unicode61 remove_diacritics 2 tokenchars '_'"
+
+CHUNK_FIELDS = ['chunk_id', 'document_id', 'file_name', 'hierarchical_path', 'chunk_type', 'section_title', 'content']
+
+
+def get_keyword_index_settings() -> Dict[str, Any]:
+    """Merge ``settings.KEYWORD_INDEX`` over the defaults"""
+    index_settings = dict(DEFAULT_KEYWORD_INDEX_SETTINGS)
+    index_settings.update(getattr(settings, 'KEYWORD_INDEX', {}) or {})
+    if not index_settings['DIRECTORY']:
+        index_settings['DIRECTORY'] = os.path.join(str(settings.MEDIA_ROOT), 'keyword_index')
+    return index_settings
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased terms of ``text`` as the index tokenizes them"""
+    return [token.lower() for token in _TOKEN_PATTERN.findall(text or '')]
+
+
+def build_match_expression(query: str, min_term_length: int = 2, phrase_boost: bool = True,
+                           max_terms: int = 32) -> Optional[str]:
+    """
+    FTS5 MATCH expression for a free-text query: any of its terms (OR), plus
+    the whole query as a phrase when ``phrase_boost`` so chunks containing it
+    verbatim rank first. None when no term is long enough.
+    """
+    tokens = tokenize(query)
+    terms = list(dict.fromkeys(token for token in tokens if len(token) >= min_term_length))[:max_terms]
+    if not terms:
+        return None
+    clauses = [f'"{term}"' for term in terms]
+    if phrase_boost and len(tokens) > 1:
+        clauses.append('"' + ' '.join(tokens[:max_terms]) + '"')
+    return ' OR '.join(clauses)
+
+
+def _content_filter_clause(content_filters: Optional[List[str]]):
+    """
+    SQL condition for DocAware content filter IDs ("folder_<path>" or
+    "file_<document_id>"), OR-ed like the Milvus filter expressions
+    """
+    clauses, args = [], []
+    for content_filter in content_filters or []:
+        if not isinstance(content_filter, str):
+            continue
+        if content_filter.startswith('folder_'):
+            clauses.append('substr(chunk_meta.hierarchical_path, 1, length(?)) = ?')
+            args.extend([content_filter[7:], content_filter[7:]])
+        elif content_filter.startswith('file_'):
+            clauses.append('chunk_meta.document_id = ?')
+            args.append(content_filter[5:])
+    if not clauses:
+        return '', []
+    return ' AND (' + ' OR '.join(clauses) + ')', args
+
+
+def _safe_str(value) -> str:
+    return str(value) if value is not None else ''
+
+
+def split_hierarchical_path(hierarchical_path: Optional[str]) -> Optional[Tuple[str, str]]:
+    """
+    (file path, folder path) of a chunk's hierarchical_path, e.g.
+    "Reports/Q1/summary.pdf#chunk_003" -> ("Reports/Q1/summary.pdf", "Reports/Q1").
+    None when the path does not name a file chunk.
+    """
+    clean_path = (hierarchical_path or '').strip().strip('/')
+    if '#chunk_' not in clean_path:
+        return None
+    file_path = clean_path.split('#chunk_')[0]
+    return file_path, '/'.join(file_path.split('/')[:-1])
+
+
+def folder_ancestors(folder_path: str) -> List[str]:
+    """The folder and each of its parents ("a/b" -> ["a", "a/b"])"""
+    parts = folder_path.split('/') if folder_path else []
+    return [path for path in ('/'.join(parts[:depth]) for depth in range(1, len(parts) + 1)) if path]
+
+
+def summarize_paths(rows: Iterable[Dict[str, Any]], include_files: bool = False) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Folder and file entries of chunk rows (document_id, file_name,
+    hierarchical_path), shaped like ``KeywordIndex.get_path_tree``
+    """
+    files: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        document_id = _safe_str(row.get('document_id'))
+        if not document_id:
+            continue
+        entry = files.get(document_id)
+        if entry is None:
+            entry = files[document_id] = {
+                'document_id': document_id,
+                'file_name': _safe_str(row.get('file_name')),
+                'file_path': '',
+                'folder_path': '',
+                'chunk_count': 0,
+            }
+        entry['chunk_count'] += 1
+        paths = split_hierarchical_path(row.get('hierarchical_path'))
+        if paths and not entry['file_path']:
+            entry['file_path'], entry['folder_path'] = paths
+
+    folder_counts: Dict[str, int] = {}
+    for entry in files.values():
+        if entry['file_path']:
+            for path in folder_ancestors(entry['folder_path']):
+                folder_counts[path] = folder_counts.get(path, 0) + 1
+
+    folders = [{'path': path, 'document_count': count} for path, count in sorted(folder_counts.items())]
+    if not include_files:
+        return folders, []
+    file_entries = sorted(
+        (entry for entry in files.values() if entry['file_path']),
+        key=lambda entry: (entry['file_name'], entry['document_id'])
+    )
+    return folders, file_entries
+
+
+class KeywordIndex:
+    """BM25 index of one collection, backed by a SQLite FTS5 file"""
+
+    def __init__(self, collection_name: str, path: str, index_settings: Dict[str, Any]):
+        self.collection_name = collection_name
+        self.path = path
+        self.settings = index_settings
+        self._local = threading.local()
+        self._build_lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = self._connection()
+        had_path_tables = connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'documents'"
+        ).fetchone() is not None
+        connection.executescript(f"""
+            CREATE TABLE IF NOT EXISTS chunk_meta (
+                rowid INTEGER PRIMARY KEY,
+                chunk_id TEXT NOT NULL UNIQUE,
+                document_id TEXT NOT NULL,
+                file_name TEXT NOT NULL,
+                hierarchical_path TEXT NOT NULL,
+                chunk_type TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS chunk_meta_document ON chunk_meta (document_id);
+            CREATE VIRTUAL TABLE IF NOT EXISTS chunk_fts USING fts5 (
+                content, section_title, file_name, tokenize = "{_TOKENIZER}"
+            );
+            CREATE TABLE IF NOT EXISTS documents (
+                document_id TEXT PRIMARY KEY,
+                file_name TEXT NOT NULL,
+                file_path TEXT NOT NULL,
+                folder_path TEXT NOT NULL,
+                chunk_count INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS folders (path TEXT PRIMARY KEY, document_count INTEGER NOT NULL);
+            CREATE TABLE IF NOT EXISTS index_state (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+        """)
+        if not had_path_tables:
+            # Index files written before the path tables existed
+            self._transaction(self._rebuild_path_tables)
+
+    def _rebuild_path_tables(self, connection):
+        connection.execute('DELETE FROM documents')
+        connection.execute('DELETE FROM folders')
+        for document_id, file_name, hierarchical_path in connection.execute(
+            'SELECT document_id, file_name, hierarchical_path FROM chunk_meta ORDER BY rowid'
+        ).fetchall():
+            self._add_document_chunk(connection, document_id, file_name, hierarchical_path)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def _transaction(self, operation):
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            result = operation(connection)
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return result
+
+    @staticmethod
+    def _count_folders(connection, folder_path: str, delta: int):
+        for path in folder_ancestors(folder_path):
+            connection.execute(
+                'INSERT INTO folders (path, document_count) VALUES (?, ?) '
+                'ON CONFLICT (path) DO UPDATE SET document_count = document_count + excluded.document_count',
+                (path, delta)
+            )
+        if delta < 0:
+            connection.execute('DELETE FROM folders WHERE document_count <= 0')
+
+    def _add_document_chunk(self, connection, document_id: str, file_name: str, hierarchical_path: str):
+        if not document_id:
+            return
+        paths = split_hierarchical_path(hierarchical_path)
+        document = connection.execute(
+            'SELECT file_path FROM documents WHERE document_id = ?', (document_id,)
+        ).fetchone()
+        if document is None:
+            file_path, folder_path = paths or ('', '')
+            connection.execute(
+                'INSERT INTO documents (document_id, file_name, file_path, folder_path, chunk_count) '
+                'VALUES (?, ?, ?, ?, 1)',
+                (document_id, file_name, file_path, folder_path)
+            )
+        else:
+            connection.execute(
+                'UPDATE documents SET chunk_count = chunk_count + 1 WHERE document_id = ?', (document_id,)
+            )
+            if not paths or document[0]:
+                return
+            # First chunk of the document that names its file
+            connection.execute(
+                'UPDATE documents SET file_path = ?, folder_path = ? WHERE document_id = ?',
+                (paths[0], paths[1], document_id)
+            )
+        if paths:
+            self._count_folders(connection, paths[1], 1)
+
+    def _remove_document_chunk(self, connection, document_id: str):
+        document = connection.execute(
+            'SELECT chunk_count, file_path, folder_path FROM documents WHERE document_id = ?', (document_id,)
+        ).fetchone()
+        if document is None:
+            return
+        if document[0] > 1:
+            connection.execute(
+                'UPDATE documents SET chunk_count = chunk_count - 1 WHERE document_id = ?', (document_id,)
+            )
+            return
+        connection.execute('DELETE FROM documents WHERE document_id = ?', (document_id,))
+        if document[1]:
+            self._count_folders(connection, document[2], -1)
+
+    def _delete_rowids(self, connection, rowids: List[int]):
+        for rowid in rowids:
+            row = connection.execute('SELECT document_id FROM chunk_meta WHERE rowid = ?', (rowid,)).fetchone()
+            connection.execute('DELETE FROM chunk_fts WHERE rowid = ?', (rowid,))
+            connection.execute('DELETE FROM chunk_meta WHERE rowid = ?', (rowid,))
+            if row:
+                self._remove_document_chunk(connection, row[0])
+
+    def index_chunks(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Insert or replace chunks (dicts with the ``CHUNK_FIELDS`` keys), keyed by chunk_id"""
+        rows = [row for row in rows if row.get('chunk_id') or row.get('document_id')]
+        if not rows:
+            return 0
+
+        def operation(connection):
+            for row in rows:
+                chunk_id = _safe_str(row.get('chunk_id')) or _safe_str(row.get('document_id'))
+                document_id, file_name = _safe_str(row.get('document_id')), _safe_str(row.get('file_name'))
+                existing = connection.execute('SELECT rowid FROM chunk_meta WHERE chunk_id = ?', (chunk_id,)).fetchone()
+                if existing:
+                    self._delete_rowids(connection, [existing[0]])
+                cursor = connection.execute(
+                    'INSERT INTO chunk_meta (chunk_id, document_id, file_name, hierarchical_path, chunk_type) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (chunk_id, document_id, file_name,
+                     _safe_str(row.get('hierarchical_path')), _safe_str(row.get('chunk_type')) or 'text')
+                )
+                connection.execute(
+                    'INSERT INTO chunk_fts (rowid, content, section_title, file_name) VALUES (?, ?, ?, ?)',
+                    (cursor.lastrowid, _safe_str(row.get('content')), _safe_str(row.get('section_title')), file_name)
+                )
+                self._add_document_chunk(connection, document_id, file_name, _safe_str(row.get('hierarchical_path')))
+            return len(rows)
+
+        return self._transaction(operation)
+
+    def delete_chunks(self, chunk_ids: List[str]):
+        if not chunk_ids:
+            return
+
+        def operation(connection):
+            rowids = []
+            for chunk_id in chunk_ids:
+                row = connection.execute('SELECT rowid FROM chunk_meta WHERE chunk_id = ?', (chunk_id,)).fetchone()
+                if row:
+                    rowids.append(row[0])
+            self._delete_rowids(connection, rowids)
+
+        self._transaction(operation)
+
+    def delete_document(self, document_id: str):
+        def operation(connection):
+            rowids = [row[0] for row in connection.execute(
+                'SELECT rowid FROM chunk_meta WHERE document_id = ?', (document_id,)
+            )]
+            self._delete_rowids(connection, rowids)
+
+        self._transaction(operation)
+
+    def search(self, query: str, limit: int = 10, min_term_length: int = 2, phrase_boost: bool = True,
+               content_filters: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Top ``limit`` chunks by BM25. Each hit carries the chunk fields, its
+        content and ``score`` (higher is better).
+        """
+        match = build_match_expression(query, min_term_length, phrase_boost, self.settings['MAX_QUERY_TERMS'])
+        if match is None:
+            return []
+        filter_sql, filter_args = _content_filter_clause(content_filters)
+        weights = (self.settings['CONTENT_WEIGHT'], self.settings['SECTION_TITLE_WEIGHT'], self.settings['FILE_NAME_WEIGHT'])
+        rows = self._connection().execute(
+            'SELECT chunk_meta.chunk_id, chunk_meta.document_id, chunk_meta.file_name, '
+            'chunk_meta.hierarchical_path, chunk_meta.chunk_type, chunk_fts.section_title, chunk_fts.content, '
+            'bm25(chunk_fts, ?, ?, ?) AS rank '
+            'FROM chunk_fts JOIN chunk_meta ON chunk_meta.rowid = chunk_fts.rowid '
+            f'WHERE chunk_fts MATCH ?{filter_sql} ORDER BY rank LIMIT ?',
+            (*weights, match, *filter_args, int(limit))
+        ).fetchall()
+        return [
+            {
+                'chunk_id': row[0],
+                'document_id': row[1],
+                'file_name': row[2],
+                'hierarchical_path': row[3],
+                'chunk_type': row[4],
+                'section_title': row[5],
+                'content': row[6],
+                'score': -row[7],  # bm25() is lower-is-better
+            }
+            for row in rows
+        ]
+
+    def get_path_tree(self, include_files: bool = False) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Folders (path, document_count over the subtree) sorted by path, and
+        when ``include_files`` the documents (document_id, file_name,
+        file_path, folder_path, chunk_count) sorted by file name
+        """
+        connection = self._connection()
+        connection.execute('BEGIN')  # one snapshot for both reads
+        try:
+            folders = [
+                {'path': path, 'document_count': count}
+                for path, count in connection.execute('SELECT path, document_count FROM folders ORDER BY path')
+            ]
+            files = []
+            if include_files:
+                files = [
+                    {
+                        'document_id': row[0],
+                        'file_name': row[1],
+                        'file_path': row[2],
+                        'folder_path': row[3],
+                        'chunk_count': row[4],
+                    }
+                    for row in connection.execute(
+                        'SELECT document_id, file_name, file_path, folder_path, chunk_count FROM documents '
+                        "WHERE file_path != '' ORDER BY file_name, document_id"
+                    )
+                ]
+        finally:
+            connection.execute('COMMIT')
+        return folders, files
+
+    def count(self) -> int:
+        return self._connection().execute('SELECT COUNT(*) FROM chunk_meta').fetchone()[0]
+
+    def is_built(self) -> bool:
+        row = self._connection().execute("SELECT value FROM index_state WHERE key = 'built'").fetchone()
+        return bool(row and row[0] == '1')
+
+    def _set_built(self, built: bool):
+        self._connection().execute(
+            "INSERT OR REPLACE INTO index_state (key, value) VALUES ('built', ?)", ('1' if built else '0',)
+        )
+
+    def mark_stale(self):
+        """Force a backfill from Milvus before the next search"""
+        self._set_built(False)
+
+    def ensure_built(self, load_collection: Callable[[], Any]) -> bool:
+        """
+        Backfill from the Milvus collection unless the index is complete.
+        ``load_collection`` returns the pymilvus Collection (or None when it
+        does not exist). Returns whether the index can be searched.
+        """
+        if self.is_built():
+            return True
+        with self._build_lock:
+            if self.is_built():
+                return True
+            collection = load_collection()
+            if collection is None:
+                return False
+            indexed = self.backfill(collection)
+            self._set_built(True)
+            logger.info(f"🔑 KEYWORD INDEX: Backfilled {indexed} chunks of {self.collection_name}")
+            return True
+
+    def backfill(self, collection) -> int:
+        """
+        Index every chunk stored in ``collection`` (idempotent: rows are keyed by chunk_id).
+        Reads through ``query_iterator`` (pymilvus >= 2.3), which has no offset + limit
+        cap, so the index is only marked built once it holds the whole collection.
+        """
+        batch_size = self.settings['BACKFILL_BATCH_SIZE']
+        indexed = 0
+        iterator = collection.query_iterator(batch_size=batch_size, output_fields=CHUNK_FIELDS)
+        try:
+            while True:
+                batch = iterator.next()
+                if not batch:
+                    break
+                indexed += self.index_chunks(batch)
+        finally:
+            iterator.close()
+        return indexed
+
+    def close(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+_indexes: Dict[str, KeywordIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def _index_path(collection_name: str, index_settings: Dict[str, Any]) -> str:
+    file_name = re.sub(r'[^A-Za-z0-9_]', '_', collection_name) + '.sqlite3'
+    return os.path.join(index_settings['DIRECTORY'], file_name)
+
+
+def get_keyword_index(collection_name: str) -> Optional[KeywordIndex]:
+    """Process-wide index of a collection; None when keyword indexing is disabled"""
+    index = _indexes.get(collection_name)
+    if index is None:
+        index_settings = get_keyword_index_settings()
+        if not index_settings['ENABLED']:
+            return None
+        with _indexes_lock:
+            index = _indexes.get(collection_name)
+            if index is None:
+                index = KeywordIndex(collection_name, _index_path(collection_name, index_settings), index_settings)
+                _indexes[collection_name] = index
+    return index
+
+
+# Write-through hooks for the vector database. A failed write leaves the index
+# marked stale, so it is rebuilt from Milvus instead of silently missing chunks.
+
+def _write_through(collection_name: str, description: str, operation: Callable[[KeywordIndex], Any]):
+    try:
+        index = get_keyword_index(collection_name)
+        if index is None:
+            return
+    except Exception as e:
+        logger.warning(f"⚠️ KEYWORD INDEX: Unavailable for {collection_name}, skipped {description}: {e}")
+        return
+    try:
+        operation(index)
+    except Exception as e:
+        logger.warning(f"⚠️ KEYWORD INDEX: Failed to {description} in {collection_name}, index will be rebuilt: {e}")
+        try:
+            index.mark_stale()
+        except Exception:
+            pass
+
+
+def index_documents(collection_name: str, chunks_data: List[Any]):
+    """Index chunk document-info objects (``.content`` and ``.metadata``) just written to Milvus"""
+    rows = [
+        dict({field: chunk.metadata.get(field) for field in CHUNK_FIELDS}, content=str(chunk.content)[:60000])
+        for chunk in chunks_data
+    ]
+    _write_through(collection_name, f"index {len(rows)} chunks", lambda index: index.index_chunks(rows))
+
+
+def remove_chunks(collection_name: str, chunk_ids: List[str]):
+    _write_through(collection_name, f"remove {len(chunk_ids)} chunks", lambda index: index.delete_chunks(chunk_ids))
+
+
+def remove_document(collection_name: str, document_id: str):
+    _write_through(collection_name, f"remove document {document_id}", lambda index: index.delete_document(document_id))
+
+
+def drop_keyword_index(collection_name: str):
+    """Remove a dropped collection's index file"""
+    with _indexes_lock:
+        index = _indexes.pop(collection_name, None)
+    if index is not None:
+        index.close()
+    path = _index_path(collection_name, get_keyword_index_settings())
+    for suffix in ('', '-wal', '-shm'):
+        try:
+            os.remove(path + suffix)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"⚠️ KEYWORD INDEX: Could not remove {path + suffix}: {e}")
@@ -0,0 +1,165 @@
+# backend/vector_search/model_registry.py
+"""
+Process-wide registry of SentenceTransformer models.
+
+Document ingestion, DocAware search, the workflow evaluator and the public
+chatbot all embed with the same few models. Loading a model is slow and each
+copy holds its weights in memory, so every caller gets its model from here:
+one instance per (model name, device), loaded lazily on first use.
+"""
+
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REGISTRY_SETTINGS = {
+    'DEVICE': 'cpu',
+    'TORCH_NUM_THREADS': 0,  # 0 leaves torch's default
+    'WARMUP_MODELS': [],
+}
+
+_models: Dict[Tuple[str, str], Any] = {}
+_model_info: Dict[Tuple[str, str], Dict[str, Any]] = {}
+_registry_lock = threading.Lock()
+_load_locks: Dict[Tuple[str, str], threading.Lock] = {}
+_torch_threads_configured = False
+
+
+def get_registry_settings() -> Dict[str, Any]:
+    """Merge ``settings.EMBEDDING_MODEL_REGISTRY`` over the defaults"""
+    registry_settings = dict(DEFAULT_REGISTRY_SETTINGS)
+    registry_settings.update(getattr(settings, 'EMBEDDING_MODEL_REGISTRY', {}) or {})
+    return registry_settings
+
+
+def default_model_name() -> str:
+    return getattr(settings, 'VECTOR_EMBEDDING_MODEL', 'all-MiniLM-L6-v2')
+
+
+def configure_torch_threads(num_threads: Optional[int] = None) -> None:
+    """
+    Apply ``torch.set_num_threads`` once per process (or again when a value is
+    passed explicitly). Keeps several worker processes from oversubscribing
+    the CPU with one intra-op thread pool each.
+    """
+    global _torch_threads_configured
+
+    if num_threads is None:
+        if _torch_threads_configured:
+            return
+        num_threads = get_registry_settings()['TORCH_NUM_THREADS']
+    _torch_threads_configured = True
+
+    if not num_threads or num_threads <= 0:
+        return
+    try:
+        import torch
+        torch.set_num_threads(int(num_threads))
+        logger.info(f"🧵 MODEL REGISTRY: torch intra-op threads set to {num_threads}")
+    except ImportError:
+        pass
+
+
+def _load_model(model_name: str, device: str):
+    """Load from the local sentence-transformers cache when present, otherwise download"""
+    from sentence_transformers import SentenceTransformer
+
+    cache_dir = Path.home() / '.cache' / 'torch' / 'sentence_transformers'
+    model_cache_path = cache_dir / model_name.replace('/', '_')
+
+    if model_cache_path.exists() and any(model_cache_path.iterdir()):
+        logger.info(f"Found model in cache. Loading from {model_cache_path}")
+        return SentenceTransformer(str(model_cache_path), device=device)
+
+    logger.info(f"Model not found in cache ({model_cache_path}). Attempting to download.")
+    return SentenceTransformer(model_name, cache_folder=str(cache_dir), device=device)
+
+
+def _memory_footprint_bytes(model) -> int:
+    """Bytes held by the model's parameters and buffers"""
+    try:
+        parameters = sum(p.numel() * p.element_size() for p in model.parameters())
+        buffers = sum(b.numel() * b.element_size() for b in model.buffers())
+        return int(parameters + buffers)
+    except Exception:
+        return 0
+
+
+def get_sentence_transformer(model_name: Optional[str] = None, device: Optional[str] = None):
+    """
+    Shared SentenceTransformer for ``model_name`` on ``device``.
+
+    The first caller loads the model while holding a per-model lock; concurrent
+    callers for the same model wait for that load instead of starting their own.
+    Load errors propagate to the caller and nothing is cached.
+    """
+    model_name = model_name or default_model_name()
+    device = device or get_registry_settings()['DEVICE']
+    key = (model_name, device)
+
+    model = _models.get(key)
+    if model is not None:
+        return model
+
+    with _registry_lock:
+        load_lock = _load_locks.setdefault(key, threading.Lock())
+
+    with load_lock:
+        model = _models.get(key)
+        if model is not None:
+            return model
+
+        configure_torch_threads()
+        logger.info(f"📦 MODEL REGISTRY: Loading {model_name} on {device}")
+        start = time.time()
+        model = _load_model(model_name, device)
+        load_seconds = time.time() - start
+
+        _model_info[key] = {
+            'model_name': model_name,
+            'device': device,
+            'dimension': model.get_sentence_embedding_dimension(),
+            'max_seq_length': getattr(model, 'max_seq_length', None),
+            'memory_bytes': _memory_footprint_bytes(model),
+            'load_seconds': round(load_seconds, 2),
+            'loaded_at': time.time(),
+        }
+        _models[key] = model
+        logger.info(f"✅ MODEL REGISTRY: Loaded {model_name} on {device} in {load_seconds:.1f}s "
+                    f"({_model_info[key]['memory_bytes'] / (1024 * 1024):.0f} MB)")
+        return model
+
+
+def is_loaded(model_name: Optional[str] = None, device: Optional[str] = None) -> bool:
+    model_name = model_name or default_model_name()
+    device = device or get_registry_settings()['DEVICE']
+    return (model_name, device) in _models
+
+
+def get_loaded_models() -> List[Dict[str, Any]]:
+    """Loaded models with their device, dimension and memory footprint"""
+    return [dict(info) for info in _model_info.values()]
+
+
+def warm_up(model_names: Optional[List[str]] = None) -> List[str]:
+    """
+    Load models ahead of the first request (``WARMUP_MODELS`` by default).
+    Returns the names that loaded; failures are logged and skipped.
+    """
+    if model_names is None:
+        model_names = get_registry_settings()['WARMUP_MODELS']
+
+    loaded = []
+    for model_name in model_names:
+        try:
+            get_sentence_transformer(model_name).encode("warm up", convert_to_numpy=True)
+            loaded.append(model_name)
+        except Exception as e:
+            logger.warning(f"⚠️ MODEL REGISTRY: Warm-up failed for {model_name}: {e}")
+    return loaded
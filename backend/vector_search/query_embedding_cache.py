@@ -0,0 +1,196 @@
+# backend/vector_search/query_embedding_cache.py
+"""
+LRU cache for query embeddings.
+
+Searches re-encode the same query strings over and over: retries, group-chat
+delegates searching the same subquery, evaluation datasets with repeated
+prompts. Embeddings are cached per (model, normalised text) in process and,
+when ``SHARED_CACHE_ALIAS`` names a Django cache, in that shared tier so other
+worker processes can reuse them.
+
+Cached embeddings are read-only float32 arrays; callers that need to modify
+one must copy it.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUERY_CACHE_SETTINGS = {
+    'ENABLED': True,
+    'MAX_ENTRIES': 4096,
+    'SHARED_CACHE_ALIAS': '',  # Django cache alias for the cross-process tier; '' disables it
+    'SHARED_CACHE_TTL': 3600,  # seconds
+}
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def get_query_cache_settings() -> Dict[str, Any]:
+    """Merge ``settings.QUERY_EMBEDDING_CACHE`` over the defaults"""
+    cache_settings = dict(DEFAULT_QUERY_CACHE_SETTINGS)
+    cache_settings.update(getattr(settings, 'QUERY_EMBEDDING_CACHE', {}) or {})
+    return cache_settings
+
+
+def normalize_query_text(text: str) -> str:
+    """Unicode-normalise and collapse whitespace; case is kept because cased models embed it"""
+    return _WHITESPACE.sub(' ', unicodedata.normalize('NFKC', text or '')).strip()
+
+
+def _read_only(vector: np.ndarray) -> np.ndarray:
+    vector = np.ascontiguousarray(vector, dtype=np.float32)
+    vector.flags.writeable = False
+    return vector
+
+
+class QueryEmbeddingCache:
+    """Thread-safe in-process LRU of query embeddings with an optional shared tier"""
+
+    def __init__(self, max_entries: int = 4096, shared_cache_alias: str = '', shared_cache_ttl: int = 3600):
+        self.max_entries = max_entries
+        self.shared_cache_alias = shared_cache_alias
+        self.shared_cache_ttl = shared_cache_ttl
+        self._data: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(text: str, model_name: str, normalize: bool = True) -> str:
+        digest = hashlib.sha1(f"{model_name}\x00{int(normalize)}\x00{normalize_query_text(text)}".encode('utf-8'))
+        return f"query_embedding:{digest.hexdigest()}"
+
+    def _shared_cache(self):
+        if not self.shared_cache_alias:
+            return None
+        try:
+            from django.core.cache import caches
+            return caches[self.shared_cache_alias]
+        except Exception as e:
+            logger.warning(f"⚠️ QUERY CACHE: Shared cache '{self.shared_cache_alias}' unavailable, disabling: {e}")
+            self.shared_cache_alias = ''
+            return None
+
+    def _store_local(self, key: str, vector: np.ndarray):
+        with self._lock:
+            self._data[key] = vector
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Cached embedding for a key from the local or shared tier, or None"""
+        with self._lock:
+            vector = self._data.get(key)
+            if vector is not None:
+                self._data.move_to_end(key)
+                self.local_hits += 1
+                return vector
+
+        shared_cache = self._shared_cache()
+        if shared_cache is not None:
+            try:
+                payload = shared_cache.get(key)
+            except Exception as e:
+                logger.debug(f"QUERY CACHE: Shared lookup failed: {e}")
+                payload = None
+            if payload is not None:
+                vector = np.frombuffer(payload, dtype=np.float32)  # read-only view, no copy
+                self._store_local(key, vector)
+                with self._lock:
+                    self.shared_hits += 1
+                return vector
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, vector: np.ndarray) -> np.ndarray:
+        """Store an embedding in both tiers; returns the cached read-only array"""
+        vector = _read_only(vector)
+        self._store_local(key, vector)
+
+        shared_cache = self._shared_cache()
+        if shared_cache is not None:
+            try:
+                shared_cache.set(key, vector.tobytes(), self.shared_cache_ttl)
+            except Exception as e:
+                logger.debug(f"QUERY CACHE: Shared store failed: {e}")
+        return vector
+
+    def get_or_compute(self, text: str, model_name: str, compute: Callable[[str], Any],
+                       normalize: bool = True) -> np.ndarray:
+        """
+        Embedding of ``text`` for ``model_name``, computed from the normalised text
+        on a miss so every text sharing a key shares its embedding. Concurrent
+        misses for the same text may both compute; the results are identical.
+        """
+        key = self.make_key(text, model_name, normalize)
+        vector = self.get(key)
+        if vector is None:
+            vector = self.set(key, compute(normalize_query_text(text)))
+        return vector
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for monitoring"""
+        with self._lock:
+            hits = self.local_hits + self.shared_hits
+            lookups = hits + self.misses
+            return {
+                'size': len(self._data),
+                'max_entries': self.max_entries,
+                'local_hits': self.local_hits,
+                'shared_hits': self.shared_hits,
+                'misses': self.misses,
+                'hit_rate': round(hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+                'shared_cache_alias': self.shared_cache_alias or None,
+            }
+
+
+_query_cache: Optional[QueryEmbeddingCache] = None
+_query_cache_lock = threading.Lock()
+
+
+def get_query_embedding_cache() -> Optional[QueryEmbeddingCache]:
+    """Process-wide query embedding cache, or None when disabled in settings"""
+    global _query_cache
+
+    if _query_cache is None:
+        with _query_cache_lock:
+            if _query_cache is None:
+                cache_settings = get_query_cache_settings()
+                if not cache_settings['ENABLED']:
+                    return None
+                _query_cache = QueryEmbeddingCache(
+                    max_entries=cache_settings['MAX_ENTRIES'],
+                    shared_cache_alias=cache_settings['SHARED_CACHE_ALIAS'],
+                    shared_cache_ttl=cache_settings['SHARED_CACHE_TTL'],
+                )
+    return _query_cache
+
+
+def cached_query_embedding(text: str, model_name: str, compute: Callable[[str], Any],
+                           normalize: bool = True) -> np.ndarray:
+    """``compute(text)`` through the process-wide cache (computed directly when disabled)"""
+    cache = get_query_embedding_cache()
+    if cache is None:
+        return _read_only(compute(text))
+    return cache.get_or_compute(text, model_name, compute, normalize)
@@ -3,17 +3,12 @@ from typing import Dict, Any, List, Optional
 import logging
 from django.conf import settings
 from .embeddings import DocumentEmbedder
-from .enhanced_hierarchical_processor import EnhancedHierarchicalProcessor
+from .enhanced_hierarchical_processor import EnhancedHierarchicalProcessor, compute_source_hash
 from .enhanced_hierarchical_database import EnhancedHierarchicalVectorDatabase
-import threading
-import time
+from . import ingestion
 
 logger = logging.getLogger(__name__)
 
-# Global processing control
-PROCESSING_CONTROL = {}
-PROCESSING_THREADS = {}
-
 class EnhancedProjectVectorSearchService:
     """Enhanced service for managing vector search operations with stop capability"""
     
@@ -34,41 +29,45 @@ class EnhancedProjectVectorSearchService:
         # Pass project as first argument, embedder as keyword argument
         self.processor = EnhancedHierarchicalProcessor(self.project, embedder=self.embedder)
         self.vector_db = EnhancedHierarchicalVectorDatabase(project_id)
-        self.stop_processing = False
-        self.processing_thread = None
+        self.stop_requested = False
         self.current_document_id = None
-        
-        # Initialize processing control for this project
-        if project_id not in PROCESSING_CONTROL:
-            PROCESSING_CONTROL[project_id] = {
-                'stop_requested': False,
-                'current_document_id': None,
-                'status': 'IDLE'
-            }
+        # Durable run (VectorProcessingRun) this service is processing for; stop flags live there
+        self.run_id = None
     
     def process_and_vectorize_documents(self) -> Dict[str, Any]:
-        """Process only new/unprocessed documents in a project with stop capability"""
-        from users.models import DocumentVectorStatus, ProjectVectorCollection, VectorProcessingStatus, ProjectDocument
+        """
+        Process only new/changed documents in a project with stop capability.
+
+        Runs as a durable VectorProcessingRun: documents are processed in batches by
+        worker processes (see ingestion.py) and a crashed run resumes from the last
+        completed document.
+        """
+        from users.models import ProjectVectorCollection, VectorProcessingStatus, ProjectDocument, VectorProcessingRunStatus
         from django.utils import timezone
         
+        run, active_run = ingestion.start_run(self.project)
+        if run is None:
+            logger.warning(f"Processing already in progress for project {self.project_id} (run {active_run.run_id})")
+            return {
+                "project_id": self.project_id,
+                "processed_documents": 0,
+                "failed_documents": 0,
+                "skipped_documents": 0,
+                "stopped_documents": 0,
+                "was_stopped": False,
+                "status": "error",
+                "error": f"Processing already in progress (run {active_run.run_id})"
+            }
+        
         try:
             # Reset stop flag
-            self.stop_processing = False
+            self.stop_requested = False
             self.current_document_id = None
-            
-            # Store processing state globally
-            PROCESSING_CONTROL[self.project_id] = {
-                'stop_requested': False,
-                'current_document_id': None,
-                'status': 'PROCESSING'
-            }
+            self.run_id = run.run_id
             
             logger.info(f"Starting document processing and vectorization for project {self.project_id}")
             
-            # Get or create project vector collection
-            from users.models import IntelliDocProject
-            project = IntelliDocProject.objects.get(project_id=self.project_id)
-            
+            project = self.project
             collection, created = ProjectVectorCollection.objects.get_or_create(
                 project=project,
                 defaults={
@@ -81,137 +80,24 @@ class EnhancedProjectVectorSearchService:
             collection.status = VectorProcessingStatus.PROCESSING
             collection.save()
             
-            processed_count = 0
-            failed_count = 0
-            skipped_count = 0
-            stopped_count = 0
-            results = []
-            
-            # Process each document in the project using enhanced hierarchical processor
-            documents = project.documents.filter(upload_status='ready')
-            for doc_info in self.processor.process_project_documents_enhanced(list(documents)):
-                # Check if stop was requested
-                if self._should_stop_processing():
-                    logger.info(f"Processing stopped for project {self.project_id}")
-                    stopped_count += 1
-                    break
-                
-                document_id = doc_info.document_metadata['document_id']
-                file_name = doc_info.document_metadata['file_name']
-                
-                # Update current document being processed
-                self.current_document_id = document_id
-                PROCESSING_CONTROL[self.project_id]['current_document_id'] = document_id
-                
-                try:
-                    # Get the document
-                    document = ProjectDocument.objects.get(document_id=document_id)
-                    
-                    # Get or create document vector status
-                    doc_vector_status, created = DocumentVectorStatus.objects.get_or_create(
-                    document=document,
-                    collection=collection,
-                    defaults={
-                    'status': VectorProcessingStatus.PROCESSING,
-                    'content_length': doc_info.document_metadata['original_content_length']
-                    }
-                    )
-                    
-                    # Update status to processing
-                    doc_vector_status.status = VectorProcessingStatus.PROCESSING
-                    doc_vector_status.content_length = doc_info.document_metadata['original_content_length']
-                    doc_vector_status.save()
-                    
-                    # Check again before processing
-                    if self._should_stop_processing():
-                        logger.info(f"Processing stopped during document {file_name}")
-                        # Clean up this document's partial processing
-                        self._cleanup_partial_document(document_id)
-                        doc_vector_status.status = VectorProcessingStatus.PENDING
-                        doc_vector_status.save()
-                        stopped_count += 1
-                        break
-                    
-                    # Record processing start time
-                    start_time = timezone.now()
-                    
-                    # Insert into enhanced hierarchical vector database
-                    success = self.vector_db.insert_hierarchical_document(doc_info)
-                    
-                    # Check if stopped during insertion
-                    if self._should_stop_processing():
-                        logger.info(f"Processing stopped during insertion for document {file_name}")
-                        # Clean up this document's partial processing
-                        self._cleanup_partial_document(document_id)
-                        doc_vector_status.status = VectorProcessingStatus.PENDING
-                        doc_vector_status.save()
-                        stopped_count += 1
-                        break
-                    
-                    # Calculate processing time
-                    processing_time = (timezone.now() - start_time).total_seconds() * 1000  # in milliseconds
-                    
-                    if success:
-                        # Update document status to completed
-                        doc_vector_status.status = VectorProcessingStatus.COMPLETED
-                        doc_vector_status.processed_at = timezone.now()
-                        doc_vector_status.processing_time_ms = int(processing_time)
-                        doc_vector_status.error_message = ''
-                        doc_vector_status.save()
-                        
-                        processed_count += 1
-                        results.append({
-                        "document_id": document_id,
-                        "file_name": file_name,
-                        "content_length": doc_info.document_metadata['original_content_length'],
-                        "processing_time_ms": int(processing_time),
-                        "status": "success"
-                        })
-                        logger.info(f"Successfully processed: {file_name}")
-                    else:
-                        # Update document status to failed
-                        doc_vector_status.status = VectorProcessingStatus.FAILED
-                        doc_vector_status.error_message = 'Database insertion failed'
-                        doc_vector_status.processing_time_ms = int(processing_time)
-                        doc_vector_status.save()
-                        
-                        failed_count += 1
-                        results.append({
-                            "document_id": document_id,
-                            "file_name": file_name,
-                            "status": "failed",
-                            "error": "Database insertion failed"
-                        })
-                        
-                except Exception as e:
-                    failed_count += 1
-                    error_msg = str(e)
-                    logger.error(f"Failed to process document {file_name}: {error_msg}")
-                    
-                    # Update document status to failed if we can
-                    try:
-                        document = ProjectDocument.objects.get(document_id=document_id)
-                        doc_vector_status, created = DocumentVectorStatus.objects.get_or_create(
-                            document=document,
-                            collection=collection,
-                            defaults={'status': VectorProcessingStatus.FAILED}
-                        )
-                        doc_vector_status.status = VectorProcessingStatus.FAILED
-                        doc_vector_status.error_message = error_msg
-                        doc_vector_status.save()
-                    except:
-                        pass
-                    
-                    results.append({
-                        "document_id": document_id,
-                        "file_name": file_name,
-                        "status": "failed",
-                        "error": error_msg
-                    })
-                
-                # Clear current document
-                self.current_document_id = None
-                PROCESSING_CONTROL[self.project_id]['current_document_id'] = None
+            # Only documents whose source bytes changed since they were last vectorized are processed
+            documents = list(project.documents.filter(upload_status='ready'))
+            changed_documents, source_hashes = self._select_changed_documents(documents, collection)
+            unchanged_count = len(documents) - len(changed_documents)
+            logger.info(f"♻️ INCREMENTAL: {len(changed_documents)} new/changed documents, {unchanged_count} unchanged (skipped)")
+            ingestion.update_run(run.run_id, total_documents=len(changed_documents), unchanged_documents=unchanged_count)
+            
+            # Hand documents to the ingestion workers in batches
+            per_task = max(1, ingestion.get_ingestion_settings()['DOCUMENTS_PER_TASK'])
+            document_ids = [str(document.document_id) for document in changed_documents]
+            batches = [document_ids[i:i + per_task] for i in range(0, len(document_ids), per_task)]
+            results = ingestion.execute_batches(self, run.run_id, batches, source_hashes)
+            
+            processed_count = sum(1 for result in results if result['status'] == 'success')
+            failed_count = sum(1 for result in results if result['status'] == 'failed')
+            stopped_count = sum(1 for result in results if result['status'] == 'stopped')
+            reused_chunks = sum(result.get('reused_chunks', 0) for result in results)
+            indexed_chunks = sum(result.get('inserted_chunks', 0) for result in results)
             
             # Update collection statistics
             collection.total_documents = collection.document_statuses.count()
@@ -248,15 +134,22 @@ class EnhancedProjectVectorSearchService:
             total_docs = ProjectDocument.objects.filter(project=project).count()
             skipped_count = total_docs - (processed_count + failed_count + stopped_count)
             
-            # Clean up processing control
-            PROCESSING_CONTROL[self.project_id]['status'] = 'COMPLETED' if not was_stopped else 'STOPPED'
+            ingestion.finish_run(
+                run.run_id,
+                VectorProcessingRunStatus.STOPPED if was_stopped else VectorProcessingRunStatus.COMPLETED
+            )
             
             summary = {
                 "project_id": self.project_id,
+                "run_id": str(run.run_id),
+                "resumed_from": str(run.resumed_from.run_id) if run.resumed_from else None,
                 "processed_documents": processed_count,
                 "failed_documents": failed_count,
                 "skipped_documents": skipped_count,
                 "stopped_documents": stopped_count,
+                "unchanged_documents": unchanged_count,
+                "reused_chunks": reused_chunks,
+                "inserted_chunks": indexed_chunks,
                 "total_documents_in_project": total_docs,
                 "total_in_collection": collection_stats.get("total_documents", 0),
                 "was_stopped": was_stopped,
@@ -265,8 +158,9 @@ class EnhancedProjectVectorSearchService:
             }
             
             logger.info(f"Processing completed for project {self.project_id}: "
-                       f"{processed_count} processed, {failed_count} failed, {skipped_count} skipped, "
-                       f"{stopped_count} stopped")
+                       f"{processed_count} processed, {failed_count} failed, {skipped_count} skipped "
+                       f"({unchanged_count} unchanged), {stopped_count} stopped; "
+                       f"{indexed_chunks} chunks indexed, {reused_chunks} reused")
             
             return summary
             
@@ -276,21 +170,18 @@ class EnhancedProjectVectorSearchService:
             
             # Update collection status to failed if possible
             try:
-                from users.models import IntelliDocProject
-                project = IntelliDocProject.objects.get(project_id=self.project_id)
-                collection = ProjectVectorCollection.objects.get(project=project)
+                collection = ProjectVectorCollection.objects.get(project=self.project)
                 collection.status = VectorProcessingStatus.FAILED
                 collection.error_message = error_msg
                 collection.save()
             except:
                 pass
             
-            # Clean up processing control
-            if self.project_id in PROCESSING_CONTROL:
-                PROCESSING_CONTROL[self.project_id]['status'] = 'FAILED'
+            ingestion.finish_run(run.run_id, VectorProcessingRunStatus.FAILED, error_msg)
             
             return {
                 "project_id": self.project_id,
+                "run_id": str(run.run_id),
                 "processed_documents": 0,
                 "failed_documents": 0,
                 "skipped_documents": 0,
@@ -300,16 +191,312 @@ class EnhancedProjectVectorSearchService:
                 "error": error_msg
             }
     
+    def process_document_batch(self, document_ids: List[str], source_hashes: Dict[str, str]) -> List[Dict[str, Any]]:
+        """
+        Run extract -> chunk -> summarise -> embed -> insert for a batch of documents.
+
+        Called in an ingestion worker process (or inline). Progress is written to
+        DocumentVectorStatus and the run row as each document finishes, so it
+        survives a crash of the coordinating process.
+        """
+        from users.models import DocumentVectorStatus, ProjectVectorCollection, VectorProcessingStatus, ProjectDocument
+        from django.utils import timezone
+        
+        collection = ProjectVectorCollection.objects.get(project=self.project)
+        documents = list(ProjectDocument.objects.filter(project=self.project, document_id__in=document_ids))
+        
+        # Register previously indexed chunks so unchanged ones are not re-embedded or re-summarised
+        previous_chunks = {}
+        statuses = {
+            status.document_id: status
+            for status in DocumentVectorStatus.objects.filter(collection=collection, document__in=documents)
+        }
+        for document in documents:
+            if document.id in statuses:
+                previous_chunks[str(document.document_id)] = self._prepare_reusable_chunks(document)
+        
+        results = []
+        seen_document_ids = set()
+        for doc_info in self.processor.process_project_documents_enhanced(documents):
+            document_id = doc_info.document_metadata['document_id']
+            file_name = doc_info.document_metadata['file_name']
+            seen_document_ids.add(document_id)
+            
+            # Check if stop was requested
+            if self._should_stop_processing():
+                logger.info(f"Processing stopped for project {self.project_id}")
+                results.append({"document_id": document_id, "file_name": file_name, "status": "stopped"})
+                break
+            
+            # Update current document being processed
+            self.current_document_id = document_id
+            
+            try:
+                # Get the document
+                document = ProjectDocument.objects.get(document_id=document_id)
+                
+                # Get or create document vector status
+                doc_vector_status, created = DocumentVectorStatus.objects.get_or_create(
+                document=document,
+                collection=collection,
+                defaults={
+                'status': VectorProcessingStatus.PROCESSING,
+                'content_length': doc_info.document_metadata['original_content_length']
+                }
+                )
+                
+                # Update status to processing
+                doc_vector_status.status = VectorProcessingStatus.PROCESSING
+                doc_vector_status.content_length = doc_info.document_metadata['original_content_length']
+                doc_vector_status.save()
+                
+                # Record processing start time
+                start_time = timezone.now()
+                
+                # Insert new/changed chunks and drop stale vectors from the previous version
+                success, chunk_stats = self._index_document_chunks(doc_info, previous_chunks.get(document_id))
+                
+                # Check if stopped during insertion
+                if self._should_stop_processing():
+                    logger.info(f"Processing stopped during insertion for document {file_name}")
+                    # Clean up this document's partial processing
+                    self._cleanup_partial_document(document_id)
+                    doc_vector_status.status = VectorProcessingStatus.PENDING
+                    doc_vector_status.source_hash = ''
+                    doc_vector_status.save()
+                    results.append({"document_id": document_id, "file_name": file_name, "status": "stopped"})
+                    break
+                
+                # Calculate processing time
+                processing_time = (timezone.now() - start_time).total_seconds() * 1000  # in milliseconds
+                
+                if success:
+                    # Update document status to completed
+                    doc_vector_status.status = VectorProcessingStatus.COMPLETED
+                    doc_vector_status.processed_at = timezone.now()
+                    doc_vector_status.processing_time_ms = int(processing_time)
+                    doc_vector_status.error_message = ''
+                    doc_vector_status.source_hash = source_hashes.get(document_id, '')
+                    doc_vector_status.save()
+                    self._sync_chunk_records(document, doc_vector_status, doc_info)
+                    
+                    results.append({
+                    "document_id": document_id,
+                    "file_name": file_name,
+                    "content_length": doc_info.document_metadata['original_content_length'],
+                    "processing_time_ms": int(processing_time),
+                    "reused_chunks": chunk_stats['reused'],
+                    "inserted_chunks": chunk_stats['inserted'],
+                    "deleted_chunks": chunk_stats['deleted'],
+                    "status": "success"
+                    })
+                    logger.info(f"Successfully processed: {file_name}")
+                else:
+                    # Update document status to failed
+                    doc_vector_status.status = VectorProcessingStatus.FAILED
+                    doc_vector_status.error_message = 'Database insertion failed'
+                    doc_vector_status.processing_time_ms = int(processing_time)
+                    doc_vector_status.save()
+                    
+                    results.append({
+                        "document_id": document_id,
+                        "file_name": file_name,
+                        "status": "failed",
+                        "error": "Database insertion failed"
+                    })
+                    
+            except Exception as e:
+                error_msg = str(e)
+                logger.error(f"Failed to process document {file_name}: {error_msg}")
+                
+                # Update document status to failed if we can
+                try:
+                    document = ProjectDocument.objects.get(document_id=document_id)
+                    doc_vector_status, created = DocumentVectorStatus.objects.get_or_create(
+                        document=document,
+                        collection=collection,
+                        defaults={'status': VectorProcessingStatus.FAILED}
+                    )
+                    doc_vector_status.status = VectorProcessingStatus.FAILED
+                    doc_vector_status.error_message = error_msg
+                    doc_vector_status.save()
+                except:
+                    pass
+                
+                results.append({
+                    "document_id": document_id,
+                    "file_name": file_name,
+                    "status": "failed",
+                    "error": error_msg
+                })
+            
+            # Durable per-document progress
+            if self.run_id:
+                ingestion.record_document_result(self.run_id, results[-1]['status'] == 'success')
+            
+            # Clear current document
+            self.current_document_id = None
+        
+        # Documents the processor dropped (extraction or chunking failed)
+        if not self._should_stop_processing():
+            for document in documents:
+                document_id = str(document.document_id)
+                if document_id in seen_document_ids:
+                    continue
+                DocumentVectorStatus.objects.update_or_create(
+                    document=document,
+                    collection=collection,
+                    defaults={'status': VectorProcessingStatus.FAILED,
+                              'error_message': 'Content extraction or chunking failed'}
+                )
+                results.append({
+                    "document_id": document_id,
+                    "file_name": document.original_filename,
+                    "status": "failed",
+                    "error": "Content extraction or chunking failed"
+                })
+                if self.run_id:
+                    ingestion.record_document_result(self.run_id, False)
+        
+        return results
+    
+    def _select_changed_documents(self, documents: List[Any], collection) -> tuple:
+        """
+        Split ready documents by source hash.
+
+        Returns (changed documents, {document_id: source hash}). A document is
+        unchanged when it was vectorized successfully from identical bytes.
+        """
+        from users.models import DocumentVectorStatus, VectorProcessingStatus
+        
+        statuses = {
+            status.document_id: status
+            for status in DocumentVectorStatus.objects.filter(collection=collection, document__in=documents)
+        }
+        
+        changed_documents = []
+        source_hashes = {}
+        for document in documents:
+            document_id = str(document.document_id)
+            try:
+                source_hash = compute_source_hash(document)
+            except OSError as e:
+                logger.warning(f"⚠️ INCREMENTAL: Could not hash {document.original_filename}, reprocessing: {e}")
+                source_hash = ''
+            source_hashes[document_id] = source_hash
+            
+            status = statuses.get(document.id)
+            if (status and source_hash and status.source_hash == source_hash and
+                    status.status == VectorProcessingStatus.COMPLETED):
+                continue
+            changed_documents.append(document)
+        
+        return changed_documents, source_hashes
+    
+    def _prepare_reusable_chunks(self, document) -> List[Dict[str, Any]]:
+        """
+        Register a previously vectorized document's indexed chunks with the processor.
+        Returns them (empty when there is no usable chunk index; old vectors are then
+        replaced wholesale).
+        """
+        from users.models import DocumentChunk
+        
+        document_id = str(document.document_id)
+        chunk_hashes = dict(
+            DocumentChunk.objects.filter(document=document).exclude(content_hash='')
+            .values_list('chunk_id', 'content_hash')
+        )
+        if not chunk_hashes:
+            return []
+        indexed = self.vector_db.get_indexed_chunks(document_id)
+        previous = [
+            {**indexed[chunk_id], 'content_hash': content_hash}
+            for chunk_id, content_hash in chunk_hashes.items() if chunk_id in indexed
+        ]
+        self.processor.set_reusable_chunks(document_id, previous)
+        return previous
+    
+    def _index_document_chunks(self, doc_info, previous_chunks: Optional[List[Dict[str, Any]]]) -> tuple:
+        """
+        Write a (re)processed document to the vector database incrementally.
+
+        Chunks reused at the same position are left untouched; new, changed and moved
+        chunks are inserted after their old vectors (and those of removed chunks) are
+        deleted. previous_chunks is None for documents never vectorized before.
+        Returns (success, stats).
+        """
+        previous_by_id = {chunk['chunk_id']: chunk for chunk in previous_chunks or []}
+        
+        unchanged_ids = set()
+        for chunk in doc_info.chunks:
+            previous = previous_by_id.get(chunk.chunk_id)
+            if (previous and previous.get('chunk_index') == chunk.chunk_index and
+                    previous.get('total_chunks') == chunk.total_chunks):
+                unchanged_ids.add(chunk.chunk_id)
+        
+        to_insert = [chunk for chunk in doc_info.chunks if chunk.chunk_id not in unchanged_ids]
+        # Previous vectors of chunks that are re-inserted or no longer exist
+        stale_ids = [chunk_id for chunk_id in previous_by_id if chunk_id not in unchanged_ids]
+        if previous_chunks == []:
+            # No usable chunk index for this document: replace whatever is stored
+            self.vector_db.delete_document_and_chunks(doc_info.document_metadata['document_id'])
+        elif stale_ids and not self.vector_db.delete_chunks(stale_ids):
+            return False, {'reused': 0, 'inserted': 0, 'deleted': 0}
+        
+        success = self.vector_db.insert_hierarchical_document(doc_info, chunks=to_insert)
+        reused = sum(1 for chunk in doc_info.chunks if chunk.chunk_id in previous_by_id)
+        logger.info(f"♻️ INCREMENTAL: {doc_info.document_metadata['file_name']}: {len(unchanged_ids)} unchanged, "
+                    f"{len(to_insert)} inserted ({reused} reused embeddings), {len(stale_ids)} stale deleted")
+        return success, {'reused': reused, 'inserted': len(to_insert), 'deleted': len(stale_ids)}
+    
+    def _sync_chunk_records(self, document, doc_vector_status, doc_info) -> None:
+        """Replace the document's DocumentChunk rows with the chunks just indexed"""
+        from django.db import transaction
+        from django.utils import timezone
+        from users.models import DocumentChunk
+        
+        now = timezone.now()
+        records = []
+        for chunk in doc_info.chunks:
+            summary = chunk.metadata.get('summary', '')
+            topic = chunk.metadata.get('topic', '')
+            records.append(DocumentChunk(
+                chunk_id=chunk.chunk_id,
+                chunk_index=chunk.chunk_index,
+                chunk_type=chunk.chunk_type[:50],
+                section_title=chunk.section_title[:500],
+                content_length=len(chunk.content),
+                content_hash=chunk.content_hash,
+                has_embedding=chunk.embedding is not None,
+                has_summary=bool(summary),
+                summary_word_count=len(summary.split()),
+                summary_generated_at=now if summary else None,
+                summarizer_used='default_summarizer' if summary else 'none',
+                has_topic=bool(topic),
+                topic_word_count=len(topic.split()),
+                topic_generated_at=now if topic else None,
+                topic_generator_used='default_topic_generator' if topic else 'none',
+                document=document,
+                vector_status=doc_vector_status
+            ))
+        
+        with transaction.atomic():
+            DocumentChunk.objects.filter(document=document).delete()
+            DocumentChunk.objects.bulk_create(records)
+    
     def _should_stop_processing(self) -> bool:
-        """Check if processing should be stopped"""
-        return (self.stop_processing or 
-                PROCESSING_CONTROL.get(self.project_id, {}).get('stop_requested', False))
+        """Check if processing should be stopped (stop flags are shared through the run row)"""
+        if self.stop_requested:
+            return True
+        if self.run_id and ingestion.is_stop_requested(self.run_id):
+            self.stop_requested = True
+        return self.stop_requested
     
     def _cleanup_partial_document(self, document_id: str) -> None:
         """Clean up partial processing for a document"""
         try:
             # Delete from vector database
-            success = self.vector_db.delete_document(document_id)
+            success = self.vector_db.delete_document_and_chunks(document_id)
             if success:
                 logger.info(f"Cleaned up partial processing for document {document_id}")
             else:
@@ -322,22 +509,17 @@ class EnhancedProjectVectorSearchService:
         try:
             logger.info(f"Stop requested for project {self.project_id}")
             
-            # Set stop flags
-            self.stop_processing = True
-            if self.project_id in PROCESSING_CONTROL:
-                PROCESSING_CONTROL[self.project_id]['stop_requested'] = True
-            
-            # Clean up current document if any
-            if self.current_document_id:
-                self._cleanup_partial_document(self.current_document_id)
+            # Set stop flags; workers of a running run observe them and clean up their own documents
+            self.stop_requested = True
+            if ingestion.request_stop(self.project_id):
+                logger.info(f"Stop flag set on active ingestion run for project {self.project_id}")
+                return True
             
-            # Update all PROCESSING documents to PENDING
+            # No live run: reset documents a crashed run left in PROCESSING
             from users.models import ProjectVectorCollection, DocumentVectorStatus, VectorProcessingStatus
-            from users.models import IntelliDocProject
             
-            project = IntelliDocProject.objects.get(project_id=self.project_id)
             try:
-                collection = ProjectVectorCollection.objects.get(project=project)
+                collection = ProjectVectorCollection.objects.get(project=self.project)
                 
                 # Reset processing documents to pending
                 processing_docs = DocumentVectorStatus.objects.filter(
@@ -351,6 +533,7 @@ class EnhancedProjectVectorSearchService:
                     # Reset status
                     doc_status.status = VectorProcessingStatus.PENDING
                     doc_status.processed_at = None
+                    doc_status.source_hash = ''
                     doc_status.error_message = 'Processing stopped by user'
                     doc_status.save()
                 
@@ -433,6 +616,29 @@ class EnhancedProjectVectorSearchService:
             logger.error(f"Error getting document statuses for project {self.project_id}: {e}")
             return []
     
+    def _get_run_control_status(self) -> Dict[str, Any]:
+        """Processing control status of the project's active ingestion run"""
+        run = ingestion.get_active_run(self.project_id)
+        if run is None:
+            return {}
+        is_live = not ingestion._is_stale(run)
+        return {
+            'status': 'PROCESSING' if is_live else 'INTERRUPTED',
+            'current_document_id': run.current_document_ids[0] if run.current_document_ids else None,
+            'stop_requested': run.stop_requested,
+            'run': {
+                'run_id': str(run.run_id),
+                'worker_count': run.worker_count,
+                'total_documents': run.total_documents,
+                'completed_documents': run.completed_documents,
+                'failed_documents': run.failed_documents,
+                'unchanged_documents': run.unchanged_documents,
+                'current_document_ids': run.current_document_ids,
+                'resumed_from': str(run.resumed_from_id) if run.resumed_from_id else None,
+                'heartbeat_at': run.heartbeat_at.isoformat() if run.heartbeat_at else None,
+            }
+        }
+    
     def get_processing_status(self) -> Dict[str, Any]:
         """Get detailed processing status for the project"""
         from users.models import ProjectVectorCollection, DocumentVectorStatus, VectorProcessingStatus, ProjectDocument
@@ -447,8 +653,8 @@ class EnhancedProjectVectorSearchService:
             total_documents = ProjectDocument.objects.filter(project=project).count()
             logger.debug(f"📊 STATUS: Total documents in project: {total_documents}")
             
-            # Get current processing control status
-            control_status = PROCESSING_CONTROL.get(self.project_id, {})
+            # Get current processing control status from the durable run
+            control_status = self._get_run_control_status()
             logger.debug(f"📊 STATUS: Processing control status: {control_status}")
             
             try:
@@ -490,6 +696,7 @@ class EnhancedProjectVectorSearchService:
                     'is_processing': control_status.get('status') == 'PROCESSING',
                     'current_document_id': control_status.get('current_document_id'),
                     'stop_requested': control_status.get('stop_requested', False),
+                    'run': control_status.get('run'),
                     'processing_progress': {
                         'completed': status_counts['completed'],
                         'total': total_documents,
@@ -516,6 +723,7 @@ class EnhancedProjectVectorSearchService:
                     'is_processing': control_status.get('status') == 'PROCESSING',
                     'current_document_id': control_status.get('current_document_id'),
                     'stop_requested': control_status.get('stop_requested', False),
+                    'run': control_status.get('run'),
                     'processing_progress': {
                         'completed': 0,
                         'total': total_documents,
@@ -6,8 +6,12 @@ Ensures singleton embedder and Gemini extractor are created once during applicat
 
 import logging
 import os
+import sys
+import threading
 from django.conf import settings
 from .embeddings import get_embedder_instance
+from .model_registry import get_loaded_models, warm_up
+from .query_embedding_cache import get_query_embedding_cache
 from .modern_gemini_extractor import initialize_gemini_extractor
 
 logger = logging.getLogger(__name__)
@@ -20,6 +24,12 @@ def initialize_vector_search():
         # Create singleton embedder instance
         embedder = get_embedder_instance()
         
+        # Load any additional shared models configured for warm-up
+        warm_up()
+        for info in get_loaded_models():
+            logger.info(f"📦 Shared model {info['model_name']} on {info['device']}: "
+                        f"{info['memory_bytes'] / (1024 * 1024):.0f} MB")
+        
         # Initialize Gemini PDF extractor if API key is available
         try:
             gemini_api_key = os.getenv('GOOGLE_API_KEY')
@@ -51,6 +61,33 @@ def initialize_vector_search():
         logger.warning("🔄 Will use fallback mode during processing")
         return False
 
+def schedule_ingestion_resume(delay: float = 5.0):
+    """
+    Resume document ingestion runs that were interrupted by a crash or restart.
+    Runs shortly after startup (outside AppConfig.ready, which must not query the
+    database) and never inside ingestion worker processes or management commands.
+    """
+    from .ingestion import get_ingestion_settings, resume_interrupted_runs
+    
+    if not get_ingestion_settings()['RESUME_ON_STARTUP']:
+        return
+    if os.environ.get('VECTOR_INGESTION_WORKER'):
+        return
+    if len(sys.argv) > 1 and sys.argv[0].endswith('manage.py') and sys.argv[1] != 'runserver':
+        return
+    
+    def _resume():
+        try:
+            project_ids = resume_interrupted_runs()
+            if project_ids:
+                logger.info(f"🔁 INGESTION: Resumed interrupted runs for {len(project_ids)} projects")
+        except Exception as e:
+            logger.warning(f"⚠️ INGESTION: Could not resume interrupted runs: {e}")
+    
+    timer = threading.Timer(delay, _resume)
+    timer.daemon = True
+    timer.start()
+
 def check_system_health():
     """Check system health for vector search components"""
     try:
@@ -60,9 +97,14 @@ def check_system_health():
             "embedder_available": embedder is not None,
             "model_loaded": embedder.model is not None if embedder else False,
             "vector_dimension": embedder.vector_dim if embedder else 0,
-            "status": "healthy" if (embedder and embedder.model) else "degraded"
+            "status": "healthy" if (embedder and embedder.model) else "degraded",
+            "loaded_models": get_loaded_models()
         }
         
+        query_cache = get_query_embedding_cache()
+        if query_cache is not None:
+            health_status["query_embedding_cache"] = query_cache.get_stats()
+        
         return health_status
         
     except Exception as e:
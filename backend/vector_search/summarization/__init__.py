@@ -4,6 +4,7 @@
 import logging
 from typing import Optional
 from .openai_summarizer import OpenAISummarizer
+from .pipeline import ChunkSummarizationPipeline, SummarizationRequest
 
 logger = logging.getLogger(__name__)
 
@@ -30,4 +31,5 @@ def initialize_summarizer() -> bool:
         return False
 
 # Export for easy importing
-__all__ = ['get_summarizer', 'initialize_summarizer', 'OpenAISummarizer']
+__all__ = ['get_summarizer', 'initialize_summarizer', 'OpenAISummarizer',
+           'ChunkSummarizationPipeline', 'SummarizationRequest']
@@ -2,9 +2,10 @@
 # backend/vector_search/summarization/openai_summarizer.py
 
 import os
+import json
 import openai
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from django.conf import settings
 
 logger = logging.getLogger(__name__)
@@ -188,7 +189,71 @@ class OpenAISummarizer:
         except Exception as e:
             logger.error(f"Failed to generate topic using OpenAI: {e}")
             return None
-    
+
+    def generate_summary_and_topic(self, content: str, document_metadata: Dict[str, Any] = None) -> Optional[Tuple[Optional[str], Optional[str]]]:
+        """Generate summary and topic with a single API call (returns None if neither was produced)"""
+        if not self.client or not content.strip():
+            return None
+
+        try:
+            # Truncate content if too long
+            if len(content) > self.max_input_length:
+                content = content[:self.max_input_length] + "..."
+
+            # Reuse the summary prompt's context and ask for both fields as JSON
+            prompt = self._build_summarization_prompt(content, document_metadata).rsplit("SUMMARY:", 1)[0]
+            prompt += (
+                "Also create a topic name for the content (maximum 8 words, title case, no quotation marks).\n\n"
+                'Respond with JSON only: {"summary": "...", "topic": "..."}'
+            )
+            messages = [
+                {
+                    "role": "system",
+                    "content": "You are a professional document summarizer. Create concise, informative summaries and clear, specific topic titles."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ]
+
+            if hasattr(self.client, 'chat') and hasattr(self.client.chat, 'completions'):
+                # New client syntax
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    max_tokens=self.max_tokens + 30,
+                    temperature=self.temperature
+                )
+            else:
+                # Legacy client syntax
+                response = self.client.ChatCompletion.create(
+                    model=self.model,
+                    messages=messages,
+                    max_tokens=self.max_tokens + 30,
+                    temperature=self.temperature
+                )
+
+            raw = response.choices[0].message.content.strip()
+            # Tolerate code fences around the JSON object
+            parsed = json.loads(raw[raw.find('{'):raw.rfind('}') + 1])
+
+            summary = (parsed.get('summary') or '').strip() or None
+            if summary and not self._validate_summary(summary):
+                summary = self._enforce_summary_constraints(summary)
+            topic = self._clean_and_validate_topic((parsed.get('topic') or '').strip())
+
+            if not summary and not topic:
+                logger.warning("No valid summary or topic in combined OpenAI response")
+                return None
+
+            logger.info(f"Summary and topic generated in one call: '{topic}'")
+            return summary, topic
+
+        except Exception as e:
+            logger.error(f"Failed to generate summary and topic using OpenAI: {e}")
+            return None
+
     def _build_summarization_prompt(self, content: str, metadata: Dict[str, Any] = None) -> str:
         """Build a context-aware prompt for summarization"""
         
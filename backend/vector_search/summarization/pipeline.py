@@ -0,0 +1,204 @@
+# Concurrent Chunk Summarization Pipeline
+# backend/vector_search/summarization/pipeline.py
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PIPELINE_SETTINGS = {
+    'MAX_CONCURRENCY': 8,          # Chunks with AI calls in flight at once
+    'REQUESTS_PER_MINUTE': 300,    # Per-project request budget
+    'TOKENS_PER_MINUTE': 150000,   # Per-project token budget (prompt + completion estimate)
+    'MAX_RETRIES': 3,              # Extra attempts after a failed call
+    'RETRY_BASE_DELAY': 1.0,       # Seconds; doubled per attempt with full jitter
+    'COMBINED_CALL': False,        # One call returning summary and topic together
+}
+
+# Rough characters-per-token ratio used for budget estimates
+CHARS_PER_TOKEN = 4
+
+
+def get_pipeline_settings() -> Dict[str, Any]:
+    """Merge ``settings.CHUNK_SUMMARIZATION`` over the defaults"""
+    pipeline_settings = dict(DEFAULT_PIPELINE_SETTINGS)
+    pipeline_settings.update(getattr(settings, 'CHUNK_SUMMARIZATION', {}) or {})
+    return pipeline_settings
+
+
+class ProjectRateLimiter:
+    """
+    Token-bucket limiter for one project's summarization requests and tokens.
+
+    Shared by every pipeline run of the project in this process (runs may live
+    on different threads and event loops), so state is guarded by a thread lock
+    and waiting happens with ``asyncio.sleep`` outside of it.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._request_allowance = float(requests_per_minute)
+        self._token_allowance = float(tokens_per_minute)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill_locked(self):
+        now = time.monotonic()
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        self._request_allowance = min(self.requests_per_minute,
+                                      self._request_allowance + elapsed * self.requests_per_minute / 60)
+        self._token_allowance = min(self.tokens_per_minute,
+                                    self._token_allowance + elapsed * self.tokens_per_minute / 60)
+
+    def _try_acquire(self, tokens: int) -> float:
+        """Take one request and ``tokens`` from the buckets, or return seconds to wait"""
+        # A single call larger than the whole budget is allowed once the bucket is full
+        tokens = min(tokens, self.tokens_per_minute)
+        with self._lock:
+            self._refill_locked()
+            if self._request_allowance >= 1 and self._token_allowance >= tokens:
+                self._request_allowance -= 1
+                self._token_allowance -= tokens
+                return 0.0
+            request_wait = max(0.0, 1 - self._request_allowance) * 60 / self.requests_per_minute
+            token_wait = max(0.0, tokens - self._token_allowance) * 60 / self.tokens_per_minute
+            return max(request_wait, token_wait)
+
+    async def acquire(self, tokens: int) -> float:
+        """Wait until the request fits the budget; returns seconds spent waiting"""
+        waited = 0.0
+        while True:
+            wait = self._try_acquire(tokens)
+            if wait <= 0:
+                return waited
+            await asyncio.sleep(wait)
+            waited += wait
+
+
+_limiters: Dict[str, ProjectRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_project_rate_limiter(project_id: str, requests_per_minute: int,
+                             tokens_per_minute: int) -> ProjectRateLimiter:
+    """Get the process-wide limiter for a project, rebuilding it if its budget changed"""
+    with _limiters_lock:
+        limiter = _limiters.get(project_id)
+        if (limiter is None or limiter.requests_per_minute != requests_per_minute or
+                limiter.tokens_per_minute != tokens_per_minute):
+            limiter = ProjectRateLimiter(requests_per_minute, tokens_per_minute)
+            _limiters[project_id] = limiter
+        return limiter
+
+
+@dataclass
+class SummarizationRequest:
+    """Content and prompt metadata for one chunk"""
+    content: str
+    metadata: Dict[str, Any]
+
+
+class ChunkSummarizationPipeline:
+    """
+    Generates summary and topic for many chunks with bounded concurrency.
+
+    The summarizer's blocking ``generate_summary`` / ``generate_topic`` (or
+    ``generate_summary_and_topic`` in combined mode) run on worker threads,
+    at most ``MAX_CONCURRENCY`` chunks at a time and within the project's rate
+    budget. Calls returning nothing are retried with exponential backoff and
+    full jitter. Results are returned in request order; ``None`` entries mean
+    the caller should apply its own fallback.
+    """
+
+    def __init__(self, summarizer, project_id: str, pipeline_settings: Optional[Dict[str, Any]] = None):
+        self.summarizer = summarizer
+        self.project_id = project_id
+        self.settings = pipeline_settings or get_pipeline_settings()
+        self.max_concurrency = max(1, self.settings['MAX_CONCURRENCY'])
+        self.max_retries = max(0, self.settings['MAX_RETRIES'])
+        self.retry_base_delay = self.settings['RETRY_BASE_DELAY']
+        self.combined = bool(self.settings['COMBINED_CALL']) and hasattr(summarizer, 'generate_summary_and_topic')
+        self.limiter = get_project_rate_limiter(
+            project_id, self.settings['REQUESTS_PER_MINUTE'], self.settings['TOKENS_PER_MINUTE']
+        )
+        self.stats = {'calls': 0, 'retries': 0, 'failures': 0, 'rate_limit_wait_s': 0.0}
+
+    def run(self, requests: List[SummarizationRequest]) -> List[Tuple[Optional[str], Optional[str]]]:
+        """Process all requests and return (summary, topic) pairs in request order"""
+        if not requests:
+            return []
+
+        started_at = time.monotonic()
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            results = asyncio.run(self._run_all(requests))
+        else:
+            # Called from inside an event loop: run the pipeline on its own loop
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                results = executor.submit(asyncio.run, self._run_all(requests)).result()
+
+        logger.info(
+            f"🧠 SUMMARIZATION: {len(requests)} chunks in {time.monotonic() - started_at:.1f}s "
+            f"(concurrency {self.max_concurrency}, combined={self.combined}, calls {self.stats['calls']}, "
+            f"retries {self.stats['retries']}, failures {self.stats['failures']}, "
+            f"rate-limit wait {self.stats['rate_limit_wait_s']:.1f}s)"
+        )
+        return results
+
+    async def _run_all(self, requests: List[SummarizationRequest]) -> List[Tuple[Optional[str], Optional[str]]]:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_one(request: SummarizationRequest):
+            async with semaphore:
+                if self.combined:
+                    result = await self._call_with_retry(
+                        self.summarizer.generate_summary_and_topic, request, expected_tokens=200
+                    )
+                    return result if result else (None, None)
+                summary, topic = await asyncio.gather(
+                    self._call_with_retry(
+                        self.summarizer.generate_summary, request,
+                        expected_tokens=getattr(self.summarizer, 'max_tokens', 150)
+                    ),
+                    self._call_with_retry(self.summarizer.generate_topic, request, expected_tokens=30)
+                )
+                return summary, topic
+
+        return await asyncio.gather(*(run_one(request) for request in requests))
+
+    async def _call_with_retry(self, method, request: SummarizationRequest, expected_tokens: int):
+        if not request.content.strip():
+            return None
+
+        max_input_length = getattr(self.summarizer, 'max_input_length', 3000)
+        tokens = min(len(request.content), max_input_length) // CHARS_PER_TOKEN + expected_tokens
+
+        for attempt in range(self.max_retries + 1):
+            self.stats['rate_limit_wait_s'] += await self.limiter.acquire(tokens)
+            self.stats['calls'] += 1
+            try:
+                result = await asyncio.to_thread(method, request.content, request.metadata)
+            except Exception as e:
+                logger.warning(f"⚠️ SUMMARIZATION: {method.__name__} raised: {e}")
+                result = None
+
+            if result:
+                return result
+
+            if attempt < self.max_retries:
+                self.stats['retries'] += 1
+                await asyncio.sleep(random.uniform(0, self.retry_base_delay * (2 ** attempt)))
+
+        self.stats['failures'] += 1
+        return None
@@ -23,6 +23,17 @@ export interface AgentMessage {
     token_count?: number;
 }
 
+export interface StreamingAgentMessage {
+    execution_id: string;
+    node_id: string;
+    agent_name: string;
+    agent_type: string;
+    content: string;
+    done: boolean;
+    error?: string | null;
+    first_token_ms?: number | null;
+}
+
 export interface HumanInputRequest {
     request_id: string;
     agent_name: string;
@@ -66,6 +77,8 @@ export class WorkflowWebSocketService {
     public connectionStatus: Writable<'disconnected' | 'connecting' | 'connected' | 'error'> = writable('disconnected');
     public capabilities: Writable<WorkflowCapabilities | null> = writable(null);
     public humanInputRequests: Writable<HumanInputRequest[]> = writable([]);
+    // Partial agent output keyed by node_id while the agent is still generating
+    public streamingMessages: Writable<Record<string, StreamingAgentMessage>> = writable({});
     
     // Event handlers
     private messageHandlers: Map<string, Function> = new Map();
@@ -176,6 +189,10 @@ export class WorkflowWebSocketService {
                 this.handleAgentMessage(data);
                 break;
                 
+            case 'agent_stream':
+                this.handleAgentStream(data);
+                break;
+                
             case 'execution_status':
                 this.handleExecutionStatus(data);
                 break;
@@ -242,6 +259,34 @@ export class WorkflowWebSocketService {
         console.log(`💬 Agent message from ${message.agent_name}: ${message.content.substring(0, 50)}...`);
     }
     
+    /**
+     * Handle streamed agent tokens (agent_stream_start / agent_token / agent_stream_end)
+     */
+    private handleAgentStream(data: any): void {
+        this.streamingMessages.update(streams => {
+            const current = streams[data.node_id];
+            if (data.event === 'agent_stream_start' || !current) {
+                streams[data.node_id] = {
+                    execution_id: data.execution_id,
+                    node_id: data.node_id,
+                    agent_name: data.agent_name,
+                    agent_type: data.agent_type,
+                    content: '',
+                    done: false
+                };
+            }
+            const stream = streams[data.node_id];
+            if (data.event === 'agent_token') {
+                stream.content += data.delta || '';
+            } else if (data.event === 'agent_stream_end') {
+                stream.done = true;
+                stream.error = data.error;
+                stream.first_token_ms = data.first_token_ms;
+            }
+            return { ...streams };
+        });
+    }
+    
     /**
      * Handle execution status updates
      */
@@ -367,6 +412,7 @@ export class WorkflowWebSocketService {
      */
     clearMessages(): void {
         this.messages.set([]);
+        this.streamingMessages.set({});
     }
     
     /**